@@ -0,0 +1,183 @@
+"""
+海豚内置函数执行性能基准测试：对比优化前的逐次解析实现与编译缓存实现
+
+用法：
+    python benchmarks/bench_dolphin_inner_function.py [海豚脚本目录] [--repeat N]
+
+如果指定海豚脚本目录，则使用目录下所有文件作为测试语料（例如从 t_ds_task_definition 导出的 rawScript 和 sql），
+否则使用内置的样例语料。
+"""
+
+import argparse
+import calendar
+import datetime
+import os
+import time
+from typing import Any, List
+
+from hanlu.common import dolphin_utils
+
+# 内置样例语料中使用的海豚内置函数
+SAMPLE_EXPRESSION_LIST = [
+    "${zdt.addDay(-1).format(\"yyyyMMdd\")}",
+    "${zdt.addDay(-2).format(\"yyyyMMdd\")}",
+    "${zdt.addDay(-1).format(\"yyyy-MM-dd\")}",
+    "${zdt.add(2,-1).format(\"yyyyMM\")}",
+    "${zdt.add(5,-7).format(\"yyyyMMdd\")}",
+    "${zdt.add(11,-1).format(\"yyyyMMddHH\")}",
+    "${start(\"yyyyMMdd\",-1)}",
+    "${zdt.getTime()}",
+]
+
+SAMPLE_SQL_TEMPLATE = """
+INSERT OVERWRITE TABLE dw.dws_order_{idx} PARTITION (dt = '{e0}')
+SELECT order_id, user_id, amount
+FROM ods.ods_order_{idx}
+WHERE dt BETWEEN '{e1}' AND '{e0}' AND month = '{e3}' AND hour = '{e5}';
+"""
+
+SAMPLE_SHELL_TEMPLATE = """
+beeline -u "jdbc:hive2://127.0.0.1:10000/dw" -e "ALTER TABLE dw.dwd_log_{idx} DROP IF EXISTS PARTITION (dt='{e4}')"
+spark-submit --class com.example.Job{idx} job.jar {e0} {e2} {e7}
+"""
+
+
+def build_sample_corpus(n_script: int = 200, n_statement: int = 20) -> List[str]:
+    """构造内置样例语料：每个脚本包含 n_statement 段 SQL 或 Shell，每段包含多个海豚内置函数"""
+    corpus = []
+    for i in range(n_script):
+        template = SAMPLE_SQL_TEMPLATE if i % 2 == 0 else SAMPLE_SHELL_TEMPLATE
+        corpus.append("".join(
+            template.format(idx=j, **{f"e{k}": expression for k, expression in enumerate(SAMPLE_EXPRESSION_LIST)})
+            for j in range(n_statement)
+        ))
+    return corpus
+
+
+def load_corpus(path: str) -> List[str]:
+    """读取目录下所有文件作为测试语料"""
+    corpus = []
+    for root, _, file_names in os.walk(path):
+        for file_name in file_names:
+            with open(os.path.join(root, file_name), encoding="utf-8", errors="ignore") as file:
+                corpus.append(file.read())
+    return corpus
+
+
+def run_inner_function_per_occurrence(text: str, business_date: datetime.datetime) -> str:
+    """优化前的实现：每个内置函数出现时都重新拆分、解析参数和转换日期格式
+
+    除业务日期改为参数传入、月份计算使用修正后的跨年算法外，与编译缓存前的 dolphin_utils.run_inner_function 一致。
+    """
+    if text.startswith("${"):
+        text = text[2:]
+    if text.endswith("}"):
+        text = text[:-1]
+
+    now: Any = None
+    for sub_text in text.split("."):
+        if "(" in sub_text and sub_text.endswith(")"):
+            idx = sub_text.index("(")
+            name = sub_text[:idx]
+            params = sub_text[idx + 1:-1].split(",")
+        else:
+            name = sub_text
+            params = []
+
+        if now is None:
+            if name == "start" and len(params) == 2:
+                p1 = (params[0][1:-1]
+                      .replace("yyyy", "%Y")
+                      .replace("MM", "%m")
+                      .replace("dd", "%d")
+                      .replace("HH", "%H")
+                      .replace("mm", "%M")
+                      .replace("ss", "%S"))
+                p2 = int(params[1])
+                now = (business_date + datetime.timedelta(days=p2)).strftime(p1)
+            elif name == "zdt":
+                now = business_date
+            else:
+                return "${" + text + "}"
+        else:
+            if name == "addDay" and isinstance(now, datetime.datetime):
+                now += datetime.timedelta(days=int(params[0]))
+            elif name == "add" and isinstance(now, datetime.datetime):
+                p1 = int(params[0])
+                p2 = int(params[1])
+                if p1 == 1:
+                    new_year = now.year + p2
+                    new_day = min(now.day, calendar.monthrange(new_year, now.month)[1])
+                    now = now.replace(year=new_year, day=new_day)
+                elif p1 == 2:
+                    year_delta, month_idx = divmod(now.month - 1 + p2, 12)
+                    new_year = now.year + year_delta
+                    new_day = min(now.day, calendar.monthrange(new_year, month_idx + 1)[1])
+                    now = now.replace(year=new_year, month=month_idx + 1, day=new_day)
+                elif p1 == 3 or p1 == 4:
+                    now += datetime.timedelta(days=p2 * 7)
+                elif p1 == 5:
+                    now += datetime.timedelta(days=p2 * 1)
+                elif p1 == 11:
+                    now += datetime.timedelta(hours=p2 * 1)
+                else:
+                    return "${" + text + "}"
+            elif name == "format" and isinstance(now, datetime.datetime):
+                p1 = (params[0][1:-1]
+                      .replace("yyyy", "%Y")
+                      .replace("MM", "%m")
+                      .replace("dd", "%d")
+                      .replace("HH", "%H")
+                      .replace("mm", "%M")
+                      .replace("ss", "%S"))
+                now = now.strftime(p1)
+            elif name == "getTime" and isinstance(now, datetime.datetime):
+                now = int(now.timestamp())
+            else:
+                return "${" + text + "}"
+
+    if isinstance(now, str):
+        return now
+    if isinstance(now, int):
+        return str(now)
+    return "${" + text + "}"
+
+
+def run_uncached(script: str, business_date: datetime.datetime) -> str:
+    """优化前的实现：逐次解析每个内置函数"""
+    return dolphin_utils.DOLPHIN_INNER_FUNCTION.sub(
+        lambda x: run_inner_function_per_occurrence(x.group(), business_date), script)
+
+
+def run_cached(script: str, business_date: datetime.datetime) -> str:
+    """编译缓存：相同内置函数只编译一次"""
+    return dolphin_utils.run_all_inner_function(script, business_date)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="海豚内置函数执行性能基准测试")
+    parser.add_argument("path", nargs="?", default=None, help="海豚脚本目录")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.path) if args.path is not None else build_sample_corpus()
+    n_expression = sum(len(dolphin_utils.DOLPHIN_INNER_FUNCTION.findall(script)) for script in corpus)
+    business_date = datetime.datetime(2024, 7, 31)
+    print(f"语料: {len(corpus)} 个脚本, {n_expression} 个内置函数, 重复 {args.repeat} 次")
+
+    for script in corpus:  # 检查两种执行方式的结果一致
+        assert run_uncached(script, business_date) == run_cached(script, business_date)
+
+    for name, function in [("逐次解析", run_uncached), ("编译缓存", run_cached)]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start_time = time.perf_counter()
+            for script in corpus:
+                function(script, business_date)
+            best = min(best, time.perf_counter() - start_time)
+        print(f"{name}: {best * 1000:.1f} ms, "
+              f"{best / len(corpus) * 1e6:.1f} us/script, {best / max(n_expression, 1) * 1e6:.2f} us/expression")
+
+
+if __name__ == "__main__":
+    main()
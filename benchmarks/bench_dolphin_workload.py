@@ -0,0 +1,278 @@
+"""
+寒露分析器端到端性能基准测试：使用合成的海豚调度任务负载，测量吞吐量、任务耗时分位数、分阶段耗时和峰值内存
+
+用法：
+    python benchmarks/bench_dolphin_workload.py [--tasks N] [--seed S] [--workers W] [--output result.json]
+                                                [--baseline baseline.json]
+
+默认使用 synthetic_dolphin_workload 生成任务记录；指定 --records 时从 JSON Lines 文件读取任务记录（例如
+synthetic_dolphin_workload.py 生成的文件，或从 t_ds_task_definition 导出的记录）。指定 --output 时将结果写入 JSON 文件，
+指定 --baseline 时与之前写入的结果文件对比（例如升级 metasequoia_sql / metasequoia_shell 前后的两次运行）。
+
+--workers 为 1 时在当前进程中串行分析并精确记录每个任务的耗时；大于 1 时使用 analyze_dolphin_tasks 的进程池，任务耗时
+分位数根据性能分析器的直方图估算（取 2 的幂次桶的上界）。
+"""
+
+import argparse
+import collections
+import datetime
+import importlib.metadata
+import json
+import os
+import platform
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from hanlu import BatchReport
+from hanlu import HanLuDefaultAnalyzer
+from hanlu import analyze_dolphin_tasks
+from hanlu.analyzer_batch import _analyze_record
+from hanlu.analyzer_logger import FailureSummary
+from hanlu.analyzer_logger import NULL_LOGGER
+from hanlu.analyzer_profiler import TimingProfiler
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_dolphin_workload import SyntheticDolphinEnv  # noqa: E402
+from synthetic_dolphin_workload import create_hanlu_env  # noqa: E402
+from synthetic_dolphin_workload import generate_task_definitions  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 记录版本号的依赖包（升级这些包前后的结果需要对比）
+PACKAGE_LIST = ["hanlu", "metasequoia-sql", "metasequoia-shell", "metasequoia-data-linage"]
+
+# 结果文件格式版本：结果文件的结构变化时递增
+RESULT_FORMAT_VERSION = 1
+
+
+def load_records(path: str) -> List[Dict[str, Any]]:
+    """从 JSON Lines 文件读取任务记录"""
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def percentiles(seconds_list: List[float]) -> Dict[str, float]:
+    """计算耗时列表的精确分位数（最近秩法）"""
+    if not seconds_list:
+        return {"count": 0}
+    seconds_list = sorted(seconds_list)
+    n = len(seconds_list)
+
+    def rank(q: float) -> float:
+        return seconds_list[min(n - 1, max(0, int(q * n + 0.5) - 1))]
+
+    return {
+        "count": n,
+        "mean_seconds": sum(seconds_list) / n,
+        "p50_seconds": rank(0.5),
+        "p90_seconds": rank(0.9),
+        "p99_seconds": rank(0.99),
+        "max_seconds": seconds_list[-1],
+    }
+
+
+def peak_rss() -> Dict[str, Optional[int]]:
+    """当前进程和已结束子进程（工作进程）的峰值常驻内存（字节），不支持 resource 模块的平台返回 None"""
+    if resource is None:
+        return {"self_bytes": None, "children_bytes": None}
+    unit = 1 if sys.platform == "darwin" else 1024  # ru_maxrss 在 macOS 上以字节为单位，在 Linux 上以 KB 为单位
+    return {"self_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+            "children_bytes": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit}
+
+
+def package_versions() -> Dict[str, Optional[str]]:
+    """依赖包的版本号，未安装的包为 None"""
+    versions = {}
+    for name in PACKAGE_LIST:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def run_serial(analyzer: HanLuDefaultAnalyzer, records: List[Dict[str, Any]],
+               failure_summary: FailureSummary) -> Dict[str, Any]:
+    """在当前进程中串行分析，返回所有任务及各任务类型的精确耗时分位数"""
+    seconds_hash: Dict[str, List[float]] = collections.defaultdict(list)
+    for record in records:
+        start_time = time.perf_counter()
+        data_task = _analyze_record(analyzer, record)
+        seconds_hash[record["task_type"]].append(time.perf_counter() - start_time)
+        failure_summary.add(record["code"], data_task)
+    latency = {"all": percentiles([seconds for seconds_list in seconds_hash.values() for seconds in seconds_list])}
+    for task_type, seconds_list in sorted(seconds_hash.items()):
+        latency[task_type] = percentiles(seconds_list)
+    return latency
+
+
+def run_parallel(analyzer: HanLuDefaultAnalyzer, records: List[Dict[str, Any]], workers: int,
+                 chunk_size: int, failure_summary: FailureSummary) -> Dict[str, Any]:
+    """使用进程池分析，返回各任务类型的估算耗时分位数（工作进程的性能分析统计合并到 analyzer.profiler）"""
+    report = BatchReport(failure_summary=failure_summary)
+    for _ in analyze_dolphin_tasks(analyzer, records, workers=workers, chunk_size=chunk_size, report=report):
+        pass
+    task_stage = analyzer.profiler.report(top_n=0)["stages"].get("task", {})
+    keys = ("count", "mean_seconds", "p50_seconds", "p90_seconds", "p99_seconds", "max_seconds")
+    return {task_type: {key: metric[key] for key in keys} for task_type, metric in task_stage.items()}
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """执行基准测试，返回结果"""
+    if args.records is not None:
+        records = load_records(args.records)
+    else:
+        records = list(generate_task_definitions(args.tasks, seed=args.seed, sql_ratio=args.sql_ratio,
+                                                 param_count=args.params, max_statements=args.max_statements))
+
+    profiler = TimingProfiler(top_n=args.top)
+    analyzer = HanLuDefaultAnalyzer(
+        hanlu_env=create_hanlu_env(),
+        dolphin_env=SyntheticDolphinEnv(),
+        business_date=datetime.datetime(2024, 7, 31),
+        profiler=profiler,
+        logger=NULL_LOGGER,
+    )
+
+    # 预热：使用不同随机种子生成的任务，避免预热结果进入 DataX 缓存影响正式测试
+    if args.warmup > 0 and args.workers <= 1:
+        for record in generate_task_definitions(args.warmup, seed=args.seed + 1, sql_ratio=args.sql_ratio,
+                                                param_count=args.params, max_statements=args.max_statements):
+            _analyze_record(analyzer, record)
+        profiler.take()
+
+    failure_summary = FailureSummary()
+    start_time = time.perf_counter()
+    if args.workers <= 1:
+        latency = run_serial(analyzer, records, failure_summary)
+    else:
+        latency = run_parallel(analyzer, records, args.workers, args.chunk_size, failure_summary)
+    wall_seconds = time.perf_counter() - start_time
+
+    task_type_counter = collections.Counter(record["task_type"] for record in records)
+    profile = profiler.report(top_n=args.top)
+    return {
+        "format_version": RESULT_FORMAT_VERSION,
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "packages": package_versions(),
+        },
+        "config": {
+            "records": args.records,
+            "tasks": len(records),
+            "task_types": dict(sorted(task_type_counter.items())),
+            "seed": args.seed if args.records is None else None,
+            "sql_ratio": args.sql_ratio if args.records is None else None,
+            "params": args.params if args.records is None else None,
+            "max_statements": args.max_statements if args.records is None else None,
+            "workers": args.workers,
+            "chunk_size": args.chunk_size,
+            "warmup": args.warmup,
+        },
+        "summary": {
+            "wall_seconds": wall_seconds,
+            "tasks_per_second": len(records) / wall_seconds if wall_seconds > 0 else 0.0,
+            "unknown_count": failure_summary.unknown_count,
+            "peak_rss": peak_rss(),
+        },
+        "task_latency": latency,
+        "stages": profile["stages"],
+        "slowest_tasks": profile["slowest_tasks"],
+        "failures": failure_summary.report(top_n=args.top),
+    }
+
+
+def _ratio(current: Optional[float], baseline: Optional[float]) -> str:
+    if not current or not baseline:
+        return "-"
+    return f"{current / baseline:.2f}x"
+
+
+def compare_with_baseline(result: Dict[str, Any], baseline: Dict[str, Any]) -> List[str]:
+    """与基准结果对比，返回对比报告的各行（比值为 当前 / 基准）"""
+    summary, baseline_summary = result["summary"], baseline["summary"]
+    lines = [
+        f"基准: {baseline.get('created_at')}, packages: {baseline['environment']['packages']}",
+        f"吞吐量: {summary['tasks_per_second']:.1f} vs {baseline_summary['tasks_per_second']:.1f} task/s "
+        f"({_ratio(summary['tasks_per_second'], baseline_summary['tasks_per_second'])})",
+        f"峰值内存: {_ratio(summary['peak_rss']['self_bytes'], baseline_summary['peak_rss']['self_bytes'])}, "
+        f"推断失败: {summary['unknown_count']} vs {baseline_summary['unknown_count']}",
+    ]
+    config, baseline_config = result["config"], baseline["config"]
+    if any(config[key] != baseline_config.get(key) for key in ("records", "tasks", "seed", "sql_ratio", "params",
+                                                               "workers")):
+        lines.append("注意: 两次运行的任务记录或工作进程数不同，结果不能直接对比")
+    for task_type, metric in result["task_latency"].items():
+        baseline_metric = baseline["task_latency"].get(task_type)
+        if not metric["count"] or not baseline_metric or not baseline_metric["count"]:
+            continue
+        lines.append(f"  任务 {task_type}: p50 {_ratio(metric['p50_seconds'], baseline_metric['p50_seconds'])}, "
+                     f"p99 {_ratio(metric['p99_seconds'], baseline_metric['p99_seconds'])}")
+    for stage, label_hash in result["stages"].items():  # 阶段的各标签合计（标签的取值随依赖包版本变化）
+        baseline_label_hash = baseline["stages"].get(stage)
+        if stage == "task" or baseline_label_hash is None:
+            continue
+        total = sum(metric["total_seconds"] for metric in label_hash.values())
+        baseline_total = sum(metric["total_seconds"] for metric in baseline_label_hash.values())
+        count = sum(metric["count"] for metric in label_hash.values())
+        baseline_count = sum(metric["count"] for metric in baseline_label_hash.values())
+        lines.append(f"  阶段 {stage}: total {_ratio(total, baseline_total)}, count {count} vs {baseline_count}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="寒露分析器端到端性能基准测试")
+    parser.add_argument("--tasks", type=int, default=2000, help="生成的任务数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--sql-ratio", type=float, default=0.4, help="SQL 任务的比例")
+    parser.add_argument("--params", type=int, default=4, help="每个 INSERT 语句中的海豚内置函数数量")
+    parser.add_argument("--max-statements", type=int, default=8, help="每个 SQL 脚本的最大语句数")
+    parser.add_argument("--records", default=None, help="任务记录文件（JSON Lines），指定时不生成任务")
+    parser.add_argument("--workers", type=int, default=1, help="工作进程数，为 1 时在当前进程中串行分析")
+    parser.add_argument("--chunk-size", type=int, default=64, help="每次提交到工作进程的任务数")
+    parser.add_argument("--warmup", type=int, default=100, help="串行分析时的预热任务数")
+    parser.add_argument("--top", type=int, default=20, help="结果中包含的最慢任务数和失败原因数")
+    parser.add_argument("--output", default=None, help="结果文件（JSON）")
+    parser.add_argument("--baseline", default=None, help="对比的基准结果文件（JSON）")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    summary = result["summary"]
+    print(f"任务: {result['config']['tasks']} {result['config']['task_types']}, workers: {args.workers}")
+    print(f"耗时: {summary['wall_seconds']:.2f}s, 吞吐量: {summary['tasks_per_second']:.1f} task/s, "
+          f"推断失败: {summary['unknown_count']}")
+    for name, value in summary["peak_rss"].items():
+        if value is not None:
+            print(f"峰值内存 {name}: {value / 1024 / 1024:.1f} MB")
+    for task_type, metric in result["task_latency"].items():
+        if metric["count"]:
+            print(f"  {task_type}: {metric['count']} tasks, p50 {metric['p50_seconds'] * 1000:.2f} ms, "
+                  f"p90 {metric['p90_seconds'] * 1000:.2f} ms, p99 {metric['p99_seconds'] * 1000:.2f} ms")
+    for stage, label_hash in result["stages"].items():
+        total = sum(metric["total_seconds"] for metric in label_hash.values())
+        count = sum(metric["count"] for metric in label_hash.values())
+        print(f"  [{stage}] {count} 次, {total:.2f}s")
+
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=2, default=str)
+        print(f"结果已写入: {args.output}")
+
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        for line in compare_with_baseline(result, baseline):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
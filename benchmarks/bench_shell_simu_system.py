@@ -0,0 +1,75 @@
+"""
+Shell 脚本分析性能基准测试：对比每个脚本初始化模拟系统与复用模拟系统的单脚本延迟
+
+用法：
+    python benchmarks/bench_shell_simu_system.py [Shell 脚本目录] [--repeat N]
+
+如果指定 Shell 脚本目录，则使用目录下所有文件作为测试语料，否则使用内置的样例语料。
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import List
+
+from hanlu import HanLuDefaultAnalyzer
+from hanlu import HanLuEnv
+
+SAMPLE_SHELL_SCRIPT_LIST = [
+    "echo start\n"
+    "beeline -u \"jdbc:hive2://127.0.0.1:10000/dw\" -e \"INSERT OVERWRITE TABLE dw.dwd_order SELECT * FROM ods.ods_order\"\n"
+    "echo done\n",
+
+    "DT=20240731\n"
+    "beeline -u \"jdbc:hive2://127.0.0.1:10000/dw\" -e \"ALTER TABLE dw.dwd_log DROP IF EXISTS PARTITION (dt='${DT}')\"\n",
+
+    "for i in 1 2 3; do\n"
+    "  echo $i\n"
+    "done\n"
+    "mkdir -p /tmp/output\n"
+    "rm -rf /tmp/output/*\n",
+]
+
+
+def load_corpus(path: str) -> List[str]:
+    """读取目录下所有文件作为测试语料"""
+    corpus = []
+    for root, _, file_names in os.walk(path):
+        for file_name in file_names:
+            with open(os.path.join(root, file_name), encoding="utf-8", errors="ignore") as file:
+                corpus.append(file.read())
+    return corpus
+
+
+def measure(analyzer: HanLuDefaultAnalyzer, corpus: List[str], repeat: int) -> List[float]:
+    """返回每个脚本每次分析的延迟（秒）"""
+    latency_list = []
+    for _ in range(repeat):
+        for script in corpus:
+            start_time = time.perf_counter()
+            analyzer.analyze_shell_script(script)
+            latency_list.append(time.perf_counter() - start_time)
+    return latency_list
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shell 脚本分析性能基准测试")
+    parser.add_argument("path", nargs="?", default=None, help="Shell 脚本目录")
+    parser.add_argument("--repeat", type=int, default=20, help="重复次数")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.path) if args.path is not None else SAMPLE_SHELL_SCRIPT_LIST
+    hanlu_env = HanLuEnv()
+    print(f"语料: {len(corpus)} 个脚本, 重复 {args.repeat} 次")
+
+    for name, reuse_shell_system in [("每个脚本初始化模拟系统", False), ("复用模拟系统", True)]:
+        analyzer = HanLuDefaultAnalyzer(hanlu_env, reuse_shell_system=reuse_shell_system)
+        latency_list = sorted(measure(analyzer, corpus, args.repeat))
+        p99 = latency_list[min(len(latency_list) - 1, int(len(latency_list) * 0.99))]
+        print(f"{name}: 平均 {statistics.mean(latency_list) * 1000:.3f} ms/script, "
+              f"中位数 {statistics.median(latency_list) * 1000:.3f} ms, P99 {p99 * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+合成的海豚调度任务负载：生成 t_ds_task_definition 表的记录，用于端到端的性能基准测试
+
+生成的任务包括：
+- SQL 任务：Hive 或 MySQL 数据源上的多语句 SQL（INSERT ... SELECT、WITH 子句、关联、ALTER TABLE、SET 等）
+- SHELL 任务：beeline -e / -f（包含 --hivevar 参数和脚本中的变量）、spark-submit（已注册和未注册血缘模板的作业）、
+  DataX（通过 heredoc 生成配置文件），以及变量赋值、echo、mkdir 等不影响血缘关系的命令
+- DEPENDENT 任务
+
+SQL 和 Shell 脚本中包含大量 ${zdt...}、$[yyyyMMdd-1] 等海豚内置函数。生成结果只由参数和随机种子决定，相同参数的多次运行可以比较。
+
+用法（将生成的记录写入 JSON Lines 文件）：
+    python benchmarks/synthetic_dolphin_workload.py output.jsonl [--tasks N] [--seed S]
+"""
+
+import argparse
+import json
+import random
+from typing import Any, Dict, Iterator, List
+
+from hanlu import DHiveInstance
+from hanlu import DMySQLInstance
+from hanlu import HanLuEnv
+from hanlu.data_node import DInstance
+from hanlu.hanlu_env import DolphinEnv
+from hanlu.spark import SparkLineageTemplate
+
+__all__ = [
+    "HIVE_HOSTS",
+    "SyntheticDolphinEnv",
+    "create_hanlu_env",
+    "generate_task_definitions",
+]
+
+HIVE_HOSTS = ["10.0.0.1:10000", "10.0.0.2:10000"]  # 合成 Hive 集群的主机列表
+MYSQL_HOST = "10.0.1.1"  # 合成 MySQL 服务器的主机
+MYSQL_PORT = 3306
+
+HIVE_DATASOURCE_ID = 1  # SQL 任务使用的 Hive 数据源 ID
+MYSQL_DATASOURCE_ID = 2  # SQL 任务使用的 MySQL 数据源 ID
+
+LAYER_LIST = ["ods", "dwd", "dws", "ads"]  # 数仓分层（库名），下游层的表依赖上游层的表
+DOMAIN_LIST = ["order", "user", "item", "payment", "logistics", "coupon", "shop", "log"]
+TABLE_PER_DOMAIN = 50  # 每个分层中每个主题域的表数
+
+# 海豚内置函数表达式
+DOLPHIN_EXPRESSION_LIST = [
+    "${zdt.addDay(-1).format(\"yyyyMMdd\")}",
+    "${zdt.addDay(-2).format(\"yyyyMMdd\")}",
+    "${zdt.addDay(-1).format(\"yyyy-MM-dd\")}",
+    "${zdt.add(2,-1).format(\"yyyyMM\")}",
+    "${zdt.add(5,-7).format(\"yyyyMMdd\")}",
+    "${zdt.add(11,-1).format(\"yyyyMMddHH\")}",
+    "${start(\"yyyyMMdd\",-1)}",
+    "$[yyyyMMdd-1]",
+    "$[yyyy-MM-dd-7]",
+]
+
+# 已注册血缘模板的 spark-submit 作业：(Jar 包, 主类)
+SPARK_TEMPLATE_JOB_LIST = [(f"/opt/jobs/etl-{i}.jar", f"com.example.etl.Job{i}") for i in range(20)]
+
+
+class SyntheticDolphinEnv(DolphinEnv):
+    """合成负载使用的海豚环境：数据源 ID 到数据实例的固定映射（定义在模块顶层，以便发送到工作进程）"""
+
+    def __init__(self):
+        self._instance_hash = {
+            HIVE_DATASOURCE_ID: DHiveInstance.create(hosts=HIVE_HOSTS, name="hive"),
+            MYSQL_DATASOURCE_ID: DMySQLInstance.create(host=MYSQL_HOST, port=MYSQL_PORT, name="mysql"),
+        }
+
+    def get_data_instance(self, data_source_id: int) -> DInstance:
+        return self._instance_hash.get(data_source_id, DInstance.unknown())
+
+
+def create_hanlu_env() -> HanLuEnv:
+    """创建合成负载使用的寒露环境：注册 Hive 集群、MySQL 服务器和 spark-submit 作业的血缘模板"""
+    hanlu_env = HanLuEnv()
+    hanlu_env.regist_hive_cluster(HIVE_HOSTS, "hive")
+    hanlu_env.regist_mysql_server(MYSQL_HOST, MYSQL_PORT, "mysql")
+    hanlu_env.regist_spark_hive("hive")
+    for i, (application, arg_class) in enumerate(SPARK_TEMPLATE_JOB_LIST):
+        hanlu_env.regist_spark_submit_template(application, arg_class, SparkLineageTemplate(
+            dependent_tables=(f"dwd.dwd_{DOMAIN_LIST[i % len(DOMAIN_LIST)]}_{i}",),
+            generate_tables=(f"dws.dws_{DOMAIN_LIST[i % len(DOMAIN_LIST)]}_{{0}}",)
+        ))
+    return hanlu_env
+
+
+class _TaskGenerator:
+    """按随机种子生成任务记录"""
+
+    def __init__(self, seed: int, param_count: int, max_statements: int):
+        self.random = random.Random(seed)
+        self.param_count = param_count
+        self.max_statements = max_statements
+
+    def table(self, layer_idx: int) -> str:
+        domain = self.random.choice(DOMAIN_LIST)
+        layer = LAYER_LIST[layer_idx]
+        return f"{layer}.{layer}_{domain}_{self.random.randrange(TABLE_PER_DOMAIN)}"
+
+    def expression(self) -> str:
+        return self.random.choice(DOLPHIN_EXPRESSION_LIST)
+
+    def conditions(self) -> str:
+        """包含 param_count 个海豚内置函数的过滤条件"""
+        return " AND ".join(f"col_{i} <= '{self.expression()}'" for i in range(self.param_count)) or "1 = 1"
+
+    def insert_statement(self) -> str:
+        layer_idx = self.random.randrange(1, len(LAYER_LIST))
+        target = self.table(layer_idx)
+        source_1 = self.table(layer_idx - 1)
+        source_2 = self.table(layer_idx - 1)
+        style = self.random.randrange(3)
+        if style == 0:
+            return (f"INSERT OVERWRITE TABLE {target} PARTITION (dt = '{self.expression()}')\n"
+                    f"SELECT a.id, a.user_id, b.amount, CASE WHEN b.status = 1 THEN 'paid' ELSE 'unpaid' END\n"
+                    f"FROM {source_1} a\nLEFT JOIN {source_2} b ON a.id = b.id\n"
+                    f"WHERE a.dt = '{self.expression()}' AND {self.conditions()}")
+        if style == 1:
+            return (f"WITH t1 AS (\n  SELECT id, sum(amount) AS amount FROM {source_1}\n"
+                    f"  WHERE dt BETWEEN '{self.expression()}' AND '{self.expression()}' GROUP BY id\n)\n"
+                    f"INSERT INTO TABLE {target}\nSELECT t1.id, t1.amount, c.name\nFROM t1\n"
+                    f"JOIN {source_2} c ON t1.id = c.id\nWHERE {self.conditions()}")
+        return (f"INSERT OVERWRITE TABLE {target} PARTITION (dt = '{self.expression()}')\n"
+                f"SELECT id, count(1) AS cnt FROM (\n  SELECT id FROM {source_1} WHERE {self.conditions()}\n"
+                f"  UNION ALL\n  SELECT id FROM {source_2} WHERE dt = '{self.expression()}'\n) t GROUP BY id")
+
+    def hive_sql(self) -> str:
+        statement_list = []
+        for _ in range(self.random.randint(1, self.max_statements)):
+            kind = self.random.random()
+            if kind < 0.65:
+                statement_list.append(self.insert_statement())
+            elif kind < 0.8:
+                statement_list.append(f"ALTER TABLE {self.table(self.random.randrange(1, len(LAYER_LIST)))} "
+                                      f"DROP IF EXISTS PARTITION (dt = '{self.expression()}')")
+            elif kind < 0.9:
+                statement_list.append(self.random.choice(["SET hive.exec.dynamic.partition.mode=nonstrict",
+                                                          "SET mapreduce.job.queuename=etl",
+                                                          "SET hive.exec.parallel=true"]))
+            else:
+                statement_list.append(f"TRUNCATE TABLE {self.table(len(LAYER_LIST) - 1)}")
+        return ";\n".join(statement_list) + ";"
+
+    def mysql_sql(self) -> str:
+        domain = self.random.choice(DOMAIN_LIST)
+        target = f"report.rpt_{domain}_{self.random.randrange(TABLE_PER_DOMAIN)}"
+        source = f"report.stg_{domain}_{self.random.randrange(TABLE_PER_DOMAIN)}"
+        return (f"INSERT INTO {target} (dt, id, amount)\n"
+                f"SELECT dt, id, sum(amount) FROM {source} WHERE dt = '{self.expression()}' GROUP BY dt, id")
+
+    def sql_task(self) -> Dict[str, Any]:
+        if self.random.random() < 0.85:
+            return {"type": "HIVE", "datasource": HIVE_DATASOURCE_ID, "sql": self.hive_sql(), "sqlType": "1"}
+        return {"type": "MYSQL", "datasource": MYSQL_DATASOURCE_ID, "sql": self.mysql_sql(), "sqlType": "1"}
+
+    def shell_header(self) -> List[str]:
+        """不影响血缘关系的命令和变量赋值"""
+        return [
+            "#!/bin/bash",
+            f"DT={self.expression()}",
+            f"PRE_DT=$(date -d \"{self.expression()} -1 day\" +%Y%m%d)",
+            "echo \"start ${DT}\"",
+            "mkdir -p /tmp/hanlu_bench",
+        ]
+
+    def beeline_command(self) -> List[str]:
+        url = f"jdbc:hive2://{','.join(HIVE_HOSTS)}/default"
+        if self.random.random() < 0.6:
+            sql = self.insert_statement().replace("\n", " ")
+            return [f"beeline -u \"{url}\" -n etl --hivevar dt=${{DT}} -e \"{sql}\""]
+        file_name = f"/tmp/hanlu_bench/job_{self.random.randrange(1 << 30)}.sql"
+        return [f"cat > {file_name} <<EOF", self.hive_sql(), "EOF",
+                f"beeline -u \"{url}\" -n etl -d dw --hivevar dt=${{DT}} -f {file_name}"]
+
+    def spark_submit_command(self) -> List[str]:
+        if self.random.random() < 0.7:
+            application, arg_class = self.random.choice(SPARK_TEMPLATE_JOB_LIST)
+        else:
+            application, arg_class = "/opt/jobs/adhoc.jar", f"com.example.adhoc.Job{self.random.randrange(100)}"
+        return [f"spark-submit --master yarn --deploy-mode cluster --queue etl --num-executors 8 "
+                f"--executor-memory 4g --conf spark.sql.shuffle.partitions=200 --class {arg_class} "
+                f"{application} {self.random.choice(DOMAIN_LIST)} ${{DT}} {self.expression()}"]
+
+    def datax_command(self) -> List[str]:
+        file_name = f"/tmp/hanlu_bench/datax_{self.random.randrange(1 << 30)}.json"
+        config = {"job": {"content": [{
+            "reader": {"name": "mysqlreader", "parameter": {
+                "username": "etl", "password": "******", "column": ["*"],
+                "connection": [{"jdbcUrl": [f"jdbc:mysql://{MYSQL_HOST}:{MYSQL_PORT}/biz"],
+                                "table": [f"biz.{self.random.choice(DOMAIN_LIST)}_{self.random.randrange(20)}"]}]}},
+            "writer": {"name": "hdfswriter", "parameter": {
+                "defaultFS": "hdfs://nameservice1", "fileType": "orc", "writeMode": "truncate",
+                "path": f"/user/hive/warehouse/ods.db/ods_{self.random.choice(DOMAIN_LIST)}_0/dt={self.expression()}"}}
+        }], "setting": {"speed": {"channel": 4}}}}
+        return [f"cat > {file_name} <<EOF", json.dumps(config, indent=2), "EOF",
+                f"/data/datax/bin/datax.py {file_name}"]
+
+    def shell_task(self) -> Dict[str, Any]:
+        line_list = self.shell_header()
+        for _ in range(self.random.randint(1, 4)):
+            kind = self.random.random()
+            if kind < 0.5:
+                line_list.extend(self.beeline_command())
+            elif kind < 0.75:
+                line_list.extend(self.spark_submit_command())
+            else:
+                line_list.extend(self.datax_command())
+        line_list.append("echo \"done ${DT}\"")
+        return {"rawScript": "\n".join(line_list) + "\n", "localParams": [], "resourceList": []}
+
+    def dependent_task(self) -> Dict[str, Any]:
+        return {"dependence": {"relation": "AND", "dependTaskList": []}}
+
+
+def generate_task_definitions(task_count: int,
+                              seed: int = 0,
+                              sql_ratio: float = 0.4,
+                              dependent_ratio: float = 0.05,
+                              param_count: int = 4,
+                              max_statements: int = 8) -> Iterator[Dict[str, Any]]:
+    """生成合成的 t_ds_task_definition 表记录
+
+    Parameters
+    ----------
+    task_count : int
+        任务数
+    seed : int, default = 0
+        随机种子
+    sql_ratio : float, default = 0.4
+        SQL 任务的比例
+    dependent_ratio : float, default = 0.05
+        DEPENDENT 任务的比例，其余为 SHELL 任务
+    param_count : int, default = 4
+        每个 INSERT 语句过滤条件中的海豚内置函数数量
+    max_statements : int, default = 8
+        每个 SQL 脚本的最大语句数
+    """
+    generator = _TaskGenerator(seed, param_count, max_statements)
+    for i in range(task_count):
+        kind = generator.random.random()
+        if kind < sql_ratio:
+            task_type, task_params = "SQL", generator.sql_task()
+        elif kind < sql_ratio + dependent_ratio:
+            task_type, task_params = "DEPENDENT", generator.dependent_task()
+        else:
+            task_type, task_params = "SHELL", generator.shell_task()
+        yield {
+            "code": 10_000_000 + i,
+            "name": f"bench_task_{i}",
+            "version": 1,
+            "project_code": 1000 + i % 20,
+            "task_type": task_type,
+            "task_params": json.dumps(task_params, ensure_ascii=False),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成的海豚调度任务记录（JSON Lines）")
+    parser.add_argument("output", help="输出文件路径")
+    parser.add_argument("--tasks", type=int, default=10000, help="任务数")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--sql-ratio", type=float, default=0.4, help="SQL 任务的比例")
+    parser.add_argument("--params", type=int, default=4, help="每个 INSERT 语句中的海豚内置函数数量")
+    parser.add_argument("--max-statements", type=int, default=8, help="每个 SQL 脚本的最大语句数")
+    args = parser.parse_args()
+
+    with open(args.output, "w", encoding="utf-8") as file:
+        for record in generate_task_definitions(args.tasks, seed=args.seed, sql_ratio=args.sql_ratio,
+                                                param_count=args.params, max_statements=args.max_statements):
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    print(f"已生成 {args.tasks} 个任务: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,9 @@
 寒露数据血缘分析引擎
 """
 
+from hanlu.analyzer_batch import BatchReport
+from hanlu.analyzer_batch import SQLStatementPool
+from hanlu.analyzer_batch import analyze_dolphin_tasks
 from hanlu.analyzer_main import HanLuAnalyzer
 from hanlu.analyzer_main import HanLuDefaultAnalyzer
 from hanlu.data_node import *
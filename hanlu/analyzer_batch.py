@@ -0,0 +1,523 @@
+"""
+寒露批量分析器：使用进程池并行分析海豚调度任务
+"""
+
+import collections
+import concurrent.futures
+import dataclasses
+import multiprocessing
+import multiprocessing.connection
+import os
+import pickle
+import resource
+import signal
+import time
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from hanlu.analyzer_logger import FailureSummary
+from hanlu.analyzer_main import HanLuAnalyzer
+from hanlu.analyzer_main import LackEnvError
+from hanlu.analyzer_profiler import HanLuProfiler
+from hanlu.analyzer_profiler import TimingProfiler
+from hanlu.data_node import DInstance
+from hanlu.data_task import DTask
+from hanlu.data_task import DTaskFailReason
+
+__all__ = [
+    "AnalyzerPickleError",
+    "IsolatedWorker",
+    "WorkerStat",
+    "BatchReport",
+    "SQLStatementPool",
+    "analyze_dolphin_tasks",
+]
+
+
+class AnalyzerPickleError(Exception):
+    """分析器无法序列化到工作进程错误"""
+
+
+@dataclasses.dataclass(slots=True)
+class WorkerStat:
+    """工作进程的吞吐量统计"""
+
+    pid: int = dataclasses.field(kw_only=True)  # 工作进程 ID
+    task_count: int = dataclasses.field(kw_only=True, default=0)  # 已分析的任务数
+    busy_seconds: float = dataclasses.field(kw_only=True, default=0.0)  # 分析任务的累计耗时（秒）
+
+    @property
+    def throughput(self) -> float:
+        """每秒分析的任务数"""
+        if self.busy_seconds <= 0:
+            return 0.0
+        return self.task_count / self.busy_seconds
+
+
+@dataclasses.dataclass(slots=True)
+class BatchReport:
+    """批量分析的统计报告"""
+
+    worker_stat_hash: Dict[int, WorkerStat] = dataclasses.field(kw_only=True, default_factory=dict)  # 进程 ID 到统计的映射
+    start_time: Optional[float] = dataclasses.field(kw_only=True, default=None)  # 批量分析开始时间
+    end_time: Optional[float] = dataclasses.field(kw_only=True, default=None)  # 批量分析结束时间
+    failure_summary: FailureSummary = dataclasses.field(kw_only=True, default_factory=FailureSummary)  # 推断失败原因汇总
+
+    def add(self, pid: int, task_count: int, busy_seconds: float) -> None:
+        """记录工作进程完成的一批任务"""
+        worker_stat = self.worker_stat_hash.get(pid)
+        if worker_stat is None:
+            worker_stat = self.worker_stat_hash[pid] = WorkerStat(pid=pid)
+        worker_stat.task_count += task_count
+        worker_stat.busy_seconds += busy_seconds
+
+    @property
+    def task_count(self) -> int:
+        """已分析的任务总数"""
+        return sum(worker_stat.task_count for worker_stat in self.worker_stat_hash.values())
+
+    @property
+    def wall_seconds(self) -> float:
+        """批量分析的墙钟耗时（秒）"""
+        if self.start_time is None:
+            return 0.0
+        return (self.end_time or time.perf_counter()) - self.start_time
+
+    def summary(self) -> str:
+        """生成便于确定进程池大小的文本报告"""
+        lines = [f"任务数: {self.task_count}, 耗时: {self.wall_seconds:.2f}s, "
+                 f"总吞吐量: {self.task_count / self.wall_seconds if self.wall_seconds > 0 else 0:.1f} task/s"]
+        for worker_stat in sorted(self.worker_stat_hash.values(), key=lambda x: x.pid):
+            lines.append(f"  worker {worker_stat.pid}: {worker_stat.task_count} tasks, "
+                         f"{worker_stat.busy_seconds:.2f}s, {worker_stat.throughput:.1f} task/s")
+        lines.append(self.failure_summary.summary())
+        return "\n".join(lines)
+
+
+# 工作进程中的分析器（由 _init_worker 在进程启动时反序列化）
+_WORKER_ANALYZER: Optional[HanLuAnalyzer] = None
+
+
+def _init_worker(analyzer_payload: bytes) -> None:
+    """工作进程初始化：反序列化分析器，每个工作进程只执行一次"""
+    global _WORKER_ANALYZER
+    _WORKER_ANALYZER = pickle.loads(analyzer_payload)
+
+
+def _analyze_record(analyzer: HanLuAnalyzer, record: Dict[str, Any]) -> DTask:
+    """分析单个任务，除缺失环境信息外的异常均视为推断失败，避免单个任务中断整个批次"""
+    try:
+        return analyzer.analyze_dolphin_task(record)
+    except LackEnvError:
+        raise
+    except MemoryError:
+        return analyzer.fail(DTaskFailReason.MEMORY_LIMIT, task_code=record.get("code"))
+    except Exception as e:
+        return analyzer.fail(DTaskFailReason.ANALYZE_ERROR, type(e).__name__, task_code=record.get("code"),
+                             error=repr(e))
+
+
+def _analyze_chunk(records: List[Dict[str, Any]]
+                   ) -> Tuple[List[Tuple[int, DTask]], int, float, Optional[TimingProfiler]]:
+    """在工作进程中分析一批任务，返回分析结果、工作进程 ID、耗时和这批任务的性能分析统计"""
+    start_time = time.perf_counter()
+    result = [(record["code"], _analyze_record(_WORKER_ANALYZER, record)) for record in records]
+    profiler = _WORKER_ANALYZER.profiler
+    snapshot = profiler.take() if isinstance(profiler, TimingProfiler) else None
+    return result, os.getpid(), time.perf_counter() - start_time, snapshot
+
+
+def _analyze_sql_chunk(data_instance: DInstance, statement_list: List[str], schema_list: List[Optional[str]]
+                       ) -> Tuple[List[DTask], Optional[TimingProfiler]]:
+    """在工作进程中逐个分析 SQL 语句，返回每个语句的分析结果和性能分析统计"""
+    result = [_WORKER_ANALYZER.analyze_sql_statement(data_instance, statement, default_schema)
+              for statement, default_schema in zip(statement_list, schema_list)]
+    profiler = _WORKER_ANALYZER.profiler
+    return result, profiler.take() if isinstance(profiler, TimingProfiler) else None
+
+
+def call_worker_analyzer(method_name: str, *args: Any) -> Any:
+    """在 create_process_pool 创建的工作进程中调用分析器副本的方法（如 analyze_sql、analyze_shell_script）
+
+    Parameters
+    ----------
+    method_name : str
+        分析器的方法名
+    *args : Any
+        方法的参数
+    """
+    return getattr(_WORKER_ANALYZER, method_name)(*args)
+
+
+def dumps_analyzer(analyzer: HanLuAnalyzer) -> bytes:
+    """序列化分析器（包含 HanLuEnv、DolphinEnv 及子类中重写的方法所在的类），序列化失败时给出明确的错误信息"""
+    try:
+        return pickle.dumps(analyzer)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        raise AnalyzerPickleError(
+            f"分析器 {type(analyzer).__name__} 无法序列化到工作进程，"
+            f"请确认分析器子类、HanLuEnv 和 DolphinEnv 的实现类定义在模块顶层且属性可序列化: {e}"
+        ) from e
+
+
+def create_process_pool(analyzer: HanLuAnalyzer, workers: int) -> concurrent.futures.ProcessPoolExecutor:
+    """创建每个工作进程持有一份分析器副本的进程池"""
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(dumps_analyzer(analyzer),)
+    )
+
+
+def _iter_chunks(records: Iterable[Dict[str, Any]], chunk_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """将任务记录按固定大小分批"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_dolphin_tasks(analyzer: HanLuAnalyzer,
+                          records: Iterable[Dict[str, Any]],
+                          workers: Optional[int] = None,
+                          chunk_size: int = 64,
+                          report: Optional[BatchReport] = None,
+                          task_timeout: Optional[float] = None,
+                          memory_limit: Optional[int] = None) -> Iterator[Tuple[int, DTask]]:
+    """使用进程池批量分析海豚调度任务，按输入顺序逐个返回 (task_code, DTask)
+
+    分析器在每个工作进程启动时只序列化一次，因此分析器子类、HanLuEnv 和 DolphinEnv 的实现类需要定义在模块顶层。
+    正在处理的任务批次数量不超过工作进程数的 2 倍，records 可以是生成器，内存占用不随任务总数增长。
+
+    Parameters
+    ----------
+    analyzer : HanLuAnalyzer
+        寒露分析器
+    records : Iterable[Dict[str, Any]]
+        海豚元数据 task_definition 的表中记录
+    workers : Optional[int], default = None
+        工作进程数，默认为 CPU 核数；小于等于 1 时在当前进程中串行分析
+    chunk_size : int, default = 64
+        每次提交到工作进程的任务数
+    report : Optional[BatchReport], default = None
+        统计报告，如果提供则记录每个工作进程的吞吐量及推断失败原因汇总
+    task_timeout : Optional[float], default = None
+        单个任务的墙钟时间上限（秒），超时的任务所在工作进程会被终止并重启，任务结果为
+        DTask.unknown(DTaskFailReason.TIMEOUT)
+    memory_limit : Optional[int], default = None
+        每个工作进程的地址空间上限（字节），超出限制的任务结果为 DTask.unknown(DTaskFailReason.MEMORY_LIMIT)
+
+    指定 task_timeout 或 memory_limit 时使用受限执行模式：每个任务单独下发到可终止的工作进程（此时忽略 chunk_size），
+    即使 workers 小于等于 1 也会在子进程中执行。
+    """
+    if report is None:
+        report = BatchReport()
+    for task_code, data_task in _analyze_dolphin_tasks(analyzer, records, workers, chunk_size, report,
+                                                       task_timeout, memory_limit):
+        report.failure_summary.add(task_code, data_task)
+        yield task_code, data_task
+
+
+def _analyze_dolphin_tasks(analyzer: HanLuAnalyzer,
+                           records: Iterable[Dict[str, Any]],
+                           workers: Optional[int],
+                           chunk_size: int,
+                           report: BatchReport,
+                           task_timeout: Optional[float],
+                           memory_limit: Optional[int]) -> Iterator[Tuple[int, DTask]]:
+    """批量分析海豚调度任务的实现（参数含义同 analyze_dolphin_tasks）"""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    report.start_time = time.perf_counter()
+
+    if task_timeout is not None or memory_limit is not None:
+        yield from _analyze_dolphin_tasks_isolated(analyzer, records, max(workers, 1), report,
+                                                   task_timeout, memory_limit)
+        report.end_time = time.perf_counter()
+        return
+
+    if workers <= 1:
+        pid = os.getpid()
+        for record in records:
+            start_time = time.perf_counter()
+            data_task = _analyze_record(analyzer, record)
+            report.add(pid, 1, time.perf_counter() - start_time)
+            yield record["code"], data_task
+        report.end_time = time.perf_counter()
+        return
+
+    with create_process_pool(analyzer, workers) as executor:
+        futures: Deque[concurrent.futures.Future] = collections.deque()
+        for chunk in _iter_chunks(records, chunk_size):
+            futures.append(executor.submit(_analyze_chunk, chunk))
+            if len(futures) >= workers * 2:
+                yield from _collect_chunk(futures.popleft(), report, analyzer.profiler)
+        while futures:
+            yield from _collect_chunk(futures.popleft(), report, analyzer.profiler)
+    report.end_time = time.perf_counter()
+
+
+def _collect_chunk(future: concurrent.futures.Future, report: BatchReport,
+                   profiler: HanLuProfiler) -> List[Tuple[int, DTask]]:
+    """等待一批任务完成，记录工作进程的统计信息，并将工作进程的性能分析统计合并到主进程的性能分析器中"""
+    result, pid, busy_seconds, snapshot = future.result()
+    report.add(pid, len(result), busy_seconds)
+    if snapshot is not None and isinstance(profiler, TimingProfiler):
+        profiler.merge(snapshot)
+    return result
+
+
+_MEMORY_ERROR_EXITCODE = 3  # 受限执行模式的工作进程在分析任务之外发生 MemoryError（如序列化结果时）的退出码
+
+
+def _isolated_worker_main(analyzer_payload: bytes, memory_limit: Optional[int],
+                          connection: multiprocessing.connection.Connection) -> None:
+    """受限执行模式的工作进程：逐个接收任务或分析器方法调用并返回结果，收到 None 时退出"""
+    if memory_limit is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+    try:
+        _isolated_worker_loop(analyzer_payload, connection)
+    except MemoryError:
+        os._exit(_MEMORY_ERROR_EXITCODE)  # 内存不足时不再执行清理逻辑，由主进程根据退出码判断原因
+
+
+def _isolated_worker_loop(analyzer_payload: bytes, connection: multiprocessing.connection.Connection) -> None:
+    _init_worker(analyzer_payload)
+    profiler = _WORKER_ANALYZER.profiler
+    pid = os.getpid()
+    while True:
+        item = connection.recv()
+        if item is None:
+            break
+        index, record = item
+        start_time = time.perf_counter()
+        if isinstance(record, tuple):  # 分析器方法调用 (method_name, args)，异常作为结果返回
+            try:
+                result = call_worker_analyzer(record[0], *record[1])
+            except Exception as e:
+                result = e
+            snapshot = profiler.take() if isinstance(profiler, TimingProfiler) else None
+            connection.send((index, result, pid, time.perf_counter() - start_time, snapshot))
+            continue
+        try:
+            data_task = _analyze_record(_WORKER_ANALYZER, record)
+        except LackEnvError as e:
+            connection.send((index, e, pid, time.perf_counter() - start_time, None))
+            continue
+        snapshot = profiler.take() if isinstance(profiler, TimingProfiler) else None
+        connection.send((index, data_task, pid, time.perf_counter() - start_time, snapshot))
+    connection.close()
+
+
+class IsolatedWorker:
+    """受限执行模式中可终止的工作进程：持有一份分析器副本，一次执行一个任务；任务超时时可以直接终止进程并创建新的工作进程"""
+
+    __slots__ = ("process", "connection", "index", "task_code", "deadline")
+
+    def __init__(self, context: multiprocessing.context.BaseContext, analyzer_payload: bytes,
+                 memory_limit: Optional[int]):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_isolated_worker_main,
+                                       args=(analyzer_payload, memory_limit, child_connection),
+                                       daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.index: Optional[int] = None  # 正在分析的任务序号，为 None 时表示空闲
+        self.task_code: Optional[int] = None  # 正在分析的任务编码
+        self.deadline: Optional[float] = None  # 正在分析的任务的超时时间点
+
+    def submit(self, index: int, record: Dict[str, Any], task_timeout: Optional[float]) -> None:
+        self.index = index
+        self.task_code = record["code"]
+        self.deadline = time.monotonic() + task_timeout if task_timeout is not None else None
+        self.connection.send((index, record))
+
+    def call(self, method_name: str, *args: Any) -> None:
+        """在工作进程中调用分析器副本的方法（如 analyze_sql、analyze_shell_script），结果通过 connection 返回"""
+        self.index = 0
+        self.task_code = None
+        self.deadline = None
+        self.connection.send((0, (method_name, args)))
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+    def stop(self) -> None:
+        try:
+            self.connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+def _analyze_dolphin_tasks_isolated(analyzer: HanLuAnalyzer,
+                                    records: Iterable[Dict[str, Any]],
+                                    workers: int,
+                                    report: BatchReport,
+                                    task_timeout: Optional[float],
+                                    memory_limit: Optional[int]) -> Iterator[Tuple[int, DTask]]:
+    """受限执行模式：每个任务在可终止的工作进程中执行，超时或工作进程异常退出时终止并重启该工作进程
+
+    已完成的任务按输入顺序返回；等待返回的任务数受超时时间约束，不随任务总数增长。
+    """
+    analyzer_payload = dumps_analyzer(analyzer)
+    context = multiprocessing.get_context()
+    profiler = analyzer.profiler
+
+    record_iter = enumerate(records)
+    is_exhausted = False
+    result_hash: Dict[int, Tuple[int, DTask]] = {}  # 已完成但尚未按顺序返回的任务
+    next_index = 0
+
+    worker_list = [IsolatedWorker(context, analyzer_payload, memory_limit) for _ in range(workers)]
+    try:
+        while True:
+            # 向空闲的工作进程下发任务
+            for worker in worker_list:
+                if worker.index is None and not is_exhausted:
+                    item = next(record_iter, None)
+                    if item is None:
+                        is_exhausted = True
+                    else:
+                        worker.submit(item[0], item[1], task_timeout)
+
+            busy_list = [worker for worker in worker_list if worker.index is not None]
+            if not busy_list:
+                break
+
+            # 等待任意工作进程返回结果或最早的任务超时
+            deadline_list = [worker.deadline for worker in busy_list if worker.deadline is not None]
+            timeout = max(0.0, min(deadline_list) - time.monotonic()) if deadline_list else None
+            ready_set = set(multiprocessing.connection.wait([worker.connection for worker in busy_list], timeout))
+
+            now = time.monotonic()
+            for i, worker in enumerate(worker_list):
+                if worker.index is None:
+                    continue
+                if worker.connection in ready_set:
+                    try:
+                        index, data_task, pid, busy_seconds, snapshot = worker.connection.recv()
+                    except (EOFError, OSError):
+                        fail_reason = _crash_reason(worker, memory_limit, now)
+                        result_hash[worker.index] = (worker.task_code, analyzer.fail(
+                            fail_reason, task_code=worker.task_code, exitcode=worker.process.exitcode))
+                        worker.kill()
+                        worker_list[i] = IsolatedWorker(context, analyzer_payload, memory_limit)
+                        continue
+                    if isinstance(data_task, LackEnvError):
+                        raise data_task
+                    report.add(pid, 1, busy_seconds)
+                    if snapshot is not None and isinstance(profiler, TimingProfiler):
+                        profiler.merge(snapshot)
+                    result_hash[index] = (worker.task_code, data_task)
+                    worker.index = worker.task_code = worker.deadline = None
+                elif worker.deadline is not None and worker.deadline <= now:
+                    result_hash[worker.index] = (worker.task_code, analyzer.fail(
+                        DTaskFailReason.TIMEOUT, task_code=worker.task_code, task_timeout=task_timeout))
+                    report.add(worker.process.pid, 1, task_timeout)
+                    worker.kill()
+                    worker_list[i] = IsolatedWorker(context, analyzer_payload, memory_limit)
+
+            while next_index in result_hash:
+                yield result_hash.pop(next_index)
+                next_index += 1
+    finally:
+        for worker in worker_list:
+            if worker.index is None:
+                worker.stop()
+            else:
+                worker.kill()
+
+
+def _crash_reason(worker: IsolatedWorker, memory_limit: Optional[int], now: float) -> DTaskFailReason:
+    """推断工作进程异常退出的原因
+
+    - 任务已超过超时时间点时视为超时
+    - 工作进程因 MemoryError 退出，或设置了内存限制且进程被 SIGKILL 终止（OOM killer）时视为超出内存限制
+    - 其他情况（如段错误、abort 或其他信号）视为工作进程崩溃
+    """
+    worker.process.join(timeout=1)
+    exitcode = worker.process.exitcode
+    if worker.deadline is not None and worker.deadline <= now:
+        return DTaskFailReason.TIMEOUT
+    if exitcode == _MEMORY_ERROR_EXITCODE or (memory_limit is not None and exitcode == -signal.SIGKILL):
+        return DTaskFailReason.MEMORY_LIMIT
+    return DTaskFailReason.WORKER_CRASH
+
+
+class SQLStatementPool:
+    """并行分析多语句 SQL 的进程池
+
+    将分析器的 sql_pool 属性设置为 SQLStatementPool 对象后，语句数量不少于 min_statements 的 SQL 会按 chunk_size 个语句
+    一批提交到进程池并行分析，分析结果按语句顺序返回。分析器在创建进程池时复制到每个工作进程中，因此创建后对分析器的修改
+    不会同步到工作进程。
+
+    用法：
+        analyzer.sql_pool = SQLStatementPool(analyzer, workers=8)
+    """
+
+    def __init__(self, analyzer: HanLuAnalyzer, workers: Optional[int] = None,
+                 min_statements: int = 32, chunk_size: int = 16):
+        """
+
+        Parameters
+        ----------
+        analyzer : HanLuAnalyzer
+            寒露分析器
+        workers : Optional[int], default = None
+            工作进程数，默认为 CPU 核数
+        min_statements : int, default = 32
+            使用进程池的最少语句数，语句较少时进程间通信的开销大于并行的收益
+        chunk_size : int, default = 16
+            每次提交到工作进程的语句数
+        """
+        self.analyzer = analyzer
+        self.min_statements = min_statements
+        self.chunk_size = chunk_size
+        self._executor = create_process_pool(analyzer, workers or os.cpu_count() or 1)
+
+    def analyze_sql_statements(self, data_instance: DInstance, statement_list: List[str],
+                               schema_list: Optional[List[Optional[str]]] = None) -> List[DTask]:
+        """并行分析 SQL 语句，按语句顺序返回每个语句的分析结果
+
+        Parameters
+        ----------
+        data_instance : DInstance
+            SQL 运行的数据实例
+        statement_list : List[str]
+            SQL 语句列表
+        schema_list : Optional[List[Optional[str]]], default = None
+            执行每个语句时的默认库名（见 sql_utils.track_use_statements），为 None 时均没有默认库名
+        """
+        if schema_list is None:
+            schema_list = [None] * len(statement_list)
+        futures = [self._executor.submit(_analyze_sql_chunk, data_instance, statement_list[i:i + self.chunk_size],
+                                         schema_list[i:i + self.chunk_size])
+                   for i in range(0, len(statement_list), self.chunk_size)]
+        result = []
+        profiler = self.analyzer.profiler
+        for future in futures:
+            data_task_list, snapshot = future.result()
+            result.extend(data_task_list)
+            if snapshot is not None and isinstance(profiler, TimingProfiler):
+                profiler.merge(snapshot)
+        return result
+
+    def close(self) -> None:
+        """关闭进程池"""
+        self._executor.shutdown()
+
+    def __enter__(self) -> "SQLStatementPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -0,0 +1,212 @@
+"""
+寒露分析器的结构化日志与推断失败原因汇总
+"""
+
+import collections
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Counter, Dict, Hashable, List, Optional, Tuple, Union
+
+from hanlu.data_task import DTask
+from hanlu.data_task import DTaskFailReason
+
+__all__ = [
+    "HanLuLogger",
+    "StructuredLogger",
+    "FailureSummary",
+    "NULL_LOGGER",
+]
+
+
+class HanLuLogger:
+    """日志记录器基类：不输出任何信息
+
+    分析器在推断失败时调用 failure 方法，在分析每个 Shell 命令等高频位置调用 debug 方法。
+    """
+
+    def failure(self, reason: DTaskFailReason, detail: Optional[str] = None, **fields: Any) -> None:
+        """记录一次推断失败
+
+        Parameters
+        ----------
+        reason : DTaskFailReason
+            推断失败的原因
+        detail : Optional[str], default = None
+            推断失败的详细信息（取值有限的短字符串，如命令名称）
+        **fields : Any
+            其他上下文信息（如 SQL 语句、命令参数）
+        """
+
+    def debug(self, event: str, **fields: Any) -> None:
+        """记录调试信息"""
+
+
+NULL_LOGGER = HanLuLogger()
+
+
+class StructuredLogger(HanLuLogger):
+    """将事件以 JSON 格式输出到 logging 的日志记录器，支持采样和按失败原因限流
+
+    每种失败原因使用独立的令牌桶：每秒补充 rate_limit 个令牌，最多积累 burst 个令牌；被采样或限流丢弃的事件数量
+    在该原因下一次输出的事件中以 suppressed 字段给出。超过 max_field_length 的字段值会被截断。
+    """
+
+    def __init__(self,
+                 logger: Union[str, logging.Logger] = "hanlu",
+                 sample_rate: float = 1.0,
+                 rate_limit: float = 10.0,
+                 burst: int = 100,
+                 max_field_length: int = 500):
+        """
+
+        Parameters
+        ----------
+        logger : Union[str, logging.Logger], default = "hanlu"
+            输出事件的 logging 日志记录器或其名称
+        sample_rate : float, default = 1.0
+            推断失败事件的采样比例
+        rate_limit : float, default = 10.0
+            每种失败原因每秒输出的事件数上限
+        burst : int, default = 100
+            每种失败原因允许突发输出的事件数
+        max_field_length : int, default = 500
+            字段值的最大长度
+        """
+        self.logger_name = logger if isinstance(logger, str) else logger.name
+        self.sample_rate = sample_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.max_field_length = max_field_length
+        self._logger = logging.getLogger(self.logger_name)
+        self._bucket_hash: Dict[DTaskFailReason, Tuple[float, float]] = {}  # 失败原因到（令牌数, 更新时间）的映射
+        self._suppressed_counter: Counter[DTaskFailReason] = collections.Counter()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"logger_name": self.logger_name, "sample_rate": self.sample_rate, "rate_limit": self.rate_limit,
+                "burst": self.burst, "max_field_length": self.max_field_length}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(logger=state["logger_name"], sample_rate=state["sample_rate"], rate_limit=state["rate_limit"],
+                      burst=state["burst"], max_field_length=state["max_field_length"])
+
+    def failure(self, reason: DTaskFailReason, detail: Optional[str] = None, **fields: Any) -> None:
+        if not self._logger.isEnabledFor(logging.WARNING):
+            return
+        with self._lock:
+            if not self._acquire(reason):
+                self._suppressed_counter[reason] += 1
+                return
+            suppressed = self._suppressed_counter.pop(reason, 0)
+        event = {"event": "analyze_failure", "reason": reason.name, "detail": detail}
+        if suppressed:
+            event["suppressed"] = suppressed
+        event.update(fields)
+        self._logger.warning(self._dumps(event))
+
+    def debug(self, event: str, **fields: Any) -> None:
+        if not self._logger.isEnabledFor(logging.DEBUG):
+            return
+        self._logger.debug(self._dumps({"event": event, **fields}))
+
+    def _acquire(self, reason: DTaskFailReason) -> bool:
+        """判断是否输出当前事件（采样及令牌桶限流）"""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        now = time.monotonic()
+        tokens, update_time = self._bucket_hash.get(reason, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - update_time) * self.rate_limit)
+        if tokens < 1.0:
+            self._bucket_hash[reason] = (tokens, now)
+            return False
+        self._bucket_hash[reason] = (tokens - 1.0, now)
+        return True
+
+    def _dumps(self, event: Dict[str, Any]) -> str:
+        for key, value in event.items():
+            if not isinstance(value, (str, int, float, bool, type(None))):
+                value = event[key] = str(value)
+            if isinstance(value, str) and len(value) > self.max_field_length:
+                event[key] = value[:self.max_field_length] + "..."
+        return json.dumps(event, ensure_ascii=False)
+
+
+class FailureSummary:
+    """按失败原因及详细信息汇总推断失败的任务，用于找出覆盖率损失最大的暂不支持场景"""
+
+    def __init__(self, sample_size: int = 5, max_detail_count: int = 1000):
+        """
+
+        Parameters
+        ----------
+        sample_size : int, default = 5
+            每个（失败原因, 详细信息）保留的任务编码样例数
+        max_detail_count : int, default = 1000
+            每种失败原因最多记录的不同详细信息数，超出后计入 "<other>"
+        """
+        self.sample_size = sample_size
+        self.max_detail_count = max_detail_count
+        self.task_count = 0  # 汇总的任务总数
+        self.reason_counter: Counter[DTaskFailReason] = collections.Counter()
+        self.detail_counter_hash: Dict[DTaskFailReason, Counter[str]] = {}
+        self.sample_hash: Dict[Tuple[DTaskFailReason, str], List[Hashable]] = {}
+
+    @property
+    def unknown_count(self) -> int:
+        """推断失败的任务数"""
+        return sum(self.reason_counter.values())
+
+    def add(self, task_code: Hashable, data_task: DTask) -> None:
+        """汇总一个任务的分析结果"""
+        self.task_count += 1
+        if not data_task.is_unknown:
+            return
+        reason = data_task.fail_reason if data_task.fail_reason is not None else DTaskFailReason.UNKNOWN
+        self._add(reason, data_task.fail_detail or "", 1, [task_code])
+
+    def _add(self, reason: DTaskFailReason, detail: str, count: int, task_code_list: List[Hashable]) -> None:
+        self.reason_counter[reason] += count
+        detail_counter = self.detail_counter_hash.setdefault(reason, collections.Counter())
+        if detail not in detail_counter and len(detail_counter) >= self.max_detail_count:
+            detail = "<other>"
+        detail_counter[detail] += count
+        sample_list = self.sample_hash.setdefault((reason, detail), [])
+        for task_code in task_code_list:
+            if len(sample_list) >= self.sample_size:
+                break
+            sample_list.append(task_code)
+
+    def merge(self, other: "FailureSummary") -> None:
+        """合并其他汇总结果"""
+        self.task_count += other.task_count
+        for reason, detail_counter in other.detail_counter_hash.items():
+            for detail, count in detail_counter.items():
+                self._add(reason, detail, count, other.sample_hash.get((reason, detail), []))
+
+    def report(self, top_n: int = 20) -> Dict[str, Any]:
+        """生成汇总报告：按任务数降序排列各失败原因及其中任务数最多的 top_n 个详细信息"""
+        return {
+            "task_count": self.task_count,
+            "unknown_count": self.unknown_count,
+            "reasons": [{
+                "reason": reason.name,
+                "count": count,
+                "details": [{"detail": detail, "count": detail_count,
+                             "sample_task_codes": self.sample_hash.get((reason, detail), [])}
+                            for detail, detail_count in self.detail_counter_hash[reason].most_common(top_n)]
+            } for reason, count in self.reason_counter.most_common()]
+        }
+
+    def summary(self, top_n: int = 5) -> str:
+        """生成文本报告"""
+        ratio = self.unknown_count / self.task_count if self.task_count else 0.0
+        lines = [f"推断失败: {self.unknown_count}/{self.task_count} ({ratio:.1%})"]
+        for reason, count in self.reason_counter.most_common():
+            lines.append(f"  {reason.name}: {count}")
+            for detail, detail_count in self.detail_counter_hash[reason].most_common(top_n):
+                if detail:
+                    lines.append(f"    {detail}: {detail_count}")
+        return "\n".join(lines)
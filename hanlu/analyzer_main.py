@@ -3,18 +3,38 @@
 """
 
 import abc
+import contextlib
+import datetime
 import json
-from typing import Any, Dict, Optional
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import metasequoia_sql as ms_sql
 from hanlu import special_command
+from hanlu.analyzer_logger import HanLuLogger
+from hanlu.analyzer_logger import StructuredLogger
+from hanlu.analyzer_profiler import HanLuProfiler
+from hanlu.analyzer_profiler import NULL_PROFILER
+from hanlu.cache import SQLLineageCache
+from hanlu.column_lineage import ColumnLineageAnalyzer
+from hanlu.column_lineage import SchemaProvider
 from hanlu.common import dolphin_utils
-from hanlu.data_node import DHdfsInstance
+from hanlu.common import sql_utils
+from hanlu.data_node import DHiveInstance
 from hanlu.data_node import DInstance
 from hanlu.data_node import DNode
+from hanlu.data_task import DColumnEdge
 from hanlu.data_task import DTask
+from hanlu.data_task import DTaskFailReason
+from hanlu.datax import DEFAULT_DATAX_REGISTRY
+from hanlu.datax import DataXConfigError
+from hanlu.datax import DataXPluginRegistry
+from hanlu.datax import iter_datax_content
 from hanlu.hanlu_env import DolphinEnv
 from hanlu.hanlu_env import HanLuEnv
+from hanlu.hanlu_env import TableCatalog
+from hanlu.spark import PySparkScanCache
+from hanlu.spark import SparkLineageTemplate
 from metasequoia_data_linage.table_level.analysis import all_use_table
 from metasequoia_shell.init_simu_system import init_simu_system
 from metasequoia_shell.lexical import LexicalFSMShell
@@ -22,17 +42,121 @@ from metasequoia_shell.parser import parse
 from metasequoia_shell.simu_env import SimuCommandInput
 from metasequoia_shell.simu_env import SimuProcess
 
+# 性能分析中单独记录的 Shell 命令，其他命令统一记录在 SHELL_OTHER_COMMAND_LABEL 标签下（避免标签数量随脚本中的命令无限增长）
+PROFILED_SHELL_COMMAND_SET = {"beeline", "spark-submit", "/data/datax/bin/datax.py"}
+SHELL_OTHER_COMMAND_LABEL = "shell:other"
+
 
 class LackEnvError(Exception):
     """缺失环境信息错误"""
 
 
+class ShellScriptContext:
+    """复用的模拟系统中，当前线程正在分析的 Shell 脚本的上下文
+
+    分析 Shell 命令时可能再次调用 analyze_shell_script（如分析命令中嵌套的脚本），因此以栈保存各层脚本的数据任务对象，
+    命令的分析结果写入栈顶（最内层）脚本的数据任务对象。
+    """
+
+    __slots__ = ("data_task_stack",)
+
+    def __init__(self):
+        self.data_task_stack: List[DTask] = []
+
+
 class HanLuAnalyzer(abc.ABC):
     """寒露分析器"""
 
-    def __init__(self, hanlu_env: Optional[HanLuEnv] = None, dolphin_env: Optional[DolphinEnv] = None):
+    # DataX Reader / Writer 插件的处理器注册表；注册自定义处理器时，在子类中使用 DEFAULT_DATAX_REGISTRY.copy() 的结果覆盖
+    datax_registry: DataXPluginRegistry = DEFAULT_DATAX_REGISTRY
+
+    def __init__(self, hanlu_env: Optional[HanLuEnv] = None, dolphin_env: Optional[DolphinEnv] = None,
+                 sql_cache: Optional[SQLLineageCache] = None,
+                 business_date: Optional[datetime.datetime] = None,
+                 reuse_shell_system: bool = False,
+                 profiler: Optional[HanLuProfiler] = None,
+                 logger: Optional[HanLuLogger] = None,
+                 datax_cache: Optional[SQLLineageCache] = None,
+                 scan_pyspark: bool = False,
+                 column_lineage: bool = False,
+                 schema_provider: Optional[SchemaProvider] = None,
+                 table_catalog: Optional[TableCatalog] = None):
         self.hanlu_env = hanlu_env
         self.dolphin_env = dolphin_env
+        self.sql_cache = sql_cache  # SQL 血缘分析结果缓存，为 None 时不使用缓存
+        # DataX 配置文件分析结果缓存（以配置文件内容的哈希值为键），默认使用内存缓存；
+        # HanLuEnv 的注册信息、datax_registry 和 SQL 分析配置（见 datax_cache_context）参与缓存键的计算
+        self.datax_cache = datax_cache if datax_cache is not None else SQLLineageCache(max_size=4096, namespace="datax")
+        # 计算海豚内置函数使用的业务日期：为 None 时使用当前时间；
+        # 使用 dolphin_utils.PLACEHOLDER_BUSINESS_DATE 时，分析结果与运行日期无关，相同脚本的分析结果可以复用
+        self.business_date = business_date
+        # 是否在同一线程分析的多个 Shell 脚本之间复用模拟系统：复用时模拟文件系统在脚本之间共享（前一个脚本写入的 DataX
+        # 配置文件、beeline -f 的 SQL 文件对后续脚本可见），默认不复用，每个脚本使用独立的模拟系统
+        self.reuse_shell_system = reuse_shell_system
+        self._shell_local = threading.local()  # 每个线程复用的模拟系统
+        self._fail_local = threading.local()  # 每个线程暂缓记录的推断失败（见 _deferred_failures）
+        # 分阶段性能分析器，默认不记录任何信息
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        # 结构化日志记录器，默认输出到名为 hanlu 的 logging 日志记录器并按失败原因限流
+        self.logger = logger if logger is not None else StructuredLogger()
+        # 并行分析多语句 SQL 的进程池（analyzer_batch.SQLStatementPool），为 None 时在当前进程中逐个分析语句
+        self.sql_pool = None
+        # PySpark 脚本静态扫描结果缓存（以脚本内容的哈希值为键），为 None 时不扫描 PySpark 脚本
+        self.pyspark_scan_cache = PySparkScanCache() if scan_pyspark else None
+        # 是否分析 INSERT ... SELECT 语句的字段级血缘关系（记录在 DTask.column_edge_list 中）；
+        # 是否开启、以及表结构提供器的指纹参与 sql_cache 缓存键的计算，开启或关闭、更新表结构后旧的缓存结果不再命中
+        self.column_lineage = column_lineage
+        # 字段级血缘分析使用的表结构提供器（如 column_lineage.SchemaStore），用于展开 SELECT * 和按位置对应目标表的字段
+        self.schema_provider = schema_provider
+        # Hive 表目录，用于补全没有库名（且没有默认库名）的 Hive 表的库名，为 None 时只使用默认库名补全；
+        # 表目录的指纹参与 sql_cache 缓存键的计算，更新表目录后旧的缓存结果不再命中
+        self.table_catalog = table_catalog
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """序列化时（如发送到工作进程）不包含线程本地的模拟系统、暂缓记录的推断失败和 SQL 语句进程池"""
+        state = self.__dict__.copy()
+        del state["_shell_local"]
+        del state["_fail_local"]
+        state["sql_pool"] = None
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._shell_local = threading.local()
+        self._fail_local = threading.local()
+
+    def fail(self, reason: DTaskFailReason, detail: Optional[str] = None, **fields: Any) -> DTask:
+        """记录推断失败并返回推断失败的数据任务对象
+
+        Parameters
+        ----------
+        reason : DTaskFailReason
+            推断失败的原因
+        detail : Optional[str], default = None
+            推断失败的详细信息（取值有限的短字符串，如命令名称），用于按原因汇总时进一步分组
+        **fields : Any
+            只写入日志的上下文信息（如 SQL 语句、命令参数）
+        """
+        self._log_failure(reason, detail, **fields)
+        return DTask.unknown(reason, detail)
+
+    def _log_failure(self, reason: DTaskFailReason, detail: Optional[str] = None, **fields: Any) -> None:
+        """记录推断失败；在 _deferred_failures 中时只暂存，由调用方确定最终的失败原因后决定是否记录"""
+        deferred_list = getattr(self._fail_local, "deferred_list", None)
+        if deferred_list is not None:
+            deferred_list.append((reason, detail, fields))
+        else:
+            self.logger.failure(reason, detail, **fields)
+
+    @contextlib.contextmanager
+    def _deferred_failures(self) -> Iterator[List[Tuple[DTaskFailReason, Optional[str], Dict[str, Any]]]]:
+        """暂存当前线程中记录的推断失败，返回暂存的 (原因, 详细信息, 上下文信息) 列表"""
+        previous = getattr(self._fail_local, "deferred_list", None)
+        deferred_list = self._fail_local.deferred_list = []
+        try:
+            yield deferred_list
+        finally:
+            self._fail_local.deferred_list = previous
 
     # ------------------------------ 分析海豚调度任务的血缘关系 ------------------------------
     # analyze_dolphin_task：海豚调度任务血缘关系分析方法的入口，包含内置的处理逻辑；如果需要调整内置处理逻辑，则重写此方法
@@ -46,22 +170,27 @@ class HanLuAnalyzer(abc.ABC):
         record : Dict[str, Any]
             海豚元数据 task_definition 的表中记录
         """
-        # DEPENDENT、CONDITIONS、DATA_QUALITY 类型任务节点中包含上下游关系
-        if record["task_type"] in {"DEPENDENT", "CONDITIONS", "DATA_QUALITY"}:
-            return DTask.empty()
-
-        if record["task_type"] == "SQL":
-            if self.dolphin_env is None:
-                raise LackEnvError("need dolphin_env")
-            task_params = json.loads(record["task_params"])
-            data_instance = self.dolphin_env.get_data_instance(task_params["datasource"])
-            return self.analyze_sql(data_instance, dolphin_utils.run_all_inner_function(task_params["sql"]))
-
-        if record["task_type"] in {"SPARK", "SHELL"}:
-            task_params = json.loads(record["task_params"])
-            return self.analyze_shell_script(dolphin_utils.run_all_inner_function(task_params["rawScript"]))
-
-        return self.analyze_other_dolphin_task(record)
+        with self.profiler.task(record.get("code"), record["task_type"]):
+            # DEPENDENT、CONDITIONS、DATA_QUALITY 类型任务节点中包含上下游关系
+            if record["task_type"] in {"DEPENDENT", "CONDITIONS", "DATA_QUALITY"}:
+                return DTask.empty()
+
+            if record["task_type"] == "SQL":
+                if self.dolphin_env is None:
+                    raise LackEnvError("need dolphin_env")
+                task_params = json.loads(record["task_params"])
+                data_instance = self.dolphin_env.get_data_instance(task_params["datasource"])
+                with self.profiler.stage("dolphin_function", record["task_type"]):
+                    sql = dolphin_utils.run_all_inner_function(task_params["sql"], self.business_date)
+                return self.analyze_sql(data_instance, sql)
+
+            if record["task_type"] in {"SPARK", "SHELL"}:
+                task_params = json.loads(record["task_params"])
+                with self.profiler.stage("dolphin_function", record["task_type"]):
+                    script = dolphin_utils.run_all_inner_function(task_params["rawScript"], self.business_date)
+                return self.analyze_shell_script(script)
+
+            return self.analyze_other_dolphin_task(record)
 
     @abc.abstractmethod
     def analyze_other_dolphin_task(self, record: Dict[str, Any]) -> DTask:
@@ -76,22 +205,65 @@ class HanLuAnalyzer(abc.ABC):
     # ------------------------------ 分析 Shell 命令的血缘关系 ------------------------------
 
     def analyze_shell_script(self, script: str) -> DTask:
-        """分析 Shell 脚本"""
+        """分析 Shell 脚本
+
+        默认每个脚本初始化独立的模拟系统，脚本之间互不影响。启用 reuse_shell_system 时，每个线程只根据 HanLuEnv 的配置初始化一次
+        模拟系统，每个脚本在模拟系统新创建的进程中执行，命令回调通过线程本地的上下文写入当前脚本的数据任务对象；此时各脚本的
+        血缘关系互不影响，但模拟文件系统在同一线程的脚本之间共享，前一个脚本写入的文件对后续脚本可见。
+        """
         data_task = DTask.empty()
-        simu_system = init_simu_system(
-            configuration=self.hanlu_env.shell_parser_configuration,
-            hook_func=self.analyze_shell_command_hook,
-            hook_args={"data_task": data_task}
-        )
-        parse(LexicalFSMShell(script)).execute(simu_system.create_process())
+        with self.profiler.stage("shell_parse"):
+            program = parse(LexicalFSMShell(script))
+
+        if not self.reuse_shell_system:
+            simu_system = init_simu_system(
+                configuration=self.hanlu_env.shell_parser_configuration,
+                hook_func=self.analyze_shell_command_hook,
+                hook_args={"data_task": data_task}
+            )
+            with self.profiler.stage("shell_execute"):
+                program.execute(simu_system.create_process())
+            return data_task
+
+        simu_system, context = self._get_shell_system()
+        context.data_task_stack.append(data_task)
+        try:
+            with self.profiler.stage("shell_execute"):
+                program.execute(simu_system.create_process())
+        finally:
+            context.data_task_stack.pop()
         return data_task
 
+    def _get_shell_system(self):
+        """获取当前线程复用的模拟系统及其上下文，HanLuEnv 变化后重新初始化"""
+        local = self._shell_local
+        if getattr(local, "hanlu_env", None) is not self.hanlu_env:
+            local.context = ShellScriptContext()
+            local.simu_system = init_simu_system(
+                configuration=self.hanlu_env.shell_parser_configuration,
+                hook_func=self._analyze_shell_command_in_context,
+                hook_args={"context": local.context}
+            )
+            local.hanlu_env = self.hanlu_env
+        return local.simu_system, local.context
+
+    def _analyze_shell_command_in_context(self,
+                                          simu_process: SimuProcess,
+                                          command_input: SimuCommandInput,
+                                          context: ShellScriptContext) -> None:
+        """复用的模拟系统中分析 Shell 命令的回调方法，将命令的分析结果写入当前脚本的数据任务对象"""
+        self.analyze_shell_command_hook(simu_process, command_input, context.data_task_stack[-1])
+
     def analyze_shell_command_hook(self,
                                    simu_process: SimuProcess,
                                    command_input: SimuCommandInput,
                                    data_task: Optional[DTask]) -> None:
         """分析 Shell 命令的回调方法"""
-        res_data_task = self.analyze_shell_command(simu_process, command_input)
+        command_label = command_input.command_name
+        if command_label not in PROFILED_SHELL_COMMAND_SET:
+            command_label = SHELL_OTHER_COMMAND_LABEL
+        with self.profiler.stage("shell_command", command_label):
+            res_data_task = self.analyze_shell_command(simu_process, command_input)
         data_task += res_data_task
 
     def analyze_shell_command(self,
@@ -105,17 +277,21 @@ class HanLuAnalyzer(abc.ABC):
             return self.analyze_beeline_command(simu_process, command_input)
         if command_input.command_name == "spark-submit":
             spark_submit_command = special_command.parse_spark_submit(command_input.command_params)
+            if spark_submit_command is None:
+                return self.fail(DTaskFailReason.UNSUPPORTED_SPARK_SUBMIT, "application not found",
+                                 command_params=command_input.command_params)
             return self.analyze_spark_submit_command(simu_process, spark_submit_command)
 
         if command_input.command_name == "/data/datax/bin/datax.py":
             file_name = command_input.command_params[0]
             file_content = simu_process.read_file(file_name)
             if file_content is None:
-                print(f"【失败】DataX 配置文件构造失败: {file_content}")
-                return DTask.unknown()
-            return self.analyze_datax_config(file_content)
+                return self.fail(DTaskFailReason.DATAX_CONFIG_NOT_FOUND, file_name=file_name)
+            with self.profiler.stage("datax"):
+                return self.analyze_datax_config(file_content)
 
-        print(f"分析命令: {command_input.command_name} {command_input.command_params}")
+        self.logger.debug("analyze_shell_command", command_name=command_input.command_name,
+                          command_params=command_input.command_params)
         return self.analyze_other_shell_command(simu_process, command_input)
 
     @abc.abstractmethod
@@ -124,6 +300,79 @@ class HanLuAnalyzer(abc.ABC):
                                      command: special_command.CommandSparkSubmit) -> DTask:
         """分析 spark-submit 命令"""
 
+    def analyze_spark_submit_by_registry(self,
+                                         simu_process: SimuProcess,
+                                         command: special_command.CommandSparkSubmit) -> Optional[DTask]:
+        """使用 HanLuEnv 中注册的血缘模板分析 spark-submit 命令；没有匹配的模板时，如果启用了 PySpark 脚本扫描，则静态扫描
+        Python 脚本。无法使用这两种方式分析时返回 None
+
+        Parameters
+        ----------
+        simu_process : SimuProcess
+            执行命令的模拟进程（用于读取 Python 脚本）
+        command : special_command.CommandSparkSubmit
+            spark-submit 命令
+        """
+        template = self.hanlu_env.get_spark_submit_template(command.application, command.arg_class)
+        if template is not None:
+            try:
+                template = template.render(command.application_arguments)
+            except (KeyError, IndexError, ValueError) as e:
+                return self.fail(DTaskFailReason.UNSUPPORTED_SPARK_SUBMIT, "template argument missing",
+                                 application=command.application, arg_class=command.arg_class, error=repr(e))
+            return self._analyze_spark_lineage(template)
+
+        if self.pyspark_scan_cache is not None and command.application.endswith(".py"):
+            return self.analyze_pyspark_application(simu_process, command)
+        return None
+
+    def analyze_pyspark_application(self,
+                                    simu_process: SimuProcess,
+                                    command: special_command.CommandSparkSubmit) -> Optional[DTask]:
+        """静态扫描 spark-submit 提交的 Python 脚本，相同内容的脚本只扫描一次；脚本不存在时返回 None
+
+        Parameters
+        ----------
+        simu_process : SimuProcess
+            执行命令的模拟进程（用于读取 Python 脚本）
+        command : special_command.CommandSparkSubmit
+            spark-submit 命令
+        """
+        source = simu_process.read_file(command.application)
+        if source is None:
+            return None
+        try:
+            with self.profiler.stage("pyspark_scan"):
+                result = self.pyspark_scan_cache.scan(source)
+        except (SyntaxError, ValueError, RecursionError) as e:
+            return self.fail(DTaskFailReason.UNSUPPORTED_SPARK_SUBMIT, "pyspark syntax error",
+                             application=command.application, error=repr(e))
+        if result.is_empty:
+            return self.fail(DTaskFailReason.UNSUPPORTED_SPARK_SUBMIT, "pyspark lineage not found",
+                             application=command.application, unresolved_count=result.unresolved_count)
+        if result.unresolved_count:
+            self.logger.debug("pyspark_unresolved_call", application=command.application,
+                              unresolved_count=result.unresolved_count)
+        return self._analyze_spark_lineage(SparkLineageTemplate(
+            dependent_tables=result.read_table_list,
+            generate_tables=result.write_table_list,
+            sql=";\n".join(result.sql_list) if result.sql_list else None
+        ))
+
+    def _analyze_spark_lineage(self, template: SparkLineageTemplate) -> DTask:
+        """根据渲染后的血缘模板构造数据任务对象"""
+        data_instance = self.hanlu_env.get_hive_instance_by_name(template.hive_name)
+        data_task = DTask.empty()
+        for table in template.dependent_tables:
+            schema_name, _, table_name = table.rpartition(".")
+            data_task.add_dependent_node(self.create_table_node(data_instance, schema_name or None, table_name))
+        for table in template.generate_tables:
+            schema_name, _, table_name = table.rpartition(".")
+            data_task.add_generate_node(self.create_table_node(data_instance, schema_name or None, table_name))
+        if template.sql is not None:
+            data_task += self.analyze_sql(data_instance, template.sql)
+        return data_task
+
     @abc.abstractmethod
     def analyze_other_shell_command(self,
                                     simu_process: SimuProcess,
@@ -132,8 +381,76 @@ class HanLuAnalyzer(abc.ABC):
 
     # ------------------------------ 分析 SQL 的血缘关系 ------------------------------
 
-    def analyze_sql(self, data_instance: DInstance, sql: str) -> DTask:
-        """分析 SQL 语句
+    def analyze_sql(self, data_instance: DInstance, sql: str, default_schema: Optional[str] = None) -> DTask:
+        """分析 SQL 语句，如果配置了 SQL 血缘分析结果缓存，则优先从缓存中获取
+
+        Parameters
+        ----------
+        data_instance : DInstance
+            SQL 运行的数据实例
+        sql : str
+            执行的 SQL 语句
+        default_schema : Optional[str], default = None
+            默认库名（如 beeline 的 -d 参数），SQL 中没有指定库名的表使用该库名
+        """
+        if self.sql_cache is None:
+            return self.analyze_sql_without_cache(data_instance, sql, default_schema)
+        context = self.sql_cache_context()
+        data_task = self.sql_cache.get(data_instance, sql, default_schema, context)
+        if data_task is None:
+            data_task = self.analyze_sql_without_cache(data_instance, sql, default_schema)
+            self.sql_cache.put(data_instance, sql, data_task, default_schema, context)
+        return data_task
+
+    def sql_cache_context(self) -> str:
+        """返回影响 SQL 血缘分析结果的分析器配置，参与 SQL 血缘分析结果缓存键的计算
+
+        包括是否分析字段级血缘关系、表结构提供器的指纹（只在分析字段级血缘关系时使用）和 Hive 表目录的指纹。
+        """
+        schema_fingerprint = None
+        if self.column_lineage and self.schema_provider is not None:
+            schema_fingerprint = self.schema_provider.fingerprint()
+        catalog_fingerprint = self.table_catalog.fingerprint() if self.table_catalog is not None else None
+        return f"column_lineage={self.column_lineage};schema={schema_fingerprint};catalog={catalog_fingerprint}"
+
+    def analyze_sql_without_cache(self, data_instance: DInstance, sql: str,
+                                  default_schema: Optional[str] = None) -> DTask:
+        """将 SQL 拆分为语句并逐个分析，按语句顺序合并分析结果
+
+        每个语句独立解析和分析，无法分析的语句只使该语句推断失败：合并后的数据任务对象标记为推断失败（保留首个失败原因），
+        但仍包含其他语句的数据节点。配置了 sql_pool 且语句数量达到进程池的阈值时，在进程池中并行分析。
+
+        没有指定默认库名时，使用 Hive 实例的库名（如 JDBC URL 中的库名）作为默认库名，数据节点使用不包含库名的实例对象；
+        USE 语句修改之后语句的默认库名。
+
+        Parameters
+        ----------
+        data_instance : DInstance
+            SQL 运行的数据实例
+        sql : str
+            执行的 SQL 语句
+        default_schema : Optional[str], default = None
+            默认库名，SQL 中没有指定库名的表使用该库名
+        """
+        if isinstance(data_instance, DHiveInstance) and data_instance.schema_name is not None:
+            if default_schema is None:
+                default_schema = data_instance.schema_name
+            data_instance = data_instance.without_schema()
+        statement_list = sql_utils.split_sql_statements(sql)
+        schema_list = sql_utils.track_use_statements(statement_list, default_schema)
+        if self.sql_pool is not None and len(statement_list) >= self.sql_pool.min_statements:
+            data_task_list = self.sql_pool.analyze_sql_statements(data_instance, statement_list, schema_list)
+        else:
+            data_task_list = [self.analyze_sql_statement(data_instance, statement, statement_schema)
+                              for statement, statement_schema in zip(statement_list, schema_list)]
+        data_task = DTask.empty()
+        for statement_data_task in data_task_list:
+            data_task += statement_data_task
+        return data_task
+
+    def analyze_sql_statement(self, data_instance: DInstance, sql: str,
+                              default_schema: Optional[str] = None) -> DTask:
+        """解析并分析单个 SQL 语句，无法分析时调用 analyze_other_sql 分析该语句
 
         Parameters
         ----------
@@ -141,50 +458,123 @@ class HanLuAnalyzer(abc.ABC):
             SQL 运行的数据实例
         sql : str
             执行的 SQL 语句
+        default_schema : Optional[str], default = None
+            默认库名，SQL 中没有指定库名的表使用该库名
         """
         try:
             data_task = DTask.empty()
-            for statement in ms_sql.SQLParser.parse_statements(sql, sql_type=ms_sql.SQLType.HIVE):
-                if isinstance(statement, ms_sql.node.ASTAlterTableStatement):
-                    data_task.add_generate_node(DNode(
-                        instance=data_instance,
-                        schema_name=statement.table_name.schema_name,
-                        table_name=statement.table_name.table_name
-                    ))
-                elif isinstance(statement, ms_sql.node.ASTInsertSelectStatement):
-                    for dependent_table in all_use_table(statement):
-                        data_task.add_dependent_node(DNode(
-                            instance=data_instance,
-                            schema_name=dependent_table.schema_name,
-                            table_name=dependent_table.table_name
-                        ))
-                    data_task.add_generate_node(DNode(
-                        instance=data_instance,
-                        schema_name=statement.table_name.schema_name,
-                        table_name=statement.table_name.table_name
-                    ))
-                elif isinstance(statement, ms_sql.node.ASTSelectStatement):
-                    continue  # SELECT 语句不影响血缘关系
-                elif isinstance(statement, ms_sql.node.ASTSetStatement):
-                    continue  # SET 语句不影响血缘关系
-                elif isinstance(statement, ms_sql.node.ASTAnalyzeTableStatement):
-                    continue  # ANALYZE 语句不影响血缘关系
-                elif isinstance(statement, ms_sql.node.ASTTruncateTable):
-                    data_task.add_generate_node(DNode(
-                        instance=data_instance,
-                        schema_name=statement.table_name.schema_name,
-                        table_name=statement.table_name.table_name
-                    ))
-                else:
-                    return self.analyze_other_sql(data_instance, sql)
+            with self.profiler.stage("sql_parse"):
+                statements = list(ms_sql.SQLParser.parse_statements(sql, sql_type=ms_sql.SQLType.HIVE))
+            for statement in statements:
+                with self.profiler.stage("sql_statement", type(statement).__name__):
+                    if isinstance(statement, ms_sql.node.ASTAlterTableStatement):
+                        data_task.add_generate_node(
+                            self._create_table_node(data_instance, statement.table_name, default_schema))
+                    elif isinstance(statement, ms_sql.node.ASTInsertSelectStatement):
+                        for dependent_table in all_use_table(statement):
+                            data_task.add_dependent_node(
+                                self._create_table_node(data_instance, dependent_table, default_schema))
+                        data_task.add_generate_node(
+                            self._create_table_node(data_instance, statement.table_name, default_schema))
+                        if self.column_lineage:
+                            with self.profiler.stage("column_lineage"):
+                                data_task.column_edge_list.extend(
+                                    self.analyze_column_lineage(data_instance, statement, default_schema, sql))
+                    elif isinstance(statement, ms_sql.node.ASTSelectStatement):
+                        continue  # SELECT 语句不影响血缘关系
+                    elif isinstance(statement, ms_sql.node.ASTSetStatement):
+                        continue  # SET 语句不影响血缘关系
+                    elif isinstance(statement, ms_sql.node.ASTAnalyzeTableStatement):
+                        continue  # ANALYZE 语句不影响血缘关系
+                    elif isinstance(statement, ms_sql.node.ASTUseStatement):
+                        continue  # USE 语句修改的默认库名已在拆分语句时处理（见 analyze_sql_without_cache）
+                    elif isinstance(statement, ms_sql.node.ASTTruncateTable):
+                        data_task.add_generate_node(
+                            self._create_table_node(data_instance, statement.table_name, default_schema))
+                    else:
+                        other_data_task = self.analyze_other_sql(data_instance, sql)
+                        if other_data_task.is_unknown and other_data_task.fail_detail is None:
+                            other_data_task.fail_detail = type(statement).__name__
+                        return other_data_task
             return data_task
         except Exception as e:
-            print(f"SQL 解析失败: {sql}")
-            return self.analyze_other_sql(data_instance, sql)
+            # 补充分析逻辑记录的推断失败暂缓记录，确定最终的失败原因后只记录一次
+            with self._deferred_failures() as deferred_list:
+                other_data_task = self.analyze_other_sql(data_instance, sql)
+            if other_data_task.is_unknown and other_data_task.fail_reason in {None, DTaskFailReason.UNSUPPORTED_SQL}:
+                # 解析失败时，补充分析逻辑也无法分析则视为 SQL 解析失败
+                other_data_task.fail_reason = DTaskFailReason.SQL_PARSE_ERROR
+                other_data_task.fail_detail = type(e).__name__
+                self._log_failure(DTaskFailReason.SQL_PARSE_ERROR, type(e).__name__, error=repr(e), sql=sql)
+            else:
+                for reason, detail, fields in deferred_list:
+                    self._log_failure(reason, detail, **fields)
+            return other_data_task
+
+    def _create_table_node(self, data_instance: DInstance, table: Any, default_schema: Optional[str]) -> DNode:
+        """根据 SQL 中的表名对象构造驻留的数据源对象"""
+        return self.create_table_node(data_instance, table.schema_name, table.table_name, default_schema)
+
+    def create_table_node(self, data_instance: DInstance, schema_name: Optional[str], table_name: str,
+                          default_schema: Optional[str] = None) -> DNode:
+        """构造表的驻留数据源对象：没有库名时使用默认库名
+
+        Hive 表的库名和表名不区分大小写，均转换为小写；库名和默认库名均未指定且配置了表目录时，使用表目录补全库名。Hive 实例中的
+        库名（如 JDBC URL 中的库名）作为默认库名的兜底值，数据源对象使用不包含库名、用户名和密码的实例对象，使通过不同默认库名或
+        不同用户访问同一个集群的任务（以及通过 HDFS 路径对应到该表的任务）得到相同的数据节点。
+
+        Parameters
+        ----------
+        data_instance : DInstance
+            表所在的数据实例
+        schema_name : Optional[str]
+            库名
+        table_name : str
+            表名
+        default_schema : Optional[str], default = None
+            默认库名
+        """
+        if isinstance(data_instance, DHiveInstance):
+            default_schema = default_schema or data_instance.schema_name
+            data_instance = data_instance.cluster_instance()
+            if self.table_catalog is not None:
+                schema_name, table_name = self.table_catalog.canonicalize(data_instance.name, schema_name,
+                                                                          table_name, default_schema)
+                return DNode.create(instance=data_instance, schema_name=schema_name, table_name=table_name)
+            if schema_name is None:
+                schema_name = default_schema
+            return DNode.create(instance=data_instance,
+                                schema_name=schema_name.lower() if schema_name is not None else None,
+                                table_name=table_name.lower())
+        if schema_name is None:
+            schema_name = default_schema
+        return DNode.create(instance=data_instance, schema_name=schema_name, table_name=table_name)
+
+    def analyze_column_lineage(self, data_instance: DInstance, statement: ms_sql.node.ASTInsertSelectStatement,
+                               default_schema: Optional[str] = None, sql: Optional[str] = None) -> List[DColumnEdge]:
+        """分析 INSERT ... SELECT 语句的字段级血缘关系，无法确定来源的字段引用只记录调试日志
+
+        Parameters
+        ----------
+        data_instance : DInstance
+            SQL 运行的数据实例
+        statement : ms_sql.node.ASTInsertSelectStatement
+            INSERT ... SELECT 语句的抽象语法树
+        default_schema : Optional[str], default = None
+            默认库名，SQL 中没有指定库名的表使用该库名
+        sql : Optional[str], default = None
+            语句的 SQL（只用于日志）
+        """
+        column_analyzer = ColumnLineageAnalyzer(
+            lambda table: self._create_table_node(data_instance, table, default_schema), self.schema_provider)
+        column_edge_list = column_analyzer.analyze_insert(statement)
+        if column_analyzer.unresolved_list:
+            self.logger.debug("column_lineage_unresolved", columns=column_analyzer.unresolved_list, sql=sql)
+        return column_edge_list
 
     @abc.abstractmethod
     def analyze_other_sql(self, data_instance: DInstance, sql: str) -> DTask:
-        """分析 SQL 语句
+        """分析内置处理逻辑无法分析的单个 SQL 语句
 
         Parameters
         ----------
@@ -194,84 +584,105 @@ class HanLuAnalyzer(abc.ABC):
             执行的 SQL 语句
         """
 
+    def analyze_query_sql(self, data_instance: DInstance, sql: str) -> DTask:
+        """分析查询语句（如 DataX Reader 的 querySql），查询语句中使用的表均为依赖数据节点
+
+        Parameters
+        ----------
+        data_instance : DInstance
+            SQL 运行的数据实例
+        sql : str
+            查询语句
+        """
+        data_task = DTask.empty()
+        try:
+            with self.profiler.stage("sql_parse"):
+                statements = list(ms_sql.SQLParser.parse_statements(sql, sql_type=ms_sql.SQLType.HIVE))
+            for statement in statements:
+                for dependent_table in all_use_table(statement):
+                    data_task.add_dependent_node(self._create_table_node(data_instance, dependent_table, None))
+        except Exception as e:
+            return self.fail(DTaskFailReason.SQL_PARSE_ERROR, type(e).__name__, error=repr(e), sql=sql)
+        return data_task
+
     # ------------------------------ 分析 beeline 命令的血缘关系 ------------------------------
     def analyze_beeline_command(self,
                                 simu_process: SimuProcess,
                                 command_input: SimuCommandInput) -> DTask:
-        """分析 beeline 命令"""
-        idx = 0
-        jdbc_url: Optional[str] = None
-        user_name: Optional[str] = None
-        password: Optional[str] = None
-        sql: Optional[str] = None
+        """分析 beeline 命令
+
+        执行的 SQL 来自 -e、-q 参数或 -f 参数指定的文件（从模拟文件系统中读取），分析前按语句顺序替换 --hivevar、--hiveconf
+        及脚本中 SET 语句定义的 Hive 变量；-d 参数指定的库名作为 SQL 中没有指定库名的表的默认库名。
+        """
         params = command_input.command_params
-        while idx < len(params):
-            if params[idx] in {"-u", "--url"}:
-                jdbc_url = params[idx + 1]
-                idx += 2
-            elif params[idx] in {"-n", "--user"}:
-                user_name = params[idx + 1]
-                idx += 2
-            elif params[idx] in {"-p", "--password"}:
-                password = params[idx + 1]
-                idx += 2
-            elif params[idx] in {"-e", "--execute"}:
-                sql = params[idx + 1]
-                idx += 2
-            else:
-                print(f"未知 beeline 命令: {command_input}")
-                return DTask.unknown()
+        command = special_command.parse_beeline(params)
+        if command is None:
+            return self.fail(DTaskFailReason.BEELINE_UNKNOWN_OPTION, command_params=params)
+
+        if command.arg_execute is not None:
+            sql = command.arg_execute
+        elif command.arg_query is not None:
+            sql = command.arg_query
+        elif command.arg_filename is not None:
+            sql = simu_process.read_file(command.arg_filename)
+            if sql is None:
+                return self.fail(DTaskFailReason.BEELINE_SQL_NOT_FOUND, "file not found",
+                                 file_name=command.arg_filename)
+        else:
+            return self.fail(DTaskFailReason.BEELINE_SQL_NOT_FOUND, command_params=params)
+
+        sql = sql_utils.apply_hive_variables(sql, command.hivevar_hash, command.hiveconf_hash)
+        data_instance = self.hanlu_env.get_instance_by_jdbc_url(command.arg_url, user_name=command.arg_username,
+                                                                password=command.arg_password)
+        return self.analyze_sql(data_instance, sql, command.arg_database)
 
-        if sql is None:
-            print(f"没有找到 SQL 语句: {command_input}")
-            return DTask.unknown()
+    def analyze_datax_config(self, config_content: str) -> DTask:
+        """根据 DataX 的配置文件，分析数据流向；相同内容的配置文件只分析一次
 
-        data_instance = self.hanlu_env.get_instance_by_jdbc_url(jdbc_url, user_name=user_name, password=password)
+        Parameters
+        ----------
+        config_content : str
+            DataX 配置文件内容
+        """
+        context = self.datax_cache_context()
+        data_task = self.datax_cache.get(None, config_content, context=context)
+        if data_task is None:
+            data_task = self.analyze_datax_config_without_cache(config_content)
+            self.datax_cache.put(None, config_content, data_task, context=context)
+        return data_task
 
-        return self.analyze_sql(data_instance, sql)
+    def datax_cache_context(self) -> str:
+        """返回影响 DataX 配置文件分析结果的分析器配置，参与 DataX 分析结果缓存键的计算
 
-    def analyze_datax_config(self, config_content: str) -> DTask:
-        """根据 DataX 的配置文件，分析数据流向"""
-        data_task = DTask.empty()
-        datax_config = json.loads(config_content.replace("\t", "\\t"))
-        for content in datax_config["job"]["content"]:
-            reader_name = content["reader"]["name"]
-            if reader_name == "mysqlreader":
-                parameter = content["reader"]["parameter"]
-                username = parameter.get("username")
-                password = parameter.get("password")
-                connection = parameter["connection"][0]
-                table_name = connection["table"][0]
-                jdbc_url = connection["jdbcUrl"][0]
-                data_instance = self.hanlu_env.get_instance_by_jdbc_url(jdbc_url, user_name=username, password=password)
-                data_task.add_dependent_node(DNode(
-                    instance=data_instance,
-                    table_name=table_name
-                ))
-            else:
-                print("【失败】暂不支持的 DataX Reader 类型: ", reader_name)
-                return DTask.unknown()
-
-            writer_name = content["writer"]["name"]
-            if writer_name == "hdfswriter":
-                parameter = content["writer"]["parameter"]
-                if "defaultFS" not in parameter or "path" not in parameter:
-                    print("【失败】DataX 格式错误 ", writer_name)
-                    return DTask.unknown()
-
-                default_fs = parameter["defaultFS"]
-                path = parameter["path"]
-                if default_fs.startswith("obs://"):
-                    hdfs_instance = DHdfsInstance.create_obs_instance(
-                        name=None,
-                        fs_obs_end_point=parameter.get("hadoopConfig", {}).get("fs.obs.endpoint"),
-                        fs_obs_bucket=default_fs.replace("obs://", "").strip("/")
-                    )
-                    self.hanlu_env.get_hive_instance_by_hdfs_instance(hdfs_instance, path)
-            else:
-                print("【失败】暂不支持的 DataX Writer 类型: ", reader_name)
-                return DTask.unknown()
+        在 sql_cache_context 的基础上，包括 HanLuEnv 注册信息的指纹和 datax_registry 的指纹。
+        """
+        env_fingerprint = self.hanlu_env.fingerprint() if self.hanlu_env is not None else None
+        return f"{self.sql_cache_context()};env={env_fingerprint};datax={self.datax_registry.fingerprint()}"
+
+    def analyze_datax_config_without_cache(self, config_content: str) -> DTask:
+        """增量解析 DataX 的配置文件，使用 datax_registry 中注册的处理器分析每个 Reader 和 Writer
 
+        Parameters
+        ----------
+        config_content : str
+            DataX 配置文件内容
+        """
+        data_task = DTask.empty()
+        try:
+            for content in iter_datax_content(config_content):
+                for plugin_type, get_handler, fail_reason in [
+                    ("reader", self.datax_registry.get_reader, DTaskFailReason.UNSUPPORTED_DATAX_READER),
+                    ("writer", self.datax_registry.get_writer, DTaskFailReason.UNSUPPORTED_DATAX_WRITER)
+                ]:
+                    plugin = content[plugin_type]
+                    if not isinstance(plugin, dict) or "name" not in plugin:
+                        return self.fail(DTaskFailReason.DATAX_CONFIG_ERROR, f"missing {plugin_type}")
+                    handler = get_handler(plugin["name"])
+                    if handler is None:
+                        return self.fail(fail_reason, plugin["name"])
+                    data_task += handler(self, plugin.get("parameter", {}), plugin_type == "reader")
+        except (DataXConfigError, KeyError, TypeError, IndexError, AttributeError) as e:
+            return self.fail(DTaskFailReason.DATAX_CONFIG_ERROR, type(e).__name__, error=str(e))
         return data_task
 
 
@@ -280,20 +691,21 @@ class HanLuDefaultAnalyzer(HanLuAnalyzer):
 
     def analyze_spark_submit_command(self,
                                      simu_process: SimuProcess,
-                                     command_input: SimuCommandInput) -> DTask:
-        print("【失败】需重写 analyze_spark_submit_command 方法")
-        return DTask.unknown()
+                                     command: special_command.CommandSparkSubmit) -> DTask:
+        data_task = self.analyze_spark_submit_by_registry(simu_process, command)
+        if data_task is not None:
+            return data_task
+        return self.fail(DTaskFailReason.UNSUPPORTED_SPARK_SUBMIT, command.arg_class or "unregistered application",
+                         application=command.application)
 
     def analyze_other_dolphin_task(self, record: Dict[str, Any]) -> DTask:
-        print("【失败】未知 Dolphin 任务")
-        return DTask.unknown()
+        return self.fail(DTaskFailReason.UNSUPPORTED_DOLPHIN_TASK, record["task_type"], task_code=record.get("code"))
 
     def analyze_other_shell_command(self,
                                     simu_process: SimuProcess,
                                     command_input: SimuCommandInput) -> DTask:
-        print("【失败】未知 Shell 命令")
-        return DTask.unknown()
+        return self.fail(DTaskFailReason.UNSUPPORTED_SHELL_COMMAND, command_input.command_name,
+                         command_params=command_input.command_params)
 
     def analyze_other_sql(self, data_instance: DInstance, sql: str) -> DTask:
-        print(f"【失败】未知 sql 语句: {sql}")
-        return DTask.unknown()
+        return self.fail(DTaskFailReason.UNSUPPORTED_SQL, sql=sql)
@@ -0,0 +1,221 @@
+"""
+寒露分析器的分阶段性能分析
+"""
+
+import contextlib
+import heapq
+import json
+import math
+import threading
+import time
+from typing import Any, ContextManager, Dict, Hashable, Iterator, List, Optional, Tuple
+
+__all__ = [
+    "HanLuProfiler",
+    "TimingProfiler",
+    "NULL_PROFILER",
+]
+
+# 空的上下文管理器（未启用性能分析时所有阶段共用，避免创建对象）
+_NULL_CONTEXT = contextlib.nullcontext()
+
+
+class HanLuProfiler:
+    """性能分析器基类：不记录任何信息，开销仅为一次方法调用
+
+    分析器在以下阶段调用 stage 方法（label 为阶段的细分标签）：
+    - dolphin_function：展开海豚内置函数，label 为任务类型
+    - shell_parse：Shell 脚本词法分析和语法分析
+    - shell_execute：执行 Shell 脚本（包含其中所有命令的分析）
+    - shell_command：分析 Shell 命令，label 为命令名称（beeline、spark-submit 和 DataX 以外的命令均为 shell:other）
+    - sql_parse：SQL 解析
+    - sql_statement：分析 SQL 语句（包含 all_use_table），label 为语句类型
+    - datax：分析 DataX 配置文件
+    - pyspark_scan：静态扫描 PySpark 脚本
+    - column_lineage：分析 INSERT ... SELECT 语句的字段级血缘关系
+    """
+
+    enabled = False
+
+    def task(self, task_code: Hashable, task_type: str) -> ContextManager:
+        """记录一个海豚调度任务的整体耗时及分阶段耗时"""
+        return _NULL_CONTEXT
+
+    def stage(self, stage: str, label: Optional[str] = None) -> ContextManager:
+        """记录一个阶段的耗时"""
+        return _NULL_CONTEXT
+
+
+NULL_PROFILER = HanLuProfiler()
+
+
+class _Metric:
+    """计数器与直方图：直方图的第 i 个桶记录耗时在 [2^(i-1), 2^i) 微秒之间的次数"""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        bucket = max(0, math.ceil(math.log2(seconds * 1e6))) if seconds > 0 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def merge(self, other: "_Metric") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+
+    def percentile(self, q: float) -> float:
+        """根据直方图估算分位数（秒，取桶的上界）"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        accumulate = 0
+        for bucket in sorted(self.buckets):
+            accumulate += self.buckets[bucket]
+            if accumulate >= rank:
+                return (2 ** bucket) / 1e6
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_seconds": self.total,
+            "mean_seconds": self.total / self.count if self.count else 0.0,
+            "max_seconds": self.max,
+            "p50_seconds": self.percentile(0.5),
+            "p90_seconds": self.percentile(0.9),
+            "p99_seconds": self.percentile(0.99),
+            "histogram_us": {f"<{2 ** bucket}": count for bucket, count in sorted(self.buckets.items())},
+        }
+
+
+class TimingProfiler(HanLuProfiler):
+    """记录各阶段计数器、耗时直方图以及最慢任务的分阶段耗时
+
+    计数器和直方图按 (阶段, 标签) 分组；任务的整体耗时按任务类型记录在 task 阶段中。
+    在进程池中使用时，每个工作进程记录自己的统计信息，主进程通过 merge 合并。
+    """
+
+    enabled = True
+
+    def __init__(self, top_n: int = 100):
+        """
+
+        Parameters
+        ----------
+        top_n : int, default = 100
+            保留耗时最长的任务数
+        """
+        self.top_n = top_n
+        self._metric_hash: Dict[Tuple[str, Optional[str]], _Metric] = {}
+        self._slowest: List[Tuple[float, int, Hashable, str, Dict[str, float]]] = []  # 最小堆
+        self._sequence = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"top_n": self.top_n, "metric_hash": self._metric_hash, "slowest": self._slowest}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(top_n=state["top_n"])
+        self._metric_hash = state["metric_hash"]
+        self._slowest = state["slowest"]
+
+    @contextlib.contextmanager
+    def task(self, task_code: Hashable, task_type: str) -> Iterator[None]:
+        breakdown: Dict[str, float] = {}
+        self._local.breakdown = breakdown
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start_time
+            self._local.breakdown = None
+            with self._lock:
+                self._add_metric("task", task_type, seconds)
+                self._sequence += 1
+                item = (seconds, self._sequence, task_code, task_type, breakdown)
+                if len(self._slowest) < self.top_n:
+                    heapq.heappush(self._slowest, item)
+                elif seconds > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, item)
+
+    @contextlib.contextmanager
+    def stage(self, stage: str, label: Optional[str] = None) -> Iterator[None]:
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start_time
+            breakdown = getattr(self._local, "breakdown", None)
+            if breakdown is not None:
+                breakdown[stage] = breakdown.get(stage, 0.0) + seconds
+            with self._lock:
+                self._add_metric(stage, label, seconds)
+
+    def _add_metric(self, stage: str, label: Optional[str], seconds: float) -> None:
+        metric = self._metric_hash.get((stage, label))
+        if metric is None:
+            metric = self._metric_hash[(stage, label)] = _Metric()
+        metric.add(seconds)
+
+    def merge(self, other: "TimingProfiler") -> None:
+        """合并其他性能分析器（例如工作进程中的性能分析器）的统计信息"""
+        with self._lock:
+            for key, metric in other._metric_hash.items():
+                if key not in self._metric_hash:
+                    self._metric_hash[key] = _Metric()
+                self._metric_hash[key].merge(metric)
+            for seconds, _, task_code, task_type, breakdown in other._slowest:
+                self._sequence += 1
+                item = (seconds, self._sequence, task_code, task_type, breakdown)
+                if len(self._slowest) < self.top_n:
+                    heapq.heappush(self._slowest, item)
+                elif seconds > self._slowest[0][0]:
+                    heapq.heapreplace(self._slowest, item)
+
+    def take(self) -> "TimingProfiler":
+        """取出当前的统计信息并清空，用于在工作进程中按批次上报统计信息"""
+        with self._lock:
+            snapshot = TimingProfiler(top_n=self.top_n)
+            snapshot._metric_hash, self._metric_hash = self._metric_hash, {}
+            snapshot._slowest, self._slowest = self._slowest, []
+        return snapshot
+
+    def report(self, top_n: Optional[int] = None) -> Dict[str, Any]:
+        """生成性能分析报告
+
+        Parameters
+        ----------
+        top_n : Optional[int], default = None
+            报告中包含的最慢任务数，为 None 时包含所有保留的任务
+        """
+        with self._lock:
+            stage_hash: Dict[str, Dict[str, Any]] = {}
+            for (stage, label), metric in sorted(self._metric_hash.items(), key=lambda x: (x[0][0], x[0][1] or "")):
+                stage_hash.setdefault(stage, {})[label or ""] = metric.to_dict()
+            slowest = sorted(self._slowest, reverse=True)
+        if top_n is not None:
+            slowest = slowest[:top_n]
+        return {
+            "stages": stage_hash,
+            "slowest_tasks": [{"task_code": task_code, "task_type": task_type, "seconds": seconds,
+                               "breakdown_seconds": breakdown}
+                              for seconds, _, task_code, task_type, breakdown in slowest],
+        }
+
+    def export_json(self, path: str, top_n: Optional[int] = None) -> None:
+        """将性能分析报告写入 JSON 文件"""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(top_n), file, ensure_ascii=False, indent=2, default=str)
@@ -0,0 +1,2 @@
+from hanlu.cache.sql_lineage_cache import SQLLineageCache
+from hanlu.cache.sql_lineage_cache import normalize_sql
@@ -0,0 +1,187 @@
+"""
+SQL 血缘分析结果缓存
+"""
+
+import collections
+import hashlib
+import pickle
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+from hanlu.data_node import DInstance
+from hanlu.data_task import DTask
+
+__all__ = [
+    "normalize_sql",
+    "SQLLineageCache",
+]
+
+# 缓存值格式版本：DTask 的结构变化时递增，使持久化缓存中旧格式的分析结果不再命中
+CACHE_FORMAT_VERSION = 3
+
+
+def normalize_sql(sql: str) -> str:
+    """标准化 SQL 语句：剔除首尾空白字符、末尾分号和每行末尾的空白字符，不改变 SQL 语义"""
+    sql = sql.strip().rstrip(";").rstrip()
+    return "\n".join(line.rstrip() for line in sql.splitlines())
+
+
+class SQLLineageCache:
+    """以 SQL 内容寻址的血缘分析结果缓存
+
+    缓存键为标准化后 SQL、数据实例、默认库名与分析器配置（如是否分析字段级血缘关系、表结构的指纹）的哈希值。包含两层：
+    - 内存层：最近最少使用（LRU）淘汰的有界缓存
+    - 磁盘层（可选）：sqlite 文件，可在多次运行之间保留缓存
+
+    缓存中保存的是 DTask 的副本，读取时同样返回副本，调用方修改返回值不会影响缓存。
+    """
+
+    def __init__(self, max_size: int = 65536, path: Optional[str] = None, namespace: str = "",
+                 commit_interval: int = 256):
+        """
+
+        Parameters
+        ----------
+        max_size : int, default = 65536
+            内存层最多保存的结果数
+        path : Optional[str], default = None
+            磁盘层 sqlite 文件路径，为 None 时不启用磁盘层
+        namespace : str, default = ""
+            缓存命名空间，参与缓存键的计算；升级 SQL 解析器或修改分析逻辑后更换命名空间即可使旧缓存失效
+        commit_interval : int, default = 256
+            磁盘层每写入多少条结果提交一次事务
+        """
+        self._max_size = max_size
+        self._path = path
+        self._namespace = namespace
+        self._commit_interval = commit_interval
+
+        self._memory: collections.OrderedDict[str, DTask] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._uncommitted = 0
+
+        # 命中率统计
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """序列化时（如发送到工作进程）不包含 sqlite 连接和锁，在反序列化后重新创建"""
+        self.flush()
+        return {
+            "max_size": self._max_size,
+            "path": self._path,
+            "namespace": self._namespace,
+            "commit_interval": self._commit_interval,
+            "memory": self._memory,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(max_size=state["max_size"], path=state["path"], namespace=state["namespace"],
+                      commit_interval=state["commit_interval"])
+        self._memory = state["memory"]
+
+    def make_key(self, data_instance: Optional[DInstance], sql: str, default_schema: Optional[str] = None,
+                 context: Optional[str] = None) -> str:
+        """计算缓存键，默认库名或分析器配置为 None 时与不指定时的缓存键相同
+
+        Parameters
+        ----------
+        data_instance : Optional[DInstance]
+            SQL 运行的数据实例
+        sql : str
+            SQL 语句
+        default_schema : Optional[str], default = None
+            默认库名
+        context : Optional[str], default = None
+            影响分析结果的分析器配置，配置不同的分析结果互不命中
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_FORMAT_VERSION}\x00".encode("utf-8"))
+        digest.update(self._namespace.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(repr(data_instance).encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(normalize_sql(sql).encode("utf-8"))
+        if default_schema is not None:
+            digest.update(b"\x00")
+            digest.update(default_schema.encode("utf-8"))
+        if context is not None:
+            digest.update(b"\x01")
+            digest.update(context.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, data_instance: Optional[DInstance], sql: str,
+            default_schema: Optional[str] = None, context: Optional[str] = None) -> Optional[DTask]:
+        """查询缓存，未命中时返回 None；参数与 make_key 一致"""
+        key = self.make_key(data_instance, sql, default_schema, context)
+        with self._lock:
+            data_task = self._memory.get(key)
+            if data_task is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return data_task.copy()
+
+            connection = self._get_connection()
+            if connection is not None:
+                row = connection.execute("SELECT `value` FROM `sql_lineage` WHERE `key` = ?", (key,)).fetchone()
+                if row is not None:
+                    data_task = pickle.loads(row[0])
+                    self._put_memory(key, data_task)
+                    self.disk_hits += 1
+                    return data_task.copy()
+
+            self.misses += 1
+            return None
+
+    def put(self, data_instance: Optional[DInstance], sql: str, data_task: DTask,
+            default_schema: Optional[str] = None, context: Optional[str] = None) -> None:
+        """写入缓存；参数与 make_key 一致"""
+        key = self.make_key(data_instance, sql, default_schema, context)
+        data_task = data_task.copy()
+        with self._lock:
+            self._put_memory(key, data_task)
+            connection = self._get_connection()
+            if connection is not None:
+                connection.execute("INSERT OR REPLACE INTO `sql_lineage` (`key`, `value`) VALUES (?, ?)",
+                                   (key, pickle.dumps(data_task)))
+                self._uncommitted += 1
+                if self._uncommitted >= self._commit_interval:
+                    connection.commit()
+                    self._uncommitted = 0
+
+    def flush(self) -> None:
+        """提交磁盘层尚未提交的写入"""
+        with self._lock:
+            if self._connection is not None and self._uncommitted > 0:
+                self._connection.commit()
+                self._uncommitted = 0
+
+    def close(self) -> None:
+        """提交并关闭磁盘层连接"""
+        self.flush()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _put_memory(self, key: str, data_task: DTask) -> None:
+        """写入内存层，超过容量时淘汰最近最少使用的结果（调用方需持有锁）"""
+        self._memory[key] = data_task
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_size:
+            self._memory.popitem(last=False)
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        """获取磁盘层连接，首次调用时创建（调用方需持有锁）"""
+        if self._path is None:
+            return None
+        if self._connection is None:
+            self._connection = sqlite3.connect(self._path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")  # 允许多个工作进程同时读写
+            self._connection.execute("CREATE TABLE IF NOT EXISTS `sql_lineage` "
+                                     "(`key` TEXT PRIMARY KEY, `value` BLOB NOT NULL)")
+            self._connection.commit()
+        return self._connection
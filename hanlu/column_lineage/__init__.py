@@ -0,0 +1,9 @@
+"""
+字段级血缘分析：INSERT ... SELECT 语句的字段级血缘分析器和表结构提供器
+"""
+
+from hanlu.column_lineage.column_lineage_analyzer import ColumnLineageAnalyzer
+from hanlu.column_lineage.schema_store import METASTORE_DUMP_SQL
+from hanlu.column_lineage.schema_store import SchemaProvider
+from hanlu.column_lineage.schema_store import SchemaStore
+from hanlu.column_lineage.schema_store import TableSchema
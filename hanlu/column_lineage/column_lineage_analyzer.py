@@ -0,0 +1,252 @@
+"""
+INSERT ... SELECT 语句的字段级血缘分析
+"""
+
+import dataclasses
+from typing import Callable, Dict, List, Optional, Tuple
+
+import metasequoia_sql as ms_sql
+from hanlu.column_lineage.schema_store import SchemaProvider
+from hanlu.data_node import DNode
+from hanlu.data_task import DColumnEdge
+
+__all__ = [
+    "ColumnLineageAnalyzer",
+]
+
+SourceColumns = Tuple[Tuple[DNode, str], ...]  # 字段的源字段：(源数据节点, 源字段名) 的元组，去重并按首次出现的顺序排列
+OutputColumns = List[Tuple[str, SourceColumns]]  # 查询结果的字段：(字段名, 源字段) 的有序列表
+
+
+def _merge_sources(source_list: List[SourceColumns]) -> SourceColumns:
+    return tuple(dict.fromkeys(source for sources in source_list for source in sources))
+
+
+class _Relation:
+    """查询中 FROM / JOIN / LATERAL VIEW 子句引用的关系"""
+
+    __slots__ = ("name", "data_node", "column_list", "column_hash")
+
+    def __init__(self, name: str, data_node: Optional[DNode], column_list: Optional[OutputColumns]):
+        self.name = name  # 关系在查询中的名称（别名或表名，小写）
+        self.data_node = data_node  # 关系为物理表时的数据节点，为派生表时为 None
+        self.column_list = column_list  # 关系的字段及其源字段，物理表的表结构未知时为 None
+        self.column_hash: Optional[Dict[str, SourceColumns]] = dict(column_list) if column_list is not None else None
+
+    def get_sources(self, column_name: str) -> Optional[SourceColumns]:
+        """返回字段的源字段，关系中不存在该字段时返回 None"""
+        if self.column_hash is None:
+            return ((self.data_node, column_name),)  # 表结构未知的物理表：假定字段存在
+        return self.column_hash.get(column_name)
+
+    def has_column(self, column_name: str) -> bool:
+        return self.column_hash is not None and column_name in self.column_hash
+
+
+class ColumnLineageAnalyzer:
+    """INSERT ... SELECT 语句的字段级血缘分析器
+
+    支持字段表达式、别名、WITH 子句（CTE）、子查询、UNION、LATERAL VIEW，以及根据表结构展开 SELECT *。目标字段只包含
+    SELECT 子句中字段的直接来源，不包含 WHERE、JOIN ON、GROUP BY 等子句中用于过滤或关联的字段。无法确定来源的字段引用记录在
+    unresolved_list 中，不影响其他字段的分析。
+    """
+
+    __slots__ = ("_create_table_node", "_schema_provider", "unresolved_list")
+
+    def __init__(self, create_table_node: Callable[[ms_sql.node.ASTTableNameExpression], DNode],
+                 schema_provider: Optional[SchemaProvider] = None):
+        """
+
+        Parameters
+        ----------
+        create_table_node : Callable[[ms_sql.node.ASTTableNameExpression], DNode]
+            将 SQL 中的表名对象转换为数据节点的函数（需要处理默认库名）
+        schema_provider : Optional[SchemaProvider], default = None
+            表结构提供器，为 None 时无法展开物理表的 SELECT *，也无法按位置对应目标表的字段
+        """
+        self._create_table_node = create_table_node
+        self._schema_provider = schema_provider
+        self.unresolved_list: List[str] = []  # 无法确定来源的字段引用
+
+    def analyze_insert(self, statement: ms_sql.node.ASTInsertSelectStatement) -> List[DColumnEdge]:
+        """分析 INSERT ... SELECT 语句，返回字段级血缘关系的边（按目标字段的顺序排列）"""
+        target_node = self._create_table_node(statement.table_name)
+        cte_hash = self._resolve_with_clause(statement.with_clause, {})
+        output_list = self._resolve_select(statement.select_statement, cte_hash)
+        target_column_list = self._get_target_columns(statement, target_node, output_list)
+        edge_list = []
+        for target_column, (_, sources) in zip(target_column_list, output_list):
+            for source_node, source_column in sources:
+                edge_list.append(DColumnEdge(source_node=source_node, source_column=source_column,
+                                             target_node=target_node, target_column=target_column))
+        return edge_list
+
+    def _get_target_columns(self, statement: ms_sql.node.ASTInsertSelectStatement, target_node: DNode,
+                            output_list: OutputColumns) -> List[str]:
+        """按位置确定查询结果的每个字段写入的目标字段"""
+        static_partition_set = set()
+        dynamic_partition_list = []
+        if statement.partition is not None:
+            for partition in statement.partition.partitions:
+                if isinstance(partition, ms_sql.node.ASTColumnNameExpression):
+                    dynamic_partition_list.append(partition.column_name.lower())
+                elif isinstance(getattr(partition, "before_value", None), ms_sql.node.ASTColumnNameExpression):
+                    static_partition_set.add(partition.before_value.column_name.lower())
+
+        if statement.columns:
+            return [column.column_name.lower() for column in statement.columns] + dynamic_partition_list
+
+        table_schema = self._schema_provider.get_table_schema(target_node) if self._schema_provider else None
+        if table_schema is not None:
+            target_column_list = list(table_schema.columns) + [column for column in table_schema.partition_columns
+                                                               if column not in static_partition_set]
+            if len(target_column_list) == len(output_list):
+                return target_column_list
+            if len(table_schema.columns) == len(output_list):
+                return list(table_schema.columns)
+            self.unresolved_list.append(f"{target_node.table_name}: 查询结果的字段数 {len(output_list)} 与目标表不一致")
+
+        # 目标表结构未知时，使用查询结果的字段名；动态分区字段对应查询结果中的最后几个字段
+        target_column_list = [name for name, _ in output_list]
+        if dynamic_partition_list and len(dynamic_partition_list) <= len(target_column_list):
+            target_column_list[len(target_column_list) - len(dynamic_partition_list):] = dynamic_partition_list
+        return target_column_list
+
+    def _resolve_with_clause(self, with_clause: Optional[ms_sql.node.ASTWithClause],
+                             cte_hash: Dict[str, OutputColumns]) -> Dict[str, OutputColumns]:
+        """分析 WITH 子句中的临时表，返回包含这些临时表的新映射（后定义的临时表可以引用先定义的临时表）"""
+        if with_clause is None or not with_clause.tables:
+            return cte_hash
+        cte_hash = dict(cte_hash)
+        for with_table in with_clause.tables:
+            cte_hash[with_table.name.lower()] = self._resolve_select(with_table.statement, cte_hash)
+        return cte_hash
+
+    def _resolve_select(self, statement: ms_sql.node.ASTSelectStatement,
+                        cte_hash: Dict[str, OutputColumns]) -> OutputColumns:
+        """分析查询语句，返回查询结果的字段及其源字段"""
+        cte_hash = self._resolve_with_clause(statement.with_clause, cte_hash)
+        if isinstance(statement, ms_sql.node.ASTUnionSelectStatement):
+            output_list: Optional[OutputColumns] = None
+            for element in statement.elements:
+                if not isinstance(element, ms_sql.node.ASTSingleSelectStatement):
+                    continue  # UNION 类型
+                element_output_list = self._resolve_select(element, cte_hash)
+                if output_list is None:
+                    output_list = element_output_list  # UNION 结果的字段名与第一个查询一致
+                    continue
+                if len(element_output_list) != len(output_list):
+                    self.unresolved_list.append("UNION: 各查询的字段数不一致")
+                output_list = [(name, _merge_sources([sources, element_sources]))
+                               for (name, sources), (_, element_sources) in zip(output_list, element_output_list)]
+            return output_list or []
+
+        relation_list = self._resolve_relations(statement, cte_hash)
+        output_list = []
+        for idx, select_column in enumerate(statement.select_clause.columns):
+            value = select_column.value
+            if isinstance(value, ms_sql.node.ASTWildcardExpression):
+                output_list.extend(self._expand_wildcard(value, relation_list))
+                continue
+            if select_column.alias is not None:
+                name = select_column.alias.name.lower()
+            elif isinstance(value, ms_sql.node.ASTColumnNameExpression):
+                name = value.column_name.lower()
+            else:
+                name = f"_c{idx}"  # Hive 为没有别名的表达式生成的字段名
+            output_list.append((name, self._expression_sources(value, relation_list, cte_hash)))
+        return output_list
+
+    def _resolve_relations(self, statement: ms_sql.node.ASTSingleSelectStatement,
+                           cte_hash: Dict[str, OutputColumns]) -> List[_Relation]:
+        """分析查询语句 FROM、JOIN 和 LATERAL VIEW 子句引用的关系"""
+        from_table_list = list(statement.from_clause.tables) if statement.from_clause is not None else []
+        from_table_list.extend(join_clause.table for join_clause in statement.join_clauses)
+        relation_list = []
+        for from_table in from_table_list:
+            table = from_table.name
+            if isinstance(table, ms_sql.node.ASTSubQueryExpression):
+                name = from_table.alias.name.lower() if from_table.alias is not None else ""
+                relation_list.append(_Relation(name, None, self._resolve_select(table.statement, cte_hash)))
+                continue
+            name = (from_table.alias.name if from_table.alias is not None else table.table_name).lower()
+            if table.schema_name is None and table.table_name.lower() in cte_hash:
+                relation_list.append(_Relation(name, None, cte_hash[table.table_name.lower()]))
+                continue
+            data_node = self._create_table_node(table)
+            table_schema = self._schema_provider.get_table_schema(data_node) if self._schema_provider else None
+            column_list = ([(column, ((data_node, column),)) for column in table_schema.all_columns]
+                           if table_schema is not None else None)
+            relation_list.append(_Relation(name, data_node, column_list))
+
+        for lateral_view_clause in statement.lateral_view_clauses:
+            # LATERAL VIEW 生成的字段均来源于函数参数中引用的字段
+            sources = self._expression_sources(lateral_view_clause.function, relation_list, cte_hash)
+            column_list = [(name.lower(), sources) for name in lateral_view_clause.alias.names]
+            relation_list.append(_Relation(lateral_view_clause.view_name.lower(), None, column_list))
+        return relation_list
+
+    def _expand_wildcard(self, wildcard: ms_sql.node.ASTWildcardExpression,
+                         relation_list: List[_Relation]) -> OutputColumns:
+        """展开 SELECT * 或 SELECT t.*"""
+        if wildcard.table_name is not None:
+            relation_list = [relation for relation in relation_list if relation.name == wildcard.table_name.lower()]
+            if not relation_list:
+                self.unresolved_list.append(f"{wildcard.table_name}.*")
+        output_list = []
+        for relation in relation_list:
+            if relation.column_list is None:
+                self.unresolved_list.append(f"{relation.data_node.table_name}.*: 表结构未知")
+                continue
+            output_list.extend(relation.column_list)
+        return output_list
+
+    def _expression_sources(self, expression: ms_sql.node.ASTBase, relation_list: List[_Relation],
+                            cte_hash: Dict[str, OutputColumns]) -> SourceColumns:
+        """返回表达式中引用的所有字段的源字段"""
+        source_list = []
+        self._collect_sources(expression, relation_list, cte_hash, source_list)
+        return _merge_sources(source_list)
+
+    def _collect_sources(self, expression, relation_list: List[_Relation], cte_hash: Dict[str, OutputColumns],
+                         source_list: List[SourceColumns]) -> None:
+        if isinstance(expression, ms_sql.node.ASTColumnNameExpression):
+            sources = self._resolve_column(expression.table_name, expression.column_name, relation_list)
+            if sources is not None:
+                source_list.append(sources)
+        elif isinstance(expression, ms_sql.node.ASTSubQueryExpression):
+            # 标量子查询：结果字段的所有源字段
+            for _, sources in self._resolve_select(expression.statement, cte_hash):
+                source_list.append(sources)
+        elif isinstance(expression, (tuple, list)):
+            for element in expression:
+                self._collect_sources(element, relation_list, cte_hash, source_list)
+        elif isinstance(expression, ms_sql.node.ASTBase) and dataclasses.is_dataclass(expression):
+            for field in dataclasses.fields(expression):
+                value = getattr(expression, field.name)
+                if isinstance(value, (ms_sql.node.ASTBase, tuple, list)):
+                    self._collect_sources(value, relation_list, cte_hash, source_list)
+
+    def _resolve_column(self, table_name: Optional[str], column_name: str,
+                        relation_list: List[_Relation]) -> Optional[SourceColumns]:
+        """确定字段引用的源字段，无法确定时记录到 unresolved_list 并返回 None"""
+        column_name = column_name.lower()
+        if table_name is not None:
+            table_name = table_name.lower()
+            for relation in relation_list:
+                if relation.name == table_name:
+                    sources = relation.get_sources(column_name)
+                    if sources is None:
+                        self.unresolved_list.append(f"{table_name}.{column_name}")
+                    return sources
+            # 没有匹配的关系时，视为结构体字段的访问（如 info.name 中的 info 为字段名）
+            return self._resolve_column(None, table_name, relation_list)
+
+        candidate_list = [relation for relation in relation_list if relation.has_column(column_name)]
+        if not candidate_list:
+            # 字段不在任何已知结构的关系中时，只有一个表结构未知的物理表才能确定来源
+            candidate_list = [relation for relation in relation_list if relation.column_hash is None]
+        if len(candidate_list) != 1:
+            self.unresolved_list.append(column_name)
+            return None
+        return candidate_list[0].get_sources(column_name)
@@ -0,0 +1,229 @@
+"""
+表结构提供器：为字段级血缘分析提供表的字段列表，以及从 Hive 元数据库导出文件中批量加载的表结构存储
+"""
+
+import abc
+import collections
+import dataclasses
+import hashlib
+import os
+import pickle
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from hanlu.common.metastore_dump import METASTORE_COLUMN_DUMP_SQL
+from hanlu.common.metastore_dump import iter_metastore_dump
+from hanlu.data_node import DNode
+
+__all__ = [
+    "METASTORE_DUMP_SQL",
+    "TableSchema",
+    "SchemaProvider",
+    "SchemaStore",
+]
+
+# 从 Hive 元数据库（MySQL）导出表结构的 SQL，导出文件可以使用 SchemaStore.load_metastore_dump 加载
+METASTORE_DUMP_SQL = METASTORE_COLUMN_DUMP_SQL
+
+# 持久化文件格式版本：SchemaStore 的结构变化时递增，使旧格式的持久化文件不再被加载
+STORE_FORMAT_VERSION = 1
+
+DEFAULT_SCHEMA_NAME = "default"  # SQL 和默认库名均没有指定库名时，Hive 使用的库名
+
+
+@dataclasses.dataclass(slots=True, frozen=True, eq=True)
+class TableSchema:
+    """表结构"""
+
+    columns: Tuple[str, ...] = dataclasses.field(kw_only=True)  # 普通字段名（小写，按建表顺序排列）
+    partition_columns: Tuple[str, ...] = dataclasses.field(kw_only=True, default=())  # 分区字段名（小写，按建表顺序排列）
+
+    @property
+    def all_columns(self) -> Tuple[str, ...]:
+        """SELECT * 展开的字段：普通字段在前，分区字段在后"""
+        return self.columns + self.partition_columns
+
+
+class SchemaProvider(abc.ABC):
+    """表结构提供器"""
+
+    @abc.abstractmethod
+    def get_table_schema(self, data_node: DNode) -> Optional[TableSchema]:
+        """返回数据节点对应表的表结构，未知时返回 None
+
+        Parameters
+        ----------
+        data_node : DNode
+            数据节点（库名为 None 时表示使用 Hive 的默认库）
+        """
+
+    def fingerprint(self) -> str:
+        """返回表结构内容的指纹，参与 SQL 血缘分析结果缓存键的计算，表结构变化后旧的缓存结果不再命中
+
+        默认返回类名，即认为表结构不会变化；表结构可能变化的子类需要覆盖该方法。
+        """
+        return f"{type(self).__module__}.{type(self).__qualname__}"
+
+
+class SchemaStore(SchemaProvider):
+    """内存中的表结构存储
+
+    表结构以 (数据实例名称, 库名, 表名) 为键保存在字典中，查询时不访问元数据库；数据实例名称为 None 的表结构适用于所有数据实例，
+    查询时优先使用与数据节点所属数据实例同名的表结构。库名、表名和字段名均转换为小写。
+    """
+
+    def __init__(self):
+        self._table_hash: Dict[Tuple[Optional[str], str, str], TableSchema] = {}
+        self._fingerprint: Optional[str] = None  # 表结构内容的指纹缓存，修改表结构时清空
+
+    def __len__(self) -> int:
+        return len(self._table_hash)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"table_hash": self._table_hash, "fingerprint": self._fingerprint}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._table_hash = state["table_hash"]
+        self._fingerprint = state.get("fingerprint")
+
+    def fingerprint(self) -> str:
+        """返回所有表结构的哈希值，修改表结构后首次调用时重新计算"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            # 数据实例名称可能为 None，排序时转换为字符串
+            for key in sorted(self._table_hash, key=lambda item: (item[0] or "", item[0] is not None) + item[1:]):
+                table_schema = self._table_hash[key]
+                digest.update(repr((key, table_schema.columns, table_schema.partition_columns)).encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def add_table(self, schema_name: str, table_name: str, table_schema: TableSchema,
+                  instance_name: Optional[str] = None) -> None:
+        """添加或替换表结构
+
+        Parameters
+        ----------
+        schema_name : str
+            库名
+        table_name : str
+            表名
+        table_schema : TableSchema
+            表结构
+        instance_name : Optional[str], default = None
+            数据实例名称，为 None 时适用于所有数据实例
+        """
+        self._table_hash[(instance_name, schema_name.lower(), table_name.lower())] = table_schema
+        self._fingerprint = None
+
+    def get_table_schema(self, data_node: DNode) -> Optional[TableSchema]:
+        schema_name = (data_node.schema_name or DEFAULT_SCHEMA_NAME).lower()
+        table_name = data_node.table_name.lower()
+        table_schema = self._table_hash.get((data_node.instance.name, schema_name, table_name))
+        if table_schema is None:
+            table_schema = self._table_hash.get((None, schema_name, table_name))
+        return table_schema
+
+    def load_rows(self, rows: Iterable[Tuple[str, str, str, int, bool]], instance_name: Optional[str] = None) -> int:
+        """批量加载表结构，返回加载的表数量；同一个表的所有字段需要在同一次调用中加载，已存在的表结构会被替换
+
+        Parameters
+        ----------
+        rows : Iterable[Tuple[str, str, str, int, bool]]
+            (库名, 表名, 字段名, 字段序号, 是否为分区字段) 的元组，顺序任意
+        instance_name : Optional[str], default = None
+            数据实例名称，为 None 时适用于所有数据实例
+        """
+        column_hash: Dict[Tuple[str, str], Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]] = \
+            collections.defaultdict(lambda: ([], []))
+        for schema_name, table_name, column_name, column_idx, is_partition in rows:
+            columns, partition_columns = column_hash[(schema_name.lower(), table_name.lower())]
+            # 大部分字段名在不同表中重复出现，驻留后减少内存占用
+            column = (column_idx, sys.intern(column_name.lower()))
+            if is_partition:
+                partition_columns.append(column)
+            else:
+                columns.append(column)
+        for (schema_name, table_name), (columns, partition_columns) in column_hash.items():
+            self._table_hash[(instance_name, sys.intern(schema_name), table_name)] = TableSchema(
+                columns=tuple(name for _, name in sorted(columns)),
+                partition_columns=tuple(name for _, name in sorted(partition_columns))
+            )
+        self._fingerprint = None
+        return len(column_hash)
+
+    def load_metastore_dump(self, path: str, instance_name: Optional[str] = None) -> int:
+        """从 Hive 元数据库的导出文件中批量加载表结构，返回加载的表数量
+
+        导出文件的格式见 common.metastore_dump.iter_metastore_dump，需要包含 db_name、tbl_name、column_name 字段，可以包含
+        integer_idx（字段序号，缺失时按文件中的顺序）和 is_partition（是否为分区字段，缺失时均为普通字段）字段。
+
+        Parameters
+        ----------
+        path : str
+            导出文件路径
+        instance_name : Optional[str], default = None
+            数据实例名称，为 None 时适用于所有数据实例
+
+        Raises
+        ------
+        ValueError
+            表头缺少必要的字段，或字段序号不是整数
+        """
+        fields = ("db_name", "tbl_name", "column_name", "integer_idx", "is_partition")
+        rows = iter_metastore_dump(path, fields, required_fields=fields[:3])
+        return self.load_rows(
+            ((schema_name, table_name, column_name, int(column_idx) if column_idx is not None else line_number,
+              is_partition is not None and is_partition.strip().lower() in {"1", "true"})
+             for line_number, (schema_name, table_name, column_name, column_idx, is_partition) in enumerate(rows)),
+            instance_name
+        )
+
+    def save(self, path: str) -> None:
+        """将表结构存储持久化到文件"""
+        with open(path, "wb") as file:
+            pickle.dump((STORE_FORMAT_VERSION, self._table_hash), file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: str) -> "SchemaStore":
+        """从 save 写入的文件中加载表结构存储
+
+        Raises
+        ------
+        ValueError
+            文件格式版本与当前版本不一致
+        """
+        with open(path, "rb") as file:
+            version, table_hash = pickle.load(file)
+        if version != STORE_FORMAT_VERSION:
+            raise ValueError(f"表结构存储文件格式版本 {version} 与当前版本 {STORE_FORMAT_VERSION} 不一致")
+        store = cls()
+        store._table_hash = table_hash
+        return store
+
+    @classmethod
+    def from_metastore_dump(cls, path: str, cache_path: Optional[str] = None,
+                            instance_name: Optional[str] = None) -> "SchemaStore":
+        """从 Hive 元数据库的导出文件中创建表结构存储
+
+        指定 cache_path 时，如果缓存文件比导出文件新则直接加载缓存文件，否则解析导出文件并写入缓存文件，避免每次启动时重复解析。
+
+        Parameters
+        ----------
+        path : str
+            导出文件路径
+        cache_path : Optional[str], default = None
+            缓存文件路径，为 None 时不使用缓存
+        instance_name : Optional[str], default = None
+            数据实例名称，为 None 时适用于所有数据实例
+        """
+        if (cache_path is not None and os.path.exists(cache_path)
+                and os.path.getmtime(cache_path) >= os.path.getmtime(path)):
+            try:
+                return cls.load(cache_path)
+            except (ValueError, pickle.UnpicklingError, EOFError):
+                pass  # 缓存文件格式不一致或已损坏时重新解析导出文件
+        store = cls()
+        store.load_metastore_dump(path, instance_name)
+        if cache_path is not None:
+            store.save(cache_path)
+        return store
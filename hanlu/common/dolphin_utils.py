@@ -4,17 +4,65 @@
 
 import calendar
 import datetime
+import functools
 import re
-from typing import Any, Optional
+from typing import Any, Callable, List, Optional
 
 __all__ = [
+    "PLACEHOLDER_BUSINESS_DATE",
+    "compile_inner_function",
     "run_inner_function",
     "run_all_inner_function",
+    "normalize_all_inner_function",
 ]
 
+# 标准化海豚内置函数时使用的固定业务日期：内置函数替换为基于该日期计算的、类型正确的占位值
+PLACEHOLDER_BUSINESS_DATE = datetime.datetime(2000, 1, 1)
+
+
+# 海豚日期格式到 strftime 格式的替换规则（按顺序替换）
+DATE_FORMAT_REPLACE_LIST = [
+    ("yyyy", "%Y"),
+    ("MM", "%m"),
+    ("dd", "%d"),
+    ("HH", "%H"),
+    ("mm", "%M"),
+    ("ss", "%S"),
+]
+
+# 内置函数中间结果的类型
+_TYPE_DATETIME = 1
+_TYPE_STR = 2
+_TYPE_INT = 3
+
+
+@functools.lru_cache(maxsize=1024)
+def to_strftime_format(date_format: str) -> str:
+    """将海豚日期格式（如 yyyyMMdd）转换为 strftime 格式（如 %Y%m%d）"""
+    for source, target in DATE_FORMAT_REPLACE_LIST:
+        date_format = date_format.replace(source, target)
+    return date_format
+
+
+def _add_year(now: datetime.datetime, p2: int) -> datetime.datetime:
+    new_year = now.year + p2
+    new_day = min(now.day, calendar.monthrange(new_year, now.month)[1])
+    return now.replace(year=new_year, day=new_day)
+
+
+def _add_month(now: datetime.datetime, p2: int) -> datetime.datetime:
+    year_delta, month_idx = divmod(now.month - 1 + p2, 12)  # 月份按 0 ~ 11 计算，避免 12 月和 1 月跨年时月份为 0
+    new_year = now.year + year_delta
+    new_month = month_idx + 1
+    new_day = min(now.day, calendar.monthrange(new_year, new_month)[1])
+    return now.replace(year=new_year, month=new_month, day=new_day)
 
-def run_inner_function(text: str) -> Optional[str]:
-    """运行海豚调度的内置函数
+
+@functools.lru_cache(maxsize=4096)
+def compile_inner_function(text: str) -> Callable[[datetime.datetime], str]:
+    """将海豚调度的内置函数编译为以业务日期为参数的函数，编译结果按内置函数文本缓存
+
+    编译时完成内置函数的拆分、参数解析和日期格式转换，执行时只需要进行日期计算；无法运行的内置函数编译为返回原始文本的函数。
 
     Parameters
     ----------
@@ -23,8 +71,8 @@ def run_inner_function(text: str) -> Optional[str]:
 
     Returns
     -------
-    Optional[str]
-        内置函数的返回值，如果无法运行则返回 None
+    Callable[[datetime.datetime], str]
+        以业务日期为参数、返回内置函数运行结果的函数
     """
 
     # 兼容包含前缀和不包含前缀的情况
@@ -33,7 +81,13 @@ def run_inner_function(text: str) -> Optional[str]:
     if text.endswith("}"):  # 如果包含 "}" 后缀则剔除
         text = text[:-1]
 
-    now: Any = None
+    origin = "${" + text + "}"
+
+    def fallback(_: datetime.datetime) -> str:
+        return origin
+
+    steps: List[Callable[[Any], Any]] = []
+    now_type: Optional[int] = None
     for sub_text in text.split("."):
         # 提取变量名、函数名和函数参数
         if "(" in sub_text and sub_text.endswith(")"):  # 当前元素是函数
@@ -44,89 +98,122 @@ def run_inner_function(text: str) -> Optional[str]:
             name = sub_text
             params = []
 
-        if now is None:
+        if now_type is None:
             # 样例：start("yyyyMMdd",-1)
             if name == "start" and len(params) == 2:
-                # 解析参数
-                p1 = (params[0][1:-1]
-                      .replace("yyyy", "%Y")
-                      .replace("MM", "%m")
-                      .replace("dd", "%d")
-                      .replace("HH", "%H")
-                      .replace("mm", "%M")
-                      .replace("ss", "%S"))
-                p2 = int(params[1])
-
-                # 执行计算逻辑
-                now = (datetime.datetime.now() + datetime.timedelta(days=p2)).strftime(p1)
+                p1 = to_strftime_format(params[0][1:-1])
+                delta = datetime.timedelta(days=int(params[1]))
+                steps.append(lambda now, delta=delta, p1=p1: (now + delta).strftime(p1))
+                now_type = _TYPE_STR
 
             # 样例：zdt
             elif name == "zdt":
-                now = datetime.datetime.now()
+                now_type = _TYPE_DATETIME
 
             else:
-                return "${" + text + "}"
+                return fallback
         else:
+            if now_type != _TYPE_DATETIME:
+                return fallback
+
             # 样例：zdt.addDay(-1)
-            if name == "addDay" and isinstance(now, datetime.datetime):
-                p1 = int(params[0])
-                now += datetime.timedelta(days=p1)
+            if name == "addDay":
+                delta = datetime.timedelta(days=int(params[0]))
+                steps.append(lambda now, delta=delta: now + delta)
 
-            elif name == "add" and isinstance(now, datetime.datetime):
+            elif name == "add":
                 p1 = int(params[0])
                 p2 = int(params[1])
                 if p1 == 1:  # 年份变化
-                    new_year = now.year + p2
-                    new_day = min(now.day, calendar.monthrange(new_year, now.month)[1])
-                    now = now.replace(year=new_year, day=new_day)
+                    steps.append(lambda now, p2=p2: _add_year(now, p2))
                 elif p1 == 2:  # 月份变化
-                    new_month = now.month + p2
-                    new_year = now.year + new_month // 12
-                    new_month = new_month % 12
-                    new_day = min(now.day, calendar.monthrange(new_year, new_month)[1])
-                    now = now.replace(year=new_year, month=new_month, day=new_day)
+                    steps.append(lambda now, p2=p2: _add_month(now, p2))
                 elif p1 == 3 or p1 == 4:  # 星期变化
-                    now += datetime.timedelta(days=p2 * 7)
+                    delta = datetime.timedelta(days=p2 * 7)
+                    steps.append(lambda now, delta=delta: now + delta)
                 elif p1 == 5:  # 日期变化
-                    now += datetime.timedelta(days=p2 * 1)
+                    delta = datetime.timedelta(days=p2 * 1)
+                    steps.append(lambda now, delta=delta: now + delta)
                 elif p1 == 11:  # 小时变化
-                    now += datetime.timedelta(hours=p2 * 1)
+                    delta = datetime.timedelta(hours=p2 * 1)
+                    steps.append(lambda now, delta=delta: now + delta)
                 else:
-                    return "${" + text + "}"
+                    return fallback
 
             # 样例：zdt.format("yyyyMMdd")
-            elif name == "format" and isinstance(now, datetime.datetime):
-                p1 = (params[0][1:-1]
-                      .replace("yyyy", "%Y")
-                      .replace("MM", "%m")
-                      .replace("dd", "%d")
-                      .replace("HH", "%H")
-                      .replace("mm", "%M")
-                      .replace("ss", "%S"))
-                now = now.strftime(p1)
+            elif name == "format":
+                p1 = to_strftime_format(params[0][1:-1])
+                steps.append(lambda now, p1=p1: now.strftime(p1))
+                now_type = _TYPE_STR
 
             # 样例：zdt.getTime()
-            elif name == "getTime" and isinstance(now, datetime.datetime):
-                now = int(now.timestamp())
+            elif name == "getTime":
+                steps.append(lambda now: str(int(now.timestamp())))
+                now_type = _TYPE_INT
 
             else:
-                return "${" + text + "}"
+                return fallback
+
+    # 计算结果为日期时无法直接替换到脚本中
+    if now_type not in {_TYPE_STR, _TYPE_INT}:
+        return fallback
+
+    if len(steps) == 1:
+        return steps[0]
 
-    # 返回结果
-    if isinstance(now, str):
+    def run(now: Any) -> str:
+        for step in steps:
+            now = step(now)
         return now
-    elif isinstance(now, int):
-        return str(now)
-    else:
-        return "${" + text + "}"
+
+    return run
+
+
+def run_inner_function(text: str, business_date: Optional[datetime.datetime] = None) -> Optional[str]:
+    """运行海豚调度的内置函数
+
+    Parameters
+    ----------
+    text : str
+        内置函数文本
+    business_date : Optional[datetime.datetime], default = None
+        业务日期，内置函数基于该日期计算；为 None 时使用当前时间
+
+    Returns
+    -------
+    Optional[str]
+        内置函数的返回值，如果无法运行则返回原始文本
+    """
+    if business_date is None:
+        business_date = datetime.datetime.now()
+    return compile_inner_function(text)(business_date)
 
 
 DOLPHIN_INNER_FUNCTION = re.compile(r"\$\{[^}]+}")
 
 
-def run_all_inner_function(script: str) -> str:
-    """运行海豚调度脚本中的所有海豚内置函数"""
-    return DOLPHIN_INNER_FUNCTION.sub(lambda x: run_inner_function(x.group()), script)
+def run_all_inner_function(script: str, business_date: Optional[datetime.datetime] = None) -> str:
+    """运行海豚调度脚本中的所有海豚内置函数
+
+    Parameters
+    ----------
+    script : str
+        海豚调度脚本
+    business_date : Optional[datetime.datetime], default = None
+        业务日期，内置函数基于该日期计算；为 None 时使用当前时间
+    """
+    if business_date is None:
+        business_date = datetime.datetime.now()  # 同一脚本中的所有内置函数使用相同的时间
+    return DOLPHIN_INNER_FUNCTION.sub(lambda x: compile_inner_function(x.group())(business_date), script)
+
+
+def normalize_all_inner_function(script: str) -> str:
+    """将海豚调度脚本中的所有海豚内置函数替换为与运行日期无关的占位值
+
+    占位值基于固定的业务日期 PLACEHOLDER_BUSINESS_DATE 计算，因此类型和格式与实际运行结果一致（例如 yyyyMMdd 格式的日期），
+    同一脚本在任意日期标准化后的文本都相同，可以用于跨任务、跨版本的脚本去重和分析结果缓存。
+    """
+    return run_all_inner_function(script, PLACEHOLDER_BUSINESS_DATE)
 
 
 if __name__ == "__main__":
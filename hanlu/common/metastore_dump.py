@@ -0,0 +1,72 @@
+"""
+Hive 元数据库导出文件的读取
+"""
+
+import csv
+import gzip
+from typing import Iterator, List, Optional, Sequence
+
+__all__ = [
+    "METASTORE_COLUMN_DUMP_SQL",
+    "METASTORE_TABLE_DUMP_SQL",
+    "iter_metastore_dump",
+]
+
+# 从 Hive 元数据库（MySQL）导出所有表的字段（包括分区字段）的 SQL，例如：
+# mysql -B -e "<METASTORE_COLUMN_DUMP_SQL>" hive > metastore_columns.tsv
+METASTORE_COLUMN_DUMP_SQL = """SELECT d.NAME AS db_name, t.TBL_NAME AS tbl_name, c.COLUMN_NAME AS column_name,
+       c.INTEGER_IDX AS integer_idx, 0 AS is_partition
+FROM TBLS t JOIN DBS d ON t.DB_ID = d.DB_ID JOIN SDS s ON t.SD_ID = s.SD_ID JOIN COLUMNS_V2 c ON s.CD_ID = c.CD_ID
+UNION ALL
+SELECT d.NAME, t.TBL_NAME, p.PKEY_NAME, p.INTEGER_IDX, 1
+FROM TBLS t JOIN DBS d ON t.DB_ID = d.DB_ID JOIN PARTITION_KEYS p ON t.TBL_ID = p.TBL_ID"""
+
+# 从 Hive 元数据库（MySQL）导出所有表名的 SQL
+METASTORE_TABLE_DUMP_SQL = """SELECT d.NAME AS db_name, t.TBL_NAME AS tbl_name
+FROM TBLS t JOIN DBS d ON t.DB_ID = d.DB_ID"""
+
+# 导出文件表头中各字段可以使用的名称（小写）
+_DUMP_HEADER_HASH = {
+    "db_name": ("db_name", "name", "table_schema"),
+    "tbl_name": ("tbl_name", "table_name"),
+    "column_name": ("column_name",),
+    "integer_idx": ("integer_idx", "ordinal_position"),
+    "is_partition": ("is_partition",),
+}
+
+
+def iter_metastore_dump(path: str, fields: Sequence[str], required_fields: Sequence[str]
+                        ) -> Iterator[List[Optional[str]]]:
+    """逐行读取 Hive 元数据库的导出文件，返回每行中指定字段的值
+
+    导出文件为包含表头的 TSV 或 CSV 文件（根据表头中是否包含制表符判断），文件名以 .gz 结尾时按 gzip 格式读取；使用
+    METASTORE_COLUMN_DUMP_SQL 或 METASTORE_TABLE_DUMP_SQL 导出的文件满足以上格式。
+
+    Parameters
+    ----------
+    path : str
+        导出文件路径
+    fields : Sequence[str]
+        需要读取的字段（db_name、tbl_name、column_name、integer_idx 或 is_partition），表头中不存在的字段取值为 None
+    required_fields : Sequence[str]
+        表头中必须包含的字段
+
+    Raises
+    ------
+    ValueError
+        表头缺少必须包含的字段
+    """
+    with (gzip.open(path, "rt", encoding="utf-8", newline="") if path.endswith(".gz")
+          else open(path, "r", encoding="utf-8", newline="")) as file:
+        header_line = file.readline()
+        delimiter = "\t" if "\t" in header_line else ","
+        header = [name.strip().lower() for name in next(csv.reader([header_line], delimiter=delimiter), [])]
+        idx_list = []
+        for field in fields:
+            idx = next((header.index(name) for name in _DUMP_HEADER_HASH[field] if name in header), None)
+            if idx is None and field in required_fields:
+                raise ValueError(f"Hive 元数据库导出文件 {path} 的表头缺少 {field} 字段")
+            idx_list.append(idx)
+        for row in csv.reader(file, delimiter=delimiter):
+            if row:
+                yield [row[idx] if idx is not None else None for idx in idx_list]
@@ -0,0 +1,92 @@
+"""
+MySQL 连接池（依赖 pymysql）
+"""
+
+import contextlib
+import queue
+from typing import Any, Dict, Iterator, Optional
+
+import pymysql
+
+__all__ = [
+    "MySQLConnectionPool",
+]
+
+
+class MySQLConnectionPool:
+    """线程安全的 MySQL 连接池
+
+    连接在第一次使用时创建，归还后复用；序列化（如发送到工作进程）时只保留连接参数，在工作进程中重新创建连接。
+    """
+
+    def __init__(self, max_size: int = 8, **connect_kwargs: Any):
+        """
+
+        Parameters
+        ----------
+        max_size : int, default = 8
+            连接池中最多保存的空闲连接数
+        **connect_kwargs : Any
+            传递给 pymysql.connect 的连接参数，例如 host、port、user、password、database
+        """
+        self._max_size = max_size
+        self._connect_kwargs = connect_kwargs
+        self._idle: "queue.LifoQueue[pymysql.connections.Connection]" = queue.LifoQueue(maxsize=max_size)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"max_size": self._max_size, "connect_kwargs": self._connect_kwargs}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(max_size=state["max_size"], **state["connect_kwargs"])
+
+    def acquire(self) -> pymysql.connections.Connection:
+        """从连接池中获取连接，没有空闲连接时创建新连接"""
+        while True:
+            try:
+                connection = self._idle.get_nowait()
+            except queue.Empty:
+                return pymysql.connect(**{"charset": "utf8mb4", **self._connect_kwargs})
+            try:
+                connection.ping(reconnect=True)
+                return connection
+            except pymysql.MySQLError:
+                self._close_quietly(connection)
+
+    def release(self, connection: pymysql.connections.Connection) -> None:
+        """将连接归还到连接池，连接池已满时关闭连接"""
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            self._close_quietly(connection)
+
+    def discard(self, connection: pymysql.connections.Connection) -> None:
+        """关闭并丢弃连接（例如服务端游标未读取完成的连接）"""
+        self._close_quietly(connection)
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[pymysql.connections.Connection]:
+        """获取连接的上下文管理器，正常退出时归还连接，发生异常时丢弃连接"""
+        connection = self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            self.discard(connection)
+            raise
+        else:
+            self.release(connection)
+
+    def close(self) -> None:
+        """关闭连接池中的所有空闲连接"""
+        while True:
+            try:
+                connection: Optional[pymysql.connections.Connection] = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close_quietly(connection)
+
+    @staticmethod
+    def _close_quietly(connection: pymysql.connections.Connection) -> None:
+        try:
+            connection.close()
+        except pymysql.MySQLError:
+            pass
@@ -0,0 +1,113 @@
+"""
+按路径组件组织的前缀树，用于路径的最长前缀匹配
+"""
+
+from typing import Dict, Generic, Iterator, List, Optional, Tuple, TypeVar
+
+__all__ = [
+    "strip_scheme",
+    "split_path",
+    "PathTrie",
+]
+
+T = TypeVar("T")
+
+
+def strip_scheme(path: str) -> str:
+    """去除路径中的 scheme://authority 前缀（如 hdfs://nameservice1、obs://bucket），不包含前缀时返回原路径"""
+    if "://" in path:
+        return "/" + path.split("://", 1)[1].partition("/")[2]
+    return path
+
+
+def split_path(path: str) -> List[str]:
+    """将路径拆分为组件列表，忽略空组件（连续的 / 以及首尾的 /）"""
+    return [component for component in path.split("/") if component]
+
+
+class _PathTrieNode(Generic[T]):
+    """前缀树节点"""
+
+    __slots__ = ("children", "value", "has_value")
+
+    def __init__(self):
+        self.children: Dict[str, "_PathTrieNode[T]"] = {}
+        self.value: Optional[T] = None
+        self.has_value: bool = False
+
+
+class PathTrie(Generic[T]):
+    """按路径组件组织的前缀树：插入和查询的时间复杂度均为 O(路径深度)，与已插入的路径数量无关
+
+    路径按组件匹配，因此 /user/hive 是 /user/hive/warehouse 的前缀，但不是 /user/hive2 的前缀。
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self):
+        self._root: _PathTrieNode[T] = _PathTrieNode()
+        self._size = 0
+
+    def insert(self, path: str, value: T) -> None:
+        """插入路径，路径已存在时覆盖原有的值"""
+        node = self._root
+        for component in split_path(path):
+            child = node.children.get(component)
+            if child is None:
+                child = node.children[component] = _PathTrieNode()
+            node = child
+        if not node.has_value:
+            self._size += 1
+        node.value = value
+        node.has_value = True
+
+    def get(self, path: str) -> Optional[T]:
+        """精确匹配路径，不存在时返回 None"""
+        node = self._root
+        for component in split_path(path):
+            node = node.children.get(component)
+            if node is None:
+                return None
+        return node.value if node.has_value else None
+
+    def longest_prefix(self, path: str) -> Optional[Tuple[T, List[str]]]:
+        """最长前缀匹配
+
+        Returns
+        -------
+        Optional[Tuple[T, List[str]]]
+            匹配的最长前缀路径的值，以及路径中该前缀之后的剩余组件列表；没有匹配的前缀时返回 None
+        """
+        components = split_path(path)
+        node = self._root
+        match: Optional[Tuple[T, int]] = (node.value, 0) if node.has_value else None
+        for depth, component in enumerate(components):
+            node = node.children.get(component)
+            if node is None:
+                break
+            if node.has_value:
+                match = (node.value, depth + 1)
+        if match is None:
+            return None
+        return match[0], components[match[1]:]
+
+    def items(self) -> Iterator[Tuple[str, T]]:
+        """遍历所有路径及其值"""
+        stack: List[Tuple[str, _PathTrieNode[T]]] = [("", self._root)]
+        while stack:
+            path, node = stack.pop()
+            if node.has_value:
+                yield path or "/", node.value
+            for component, child in node.children.items():
+                stack.append((f"{path}/{component}", child))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, path: str) -> bool:
+        node = self._root
+        for component in split_path(path):
+            node = node.children.get(component)
+            if node is None:
+                return False
+        return node.has_value
@@ -0,0 +1,153 @@
+"""
+SQL 工具函数
+"""
+
+import re
+from typing import Dict, List, Optional
+
+__all__ = [
+    "split_sql_statements",
+    "substitute_hive_variables",
+    "apply_hive_variables",
+    "track_use_statements",
+]
+
+# 字符串、反引号标识符、注释和分号：分号只有在字符串、标识符和注释之外时才是语句分隔符
+_SQL_TOKEN_PATTERN = re.compile(
+    r"'(?:[^'\\]|\\.)*'"  # 单引号字符串（支持反斜杠转义）
+    r"|\"(?:[^\"\\]|\\.)*\""  # 双引号字符串（支持反斜杠转义）
+    r"|`[^`]*`"  # 反引号标识符
+    r"|--[^\n]*"  # 单行注释
+    r"|/\*.*?\*/"  # 多行注释
+    r"|;",
+    re.S
+)
+
+_SQL_COMMENT_PATTERN = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+
+# Hive 变量引用：${name}、${hivevar:name}、${hiveconf:name}
+_HIVE_VARIABLE_PATTERN = re.compile(r"\$\{(?:(hivevar|hiveconf):)?([^${}:]+)}")
+
+# 设置 Hive 变量的 SET 语句：SET hivevar:name=value、SET hiveconf:name=value（不含命名空间时视为 hiveconf）
+_HIVE_SET_VARIABLE_PATTERN = re.compile(r"set\s+(?:(hivevar|hiveconf):)?([\w.\-]+)\s*=(.*)", re.I | re.S)
+
+# 切换默认库的 USE 语句
+_USE_STATEMENT_PATTERN = re.compile(r"use\s+`?([^`\s]+)`?", re.I)
+
+# Hive 变量替换的最大深度（与 Hive 的 hive.variable.substitute.depth 默认值一致）
+_HIVE_VARIABLE_SUBSTITUTE_DEPTH = 40
+
+
+def split_sql_statements(sql: str) -> List[str]:
+    """将包含多个语句的 SQL 拆分为语句列表，忽略字符串、反引号标识符和注释中的分号
+
+    返回的语句不包含结尾的分号，只包含空白和注释的语句会被忽略。
+
+    Parameters
+    ----------
+    sql : str
+        包含一个或多个语句的 SQL
+    """
+    statement_list = []
+    start = 0
+    for match in _SQL_TOKEN_PATTERN.finditer(sql):
+        if match.group() == ";":
+            _append_statement(statement_list, sql[start:match.start()])
+            start = match.end()
+    _append_statement(statement_list, sql[start:])
+    return statement_list
+
+
+def _append_statement(statement_list: List[str], statement: str) -> None:
+    statement = statement.strip()
+    if statement and _SQL_COMMENT_PATTERN.sub("", statement).strip():
+        statement_list.append(statement)
+
+
+def substitute_hive_variables(sql: str, hivevar_hash: Dict[str, str],
+                              hiveconf_hash: Optional[Dict[str, str]] = None) -> str:
+    """替换 SQL 中的 Hive 变量引用，未定义的变量保持不变
+
+    ${hivevar:name} 只查找 Hive 变量，${hiveconf:name} 只查找 Hive 配置，${name} 依次查找 Hive 变量和 Hive 配置；
+    变量值中的变量引用会被继续替换，替换深度与 Hive 一致。
+
+    Parameters
+    ----------
+    sql : str
+        SQL 语句
+    hivevar_hash : Dict[str, str]
+        Hive 变量名到变量值的映射
+    hiveconf_hash : Optional[Dict[str, str]], default = None
+        Hive 配置名到配置值的映射
+    """
+    if "${" not in sql:
+        return sql
+    hiveconf_hash = hiveconf_hash or {}
+
+    def replace(match: re.Match) -> str:
+        namespace, name = match.group(1), match.group(2)
+        if namespace != "hiveconf" and name in hivevar_hash:
+            return hivevar_hash[name]
+        if namespace != "hivevar" and name in hiveconf_hash:
+            return hiveconf_hash[name]
+        return match.group()
+
+    for _ in range(_HIVE_VARIABLE_SUBSTITUTE_DEPTH):
+        new_sql = _HIVE_VARIABLE_PATTERN.sub(replace, sql)
+        if new_sql == sql:
+            break
+        sql = new_sql
+    return sql
+
+
+def apply_hive_variables(sql: str, hivevar_hash: Dict[str, str],
+                         hiveconf_hash: Optional[Dict[str, str]] = None) -> str:
+    """按语句顺序替换 SQL 脚本中的 Hive 变量，脚本中的 SET hivevar:name=value 语句对之后的语句生效
+
+    返回以单独一行的分号连接的语句（语句结尾的单行注释不会注释掉分隔符），不修改传入的映射。
+
+    Parameters
+    ----------
+    sql : str
+        包含一个或多个语句的 SQL 脚本
+    hivevar_hash : Dict[str, str]
+        Hive 变量名到变量值的映射（如 beeline 的 --hivevar 参数）
+    hiveconf_hash : Optional[Dict[str, str]], default = None
+        Hive 配置名到配置值的映射（如 beeline 的 --hiveconf 参数）
+    """
+    if "${" not in sql:
+        return sql
+    hivevar_hash = dict(hivevar_hash)
+    hiveconf_hash = dict(hiveconf_hash or {})
+    statement_list = []
+    for statement in split_sql_statements(sql):
+        statement = substitute_hive_variables(statement, hivevar_hash, hiveconf_hash)
+        match = _HIVE_SET_VARIABLE_PATTERN.fullmatch(_SQL_COMMENT_PATTERN.sub("", statement).strip())
+        if match is not None:
+            namespace, name, value = match.groups()
+            target_hash = hivevar_hash if namespace == "hivevar" else hiveconf_hash
+            target_hash[name] = value.strip()
+        statement_list.append(statement)
+    return "\n;\n".join(statement_list)
+
+
+def track_use_statements(statement_list: List[str], default_schema: Optional[str] = None) -> List[Optional[str]]:
+    """按语句顺序跟踪 USE 语句，返回执行每个语句时的默认库名（USE 语句对之后的语句生效）
+
+    Parameters
+    ----------
+    statement_list : List[str]
+        split_sql_statements 拆分后的语句列表
+    default_schema : Optional[str], default = None
+        执行第一个语句时的默认库名
+    """
+    schema_list = []
+    for statement in statement_list:
+        schema_list.append(default_schema)
+        if statement.startswith(("--", "/*")):
+            statement = _SQL_COMMENT_PATTERN.sub("", statement).strip()
+        if statement[:3].lower() == "use":
+            match = _USE_STATEMENT_PATTERN.fullmatch(_SQL_COMMENT_PATTERN.sub("", statement).strip())
+            if match is not None:
+                default_schema = match.group(1)
+    return schema_list
@@ -2,10 +2,14 @@
 通用字符串工具函数
 """
 
-from typing import List
+import dataclasses
+import functools
+from typing import List, Optional, Tuple
 
 __all__ = [
-    "jdbc_url_to_hive_hosts"
+    "jdbc_url_to_hive_hosts",
+    "JdbcUrlInfo",
+    "parse_jdbc_url",
 ]
 
 
@@ -18,3 +22,74 @@ def jdbc_url_to_hive_hosts(jdbc_url: str) -> List[str]:
     if "/" in jdbc_url:
         jdbc_url = jdbc_url[:jdbc_url.index("/")]
     return jdbc_url.split(",")
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class JdbcUrlInfo:
+    """JDBC URL 的解析结果"""
+
+    protocol: str = dataclasses.field(kw_only=True)  # 子协议，如 hive2、mysql
+    hosts: Tuple[str, ...] = dataclasses.field(kw_only=True)  # 主机列表（包含端口号时格式为 host:port）
+    schema_name: Optional[str] = dataclasses.field(kw_only=True, default=None)  # 库名
+    params: Tuple[Tuple[str, str], ...] = dataclasses.field(kw_only=True, default=())  # 连接参数
+
+    def get_param(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """获取连接参数（参数名不区分大小写）"""
+        key = key.lower()
+        for param_key, param_value in self.params:
+            if param_key.lower() == key:
+                return param_value
+        return default
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_jdbc_url(jdbc_url: str) -> Optional[JdbcUrlInfo]:
+    """解析 JDBC URL，结果会被缓存；无法解析时返回 None
+
+    支持的格式：
+    - Hive：jdbc:hive2://host1:2181,host2:2181/schema;serviceDiscoveryMode=zooKeeper;zooKeeperNamespace=hiveserver2
+    - MySQL：jdbc:mysql://host1:3306,host2:3306/schema?useSSL=false&characterEncoding=utf8，
+      以及 jdbc:mysql:loadbalance://、jdbc:mysql:replication:// 等多主机故障转移格式
+
+    Hive 的会话参数（; 之后）、配置参数（? 之后）和变量（# 之后），MySQL 的查询参数（? 之后）均解析为连接参数。
+    """
+    if not jdbc_url.startswith("jdbc:") or "://" not in jdbc_url:
+        return None
+    protocol, address = jdbc_url[5:].split("://", 1)
+
+    if protocol == "hive2":
+        params = []
+        for separator in ("#", "?"):
+            if separator in address:
+                address, param_str = address.split(separator, 1)
+                params.extend(_split_params(param_str, ";&"))
+        if ";" in address:
+            address, param_str = address.split(";", 1)
+            params[:0] = _split_params(param_str, ";")
+        hosts_str, _, schema_name = address.partition("/")
+        return JdbcUrlInfo(protocol="hive2", hosts=_split_hosts(hosts_str), schema_name=schema_name or None,
+                           params=tuple(params))
+
+    if protocol.split(":")[0] == "mysql":
+        address, _, param_str = address.partition("?")
+        hosts_str, _, schema_name = address.partition("/")
+        return JdbcUrlInfo(protocol="mysql", hosts=_split_hosts(hosts_str), schema_name=schema_name or None,
+                           params=tuple(_split_params(param_str, "&")))
+
+    return None
+
+
+def _split_hosts(hosts_str: str) -> Tuple[str, ...]:
+    return tuple(host.strip() for host in hosts_str.split(",") if host.strip())
+
+
+def _split_params(param_str: str, separators: str) -> List[Tuple[str, str]]:
+    for separator in separators[1:]:
+        param_str = param_str.replace(separator, separators[0])
+    params = []
+    for item in param_str.split(separators[0]):
+        if not item:
+            continue
+        key, _, value = item.partition("=")
+        params.append((key.strip(), value.strip()))
+    return params
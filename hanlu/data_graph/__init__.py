@@ -0,0 +1,7 @@
+from hanlu.data_graph.lineage_graph import LineageClosure
+from hanlu.data_graph.lineage_graph import LineageGraph
+from hanlu.data_graph.lineage_snapshot import SNAPSHOT_VERSION
+from hanlu.data_graph.lineage_snapshot import LineageSnapshot
+from hanlu.data_graph.lineage_snapshot import LineageSnapshotError
+from hanlu.data_graph.lineage_snapshot import LineageSnapshotWriter
+from hanlu.data_graph.lineage_snapshot import is_lineage_snapshot
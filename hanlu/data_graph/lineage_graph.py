@@ -0,0 +1,294 @@
+"""
+血缘关系图
+"""
+
+import array
+import collections
+import dataclasses
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from hanlu.data_node import DNode
+from hanlu.data_task import DTask
+
+__all__ = [
+    "LineageClosure",
+    "LineageGraph",
+]
+
+
+@dataclasses.dataclass(slots=True)
+class LineageClosure:
+    """血缘关系闭包：从起点出发可以到达的数据节点和数据任务，及其到起点的深度（经过的数据任务数）"""
+
+    node_hash: Dict[DNode, int] = dataclasses.field(kw_only=True, default_factory=dict)  # 数据节点到深度的映射（按广度优先顺序）
+    task_hash: Dict[Hashable, int] = dataclasses.field(kw_only=True, default_factory=dict)  # 任务 ID 到深度的映射（按广度优先顺序）
+
+
+class LineageGraph:
+    """血缘关系图
+
+    数据节点和数据任务均作为图的顶点，分配连续的整数 ID；边的方向与数据流向一致：
+    - 数据任务依赖的数据节点 -> 数据任务
+    - 数据任务 -> 数据任务生成的数据节点
+
+    添加的边先追加到边数组中，在第一次查询时构造正向和反向的压缩稀疏行（CSR）邻接数组：
+    offsets[v] 到 offsets[v + 1] 之间的 targets 元素即顶点 v 的邻居，所有数组均为 array 类型的整数数组。
+    """
+
+    def __init__(self):
+        # 顶点信息
+        self._vertex_list: List[Any] = []  # 顶点 ID 到数据节点或任务 ID 的映射
+        self._vertex_is_task = bytearray()  # 顶点是否为数据任务
+        self._node_index: Dict[DNode, int] = {}  # 数据节点到顶点 ID 的映射
+        self._task_index: Dict[Hashable, int] = {}  # 任务 ID 到顶点 ID 的映射
+        # 按名称查找的索引（第一次查找时构造，添加任务后失效）
+        self._node_key_index: Optional[Dict[Tuple[str, str, str], List[DNode]]] = None
+        self._task_key_index: Optional[Dict[str, Hashable]] = None
+
+        # 边信息（添加顺序）
+        self._edge_source = array.array("q")
+        self._edge_target = array.array("q")
+
+        # CSR 邻接数组（构造后有效）
+        self._out_offsets = array.array("q")
+        self._out_targets = array.array("q")
+        self._in_offsets = array.array("q")
+        self._in_targets = array.array("q")
+        self._is_built = False
+
+    # ------------------------------ 构造血缘关系图 ------------------------------
+
+    def add_task(self, task_id: Hashable, data_task: DTask) -> None:
+        """添加数据任务及其依赖和生成的数据节点
+
+        Parameters
+        ----------
+        task_id : Hashable
+            任务 ID（例如海豚任务编码）
+        data_task : DTask
+            数据任务对象
+        """
+        if task_id in self._task_index:
+            raise ValueError(f"任务已存在: {task_id}")
+        task_vid = self._add_vertex(task_id, is_task=True)
+        self._task_index[task_id] = task_vid
+        self._node_key_index = self._task_key_index = None
+        for data_node in data_task.dependent_node_set:
+            self._edge_source.append(self._intern_node(data_node))
+            self._edge_target.append(task_vid)
+        for data_node in data_task.generate_node_set:
+            self._edge_source.append(task_vid)
+            self._edge_target.append(self._intern_node(data_node))
+        self._is_built = False
+
+    def add_tasks(self, task_pairs: Iterable[Tuple[Hashable, DTask]]) -> None:
+        """批量添加数据任务，可以直接使用 analyze_dolphin_tasks 的返回值"""
+        for task_id, data_task in task_pairs:
+            self.add_task(task_id, data_task)
+
+    def build(self) -> None:
+        """构造 CSR 邻接数组（查询时会自动调用）"""
+        n_vertex = len(self._vertex_list)
+        self._out_offsets, self._out_targets = self._build_csr(n_vertex, self._edge_source, self._edge_target)
+        self._in_offsets, self._in_targets = self._build_csr(n_vertex, self._edge_target, self._edge_source)
+        self._is_built = True
+
+    @staticmethod
+    def _build_csr(n_vertex: int, sources: array.array, targets: array.array) -> Tuple[array.array, array.array]:
+        """使用计数排序构造 CSR 邻接数组"""
+        offsets = array.array("q", bytes(8 * (n_vertex + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for i in range(n_vertex):
+            offsets[i + 1] += offsets[i]
+        cursor = offsets[:-1]
+        csr_targets = array.array("q", bytes(8 * len(targets)))
+        for source, target in zip(sources, targets):
+            csr_targets[cursor[source]] = target
+            cursor[source] += 1
+        return offsets, csr_targets
+
+    # ------------------------------ 查询血缘关系 ------------------------------
+
+    @property
+    def vertex_count(self) -> int:
+        """顶点数（数据节点数与数据任务数之和）"""
+        return len(self._vertex_list)
+
+    @property
+    def edge_count(self) -> int:
+        """边数"""
+        return len(self._edge_source)
+
+    def nodes(self) -> Iterator[DNode]:
+        """遍历所有数据节点"""
+        return iter(self._node_index)
+
+    def tasks(self) -> Iterator[Hashable]:
+        """遍历所有任务 ID"""
+        return iter(self._task_index)
+
+    def find_nodes(self, instance_name: Optional[str], schema_name: Optional[str],
+                   table_name: Optional[str]) -> List[DNode]:
+        """查找（实例名称, 库名, 表名）相同的数据节点，None 与空字符串等价"""
+        if self._node_key_index is None:
+            node_key_index = collections.defaultdict(list)
+            for data_node in self._node_index:
+                node_instance_name = data_node.instance.name if data_node.instance is not None else None
+                node_key_index[(node_instance_name or "", data_node.schema_name or "",
+                                data_node.table_name or "")].append(data_node)
+            self._node_key_index = dict(node_key_index)
+        return self._node_key_index.get((instance_name or "", schema_name or "", table_name or ""), [])
+
+    def find_task(self, task_key: str) -> Optional[Hashable]:
+        """根据字符串形式的任务 ID 查找任务 ID，不存在时返回 None"""
+        if self._task_key_index is None:
+            self._task_key_index = {str(task_id): task_id for task_id in self._task_index}
+        return self._task_key_index.get(task_key)
+
+    def has_node(self, data_node: DNode) -> bool:
+        return data_node in self._node_index
+
+    def has_task(self, task_id: Hashable) -> bool:
+        return task_id in self._task_index
+
+    def upstream(self, source: Any, max_depth: Optional[int] = None) -> LineageClosure:
+        """查询上游闭包：起点依赖的所有数据节点和数据任务
+
+        Parameters
+        ----------
+        source : Any
+            起点，DNode 类型视为数据节点，其他类型视为任务 ID
+        max_depth : Optional[int], default = None
+            最大深度（经过的数据任务数），为 None 时不限制
+        """
+        self._ensure_built()
+        return self._closure(self._vertex_id(source), self._in_offsets, self._in_targets, max_depth)
+
+    def downstream(self, source: Any, max_depth: Optional[int] = None) -> LineageClosure:
+        """查询下游闭包：依赖起点的所有数据节点和数据任务（即起点延迟或变更时受影响的范围）
+
+        Parameters
+        ----------
+        source : Any
+            起点，DNode 类型视为数据节点，其他类型视为任务 ID
+        max_depth : Optional[int], default = None
+            最大深度（经过的数据任务数），为 None 时不限制
+        """
+        self._ensure_built()
+        return self._closure(self._vertex_id(source), self._out_offsets, self._out_targets, max_depth)
+
+    def shortest_path(self, source: Any, target: Any) -> Optional[List[Any]]:
+        """查询沿数据流向从 source 到 target 的最短路径，不存在路径时返回 None
+
+        Parameters
+        ----------
+        source : Any
+            起点，DNode 类型视为数据节点，其他类型视为任务 ID
+        target : Any
+            终点，DNode 类型视为数据节点，其他类型视为任务 ID
+
+        Returns
+        -------
+        Optional[List[Any]]
+            路径上的数据节点和任务 ID（包含起点和终点）
+        """
+        self._ensure_built()
+        source_vid = self._vertex_id(source)
+        target_vid = self._vertex_id(target)
+
+        # 双向广度优先搜索：每次扩展较小的一侧边界，直到正向和反向搜索相遇
+        forward_parent: Dict[int, int] = {source_vid: -1}
+        backward_parent: Dict[int, int] = {target_vid: -1}
+        forward_frontier, backward_frontier = [source_vid], [target_vid]
+        meet_vid = source_vid if source_vid == target_vid else None
+        while meet_vid is None and forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meet_vid = self._expand_frontier(
+                    forward_frontier, self._out_offsets, self._out_targets, forward_parent, backward_parent)
+            else:
+                backward_frontier, meet_vid = self._expand_frontier(
+                    backward_frontier, self._in_offsets, self._in_targets, backward_parent, forward_parent)
+        if meet_vid is None:
+            return None
+
+        path = []
+        vid = meet_vid
+        while vid != -1:
+            path.append(self._vertex_list[vid])
+            vid = forward_parent[vid]
+        path.reverse()
+        vid = backward_parent[meet_vid]
+        while vid != -1:
+            path.append(self._vertex_list[vid])
+            vid = backward_parent[vid]
+        return path
+
+    @staticmethod
+    def _expand_frontier(frontier: List[int], offsets: array.array, targets: array.array,
+                         parent: Dict[int, int], other_parent: Dict[int, int]) -> Tuple[List[int], Optional[int]]:
+        """将广度优先搜索的边界扩展一层，返回新的边界和与另一侧搜索相遇的顶点"""
+        next_frontier = []
+        for vid in frontier:
+            for i in range(offsets[vid], offsets[vid + 1]):
+                next_vid = targets[i]
+                if next_vid in parent:
+                    continue
+                parent[next_vid] = vid
+                if next_vid in other_parent:
+                    return next_frontier, next_vid
+                next_frontier.append(next_vid)
+        return next_frontier, None
+
+    def _closure(self, source_vid: int, offsets: array.array, targets: array.array,
+                 max_depth: Optional[int]) -> LineageClosure:
+        """广度优先遍历 CSR 邻接数组"""
+        vertex_list, vertex_is_task = self._vertex_list, self._vertex_is_task
+        depth_hash: Dict[int, int] = {source_vid: 0}
+        queue = collections.deque([source_vid])
+        while queue:
+            vid = queue.popleft()
+            depth = depth_hash[vid]
+            for i in range(offsets[vid], offsets[vid + 1]):
+                next_vid = targets[i]
+                if next_vid in depth_hash:
+                    continue
+                next_depth = depth + 1 if vertex_is_task[next_vid] else depth
+                if max_depth is not None and next_depth > max_depth:
+                    continue
+                depth_hash[next_vid] = next_depth
+                queue.append(next_vid)
+
+        closure = LineageClosure()
+        del depth_hash[source_vid]
+        for vid, depth in depth_hash.items():
+            if vertex_is_task[vid]:
+                closure.task_hash[vertex_list[vid]] = depth
+            else:
+                closure.node_hash[vertex_list[vid]] = depth
+        return closure
+
+    # ------------------------------ 顶点管理 ------------------------------
+
+    def _add_vertex(self, obj: Any, is_task: bool) -> int:
+        self._vertex_list.append(obj)
+        self._vertex_is_task.append(1 if is_task else 0)
+        return len(self._vertex_list) - 1
+
+    def _intern_node(self, data_node: DNode) -> int:
+        """获取数据节点的顶点 ID，不存在时分配新的顶点 ID"""
+        vid = self._node_index.get(data_node)
+        if vid is None:
+            vid = self._node_index[data_node] = self._add_vertex(data_node, is_task=False)
+        return vid
+
+    def _vertex_id(self, obj: Any) -> int:
+        """获取数据节点或任务 ID 对应的顶点 ID"""
+        vid = self._node_index.get(obj) if isinstance(obj, DNode) else self._task_index.get(obj)
+        if vid is None:
+            raise KeyError(f"血缘关系图中不存在: {obj}")
+        return vid
+
+    def _ensure_built(self) -> None:
+        if not self._is_built:
+            self.build()
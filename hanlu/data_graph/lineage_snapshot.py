@@ -0,0 +1,585 @@
+"""
+血缘关系快照：紧凑的二进制格式，可以通过 mmap 直接打开，不需要反序列化所有对象
+
+文件结构（小端序）：
+- 文件头：魔数、格式版本、各类对象的数量、正文的 CRC32 校验值，以及每个段的偏移量和长度
+- 字符串表：所有字符串（实例名称、库名、表名、失败详情等）只保存一次，其他段中使用字符串 ID 引用（-1 表示 None）
+- 实例表、数据节点表、数据任务表：按列保存的定长整数数组；数据节点按（实例名称, 库名, 表名）排序，数据任务按任务 ID
+  排序，因此可以直接在映射的文件上二分查找
+- 边数组：正向和反向的压缩稀疏行（CSR）邻接数组，顶点 ID 中数据节点在前、数据任务在后
+
+打开快照时只读取文件头；查询时只把结果中的数据节点反序列化为（驻留的）DNode 对象。
+"""
+
+import array
+import collections
+import dataclasses
+import json
+import mmap
+import struct
+import sys
+import time
+import zlib
+from typing import Any, BinaryIO, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from hanlu import data_node as data_node_module
+from hanlu.data_graph.lineage_graph import LineageClosure
+from hanlu.data_graph.lineage_graph import LineageGraph
+from hanlu.data_node import DInstance
+from hanlu.data_node import DNode
+from hanlu.data_node import DType
+from hanlu.data_task import DTask
+from hanlu.data_task import DTaskFailReason
+
+__all__ = [
+    "SNAPSHOT_VERSION",
+    "LineageSnapshotError",
+    "LineageSnapshotWriter",
+    "LineageSnapshot",
+    "is_lineage_snapshot",
+]
+
+SNAPSHOT_MAGIC = b"HANLUSNP"  # 文件魔数
+SNAPSHOT_VERSION = 1  # 快照格式版本：格式变化时递增，旧版本的快照无法打开
+
+# 不写入实例表的实例字段：数据源类型和名称单独保存；用户名、密码和密钥不写入快照文件，读取的实例中这些字段为默认值
+_INSTANCE_SKIP_FIELD_SET = {"data_type", "name", "username", "password", "fs_obs_access_key", "fs_obs_secret_key"}
+
+# 段名称及其元素类型（array 的类型码，bytes 表示字节串），顺序即文件中的顺序
+_SECTION_LIST = [
+    ("metadata", "bytes"),  # JSON 格式的元信息
+    ("string_offsets", "q"),  # 字符串 i 为 string_data[string_offsets[i]:string_offsets[i + 1]]
+    ("string_data", "bytes"),  # UTF-8 编码的字符串数据
+    ("instance_class", "i"),  # 实例类名的字符串 ID
+    ("instance_data_type", "i"),  # 实例的数据源类型
+    ("instance_name", "i"),  # 实例名称的字符串 ID
+    ("instance_attrs", "i"),  # 实例其他字段（JSON）的字符串 ID
+    ("node_instance", "i"),  # 数据节点的实例 ID（-1 表示 None）
+    ("node_schema", "i"),  # 数据节点库名的字符串 ID
+    ("node_table", "i"),  # 数据节点表名的字符串 ID
+    ("task_kind", "b"),  # 任务 ID 的类型：0 为整数，1 为字符串
+    ("task_value", "q"),  # 整数任务 ID，或字符串任务 ID 的字符串 ID
+    ("task_fail_reason", "i"),  # 推断失败的原因（-1 表示推断成功，-2 表示推断失败但没有原因）
+    ("task_fail_detail", "i"),  # 推断失败详情的字符串 ID
+    ("out_offsets", "q"),  # 正向 CSR 偏移量
+    ("out_targets", "i"),  # 正向 CSR 邻居
+    ("in_offsets", "q"),  # 反向 CSR 偏移量
+    ("in_targets", "i"),  # 反向 CSR 邻居
+]
+
+_HEADER_PREFIX = struct.Struct("<8sIIqqqqq")  # 魔数、版本、CRC32、字符串数、实例数、节点数、任务数、边数
+_SECTION_ENTRY = struct.Struct("<qq")  # 段的偏移量、长度（字节）
+_HEADER_SIZE = _HEADER_PREFIX.size + _SECTION_ENTRY.size * len(_SECTION_LIST)
+_ALIGNMENT = 8  # 每个段的起始位置按 8 字节对齐
+
+_TASK_KIND_INT = 0
+_TASK_KIND_STR = 1
+
+_FAIL_REASON_NONE = -1  # 推断成功
+_FAIL_REASON_UNSET = -2  # 推断失败但没有原因
+
+# 实例类型的名称到类的映射（只允许 hanlu.data_node 中的实例类型，避免根据文件内容导入任意对象）
+_INSTANCE_CLASS_HASH = {name: getattr(data_node_module, name) for name in dir(data_node_module)
+                        if isinstance(getattr(data_node_module, name), type)
+                        and issubclass(getattr(data_node_module, name), DInstance)}
+
+
+class LineageSnapshotError(ValueError):
+    """快照文件格式错误、版本不匹配或校验失败"""
+
+
+def _instance_attrs(instance: DInstance) -> Dict[str, Any]:
+    """实例写入快照的字段（不包含数据源类型、名称、用户名、密码和密钥）"""
+    return {field.name: getattr(instance, field.name) for field in dataclasses.fields(instance)
+            if field.init and field.name not in _INSTANCE_SKIP_FIELD_SET}
+
+
+def _same_instance(instance1: Optional[DInstance], instance2: Optional[DInstance]) -> bool:
+    """忽略用户名、密码和密钥后，两个实例是否相同（快照中的实例不包含这些字段）"""
+    if instance1 is None or instance2 is None:
+        return instance1 is instance2
+    return (type(instance1) is type(instance2) and instance1.data_type == instance2.data_type
+            and _instance_attrs(instance1) == _instance_attrs(instance2))
+
+
+def _node_sort_key(data_node: DNode) -> Tuple[str, str, str]:
+    instance_name = data_node.instance.name if data_node.instance is not None else None
+    return instance_name or "", data_node.schema_name or "", data_node.table_name or ""
+
+
+def _task_sort_key(task_id: Hashable) -> Tuple[int, Any]:
+    if isinstance(task_id, int):
+        return _TASK_KIND_INT, task_id
+    if isinstance(task_id, str):
+        return _TASK_KIND_STR, task_id
+    raise TypeError(f"快照只支持整数或字符串类型的任务 ID: {task_id!r}")
+
+
+class LineageSnapshotWriter:
+    """血缘关系快照的写入器：添加数据任务后调用 write 写入文件"""
+
+    def __init__(self):
+        self._task_hash: Dict[Hashable, DTask] = {}
+
+    def add_task(self, task_id: Hashable, data_task: DTask) -> None:
+        """添加数据任务
+
+        Parameters
+        ----------
+        task_id : Hashable
+            任务 ID（整数或字符串）
+        data_task : DTask
+            数据任务对象
+        """
+        _task_sort_key(task_id)
+        if task_id in self._task_hash:
+            raise ValueError(f"任务已存在: {task_id}")
+        self._task_hash[task_id] = data_task
+
+    def add_tasks(self, task_pairs: Iterable[Tuple[Hashable, DTask]]) -> None:
+        """批量添加数据任务，可以直接使用 analyze_dolphin_tasks 的返回值"""
+        for task_id, data_task in task_pairs:
+            self.add_task(task_id, data_task)
+
+    def write(self, path: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """写入快照文件
+
+        Parameters
+        ----------
+        path : str
+            文件路径
+        metadata : Optional[Dict[str, Any]], default = None
+            写入快照的元信息（可以 JSON 序列化），如分析时间、数据来源
+        """
+        string_index: Dict[str, int] = {}
+        string_offsets = array.array("q", [0])
+        string_chunks: List[bytes] = []
+
+        def string_id(value: Optional[str]) -> int:
+            if value is None:
+                return -1
+            sid = string_index.get(value)
+            if sid is None:
+                encoded = value.encode("utf-8")
+                string_chunks.append(encoded)
+                string_offsets.append(string_offsets[-1] + len(encoded))
+                sid = string_index[value] = len(string_index)
+            return sid
+
+        # 数据节点和数据任务排序后分配顶点 ID
+        node_set = {}
+        for data_task in self._task_hash.values():
+            for data_node in data_task.dependent_node_set:
+                node_set[data_node] = None
+            for data_node in data_task.generate_node_set:
+                node_set[data_node] = None
+        node_list = sorted(node_set, key=_node_sort_key)
+        node_vid = {data_node: vid for vid, data_node in enumerate(node_list)}
+        task_list = sorted(self._task_hash, key=_task_sort_key)
+        n_node = len(node_list)
+
+        # 实例表
+        instance_index: Dict[DInstance, int] = {}
+        columns = {name: array.array(type_code) for name, type_code in _SECTION_LIST if type_code != "bytes"}
+        for data_node in node_list:
+            instance = data_node.instance
+            if instance is None:
+                columns["node_instance"].append(-1)
+            else:
+                iid = instance_index.get(instance)
+                if iid is None:
+                    iid = instance_index[instance] = len(instance_index)
+                    attrs = _instance_attrs(instance)
+                    columns["instance_class"].append(string_id(type(instance).__name__))
+                    columns["instance_data_type"].append(int(instance.data_type))
+                    columns["instance_name"].append(string_id(instance.name))
+                    columns["instance_attrs"].append(string_id(json.dumps(attrs, sort_keys=True)))
+                columns["node_instance"].append(iid)
+            columns["node_schema"].append(string_id(data_node.schema_name))
+            columns["node_table"].append(string_id(data_node.table_name))
+
+        # 数据任务表和边
+        edge_source, edge_target = array.array("i"), array.array("i")
+        for i, task_id in enumerate(task_list):
+            data_task = self._task_hash[task_id]
+            kind, value = _task_sort_key(task_id)
+            columns["task_kind"].append(kind)
+            columns["task_value"].append(value if kind == _TASK_KIND_INT else string_id(value))
+            if not data_task.is_unknown:
+                columns["task_fail_reason"].append(_FAIL_REASON_NONE)
+            elif data_task.fail_reason is None:
+                columns["task_fail_reason"].append(_FAIL_REASON_UNSET)
+            else:
+                columns["task_fail_reason"].append(int(data_task.fail_reason))
+            columns["task_fail_detail"].append(string_id(data_task.fail_detail))
+            task_vid = n_node + i
+            for data_node in data_task.dependent_node_set:
+                edge_source.append(node_vid[data_node])
+                edge_target.append(task_vid)
+            for data_node in data_task.generate_node_set:
+                edge_source.append(task_vid)
+                edge_target.append(node_vid[data_node])
+
+        n_vertex = n_node + len(task_list)
+        columns["out_offsets"], columns["out_targets"] = self._build_csr(n_vertex, edge_source, edge_target)
+        columns["in_offsets"], columns["in_targets"] = self._build_csr(n_vertex, edge_target, edge_source)
+        columns["string_offsets"] = string_offsets
+
+        metadata = dict(metadata or {})
+        metadata.setdefault("created_at", time.time())
+        section_data = {
+            "metadata": json.dumps(metadata, ensure_ascii=False).encode("utf-8"),
+            "string_data": b"".join(string_chunks),
+        }
+        for name, column in columns.items():
+            if sys.byteorder != "little":
+                column.byteswap()
+            section_data[name] = column.tobytes()
+
+        # 计算段的位置并写入
+        entry_list = []
+        position = _HEADER_SIZE
+        checksum = 0
+        for name, _ in _SECTION_LIST:
+            position += -position % _ALIGNMENT
+            entry_list.append((position, len(section_data[name])))
+            position += len(section_data[name])
+        with open(path, "wb") as file:
+            file.write(bytes(_HEADER_SIZE))
+            position = _HEADER_SIZE
+            for (offset, length), (name, _) in zip(entry_list, _SECTION_LIST):
+                padding = bytes(offset - position)
+                file.write(padding)
+                file.write(section_data[name])
+                checksum = zlib.crc32(section_data[name], zlib.crc32(padding, checksum))
+                position = offset + length
+            file.seek(0)
+            self._write_header(file, checksum, len(string_index), len(instance_index), n_node, len(task_list),
+                               len(edge_source), entry_list)
+
+    @staticmethod
+    def _write_header(file: BinaryIO, checksum: int, n_string: int, n_instance: int, n_node: int, n_task: int,
+                      n_edge: int, entry_list: List[Tuple[int, int]]) -> None:
+        file.write(_HEADER_PREFIX.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, checksum, n_string, n_instance, n_node,
+                                       n_task, n_edge))
+        for offset, length in entry_list:
+            file.write(_SECTION_ENTRY.pack(offset, length))
+
+    @staticmethod
+    def _build_csr(n_vertex: int, sources: array.array, targets: array.array) -> Tuple[array.array, array.array]:
+        """使用计数排序构造 CSR 邻接数组"""
+        offsets = array.array("q", bytes(8 * (n_vertex + 1)))
+        for source in sources:
+            offsets[source + 1] += 1
+        for i in range(n_vertex):
+            offsets[i + 1] += offsets[i]
+        cursor = offsets[:-1]
+        csr_targets = array.array("i", bytes(4 * len(targets)))
+        for source, target in zip(sources, targets):
+            csr_targets[cursor[source]] = target
+            cursor[source] += 1
+        return offsets, csr_targets
+
+
+def is_lineage_snapshot(path: str) -> bool:
+    """判断文件是否为血缘关系快照（只检查魔数）"""
+    with open(path, "rb") as file:
+        return file.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+class LineageSnapshot:
+    """通过 mmap 打开的血缘关系快照
+
+    查询接口与 LineageGraph 一致（upstream、downstream、find_nodes、find_task 等），可以直接作为血缘查询服务的数据源；
+    数据节点在查询结果中第一次出现时才反序列化。只支持小端序平台直接映射。
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        """
+
+        Parameters
+        ----------
+        path : str
+            快照文件路径
+        verify : bool, default = True
+            是否校验正文的 CRC32（需要读取整个文件）
+
+        Raises
+        ------
+        LineageSnapshotError
+            文件格式错误、版本不匹配或校验失败
+        """
+        if sys.byteorder != "little":
+            raise LineageSnapshotError("只支持在小端序平台上打开快照")
+        self.path = path
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view_list: List[memoryview] = []  # 所有引用文件映射的 memoryview，关闭映射前需要全部释放
+        try:
+            self._load_header(verify)
+        except BaseException:
+            self.close()
+            raise
+
+        self._node_cache: Dict[int, DNode] = {}  # 顶点 ID 到已反序列化的数据节点的映射
+        self._node_vid_hash: Dict[DNode, int] = {}  # 已反序列化的数据节点到顶点 ID 的映射
+        self._instance_cache: Dict[int, DInstance] = {}
+        self._string_cache: Dict[int, str] = {}
+
+    def _load_header(self, verify: bool) -> None:
+        buffer = self._mmap
+        if len(buffer) < _HEADER_SIZE:
+            raise LineageSnapshotError(f"文件过短，不是血缘关系快照: {self.path}")
+        magic, version, checksum, n_string, n_instance, n_node, n_task, n_edge = _HEADER_PREFIX.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC:
+            raise LineageSnapshotError(f"不是血缘关系快照: {self.path}")
+        if version != SNAPSHOT_VERSION:
+            raise LineageSnapshotError(f"快照格式版本 {version} 与当前版本 {SNAPSHOT_VERSION} 不一致，需要重新生成快照")
+        if verify and zlib.crc32(memoryview(buffer)[_HEADER_SIZE:]) != checksum:
+            raise LineageSnapshotError(f"快照校验失败，文件可能已损坏或不完整: {self.path}")
+
+        self.string_count = n_string
+        self.instance_count = n_instance
+        self.node_count = n_node
+        self.task_count = n_task
+        self._edge_count = n_edge
+        view = memoryview(buffer)
+        self._view_list.append(view)
+        for i, (name, type_code) in enumerate(_SECTION_LIST):
+            offset, length = _SECTION_ENTRY.unpack_from(buffer, _HEADER_PREFIX.size + i * _SECTION_ENTRY.size)
+            if offset < _HEADER_SIZE or offset + length > len(buffer):
+                raise LineageSnapshotError(f"快照的段 {name} 超出文件范围")
+            section = view[offset:offset + length]
+            self._view_list.append(section)
+            if type_code != "bytes":
+                section = section.cast(type_code)
+                self._view_list.append(section)
+            setattr(self, f"_{name}", section)
+        self.metadata: Dict[str, Any] = json.loads(bytes(self._metadata).decode("utf-8"))
+
+    def close(self) -> None:
+        """关闭文件映射（之后不能再查询）"""
+        for view in reversed(self._view_list):
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "LineageSnapshot":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    # ------------------------------ 反序列化 ------------------------------
+
+    def string(self, sid: int) -> Optional[str]:
+        """根据字符串 ID 获取字符串，-1 返回 None"""
+        if sid < 0:
+            return None
+        value = self._string_cache.get(sid)
+        if value is None:
+            value = self._string_cache[sid] = str(
+                self._string_data[self._string_offsets[sid]:self._string_offsets[sid + 1]], "utf-8")
+        return value
+
+    def instance(self, iid: int) -> Optional[DInstance]:
+        """根据实例 ID 获取驻留的数据源实例，-1 返回 None"""
+        if iid < 0:
+            return None
+        instance = self._instance_cache.get(iid)
+        if instance is None:
+            class_name = self.string(self._instance_class[iid])
+            instance_class = _INSTANCE_CLASS_HASH.get(class_name)
+            if instance_class is None:
+                raise LineageSnapshotError(f"快照中包含未知的实例类型: {class_name}")
+            attrs = json.loads(self.string(self._instance_attrs[iid]))
+            attrs = {key: tuple(value) if isinstance(value, list) else value for key, value in attrs.items()}
+            instance = instance_class(data_type=DType(self._instance_data_type[iid]),
+                                      name=self.string(self._instance_name[iid]), **attrs).intern()
+            self._instance_cache[iid] = instance
+        return instance
+
+    def node(self, vid: int) -> DNode:
+        """根据顶点 ID 获取驻留的数据节点"""
+        data_node = self._node_cache.get(vid)
+        if data_node is None:
+            data_node = DNode.create(instance=self.instance(self._node_instance[vid]),
+                                     schema_name=self.string(self._node_schema[vid]),
+                                     table_name=self.string(self._node_table[vid]))
+            self._node_cache[vid] = data_node
+            self._node_vid_hash[data_node] = vid
+        return data_node
+
+    def task_id(self, tid: int) -> Hashable:
+        """根据数据任务序号（0 到 task_count - 1）获取任务 ID"""
+        value = self._task_value[tid]
+        return value if self._task_kind[tid] == _TASK_KIND_INT else self.string(value)
+
+    def task(self, tid: int) -> DTask:
+        """根据数据任务序号重建数据任务对象"""
+        fail_reason = self._task_fail_reason[tid]
+        if fail_reason == _FAIL_REASON_NONE:
+            data_task = DTask.empty()
+        else:
+            data_task = DTask.unknown(DTaskFailReason(fail_reason) if fail_reason != _FAIL_REASON_UNSET else None,
+                                      self.string(self._task_fail_detail[tid]))
+        vid = self.node_count + tid
+        for i in range(self._in_offsets[vid], self._in_offsets[vid + 1]):
+            data_task.add_dependent_node(self.node(self._in_targets[i]))
+        for i in range(self._out_offsets[vid], self._out_offsets[vid + 1]):
+            data_task.add_generate_node(self.node(self._out_targets[i]))
+        return data_task
+
+    def iter_tasks(self) -> Iterator[Tuple[Hashable, DTask]]:
+        """按任务 ID 顺序遍历（任务 ID, 数据任务对象），会反序列化所有数据节点"""
+        for tid in range(self.task_count):
+            yield self.task_id(tid), self.task(tid)
+
+    def to_graph(self) -> LineageGraph:
+        """将快照完整加载为 LineageGraph"""
+        graph = LineageGraph()
+        graph.add_tasks(self.iter_tasks())
+        graph.build()
+        return graph
+
+    # ------------------------------ 查找 ------------------------------
+
+    def _node_key(self, vid: int) -> Tuple[str, str, str]:
+        iid = self._node_instance[vid]
+        instance_name = self.string(self._instance_name[iid]) if iid >= 0 else None
+        return (instance_name or "", self.string(self._node_schema[vid]) or "",
+                self.string(self._node_table[vid]) or "")
+
+    def find_nodes(self, instance_name: Optional[str], schema_name: Optional[str],
+                   table_name: Optional[str]) -> List[DNode]:
+        """在排序的数据节点表中二分查找（实例名称, 库名, 表名）相同的数据节点，None 与空字符串等价"""
+        key = (instance_name or "", schema_name or "", table_name or "")
+        low, high = 0, self.node_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._node_key(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        result = []
+        while low < self.node_count and self._node_key(low) == key:
+            result.append(self.node(low))
+            low += 1
+        return result
+
+    def find_task(self, task_key: str) -> Optional[Hashable]:
+        """根据字符串形式的任务 ID 查找任务 ID（整数形式的字符串优先匹配整数任务 ID），不存在时返回 None"""
+        tid = self._find_task_index(task_key)
+        return self.task_id(tid) if tid is not None else None
+
+    def _find_task_index(self, task_id: Any) -> Optional[int]:
+        candidate_list = []
+        if isinstance(task_id, str):
+            try:
+                candidate_list.append((_TASK_KIND_INT, int(task_id)))
+            except ValueError:
+                pass
+            candidate_list.append((_TASK_KIND_STR, task_id))
+        elif isinstance(task_id, int):
+            candidate_list.append((_TASK_KIND_INT, task_id))
+        for key in candidate_list:
+            low, high = 0, self.task_count
+            while low < high:
+                middle = (low + high) // 2
+                if self._task_key(middle) < key:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < self.task_count and self._task_key(low) == key:
+                return low
+        return None
+
+    def _task_key(self, tid: int) -> Tuple[int, Any]:
+        kind = self._task_kind[tid]
+        return kind, self._task_value[tid] if kind == _TASK_KIND_INT else self.string(self._task_value[tid])
+
+    # ------------------------------ 与 LineageGraph 一致的查询接口 ------------------------------
+
+    @property
+    def vertex_count(self) -> int:
+        """顶点数（数据节点数与数据任务数之和）"""
+        return self.node_count + self.task_count
+
+    @property
+    def edge_count(self) -> int:
+        """边数"""
+        return self._edge_count
+
+    def build(self) -> None:
+        """快照中已包含 CSR 邻接数组，不需要构造"""
+
+    def nodes(self) -> Iterator[DNode]:
+        """遍历所有数据节点（会反序列化所有数据节点）"""
+        for vid in range(self.node_count):
+            yield self.node(vid)
+
+    def tasks(self) -> Iterator[Hashable]:
+        """遍历所有任务 ID"""
+        for tid in range(self.task_count):
+            yield self.task_id(tid)
+
+    def has_node(self, data_node: DNode) -> bool:
+        return self._node_vertex_id(data_node) is not None
+
+    def has_task(self, task_id: Hashable) -> bool:
+        return self._find_task_index(task_id) is not None
+
+    def upstream(self, source: Any, max_depth: Optional[int] = None) -> LineageClosure:
+        """查询上游闭包，参数与 LineageGraph.upstream 一致"""
+        return self._closure(self._vertex_id(source), self._in_offsets, self._in_targets, max_depth)
+
+    def downstream(self, source: Any, max_depth: Optional[int] = None) -> LineageClosure:
+        """查询下游闭包，参数与 LineageGraph.downstream 一致"""
+        return self._closure(self._vertex_id(source), self._out_offsets, self._out_targets, max_depth)
+
+    def _node_vertex_id(self, data_node: DNode) -> Optional[int]:
+        vid = self._node_vid_hash.get(data_node)
+        if vid is None:
+            instance_name = data_node.instance.name if data_node.instance is not None else None
+            for candidate in self.find_nodes(instance_name, data_node.schema_name, data_node.table_name):
+                if candidate == data_node or _same_instance(candidate.instance, data_node.instance):
+                    return self._node_vid_hash[candidate]
+        return vid
+
+    def _vertex_id(self, obj: Any) -> int:
+        """获取数据节点或任务 ID 对应的顶点 ID"""
+        if isinstance(obj, DNode):
+            vid = self._node_vertex_id(obj)
+        else:
+            tid = self._find_task_index(obj)
+            vid = self.node_count + tid if tid is not None else None
+        if vid is None:
+            raise KeyError(f"血缘关系快照中不存在: {obj}")
+        return vid
+
+    def _closure(self, source_vid: int, offsets: memoryview, targets: memoryview,
+                 max_depth: Optional[int]) -> LineageClosure:
+        """广度优先遍历映射的 CSR 邻接数组"""
+        n_node = self.node_count
+        depth_hash: Dict[int, int] = {source_vid: 0}
+        queue = collections.deque([source_vid])
+        while queue:
+            vid = queue.popleft()
+            depth = depth_hash[vid]
+            for i in range(offsets[vid], offsets[vid + 1]):
+                next_vid = targets[i]
+                if next_vid in depth_hash:
+                    continue
+                next_depth = depth + 1 if next_vid >= n_node else depth
+                if max_depth is not None and next_depth > max_depth:
+                    continue
+                depth_hash[next_vid] = next_depth
+                queue.append(next_vid)
+
+        closure = LineageClosure()
+        del depth_hash[source_vid]
+        for vid, depth in depth_hash.items():
+            if vid >= n_node:
+                closure.task_hash[self.task_id(vid - n_node)] = depth
+            else:
+                closure.node_hash[self.node(vid)] = depth
+        return closure
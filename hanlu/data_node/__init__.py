@@ -1,6 +1,7 @@
 from hanlu.data_node.data_node_base import DInstance
 from hanlu.data_node.data_node_base import DNode
 from hanlu.data_node.data_node_base import DType
+from hanlu.data_node.data_node_endpoint import DEndpointInstance
 from hanlu.data_node.data_node_hdfs import DHdfsInstance
 from hanlu.data_node.data_node_hive import DHiveInstance
 from hanlu.data_node.data_node_mysql import DMySQLInstance
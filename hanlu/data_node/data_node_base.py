@@ -4,7 +4,10 @@
 
 import dataclasses
 import enum
-from typing import Optional
+from typing import Any, Dict, Optional
+
+from hanlu.data_node.data_node_intern import intern_instance
+from hanlu.data_node.data_node_intern import intern_node
 
 __all__ = [
     "DType",
@@ -34,16 +37,75 @@ class DInstance:
 
     data_type: DType = dataclasses.field(kw_only=True, hash=True, compare=True)  # 数据源类型
     name: Optional[str] = dataclasses.field(kw_only=True, default=None, hash=False, compare=False)  # 实例名称（不参与比较）
+    # 驻留对象的整数 ID（不参与比较，未驻留时为 0）
+    intern_id: int = dataclasses.field(init=False, default=0, hash=False, compare=False, repr=False)
 
     @staticmethod
     def unknown() -> "DInstance":
-        return DInstance(data_type=DType.UNKNOWN)
+        return intern_instance(DInstance(data_type=DType.UNKNOWN))
 
+    def intern(self) -> "DInstance":
+        """返回与当前对象相等的驻留对象"""
+        return intern_instance(self)
 
-@dataclasses.dataclass(slots=True, frozen=True, eq=True)
+    def __reduce__(self):
+        """反序列化（如从工作进程返回分析结果）时重新驻留，使同一进程中相等的驻留对象仍为同一个对象"""
+        kwargs = {field.name: getattr(self, field.name) for field in dataclasses.fields(self) if field.init}
+        return _restore_instance, (type(self), kwargs, self.intern_id != 0)
+
+
+def _restore_instance(instance_class: type, kwargs: Dict[str, Any], is_interned: bool) -> DInstance:
+    instance = instance_class(**kwargs)
+    return intern_instance(instance) if is_interned else instance
+
+
+@dataclasses.dataclass(slots=True, frozen=True, eq=True, weakref_slot=True)
 class DNode:
-    """数据源对象"""
+    """数据源对象
+
+    通过 DNode.create 构造的数据源对象是驻留对象：相等的驻留对象在当前进程中是同一个对象，比较时只需比较 ID。
+    """
 
     instance: Optional[DInstance] = dataclasses.field(kw_only=True, default=None)  # 数据源实例对象
     schema_name: Optional[str] = dataclasses.field(kw_only=True, default=None)  # 数据源库名
     table_name: Optional[str] = dataclasses.field(kw_only=True, default=None)  # 数据源表名
+    # 驻留对象的整数 ID（不参与比较，未驻留时为 0）
+    intern_id: int = dataclasses.field(init=False, default=0, hash=False, compare=False, repr=False)
+    _hash: int = dataclasses.field(init=False, default=0, hash=False, compare=False, repr=False)  # 哈希值缓存
+
+    @staticmethod
+    def create(instance: Optional[DInstance] = None,
+               schema_name: Optional[str] = None,
+               table_name: Optional[str] = None) -> "DNode":
+        """获取驻留的数据源对象（数据源实例也会被驻留）"""
+        return intern_node(DNode, instance, schema_name, table_name)
+
+    def intern(self) -> "DNode":
+        """返回与当前对象相等的驻留对象"""
+        if self.intern_id:
+            return self
+        return intern_node(DNode, self.instance, self.schema_name, self.table_name)
+
+    def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        # 不是同一个对象时按字段比较，与 __hash__ 和驻留池的键使用相同的字段，是否驻留不影响比较结果
+        return (self.instance == other.instance and self.schema_name == other.schema_name
+                and self.table_name == other.table_name)
+
+    def __hash__(self) -> int:
+        if self._hash == 0:
+            object.__setattr__(self, "_hash", hash((self.instance, self.schema_name, self.table_name)))
+        return self._hash
+
+    def __reduce__(self):
+        """反序列化时重新驻留"""
+        if self.intern_id:
+            return intern_node, (DNode, self.instance, self.schema_name, self.table_name)
+        return _restore_node, (self.instance, self.schema_name, self.table_name)
+
+
+def _restore_node(instance: Optional[DInstance], schema_name: Optional[str], table_name: Optional[str]) -> DNode:
+    return DNode(instance=instance, schema_name=schema_name, table_name=table_name)
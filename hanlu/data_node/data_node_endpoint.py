@@ -0,0 +1,29 @@
+"""
+以服务地址标识的节点类型（Doris、ElasticSearch、Kafka 等）
+"""
+
+import dataclasses
+from typing import Optional
+
+from hanlu.data_node.data_node_base import DInstance
+from hanlu.data_node.data_node_base import DType
+from hanlu.data_node.data_node_intern import intern_instance
+
+__all__ = [
+    "DEndpointInstance",
+]
+
+
+@dataclasses.dataclass(slots=True, frozen=True, eq=True)
+class DEndpointInstance(DInstance):
+    """以服务地址标识的数据源实例"""
+
+    endpoint: str = dataclasses.field(kw_only=True)  # 服务地址（多个地址时为排序后以逗号分隔的地址列表）
+
+    @staticmethod
+    def create(data_type: DType, endpoint: str, name: Optional[str] = None) -> "DEndpointInstance":
+        return intern_instance(DEndpointInstance(
+            data_type=data_type,
+            name=name,
+            endpoint=",".join(sorted(address.strip() for address in endpoint.split(",") if address.strip()))
+        ))
@@ -7,6 +7,7 @@ from typing import Optional
 
 from hanlu.data_node import DInstance
 from hanlu.data_node import DType
+from hanlu.data_node.data_node_intern import intern_instance
 
 __all__ = [
     "DHdfsInstance",
@@ -28,6 +29,14 @@ class DHdfsInstance(DInstance):
     # OBS 桶名
     fs_obs_bucket: Optional[str] = dataclasses.field(kw_only=True, default=None, hash=True, compare=True)
 
+    @staticmethod
+    def create_hdfs_instance(name: Optional[str], default_fs: str) -> "DHdfsInstance":
+        return intern_instance(DHdfsInstance(
+            data_type=DType.HDFS,
+            name=name,
+            default_fs=default_fs
+        ))
+
     @staticmethod
     def create_obs_instance(name: Optional[str],
                             fs_obs_end_point: str,
@@ -35,7 +44,7 @@ class DHdfsInstance(DInstance):
                             fs_obs_access_key: Optional[str] = None,
                             fs_obs_secret_key: Optional[str] = None
                             ) -> "DHdfsInstance":
-        return DHdfsInstance(
+        return intern_instance(DHdfsInstance(
             data_type=DType.HDFS,
             name=name,
             default_fs=f"obs://{fs_obs_bucket}",
@@ -43,4 +52,4 @@ class DHdfsInstance(DInstance):
             fs_obs_bucket=fs_obs_bucket,
             fs_obs_access_key=fs_obs_access_key,
             fs_obs_secret_key=fs_obs_secret_key
-        )
+        ))
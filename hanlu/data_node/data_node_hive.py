@@ -7,6 +7,7 @@ from typing import List, Optional, Tuple
 
 from hanlu.data_node.data_node_base import DInstance
 from hanlu.data_node.data_node_base import DType
+from hanlu.data_node.data_node_intern import intern_instance
 
 __all__ = [
     "DHiveInstance",
@@ -29,11 +30,27 @@ class DHiveInstance(DInstance):
                username: Optional[str] = None,
                password: Optional[str] = None,
                schema_name: Optional[str] = None) -> "DHiveInstance":
-        return DHiveInstance(
+        return intern_instance(DHiveInstance(
             data_type=DType.HIVE,
             name=name,
             hosts=tuple(hosts),
             username=username,
             password=password,
             schema_name=schema_name,
-        )
+        ))
+
+    def without_schema(self) -> "DHiveInstance":
+        """返回不包含库名的驻留实例对象：库名只是连接的默认库名，不属于数据节点所在集群的标识"""
+        if self.schema_name is None:
+            return self
+        return DHiveInstance.create(hosts=list(self.hosts), name=self.name, username=self.username,
+                                    password=self.password)
+
+    def cluster_instance(self) -> "DHiveInstance":
+        """返回只包含集群标识（主机列表和名称）的驻留实例对象
+
+        库名、用户名和密码属于连接信息，不属于数据节点所在集群的标识；通过不同用户或默认库名访问同一个集群的任务得到相同的数据节点。
+        """
+        if self.schema_name is None and self.username is None and self.password is None:
+            return self
+        return DHiveInstance.create(hosts=list(self.hosts), name=self.name)
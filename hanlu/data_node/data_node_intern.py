@@ -0,0 +1,66 @@
+"""
+数据节点驻留池：相等的数据源实例和数据源对象在当前进程中共用同一个对象，并分配整数 ID
+"""
+
+import itertools
+import threading
+import weakref
+from typing import Any, Dict, Hashable, Tuple, TypeVar
+
+__all__ = [
+    "intern_instance",
+    "intern_node",
+    "interned_count",
+]
+
+T = TypeVar("T")
+
+_LOCK = threading.Lock()
+_ID_COUNTER = itertools.count(1)
+
+# 数据源实例驻留池：以实例本身（即参与比较和哈希的字段）为键，实例的数量有限（集群数 × 用户 × 库），因此使用强引用
+_INSTANCE_HASH: Dict[Any, Any] = {}
+
+# 数据源对象驻留池：以 (驻留后实例的 ID, 库名, 表名) 为键，值为弱引用，没有被引用的数据源对象会被回收
+_NODE_HASH: "weakref.WeakValueDictionary[Tuple[Hashable, ...], Any]" = weakref.WeakValueDictionary()
+
+
+def intern_instance(instance: T) -> T:
+    """获取与 instance 相等的驻留数据源实例，如果不存在则将 instance 驻留
+
+    驻留池的键与实例的比较和哈希使用相同的字段，因此相等的驻留实例一定是同一个对象；实例名称不参与比较，相等但名称不同的实例
+    驻留为最先驻留的实例（使用该实例的名称）。
+    """
+    if instance is None or instance.intern_id:
+        return instance
+    key = instance
+    result = _INSTANCE_HASH.get(key)
+    if result is not None:
+        return result
+    with _LOCK:
+        result = _INSTANCE_HASH.get(key)
+        if result is None:
+            object.__setattr__(instance, "intern_id", next(_ID_COUNTER))
+            result = _INSTANCE_HASH[key] = instance
+    return result
+
+
+def intern_node(node_class: type, instance: Any, schema_name: Any, table_name: Any) -> Any:
+    """获取驻留的数据源对象，如果不存在则构造并驻留（已存在时不构造新对象）"""
+    instance = intern_instance(instance)
+    key = (instance.intern_id if instance is not None else 0, schema_name, table_name)
+    result = _NODE_HASH.get(key)
+    if result is not None:
+        return result
+    with _LOCK:
+        result = _NODE_HASH.get(key)
+        if result is None:
+            result = node_class(instance=instance, schema_name=schema_name, table_name=table_name)
+            object.__setattr__(result, "intern_id", next(_ID_COUNTER))
+            _NODE_HASH[key] = result
+    return result
+
+
+def interned_count() -> Tuple[int, int]:
+    """返回当前驻留的数据源实例数量和数据源对象数量"""
+    return len(_INSTANCE_HASH), len(_NODE_HASH)
@@ -7,6 +7,7 @@ from typing import Optional
 
 from hanlu.data_node import DInstance
 from hanlu.data_node import DType
+from hanlu.data_node.data_node_intern import intern_instance
 
 __all__ = [
     "DMySQLInstance",
@@ -31,7 +32,7 @@ class DMySQLInstance(DInstance):
                username: Optional[str] = None,
                password: Optional[str] = None,
                schema_name: Optional[str] = None) -> "DMySQLInstance":
-        return DMySQLInstance(
+        return intern_instance(DMySQLInstance(
             data_type=DType.MYSQL,
             name=name,
             host=host,
@@ -39,4 +40,4 @@ class DMySQLInstance(DInstance):
             username=username,
             password=password,
             schema_name=schema_name,
-        )
+        ))
@@ -1,2 +1,6 @@
+from hanlu.data_task.data_task_column_edge import DColumnEdge
+from hanlu.data_task.data_task_fail_reason import DTaskFailReason
+from hanlu.data_task.data_task_node_set import DNodeListView
+from hanlu.data_task.data_task_node_set import DNodeSet
 from hanlu.data_task.data_task_object import DTask
 from hanlu.data_task.data_task_type import DTaskType
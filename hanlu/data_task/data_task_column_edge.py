@@ -0,0 +1,21 @@
+"""
+字段级血缘关系的边
+"""
+
+import dataclasses
+
+from hanlu.data_node import DNode
+
+__all__ = [
+    "DColumnEdge",
+]
+
+
+@dataclasses.dataclass(slots=True, frozen=True, eq=True)
+class DColumnEdge:
+    """字段级血缘关系的边：源数据节点的字段参与计算了目标数据节点的字段"""
+
+    source_node: DNode = dataclasses.field(kw_only=True)  # 源数据节点（上游）
+    source_column: str = dataclasses.field(kw_only=True)  # 源字段名（小写）
+    target_node: DNode = dataclasses.field(kw_only=True)  # 目标数据节点（下游）
+    target_column: str = dataclasses.field(kw_only=True)  # 目标字段名（小写）
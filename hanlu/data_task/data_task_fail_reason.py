@@ -0,0 +1,39 @@
+"""
+数据任务推断失败原因
+"""
+
+import enum
+
+__all__ = [
+    "DTaskFailReason",
+]
+
+
+class DTaskFailReason(enum.IntEnum):
+    """数据任务推断失败原因的枚举类"""
+
+    UNKNOWN = 0  # 未知原因（未指定失败原因）
+    UNSUPPORTED_DOLPHIN_TASK = 1  # 暂不支持的海豚调度任务类型
+
+    # 执行资源限制
+    TIMEOUT = 10  # 分析超时
+    MEMORY_LIMIT = 11  # 分析超出内存限制
+    WORKER_CRASH = 12  # 分析任务的工作进程异常退出
+
+    # Shell 命令
+    UNSUPPORTED_SHELL_COMMAND = 20  # 暂不支持的 Shell 命令
+    UNSUPPORTED_SPARK_SUBMIT = 21  # 暂不支持的 spark-submit 命令
+    BEELINE_UNKNOWN_OPTION = 22  # beeline 命令中包含暂不支持的参数
+    BEELINE_SQL_NOT_FOUND = 23  # beeline 命令中没有找到 SQL 语句
+
+    # SQL 语句
+    SQL_PARSE_ERROR = 30  # SQL 解析失败
+    UNSUPPORTED_SQL = 31  # 暂不支持的 SQL 语句类型
+
+    # DataX 配置文件
+    DATAX_CONFIG_NOT_FOUND = 40  # DataX 配置文件不存在
+    DATAX_CONFIG_ERROR = 41  # DataX 配置文件格式错误
+    UNSUPPORTED_DATAX_READER = 42  # 暂不支持的 DataX Reader 类型
+    UNSUPPORTED_DATAX_WRITER = 43  # 暂不支持的 DataX Writer 类型
+
+    ANALYZE_ERROR = 90  # 分析过程中出现未处理的异常
@@ -0,0 +1,130 @@
+"""
+数据任务的数据节点集合
+"""
+
+import collections.abc
+import warnings
+from typing import Any, Dict, ItemsView, Iterable, Iterator, List, Optional, Tuple
+
+from hanlu.data_node import DNode
+
+__all__ = [
+    "DNodeSet",
+    "DNodeListView",
+]
+
+
+class DNodeSet:
+    """按首次添加顺序排列、去重的数据节点集合，并记录每个数据节点被添加的次数（如被读取或写入的语句数）"""
+
+    __slots__ = ("_count_hash",)
+
+    def __init__(self, data_nodes: Optional[Iterable[DNode]] = None):
+        self._count_hash: Dict[DNode, int] = {}  # 数据节点到添加次数的映射（字典保持插入顺序）
+        if data_nodes is not None:
+            for data_node in data_nodes:
+                self.add(data_node)
+
+    def add(self, data_node: DNode, count: int = 1) -> None:
+        """添加数据节点，已存在时只增加计数"""
+        count_hash = self._count_hash
+        count_hash[data_node] = count_hash.get(data_node, 0) + count
+
+    def update(self, other: "DNodeSet") -> None:
+        """原地合并另一个数据节点集合（计数相加）"""
+        count_hash = self._count_hash
+        if not count_hash:
+            count_hash.update(other._count_hash)
+            return
+        for data_node, count in other._count_hash.items():
+            count_hash[data_node] = count_hash.get(data_node, 0) + count
+
+    def count(self, data_node: DNode) -> int:
+        """返回数据节点被添加的次数，不存在时返回 0"""
+        return self._count_hash.get(data_node, 0)
+
+    def items(self) -> ItemsView[DNode, int]:
+        """返回（数据节点, 添加次数）的视图"""
+        return self._count_hash.items()
+
+    def copy(self) -> "DNodeSet":
+        result = DNodeSet()
+        result._count_hash = self._count_hash.copy()
+        return result
+
+    def __iter__(self) -> Iterator[DNode]:
+        return iter(self._count_hash)
+
+    def __len__(self) -> int:
+        return len(self._count_hash)
+
+    def __contains__(self, data_node: object) -> bool:
+        return data_node in self._count_hash
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DNodeSet):
+            return NotImplemented
+        return self._count_hash == other._count_hash
+
+    def __repr__(self) -> str:
+        return f"DNodeSet({list(self._count_hash)!r})"
+
+    def __getstate__(self) -> Tuple[Dict[DNode, int]]:
+        return (self._count_hash,)  # 空集合也需要调用 __setstate__，因此不直接返回可能为空的字典
+
+    def __setstate__(self, state: Tuple[Dict[DNode, int]]) -> None:
+        self._count_hash = state[0]
+
+
+class DNodeListView(collections.abc.Sequence):
+    """数据节点集合的列表视图，兼容以列表保存数据节点时的接口（DTask.dependent_node_list 和 DTask.generate_node_list）
+
+    读取时与列表相同（按首次添加顺序排列）；append、extend 和 += 会写入对应的数据节点集合（已存在的数据节点只增加计数），
+    并给出 DeprecationWarning，新代码应使用 DTask.add_dependent_node 和 DTask.add_generate_node。不支持按下标修改或删除。
+    """
+
+    __slots__ = ("_node_set",)
+
+    def __init__(self, node_set: DNodeSet):
+        self._node_set = node_set
+
+    def __getitem__(self, index: Any) -> Any:
+        return list(self._node_set)[index]
+
+    def __iter__(self) -> Iterator[DNode]:
+        return iter(self._node_set)
+
+    def __len__(self) -> int:
+        return len(self._node_set)
+
+    def __contains__(self, data_node: object) -> bool:
+        return data_node in self._node_set
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (DNodeListView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __add__(self, other: Iterable[DNode]) -> List[DNode]:
+        return list(self) + list(other)
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def append(self, data_node: DNode) -> None:
+        _warn_list_mutation()
+        self._node_set.add(data_node)
+
+    def extend(self, data_nodes: Iterable[DNode]) -> None:
+        _warn_list_mutation()
+        for data_node in list(data_nodes):
+            self._node_set.add(data_node)
+
+    def __iadd__(self, data_nodes: Iterable[DNode]) -> "DNodeListView":
+        self.extend(data_nodes)
+        return self
+
+
+def _warn_list_mutation() -> None:
+    warnings.warn("通过 dependent_node_list / generate_node_list 添加数据节点已废弃，"
+                  "请使用 add_dependent_node / add_generate_node", DeprecationWarning, stacklevel=3)
@@ -4,60 +4,162 @@
 
 import abc
 import dataclasses
-from typing import List
+import warnings
+from typing import Iterable, List, Optional
 
 from hanlu.data_node import DNode
+from hanlu.data_task.data_task_column_edge import DColumnEdge
+from hanlu.data_task.data_task_fail_reason import DTaskFailReason
+from hanlu.data_task.data_task_node_set import DNodeListView
+from hanlu.data_task.data_task_node_set import DNodeSet
 
 __all__ = [
     "DTask",
 ]
 
 
-@dataclasses.dataclass(slots=True)
+@dataclasses.dataclass(slots=True, init=False)
 class DTask(abc.ABC):
-    """数据任务对象"""
+    """数据任务对象
+
+    兼容以列表保存数据节点时的接口（已废弃）：构造时可以使用 dependent_node_list 和 generate_node_list 参数传入数据节点，
+    dependent_node_list 和 generate_node_list 属性返回写入数据节点集合的列表视图（DNodeListView），对属性赋值会替换数据节点集合；
+    新代码应使用 dependent_node_set、generate_node_set 以及 add_dependent_node 和 add_generate_node 方法。
+    """
 
     is_unknown: bool = dataclasses.field(kw_only=True, default=False)  # 数据任务的相关数据节点推断是否成功
-    dependent_node_list: List[DNode] = dataclasses.field(kw_only=True, default_factory=lambda: [])  # 数据任务依赖的数据节点列表（上游）
-    generate_node_list: List[DNode] = dataclasses.field(kw_only=True, default_factory=lambda: [])  # 数据任务生成的数据节点列表（下游）
+    dependent_node_set: DNodeSet = dataclasses.field(kw_only=True, default_factory=DNodeSet)  # 数据任务依赖的数据节点集合（上游）
+    generate_node_set: DNodeSet = dataclasses.field(kw_only=True, default_factory=DNodeSet)  # 数据任务生成的数据节点集合（下游）
+    fail_reason: Optional[DTaskFailReason] = dataclasses.field(kw_only=True, default=None)  # 推断失败的原因
+    fail_detail: Optional[str] = dataclasses.field(kw_only=True, default=None)  # 推断失败的详细信息（如命令名称、语句类型）
+    # 字段级血缘关系的边（按语句顺序排列），只在分析器启用字段级血缘模式时记录
+    column_edge_list: List[DColumnEdge] = dataclasses.field(kw_only=True, default_factory=list)
+
+    def __init__(self, *,
+                 is_unknown: bool = False,
+                 dependent_node_set: Optional[DNodeSet] = None,
+                 generate_node_set: Optional[DNodeSet] = None,
+                 fail_reason: Optional[DTaskFailReason] = None,
+                 fail_detail: Optional[str] = None,
+                 column_edge_list: Optional[List[DColumnEdge]] = None,
+                 dependent_node_list: Optional[Iterable[DNode]] = None,
+                 generate_node_list: Optional[Iterable[DNode]] = None):
+        """
+
+        Parameters
+        ----------
+        dependent_node_list : Optional[Iterable[DNode]], default = None
+            数据任务依赖的数据节点（兼容参数），添加到 dependent_node_set 中
+        generate_node_list : Optional[Iterable[DNode]], default = None
+            数据任务生成的数据节点（兼容参数），添加到 generate_node_set 中
+        """
+        self.is_unknown = is_unknown
+        self.dependent_node_set = dependent_node_set if dependent_node_set is not None else DNodeSet()
+        self.generate_node_set = generate_node_set if generate_node_set is not None else DNodeSet()
+        self.fail_reason = fail_reason
+        self.fail_detail = fail_detail
+        self.column_edge_list = column_edge_list if column_edge_list is not None else []
+        if dependent_node_list is not None:
+            for data_node in dependent_node_list:
+                self.dependent_node_set.add(data_node)
+        if generate_node_list is not None:
+            for data_node in generate_node_list:
+                self.generate_node_set.add(data_node)
 
     @classmethod
-    def unknown(cls) -> "DTask":
-        """创建一个推断失败的数据任务对象"""
-        return cls(is_unknown=True)
+    def unknown(cls, fail_reason: Optional[DTaskFailReason] = None, fail_detail: Optional[str] = None) -> "DTask":
+        """创建一个推断失败的数据任务对象
+
+        Parameters
+        ----------
+        fail_reason : Optional[DTaskFailReason], default = None
+            推断失败的原因
+        fail_detail : Optional[str], default = None
+            推断失败的详细信息，用于按原因汇总时进一步分组，应使用命令名称、语句类型等取值有限的短字符串
+        """
+        return cls(is_unknown=True, fail_reason=fail_reason, fail_detail=fail_detail)
 
     @classmethod
     def empty(cls) -> "DTask":
         """创建没有依赖和生成数据节点的空数据任务对象"""
-        return cls(is_unknown=False, dependent_node_list=[], generate_node_list=[])
+        return cls(is_unknown=False)
+
+    def copy(self) -> "DTask":
+        """复制数据任务对象（数据节点对象和字段级血缘关系的边不可变，因此只复制集合和列表）"""
+        return DTask(
+            is_unknown=self.is_unknown,
+            dependent_node_set=self.dependent_node_set.copy(),
+            generate_node_set=self.generate_node_set.copy(),
+            fail_reason=self.fail_reason,
+            fail_detail=self.fail_detail,
+            column_edge_list=self.column_edge_list.copy()
+        )
+
+    @property
+    def dependent_node_list(self) -> DNodeListView:
+        """数据任务依赖的数据节点（去重，按首次添加顺序排列）的列表视图，append 和 extend 写入 dependent_node_set（已废弃）"""
+        return DNodeListView(self.dependent_node_set)
+
+    @dependent_node_list.setter
+    def dependent_node_list(self, data_nodes: Iterable[DNode]) -> None:
+        if isinstance(data_nodes, DNodeListView) and data_nodes._node_set is self.dependent_node_set:
+            return  # task.dependent_node_list += [...] 已通过视图写入
+        _warn_list_assignment()
+        self.dependent_node_set = DNodeSet(data_nodes)
+
+    @property
+    def generate_node_list(self) -> DNodeListView:
+        """数据任务生成的数据节点（去重，按首次添加顺序排列）的列表视图，append 和 extend 写入 generate_node_set（已废弃）"""
+        return DNodeListView(self.generate_node_set)
+
+    @generate_node_list.setter
+    def generate_node_list(self, data_nodes: Iterable[DNode]) -> None:
+        if isinstance(data_nodes, DNodeListView) and data_nodes._node_set is self.generate_node_set:
+            return
+        _warn_list_assignment()
+        self.generate_node_set = DNodeSet(data_nodes)
 
     def add_dependent_node(self, data_node: DNode) -> None:
-        self.dependent_node_list.append(data_node)
+        self.dependent_node_set.add(data_node)
 
     def add_generate_node(self, data_node: DNode) -> None:
-        self.generate_node_list.append(data_node)
+        self.generate_node_set.add(data_node)
+
+    def read_count(self, data_node: DNode) -> int:
+        """返回数据任务读取数据节点的次数（如读取该表的语句数）"""
+        return self.dependent_node_set.count(data_node)
+
+    def write_count(self, data_node: DNode) -> int:
+        """返回数据任务写入数据节点的次数（如写入该表的语句数）"""
+        return self.generate_node_set.count(data_node)
 
     def __bool__(self) -> bool:
         """如果数据任务的相关数据节点推断是否成功则返回 True，否则返回 False"""
         return self.is_unknown is False
 
     def __add__(self, other: "DTask") -> "DTask":
-        """实现 + 运算符"""
+        """实现 + 运算符，结果与 += 相同：推断失败时同样保留双方的数据节点"""
         if not isinstance(other, DTask):
-            raise NotImplemented  # 如果 other 不是 DTask 类型则不允许进行计算
-        if self.is_unknown or other.is_unknown:
-            return DTask.unknown()  # 如果 self 和 other 中有任意一个推断失败，则求和后的任务也推断失败
-        return DTask(
-            dependent_node_list=self.dependent_node_list + other.dependent_node_list,
-            generate_node_list=self.generate_node_list + other.generate_node_list
-        )
+            return NotImplemented  # 如果 other 不是 DTask 类型则不允许进行计算
+        result = self.copy()
+        result += other
+        return result
 
     def __iadd__(self, other: "DTask") -> "DTask":
-        """实现 += 运算符"""
+        """实现 += 运算符（原地合并数据节点集合）"""
         if not isinstance(other, DTask):
-            raise NotImplemented  # 如果 other 不是 DTask 类型则不允许进行计算
+            return NotImplemented  # 如果 other 不是 DTask 类型则不允许进行计算
+        if not self.is_unknown and other.is_unknown:
+            self.fail_reason = other.fail_reason  # 保留首个失败原因
+            self.fail_detail = other.fail_detail
         if self.is_unknown or other.is_unknown:
             self.is_unknown = True  # 如果 self 和 other 中有任意一个推断失败，则求和后的任务也推断失败
-        self.dependent_node_list += other.dependent_node_list
-        self.generate_node_list += other.generate_node_list
+        self.dependent_node_set.update(other.dependent_node_set)
+        self.generate_node_set.update(other.generate_node_set)
+        self.column_edge_list.extend(other.column_edge_list)
         return self
+
+
+def _warn_list_assignment() -> None:
+    warnings.warn("对 dependent_node_list / generate_node_list 赋值已废弃，请使用 dependent_node_set / generate_node_set",
+                  DeprecationWarning, stacklevel=3)
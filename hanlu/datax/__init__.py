@@ -0,0 +1,5 @@
+from hanlu.datax.datax_config_scanner import DataXConfigError
+from hanlu.datax.datax_config_scanner import iter_datax_content
+from hanlu.datax.datax_plugin import DEFAULT_DATAX_REGISTRY
+from hanlu.datax.datax_plugin import DataXHandler
+from hanlu.datax.datax_plugin import DataXPluginRegistry
@@ -0,0 +1,158 @@
+"""
+DataX 配置文件的增量解析：只构造 job.content[*] 中的 reader 和 writer，跳过其他部分（如 setting）
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterator, Optional
+
+__all__ = [
+    "DataXConfigError",
+    "iter_datax_content",
+]
+
+# 允许字符串中包含制表符等控制字符（DataX 配置文件中常见）
+_DECODER = json.JSONDecoder(strict=False)
+
+_WHITESPACE_PATTERN = re.compile(r"[ \t\n\r]*")
+_STRING_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"', re.S)
+_SCALAR_PATTERN = re.compile(r"[^,\]}\s]+")
+_CONTAINER_TOKEN_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"|[\[\]{}]', re.S)
+
+
+class DataXConfigError(ValueError):
+    """DataX 配置文件格式错误"""
+
+
+class _Scanner:
+    """JSON 文本扫描器：按位置逐个读取对象的键和数组的元素，值可以解析为 Python 对象，也可以不构造直接跳过"""
+
+    __slots__ = ("text", "pos")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def skip_whitespace(self) -> None:
+        self.pos = _WHITESPACE_PATTERN.match(self.text, self.pos).end()
+
+    def peek(self) -> str:
+        self.skip_whitespace()
+        if self.pos >= len(self.text):
+            raise DataXConfigError("DataX 配置文件不完整")
+        return self.text[self.pos]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise DataXConfigError(f"DataX 配置文件格式错误: 位置 {self.pos} 应为 {char!r}")
+        self.pos += 1
+
+    def iter_object_keys(self) -> Iterator[str]:
+        """遍历当前位置对象的键；每次返回键后，调用方需要调用 decode_value 或 skip_value 读取对应的值"""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            match = _STRING_PATTERN.match(self.text, self.pos) if self.peek() == '"' else None
+            if match is None:
+                raise DataXConfigError(f"DataX 配置文件格式错误: 位置 {self.pos} 应为对象的键")
+            self.pos = match.end()
+            key = _DECODER.decode(match.group())
+            self.expect(":")
+            self.peek()
+            yield key
+            if self._next_item("}"):
+                return
+
+    def iter_array_items(self) -> Iterator[None]:
+        """遍历当前位置的数组；每次返回后，调用方需要读取当前元素"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            self.peek()
+            yield None
+            if self._next_item("]"):
+                return
+
+    def _next_item(self, close_char: str) -> bool:
+        """读取元素之间的逗号，遇到结束符时返回 True"""
+        char = self.peek()
+        self.pos += 1
+        if char == close_char:
+            return True
+        if char != ",":
+            raise DataXConfigError(f"DataX 配置文件格式错误: 位置 {self.pos - 1} 应为 ',' 或 {close_char!r}")
+        return False
+
+    def decode_value(self) -> Any:
+        """将当前位置的值解析为 Python 对象"""
+        try:
+            value, self.pos = _DECODER.raw_decode(self.text, self.pos)
+        except json.JSONDecodeError as e:
+            raise DataXConfigError(f"DataX 配置文件格式错误: {e}") from e
+        return value
+
+    def skip_value(self) -> None:
+        """跳过当前位置的值，不构造 Python 对象"""
+        char = self.peek()
+        if char == '"':
+            match = _STRING_PATTERN.match(self.text, self.pos)
+            if match is None:
+                raise DataXConfigError(f"DataX 配置文件格式错误: 位置 {self.pos} 的字符串没有结束")
+            self.pos = match.end()
+        elif char in "[{":
+            depth = 0
+            for match in _CONTAINER_TOKEN_PATTERN.finditer(self.text, self.pos):
+                token = match.group()
+                if token in "[{":
+                    depth += 1
+                elif token in "]}":
+                    depth -= 1
+                    if depth == 0:
+                        self.pos = match.end()
+                        return
+            raise DataXConfigError("DataX 配置文件不完整")
+        else:
+            match = _SCALAR_PATTERN.match(self.text, self.pos)
+            if match is None:
+                raise DataXConfigError(f"DataX 配置文件格式错误: 位置 {self.pos}")
+            self.pos = match.end()
+
+
+def iter_datax_content(config_content: str) -> Iterator[Dict[str, Optional[Dict[str, Any]]]]:
+    """增量解析 DataX 配置文件，逐个返回 job.content 中的元素，元素中只包含 reader 和 writer
+
+    Parameters
+    ----------
+    config_content : str
+        DataX 配置文件内容
+
+    Raises
+    ------
+    DataXConfigError
+        配置文件格式错误或缺少 job.content
+    """
+    scanner = _Scanner(config_content)
+    for key in scanner.iter_object_keys():
+        if key != "job":
+            scanner.skip_value()
+            continue
+        for job_key in scanner.iter_object_keys():
+            if job_key != "content":
+                scanner.skip_value()
+                continue
+            if scanner.peek() != "[":
+                raise DataXConfigError("DataX 配置文件格式错误: job.content 不是数组")
+            for _ in scanner.iter_array_items():
+                content = {"reader": None, "writer": None}
+                for content_key in scanner.iter_object_keys():
+                    if content_key in content:
+                        content[content_key] = scanner.decode_value()
+                    else:
+                        scanner.skip_value()
+                yield content
+            return
+    raise DataXConfigError("DataX 配置文件中没有 job.content")
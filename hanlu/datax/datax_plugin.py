@@ -0,0 +1,223 @@
+"""
+DataX Reader / Writer 插件的处理器注册表
+
+处理器的参数为分析器和插件的 parameter 配置，Reader 处理器返回包含依赖数据节点的数据任务对象，Writer 处理器返回包含生成
+数据节点的数据任务对象。无法分析时通过分析器的 fail 方法返回推断失败的数据任务对象，配置格式错误时抛出 DataXConfigError。
+"""
+
+import hashlib
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from hanlu.common.string_utils import parse_jdbc_url
+from hanlu.data_node import DEndpointInstance
+from hanlu.data_node import DHdfsInstance
+from hanlu.data_node import DInstance
+from hanlu.data_node import DNode
+from hanlu.data_node import DType
+from hanlu.data_task import DTask
+from hanlu.datax.datax_config_scanner import DataXConfigError
+
+__all__ = [
+    "DataXHandler",
+    "DataXPluginRegistry",
+    "DEFAULT_DATAX_REGISTRY",
+]
+
+# 处理器：(分析器, 插件的 parameter 配置, 是否为 Reader) -> 数据任务对象
+DataXHandler = Callable[[Any, Dict[str, Any], bool], DTask]
+
+
+class DataXPluginRegistry:
+    """DataX 插件名称到处理器的注册表"""
+
+    def __init__(self):
+        self._reader_hash: Dict[str, DataXHandler] = {}
+        self._writer_hash: Dict[str, DataXHandler] = {}
+        self._fingerprint: Optional[str] = None  # 注册表内容的指纹缓存，注册处理器时清空
+
+    def regist_reader(self, name: str, handler: DataXHandler) -> None:
+        """注册 Reader 插件的处理器
+
+        Parameters
+        ----------
+        name : str
+            插件名称，如 mysqlreader
+        handler : DataXHandler
+            处理器
+        """
+        self._reader_hash[name] = handler
+        self._fingerprint = None
+
+    def regist_writer(self, name: str, handler: DataXHandler) -> None:
+        """注册 Writer 插件的处理器
+
+        Parameters
+        ----------
+        name : str
+            插件名称，如 hdfswriter
+        handler : DataXHandler
+            处理器
+        """
+        self._writer_hash[name] = handler
+        self._fingerprint = None
+
+    def get_reader(self, name: str) -> Optional[DataXHandler]:
+        return self._reader_hash.get(name)
+
+    def get_writer(self, name: str) -> Optional[DataXHandler]:
+        return self._writer_hash.get(name)
+
+    def fingerprint(self) -> str:
+        """返回插件名称与处理器（模块名和限定名）的哈希值，参与 DataX 分析结果缓存键的计算"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for plugin_type, handler_hash in [("reader", self._reader_hash), ("writer", self._writer_hash)]:
+                for name in sorted(handler_hash):
+                    handler = handler_hash[name]
+                    digest.update(f"{plugin_type}:{name}:{getattr(handler, '__module__', None)}."
+                                  f"{getattr(handler, '__qualname__', repr(handler))}\x00".encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def copy(self) -> "DataXPluginRegistry":
+        """复制注册表，用于在不影响默认注册表的情况下注册自定义处理器"""
+        registry = DataXPluginRegistry()
+        registry._reader_hash = self._reader_hash.copy()
+        registry._writer_hash = self._writer_hash.copy()
+        return registry
+
+
+# ------------------------------ 内置处理器 ------------------------------
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _create_task(nodes: Iterable[DNode], is_reader: bool) -> DTask:
+    data_task = DTask.empty()
+    for data_node in nodes:
+        if is_reader:
+            data_task.add_dependent_node(data_node)
+        else:
+            data_task.add_generate_node(data_node)
+    return data_task
+
+
+def _table_node(analyzer, data_instance: Optional[DInstance], table: str, schema_name: Optional[str] = None) -> DNode:
+    """构造表的数据源对象，表名中包含库名（db.table）时使用表名中的库名，否则使用 schema_name 作为默认库名"""
+    table = table.strip().replace("`", "")
+    if "." in table:
+        table_schema_name, table = table.split(".", 1)
+        return analyzer.create_table_node(data_instance, table_schema_name, table)
+    return analyzer.create_table_node(data_instance, None, table, schema_name)
+
+
+def _get_connection_list(parameter: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if "connection" not in parameter:
+        raise DataXConfigError("缺少 connection 配置")
+    return _as_list(parameter["connection"])
+
+
+def _rdbms_handler(analyzer, parameter: Dict[str, Any], is_reader: bool) -> DTask:
+    """关系型数据库（MySQL 协议）插件：根据 jdbcUrl 和 table 确定数据节点，Reader 的 querySql 作为 SQL 分析"""
+    data_task = DTask.empty()
+    username = parameter.get("username")
+    password = parameter.get("password")
+    for connection in _get_connection_list(parameter):
+        jdbc_url_list = _as_list(connection.get("jdbcUrl"))
+        if not jdbc_url_list:
+            raise DataXConfigError("缺少 jdbcUrl 配置")
+        data_instance = analyzer.hanlu_env.get_instance_by_jdbc_url(jdbc_url_list[0], user_name=username,
+                                                                    password=password)
+        data_task += _create_task((_table_node(analyzer, data_instance, table)
+                                   for table in _as_list(connection.get("table"))), is_reader)
+        if is_reader:
+            for query_sql in _as_list(connection.get("querySql")):
+                data_task += analyzer.analyze_query_sql(data_instance, query_sql)
+    return data_task
+
+
+def _hdfs_instance(parameter: Dict[str, Any]) -> DHdfsInstance:
+    default_fs = parameter["defaultFS"]
+    if default_fs.startswith("obs://"):
+        return DHdfsInstance.create_obs_instance(
+            name=None,
+            fs_obs_end_point=parameter.get("hadoopConfig", {}).get("fs.obs.endpoint"),
+            fs_obs_bucket=default_fs.replace("obs://", "").strip("/")
+        )
+    return DHdfsInstance.create_hdfs_instance(name=None, default_fs=default_fs.rstrip("/"))
+
+
+def _hdfs_handler(analyzer, parameter: Dict[str, Any], is_reader: bool) -> DTask:
+    """HDFS 插件：路径能对应到 Hive 表时使用 Hive 表，否则使用 HDFS 路径作为数据节点"""
+    if "defaultFS" not in parameter or "path" not in parameter:
+        raise DataXConfigError("缺少 defaultFS 或 path 配置")
+    hdfs_instance = _hdfs_instance(parameter)
+    nodes = []
+    for path in _as_list(parameter["path"]):
+        data_node = analyzer.hanlu_env.get_hive_node_by_hdfs_path(hdfs_instance, path)
+        if data_node is None:
+            data_node = DNode.create(instance=hdfs_instance, table_name=path)
+        nodes.append(data_node)
+    return _create_task(nodes, is_reader)
+
+
+def _hive_handler(analyzer, parameter: Dict[str, Any], is_reader: bool) -> DTask:
+    """Hive 插件：包含 connection 时按 JDBC 方式处理，否则按 HDFS 方式处理"""
+    if "connection" in parameter:
+        return _rdbms_handler(analyzer, parameter, is_reader)
+    return _hdfs_handler(analyzer, parameter, is_reader)
+
+
+def _doris_handler(analyzer, parameter: Dict[str, Any], is_reader: bool) -> DTask:
+    """Doris 插件：以 jdbcUrl 中的主机列表（或 loadUrl）作为实例地址"""
+    nodes = []
+    for connection in _get_connection_list(parameter):
+        jdbc_url_list = _as_list(connection.get("jdbcUrl"))
+        jdbc_url_info = parse_jdbc_url(jdbc_url_list[0]) if jdbc_url_list else None
+        if jdbc_url_info is not None:
+            endpoint = ",".join(jdbc_url_info.hosts)
+            schema_name = jdbc_url_info.schema_name
+        else:
+            endpoint = ",".join(_as_list(parameter.get("loadUrl")))
+            schema_name = None
+        if not endpoint:
+            raise DataXConfigError("缺少 jdbcUrl 或 loadUrl 配置")
+        schema_name = connection.get("selectedDatabase") or schema_name
+        data_instance = DEndpointInstance.create(DType.DORIS, endpoint)
+        nodes.extend(_table_node(analyzer, data_instance, table, schema_name)
+                     for table in _as_list(connection.get("table")))
+    return _create_task(nodes, is_reader)
+
+
+def _elasticsearch_handler(analyzer, parameter: Dict[str, Any], is_reader: bool) -> DTask:
+    """ElasticSearch 插件：以 endpoint 作为实例地址，以 index 作为表名"""
+    if "endpoint" not in parameter or "index" not in parameter:
+        raise DataXConfigError("缺少 endpoint 或 index 配置")
+    data_instance = DEndpointInstance.create(DType.ES, parameter["endpoint"])
+    return _create_task([DNode.create(instance=data_instance, table_name=parameter["index"])], is_reader)
+
+
+def _kafka_handler(analyzer, parameter: Dict[str, Any], is_reader: bool) -> DTask:
+    """Kafka 插件：以 bootstrapServers 作为实例地址，以 topic 作为表名"""
+    bootstrap_servers = parameter.get("bootstrapServers") or parameter.get("bootstrap.servers")
+    if bootstrap_servers is None or "topic" not in parameter:
+        raise DataXConfigError("缺少 bootstrapServers 或 topic 配置")
+    data_instance = DEndpointInstance.create(DType.KAFKA, bootstrap_servers)
+    return _create_task([DNode.create(instance=data_instance, table_name=topic)
+                         for topic in _as_list(parameter["topic"])], is_reader)
+
+
+DEFAULT_DATAX_REGISTRY = DataXPluginRegistry()
+for _plugin, _handler in [("mysql", _rdbms_handler),
+                          ("hdfs", _hdfs_handler),
+                          ("hive", _hive_handler),
+                          ("doris", _doris_handler),
+                          ("elasticsearch", _elasticsearch_handler),
+                          ("kafka", _kafka_handler)]:
+    DEFAULT_DATAX_REGISTRY.regist_reader(f"{_plugin}reader", _handler)
+    DEFAULT_DATAX_REGISTRY.regist_writer(f"{_plugin}writer", _handler)
@@ -0,0 +1,6 @@
+"""
+海豚调度元数据读取（依赖 pymysql）
+"""
+
+from hanlu.dolphin_meta.dolphin_env_mysql import MySQLDolphinEnv
+from hanlu.dolphin_meta.dolphin_meta_reader import DolphinMetaReader
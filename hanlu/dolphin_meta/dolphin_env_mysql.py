@@ -0,0 +1,106 @@
+"""
+基于海豚调度元数据库的海豚环境类
+"""
+
+import json
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from hanlu.data_node import DInstance
+from hanlu.dolphin_meta.dolphin_meta_reader import DolphinMetaReader
+from hanlu.hanlu_env import DolphinEnv
+from hanlu.hanlu_env import HanLuEnv
+
+__all__ = [
+    "MySQLDolphinEnv",
+]
+
+# 可以通过 JDBC URL 解析的海豚数据源类型（t_ds_datasource 表的 type 字段）
+JDBC_DATASOURCE_TYPE_SET = {
+    0,  # MYSQL
+    2,  # HIVE
+    3,  # SPARK
+}
+
+
+class MySQLDolphinEnv(DolphinEnv):
+    """基于海豚调度元数据库的海豚环境类
+
+    根据 t_ds_datasource 表中的连接信息构造数据源实例，查询结果按数据源 ID 缓存；
+    调用 preload 可以一次性读取所有数据源，此后不再需要逐个任务查询数据源。
+    """
+
+    def __init__(self, reader: DolphinMetaReader, hanlu_env: HanLuEnv):
+        """
+
+        Parameters
+        ----------
+        reader : DolphinMetaReader
+            海豚调度元数据读取器（与读取任务定义共用连接池）
+        hanlu_env : HanLuEnv
+            寒露环境，用于根据 JDBC URL 构造数据源实例
+        """
+        self.reader = reader
+        self.hanlu_env = hanlu_env
+        self._instance_hash: Dict[int, Optional[DInstance]] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"reader": self.reader, "hanlu_env": self.hanlu_env, "instance_hash": self._instance_hash}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(reader=state["reader"], hanlu_env=state["hanlu_env"])
+        self._instance_hash = state["instance_hash"]
+
+    def preload(self) -> None:
+        """一次性读取 t_ds_datasource 表中的所有数据源并缓存"""
+        instance_hash = {record["id"]: self._to_instance(record) for record in self.reader.iter_datasource()}
+        with self._lock:
+            self._instance_hash.update(instance_hash)
+
+    def get_data_instance(self, data_source_id: int) -> Optional[DInstance]:
+        """根据数据源 ID 获取实例信息，查询结果会被缓存
+
+        Parameters
+        ----------
+        data_source_id : int
+            数据源 ID
+
+        Returns
+        -------
+        DInstance
+            数据源实例对象，数据源不存在时返回 None
+        """
+        with self._lock:
+            if data_source_id in self._instance_hash:
+                return self._instance_hash[data_source_id]
+
+        data_instance = None
+        for record in self.reader.iter_datasource([data_source_id]):
+            data_instance = self._to_instance(record)
+
+        with self._lock:
+            self._instance_hash[data_source_id] = data_instance
+        return data_instance
+
+    def _to_instance(self, record: Dict[str, Any]) -> DInstance:
+        """将 t_ds_datasource 表中的记录转换为数据源实例"""
+        if record["type"] not in JDBC_DATASOURCE_TYPE_SET:
+            return DInstance.unknown()
+        jdbc_url, user_name, password = split_jdbc_credentials(json.loads(record["connection_params"]))
+        if jdbc_url is None:
+            return DInstance.unknown()
+        data_instance = self.hanlu_env.get_instance_by_jdbc_url(jdbc_url, user_name=user_name, password=password)
+        if data_instance is None:
+            return DInstance.unknown()
+        return data_instance
+
+
+def split_jdbc_credentials(connection_params: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """从 t_ds_datasource 表的 connection_params 中提取 JDBC URL、用户名和密码"""
+    jdbc_url = connection_params.get("jdbcUrl")
+    if jdbc_url is None and connection_params.get("address") is not None:
+        jdbc_url = connection_params["address"].rstrip("/")
+        if connection_params.get("database"):
+            jdbc_url += "/" + connection_params["database"]
+    return jdbc_url, connection_params.get("user"), connection_params.get("password")
@@ -0,0 +1,148 @@
+"""
+海豚调度元数据读取器：使用服务端游标流式读取海豚调度元数据
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import pymysql
+
+from hanlu.common.mysql_pool import MySQLConnectionPool
+
+__all__ = [
+    "DolphinMetaReader",
+]
+
+
+class DolphinMetaReader:
+    """海豚调度元数据读取器
+
+    使用服务端游标（SSDictCursor）按固定批次大小读取，客户端同时只保存一个批次的记录，内存占用与表的大小无关。
+    """
+
+    def __init__(self, pool: MySQLConnectionPool, batch_size: int = 1000):
+        """
+
+        Parameters
+        ----------
+        pool : MySQLConnectionPool
+            海豚调度元数据库的连接池
+        batch_size : int, default = 1000
+            每批从服务端读取的记录数
+        """
+        self.pool = pool
+        self.batch_size = batch_size
+
+    def iter_task_definition(self,
+                             project_codes: Optional[Sequence[int]] = None,
+                             process_codes: Optional[Sequence[int]] = None,
+                             task_types: Optional[Sequence[str]] = None,
+                             task_codes: Optional[Sequence[int]] = None,
+                             columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """流式读取 t_ds_task_definition 表中的记录，可以直接作为 HanLuAnalyzer.analyze_dolphin_task 的参数
+
+        Parameters
+        ----------
+        project_codes : Optional[Sequence[int]], default = None
+            项目编码列表，为 None 时不过滤
+        process_codes : Optional[Sequence[int]], default = None
+            工作流编码列表，为 None 时不过滤
+        task_types : Optional[Sequence[str]], default = None
+            任务类型列表（例如 SQL、SHELL），为 None 时不过滤
+        task_codes : Optional[Sequence[int]], default = None
+            任务编码列表，为 None 时不过滤
+        columns : Optional[Sequence[str]], default = None
+            读取的字段列表，为 None 时读取所有字段
+        """
+        conditions, params = [], []
+        if task_codes is not None:
+            conditions.append(self._in_condition("`code`", task_codes, params))
+        if project_codes is not None:
+            conditions.append(self._in_condition("`project_code`", project_codes, params))
+        if process_codes is not None:
+            conditions.append("`code` IN (SELECT `post_task_code` FROM `t_ds_process_task_relation` "
+                              f"WHERE {self._in_condition('`process_definition_code`', process_codes, params)})")
+        if task_types is not None:
+            conditions.append(self._in_condition("`task_type`", task_types, params))
+        yield from self._iter_query("t_ds_task_definition", conditions, params, columns)
+
+    def iter_process_task_relation(self,
+                                   project_codes: Optional[Sequence[int]] = None,
+                                   process_codes: Optional[Sequence[int]] = None) -> Iterator[Dict[str, Any]]:
+        """流式读取 t_ds_process_task_relation 表中的记录
+
+        Parameters
+        ----------
+        project_codes : Optional[Sequence[int]], default = None
+            项目编码列表，为 None 时不过滤
+        process_codes : Optional[Sequence[int]], default = None
+            工作流编码列表，为 None 时不过滤
+        """
+        conditions, params = [], []
+        if project_codes is not None:
+            conditions.append(self._in_condition("`project_code`", project_codes, params))
+        if process_codes is not None:
+            conditions.append(self._in_condition("`process_definition_code`", process_codes, params))
+        yield from self._iter_query("t_ds_process_task_relation", conditions, params)
+
+    def iter_datasource(self, datasource_ids: Optional[Sequence[int]] = None) -> Iterator[Dict[str, Any]]:
+        """流式读取 t_ds_datasource 表中的记录
+
+        Parameters
+        ----------
+        datasource_ids : Optional[Sequence[int]], default = None
+            数据源 ID 列表，为 None 时读取所有数据源
+        """
+        conditions, params = [], []
+        if datasource_ids is not None:
+            conditions.append(self._in_condition("`id`", datasource_ids, params))
+        yield from self._iter_query("t_ds_datasource", conditions, params)
+
+    def iter_batches(self, records: Iterator[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        """将流式读取的记录按 batch_size 分批"""
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _iter_query(self, table_name: str, conditions: List[str], params: List[Any],
+                    columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, Any]]:
+        """使用服务端游标执行查询并逐条返回记录
+
+        如果调用方没有读取完所有记录就停止迭代，服务端游标中剩余的记录无法丢弃，此时关闭连接而不归还到连接池。
+        """
+        columns_str = "*" if columns is None else ", ".join(f"`{column}`" for column in columns)
+        sql = f"SELECT {columns_str} FROM `{table_name}`"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        connection = self.pool.acquire()
+        finished = False
+        try:
+            cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+            cursor.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                yield from rows
+            cursor.close()
+            finished = True
+        finally:
+            if finished:
+                self.pool.release(connection)
+            else:
+                self.pool.discard(connection)
+
+    @staticmethod
+    def _in_condition(column: str, values: Sequence[Any], params: List[Any]) -> str:
+        """构造 IN 条件并将参数添加到参数列表"""
+        values = list(values)
+        if not values:
+            return "FALSE"
+        params.extend(values)
+        return f"{column} IN ({', '.join(['%s'] * len(values))})"
+
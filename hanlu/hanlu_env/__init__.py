@@ -1,2 +1,4 @@
 from hanlu.hanlu_env.dolphin_env import DolphinEnv
 from hanlu.hanlu_env.hanlu_env import HanLuEnv
+from hanlu.hanlu_env.hanlu_env import HiveLocation
+from hanlu.hanlu_env.table_catalog import TableCatalog
@@ -2,15 +2,24 @@
 寒露环境类
 """
 import collections
-from typing import Dict, List, Optional, Set
-
+import dataclasses
+import hashlib
+import posixpath
+from typing import Dict, List, Optional, Set, Tuple
+
+from hanlu.common.path_trie import PathTrie
+from hanlu.common.path_trie import strip_scheme
+from hanlu.common.string_utils import parse_jdbc_url
 from hanlu.data_node import DHdfsInstance
 from hanlu.data_node import DHiveInstance
 from hanlu.data_node import DInstance
 from hanlu.data_node import DMySQLInstance
+from hanlu.data_node import DNode
+from hanlu.spark import SparkLineageTemplate
 from metasequoia_shell.simu_env import SimuConfiguration
 
 __all__ = [
+    "HiveLocation",
     "HanLuEnv"
 ]
 
@@ -35,6 +44,19 @@ DEFAULT_IGNORE_COMMAND_SET = {
     "export",
 }
 
+MYSQL_DEFAULT_PORT = 3306  # MySQL 默认端口号
+DEFAULT_SCHEMA_NAME = "default"  # Hive 的默认库名，default 库的表目录直接位于 Hive 根路径下
+JDBC_INSTANCE_CACHE_SIZE = 4096  # JDBC URL 解析得到的实例对象的缓存大小
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class HiveLocation:
+    """HDFS 路径对应的 Hive 位置：注册的 Hive 根路径只包含集群名称，注册的表路径包含库名和表名"""
+
+    hive_name: str = dataclasses.field(kw_only=True)  # Hive 集群名称
+    schema_name: Optional[str] = dataclasses.field(kw_only=True, default=None)  # 库名
+    table_name: Optional[str] = dataclasses.field(kw_only=True, default=None)  # 表名
+
 
 class HanLuEnv:
     """寒露环境类"""
@@ -50,13 +72,27 @@ class HanLuEnv:
         # MySQL 主机到 MySQL 名称的映射
         self._mysql_host_to_name_hash: Dict[str, str] = {}
 
-        # HDFS 信息到 Hive 名称的映射
-        self._hdfs_info_to_hive_name_hash: Dict[DHdfsInstance, Dict[str, str]] = collections.defaultdict(dict)
+        # （JDBC URL, 用户名, 密码）到实例对象的缓存，使用最近最少使用（LRU）策略淘汰，注册集群或服务器时清空
+        self._jdbc_instance_cache: collections.OrderedDict[Tuple[str, Optional[str], Optional[str]],
+                                                           Optional[DInstance]] = collections.OrderedDict()
+
+        # HDFS 实例到路径前缀树的映射，前缀树中的值为路径对应的 Hive 位置
+        self._hdfs_path_trie_hash: Dict[DHdfsInstance, PathTrie[HiveLocation]] = collections.defaultdict(PathTrie)
+
+        # ------------------------------ Spark 配置信息 ------------------------------
+        # （Application, 主类）到血缘模板的映射，Application 可以是完整路径或文件名
+        self._spark_template_hash: Dict[Tuple[str, Optional[str]], SparkLineageTemplate] = {}
+
+        # Spark 作业默认访问的 Hive 集群名称
+        self._spark_hive_name: Optional[str] = None
 
         # ------------------------------ Shell 配置信息 ------------------------------
         self._shell_ignore_command_set: Set[str] = DEFAULT_IGNORE_COMMAND_SET  # Shell 忽略命令的集合
         self._shell_configuration = SimuConfiguration()  # Shell 解析器配置信息
 
+        # 注册信息的指纹：每次注册时与注册参数一起哈希，相同顺序的相同注册得到相同的指纹
+        self._fingerprint = ""
+
     @property
     def shell_ignore_command_set(self) -> Set[str]:
         return self._shell_ignore_command_set
@@ -65,6 +101,13 @@ class HanLuEnv:
     def shell_parser_configuration(self) -> SimuConfiguration:
         return self._shell_configuration
 
+    def fingerprint(self) -> str:
+        """返回注册信息的指纹，参与分析结果缓存键的计算，注册新的集群、路径或模板后旧的缓存结果不再命中"""
+        return self._fingerprint
+
+    def _update_fingerprint(self, *args: object) -> None:
+        self._fingerprint = hashlib.sha256((self._fingerprint + repr(args)).encode("utf-8")).hexdigest()
+
     def is_shell_ignore_command(self, command: str) -> bool:
         """判断命令是否为 Shell 忽略的命令
 
@@ -89,6 +132,7 @@ class HanLuEnv:
             命令名称
         """
         self._shell_ignore_command_set.add(command)
+        self._update_fingerprint("shell_ignore_command", command)
 
     def regist_hive_cluster(self, hosts: List[str], name: str,
                             hdfs_instance: Optional[DHdfsInstance] = None,
@@ -104,14 +148,38 @@ class HanLuEnv:
         hdfs_instance : Optional[DHdfsInstance], default = None
             HDFS 实例对象
         hdfs_root_path : Optional[str], default = None
-            HDFS 根路径
+            HDFS 根路径（可以包含 hdfs://、obs:// 等前缀）
         """
+        self._update_fingerprint("hive_cluster", hosts, name, hdfs_instance, hdfs_root_path)
         for host in hosts:
             self._hive_host_to_name_hash[host] = name
         self._hive_name_to_hosts_hash[name] = hosts
+        self._jdbc_instance_cache.clear()
 
         if hdfs_instance is not None and hdfs_root_path is not None:
-            self._hdfs_info_to_hive_name_hash[hdfs_instance][hdfs_root_path] = name
+            self._hdfs_path_trie_hash[hdfs_instance].insert(strip_scheme(hdfs_root_path), HiveLocation(hive_name=name))
+
+    def regist_hive_table_location(self, hdfs_instance: DHdfsInstance, path: str, hive_name: str,
+                                   schema_name: str, table_name: str) -> None:
+        """注册 Hive 表的存储路径（用于存储路径不在库目录下的外部表）
+
+        Parameters
+        ----------
+        hdfs_instance : DHdfsInstance
+            HDFS 实例对象
+        path : str
+            表的存储路径（可以包含 hdfs://、obs:// 等前缀）
+        hive_name : str
+            Hive 集群名称
+        schema_name : str
+            库名（转换为小写）
+        table_name : str
+            表名（转换为小写）
+        """
+        self._update_fingerprint("hive_table_location", hdfs_instance, path, hive_name, schema_name, table_name)
+        self._hdfs_path_trie_hash[hdfs_instance].insert(
+            strip_scheme(path),
+            HiveLocation(hive_name=hive_name, schema_name=schema_name.lower(), table_name=table_name.lower()))
 
     def regist_mysql_server(self, host: str, port: int, name: str) -> None:
         """注册 MySQL 服务器
@@ -125,7 +193,70 @@ class HanLuEnv:
         name : str
             服务器名称
         """
+        self._update_fingerprint("mysql_server", host, port, name)
         self._mysql_host_to_name_hash[f"{host}:{port}"] = name
+        self._jdbc_instance_cache.clear()
+
+    def regist_spark_submit_template(self, application: str, arg_class: Optional[str],
+                                     template: SparkLineageTemplate) -> None:
+        """注册 spark-submit 作业的血缘模板
+
+        Parameters
+        ----------
+        application : str
+            Jar 包或 Python 脚本的路径；只包含文件名时匹配任意目录下的同名文件
+        arg_class : Optional[str]
+            主类（--class），Python 脚本为 None
+        template : SparkLineageTemplate
+            血缘模板
+        """
+        self._update_fingerprint("spark_submit_template", application, arg_class, template)
+        self._spark_template_hash[(application, arg_class)] = template
+
+    def get_spark_submit_template(self, application: str, arg_class: Optional[str]) -> Optional[SparkLineageTemplate]:
+        """根据 Application 和主类查找血缘模板，优先匹配完整路径，其次匹配文件名；不存在时返回 None
+
+        Parameters
+        ----------
+        application : str
+            Jar 包或 Python 脚本的路径
+        arg_class : Optional[str]
+            主类（--class）
+        """
+        template = self._spark_template_hash.get((application, arg_class))
+        if template is None:
+            template = self._spark_template_hash.get((posixpath.basename(application), arg_class))
+        return template
+
+    def regist_spark_hive(self, hive_name: str) -> None:
+        """注册 Spark 作业默认访问的 Hive 集群
+
+        Parameters
+        ----------
+        hive_name : str
+            Hive 集群名称
+        """
+        self._update_fingerprint("spark_hive", hive_name)
+        self._spark_hive_name = hive_name
+
+    def get_hive_instance_by_name(self, hive_name: Optional[str]) -> DInstance:
+        """根据集群名称构造 Hive 实例对象（驻留对象），名称为 None 时返回 Spark 作业默认访问的 Hive 集群
+
+        Parameters
+        ----------
+        hive_name : Optional[str]
+            Hive 集群名称
+
+        Returns
+        -------
+        DInstance
+            Hive 实例对象，没有指定集群且没有注册 Spark 默认集群时返回未知实例
+        """
+        if hive_name is None:
+            hive_name = self._spark_hive_name
+        if hive_name is None:
+            return DInstance.unknown()
+        return DHiveInstance.create(hosts=self._hive_name_to_hosts_hash.get(hive_name, []), name=hive_name)
 
     def get_instance_by_jdbc_url(self,
                                  jdbc_url: str,
@@ -145,46 +276,138 @@ class HanLuEnv:
         Returns
         -------
         DInstance
-            实例对象
+            实例对象（驻留对象），无法识别的 JDBC URL 返回 None
+
+        解析结果按（JDBC URL, 用户名, 密码）缓存，超过 JDBC_INSTANCE_CACHE_SIZE 时淘汰最近最少使用的结果，注册 Hive 集群或
+        MySQL 服务器时清空缓存。
+        """
+        cache_key = (jdbc_url, user_name, password)
+        if cache_key in self._jdbc_instance_cache:
+            self._jdbc_instance_cache.move_to_end(cache_key)
+            return self._jdbc_instance_cache[cache_key]
+        data_instance = self._resolve_jdbc_url(jdbc_url, user_name, password)
+        self._jdbc_instance_cache[cache_key] = data_instance
+        if len(self._jdbc_instance_cache) > JDBC_INSTANCE_CACHE_SIZE:
+            self._jdbc_instance_cache.popitem(last=False)
+        return data_instance
+
+    def _resolve_jdbc_url(self,
+                          jdbc_url: str,
+                          user_name: Optional[str],
+                          password: Optional[str]) -> Optional[DInstance]:
+        """解析 JDBC URL 并构造驻留的实例对象
+
+        URL 中的任意主机已注册时，使用注册的集群名称；Hive 集群使用注册时的主机列表，MySQL 服务器使用注册的主机和端口，
+        因此主机顺序不同的 URL 得到同一个实例对象。
         """
-        if not jdbc_url.startswith("jdbc:"):
+        if jdbc_url is None or not jdbc_url.startswith("jdbc:"):
             return DInstance.unknown()
 
-        jdbc_url = jdbc_url[5:]
+        jdbc_url_info = parse_jdbc_url(jdbc_url)
+        if jdbc_url_info is None or not jdbc_url_info.hosts:
+            return None
 
         # Hive 集群：样例 jdbc:hive2://xxx.xxx.xxx.xxx:2181,xxx.xxx.xxx.xxx:2181,xxx.xxx.xxx.xxx:2181/test;serviceDiscoveryMode=zooKeeper;zooKeeperNamespace=hiveserver2;
-        if jdbc_url.startswith("hive2://"):
-            hive_info = jdbc_url[8:].split(";")[0]
-            if "/" in hive_info:
-                hosts_str, schema_name = hive_info.split("/")
-            else:
-                hosts_str, schema_name = hive_info, None
-
-            hosts = hosts_str.split(",")
+        if jdbc_url_info.protocol == "hive2":
+            name = self._find_name(self._hive_host_to_name_hash, jdbc_url_info.hosts)
             return DHiveInstance.create(
-                hosts=hosts,
-                name=self._hive_host_to_name_hash.get(hosts[0]),
+                hosts=self._hive_name_to_hosts_hash[name] if name is not None else list(jdbc_url_info.hosts),
+                name=name,
                 username=user_name,
                 password=password,
-                schema_name=schema_name,
+                schema_name=jdbc_url_info.schema_name,
             )
 
-        if jdbc_url.startswith("mysql://"):
-            mysql_info = jdbc_url[8:]
-            if "/" in mysql_info:
-                host_and_port, schema_name = mysql_info.split("/")
-            else:
-                host_and_port, schema_name = mysql_info, None
-            host, port = host_and_port.split(":")
+        # MySQL 服务器：样例 jdbc:mysql://xxx.xxx.xxx.xxx:3306,xxx.xxx.xxx.xxx:3306/test?useSSL=false
+        if jdbc_url_info.protocol == "mysql":
+            host_and_port_list = [host if ":" in host else f"{host}:{MYSQL_DEFAULT_PORT}"
+                                  for host in jdbc_url_info.hosts]
+            name = None
+            host_and_port = host_and_port_list[0]
+            for candidate in host_and_port_list:
+                if candidate in self._mysql_host_to_name_hash:
+                    name, host_and_port = self._mysql_host_to_name_hash[candidate], candidate
+                    break
+            host, port = host_and_port.rsplit(":", 1)
             return DMySQLInstance.create(
                 host=host,
                 port=int(port),
-                name=self._mysql_host_to_name_hash.get(host_and_port),
-                username=user_name,
-                password=password,
-                schema_name=schema_name
+                name=name,
+                username=user_name if user_name is not None else jdbc_url_info.get_param("user"),
+                password=password if password is not None else jdbc_url_info.get_param("password"),
+                schema_name=jdbc_url_info.schema_name
             )
 
+        return None
+
+    @staticmethod
+    def _find_name(host_to_name_hash: Dict[str, str], hosts: Tuple[str, ...]) -> Optional[str]:
+        """返回主机列表中第一个已注册主机的名称"""
+        for host in hosts:
+            name = host_to_name_hash.get(host)
+            if name is not None:
+                return name
+        return None
+
+    def get_hive_location_by_hdfs_path(self, hdfs_instance: DHdfsInstance, path: str) -> Optional[HiveLocation]:
+        """根据 HDFS 实例对象和路径，使用最长前缀匹配查找对应的 Hive 集群、库名和表名，时间复杂度为 O(路径深度)
+
+        匹配到 Hive 根路径时，根路径之后的第 1 个目录为库目录（xxx.db），第 2 个目录为表目录；根路径下不以 .db 结尾的目录为 default
+        库的表目录。表目录之后的分区目录（如 dt=20240101）和文件不影响结果。匹配到注册的表路径时直接使用注册的库名和表名。Hive 的
+        库名和表名不区分大小写，均转换为小写。
+
+        Parameters
+        ----------
+        hdfs_instance : DHdfsInstance
+            HDFS 实例对象
+        path : str
+            HDFS 路径（可以包含 hdfs://、obs:// 等前缀）
+
+        Returns
+        -------
+        Optional[HiveLocation]
+            Hive 位置，没有匹配的路径时返回 None；路径中没有库目录或表目录时，对应的库名或表名为 None
+        """
+        path_trie = self._hdfs_path_trie_hash.get(hdfs_instance)
+        if path_trie is None:
+            return None
+        match = path_trie.longest_prefix(strip_scheme(path))
+        if match is None:
+            return None
+        location, components = match
+        if location.schema_name is not None:
+            return location
+
+        schema_name = table_name = None
+        if len(components) >= 1 and "=" not in components[0]:
+            if components[0].lower().endswith(".db"):
+                schema_name = components[0][:-3].lower()
+                if len(components) >= 2 and "=" not in components[1]:
+                    table_name = components[1].lower()
+            else:  # default 库的表目录直接位于根路径下
+                schema_name, table_name = DEFAULT_SCHEMA_NAME, components[0].lower()
+        return HiveLocation(hive_name=location.hive_name, schema_name=schema_name, table_name=table_name)
+
+    def get_hive_node_by_hdfs_path(self, hdfs_instance: DHdfsInstance, path: str) -> Optional[DNode]:
+        """根据 HDFS 实例对象和路径，构造对应 Hive 表的数据源对象，无法确定库名和表名时返回 None
+
+        Parameters
+        ----------
+        hdfs_instance : DHdfsInstance
+            HDFS 实例对象
+        path : str
+            HDFS 路径
+        """
+        location = self.get_hive_location_by_hdfs_path(hdfs_instance, path)
+        if location is None or location.schema_name is None or location.table_name is None:
+            return None
+        return DNode.create(
+            instance=DHiveInstance.create(hosts=self._hive_name_to_hosts_hash.get(location.hive_name, []),
+                                          name=location.hive_name),
+            schema_name=location.schema_name,
+            table_name=location.table_name
+        )
+
     def get_hive_instance_by_hdfs_instance(self, hdfs_instance: DHdfsInstance, path: str) -> Optional[DHiveInstance]:
         """根据 HDFS 实例对象和路径，构造对应 Hive 的实例对象
 
@@ -198,19 +421,13 @@ class HanLuEnv:
         Returns
         -------
         DHdfsInstance
-            Hive 实例对象
+            Hive 实例对象，没有匹配的路径或路径中没有库目录时返回 None
         """
-        if hdfs_instance not in self._hdfs_info_to_hive_name_hash:
+        location = self.get_hive_location_by_hdfs_path(hdfs_instance, path)
+        if location is None or location.schema_name is None:
             return None
-        for root_path, hive_name in self._hdfs_info_to_hive_name_hash[hdfs_instance].items():
-            if path.startswith(root_path):
-                path = path[len(root_path):]
-                if path.startswith("/"):
-                    path = path[1:]
-                schema_name = path[:path.index("/")].replace(".db", "")
-                return DHiveInstance.create(
-                    hosts=self._hive_name_to_hosts_hash[hive_name],
-                    name=hive_name,
-                    schema_name=schema_name
-                )
-        return None
+        return DHiveInstance.create(
+            hosts=self._hive_name_to_hosts_hash.get(location.hive_name, []),
+            name=location.hive_name,
+            schema_name=location.schema_name
+        )
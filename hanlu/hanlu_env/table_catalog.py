@@ -0,0 +1,140 @@
+"""
+Hive 表目录：从 Hive 元数据库导出文件中批量加载的库名和表名，用于规范化 SQL 中的表名
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from hanlu.common.metastore_dump import iter_metastore_dump
+
+__all__ = [
+    "TableCatalog",
+]
+
+DEFAULT_SCHEMA_NAME = "default"  # Hive 的默认库名
+
+
+class TableCatalog:
+    """Hive 表目录
+
+    以 (数据实例名称, 库名, 表名) 的集合和 (数据实例名称, 表名) 到库名列表的索引保存表，规范化表名时只需常数次字典查询，不访问元数据库。
+    数据实例名称为 None 的表适用于所有数据实例，查询时优先使用与数据实例同名的表。库名和表名均转换为小写。
+    """
+
+    def __init__(self):
+        self._table_set: Set[Tuple[Optional[str], str, str]] = set()
+        self._schema_index: Dict[Tuple[Optional[str], str], Tuple[str, ...]] = {}  # 表名到包含该表的库名的索引
+        self._fingerprint: Optional[str] = None  # 表目录内容的指纹缓存，添加表时清空
+
+    def __len__(self) -> int:
+        return len(self._table_set)
+
+    def __contains__(self, item: Tuple[Optional[str], str, str]) -> bool:
+        """判断 (数据实例名称, 库名, 表名) 的表是否存在（库名和表名需要为小写）"""
+        instance_name, schema_name, table_name = item
+        if item in self._table_set:
+            return True
+        return instance_name is not None and (None, schema_name, table_name) in self._table_set
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"table_set": self._table_set, "fingerprint": self._fingerprint}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__()
+        self.add_tables(state["table_set"])
+        self._fingerprint = state.get("fingerprint")
+
+    def fingerprint(self) -> str:
+        """返回表目录中所有表的哈希值，参与 SQL 血缘分析结果缓存键的计算；添加表后首次调用时重新计算"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            # 数据实例名称可能为 None，排序时转换为字符串
+            for table in sorted(self._table_set, key=lambda item: (item[0] or "", item[0] is not None) + item[1:]):
+                digest.update(repr(table).encode("utf-8"))
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def add_tables(self, tables: Iterable[Tuple[Optional[str], str, str]]) -> int:
+        """批量添加表，返回新增的表数量
+
+        Parameters
+        ----------
+        tables : Iterable[Tuple[Optional[str], str, str]]
+            (数据实例名称, 库名, 表名) 的元组，数据实例名称为 None 时适用于所有数据实例
+        """
+        table_set = self._table_set
+        schema_index = self._schema_index
+        count = 0
+        for instance_name, schema_name, table_name in tables:
+            table = (instance_name, schema_name.lower(), table_name.lower())
+            if table in table_set:
+                continue
+            table_set.add(table)
+            key = (instance_name, table[2])
+            schema_index[key] = schema_index.get(key, ()) + (table[1],)
+            count += 1
+        if count > 0:
+            self._fingerprint = None
+        return count
+
+    def load_metastore_dump(self, path: str, instance_name: Optional[str] = None) -> int:
+        """从 Hive 元数据库的导出文件中批量加载表，返回新增的表数量
+
+        导出文件的格式见 common.metastore_dump.iter_metastore_dump，需要包含 db_name 和 tbl_name 字段；使用
+        METASTORE_TABLE_DUMP_SQL 或 METASTORE_COLUMN_DUMP_SQL 导出的文件均可加载。
+
+        Parameters
+        ----------
+        path : str
+            导出文件路径
+        instance_name : Optional[str], default = None
+            数据实例名称，为 None 时适用于所有数据实例
+
+        Raises
+        ------
+        ValueError
+            表头缺少必要的字段
+        """
+        rows = iter_metastore_dump(path, ("db_name", "tbl_name"), required_fields=("db_name", "tbl_name"))
+        return self.add_tables((instance_name, schema_name, table_name) for schema_name, table_name in rows)
+
+    def get_schema_names(self, instance_name: Optional[str], table_name: str) -> Tuple[str, ...]:
+        """返回包含该表名的所有库名（小写）"""
+        table_name = table_name.lower()
+        schema_names = self._schema_index.get((instance_name, table_name), ())
+        if instance_name is not None:
+            schema_names += tuple(schema_name for schema_name in self._schema_index.get((None, table_name), ())
+                                  if schema_name not in schema_names)
+        return schema_names
+
+    def canonicalize(self, instance_name: Optional[str], schema_name: Optional[str], table_name: str,
+                     default_schema: Optional[str] = None) -> Tuple[Optional[str], str]:
+        """规范化 SQL 中的表名，返回小写的 (库名, 表名)；Hive 的库名和表名不区分大小写，表目录只用于补全没有库名的表名
+
+        - 指定了库名或默认库名时，使用该库名（不要求表存在于表目录中）
+        - 库名和默认库名均未指定时，如果只有一个库包含该表名，则使用该库；如果多个库包含该表名，则使用 Hive 默认库（default
+          库包含该表名时）；否则库名为 None
+
+        Parameters
+        ----------
+        instance_name : Optional[str]
+            SQL 运行的数据实例名称
+        schema_name : Optional[str]
+            SQL 中的库名
+        table_name : str
+            SQL 中的表名
+        default_schema : Optional[str], default = None
+            默认库名（如 USE 语句或 beeline 的 -d 参数指定的库名）
+        """
+        if schema_name is None:
+            schema_name = default_schema
+        table_name = table_name.lower()
+        if schema_name is not None:
+            return schema_name.lower(), table_name
+
+        schema_names = self.get_schema_names(instance_name, table_name)
+        if len(schema_names) == 1:
+            return schema_names[0], table_name
+        if DEFAULT_SCHEMA_NAME in schema_names:
+            return DEFAULT_SCHEMA_NAME, table_name
+        return None, table_name
@@ -0,0 +1,9 @@
+"""
+寒露元数据库（hanlu_meta）读写（依赖 pymysql）
+"""
+
+from hanlu.meta_store.incremental import IncrementalAnalyzer
+from hanlu.meta_store.incremental import IncrementalResult
+from hanlu.meta_store.lineage_store import LineageStore
+from hanlu.meta_store.lineage_store import TaskCheckpoint
+from hanlu.meta_store.lineage_writer import LineageWriter
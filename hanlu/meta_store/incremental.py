@@ -0,0 +1,140 @@
+"""
+增量血缘分析：只分析新增或变更的海豚任务定义
+"""
+
+import dataclasses
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from hanlu.analyzer_batch import BatchReport
+from hanlu.analyzer_batch import analyze_dolphin_tasks
+from hanlu.analyzer_main import HanLuAnalyzer
+from hanlu.data_task import DTaskFailReason
+from hanlu.dolphin_meta import DolphinMetaReader
+from hanlu.meta_store.lineage_store import LineageStore
+from hanlu.meta_store.lineage_store import TaskCheckpoint
+from hanlu.meta_store.lineage_writer import LineageWriter
+
+__all__ = [
+    "IncrementalResult",
+    "IncrementalAnalyzer",
+    "TRANSIENT_FAIL_REASON_SET",
+]
+
+# 暂时性的推断失败原因：结果与运行环境有关，不写入检查点，下次增量分析时重试
+TRANSIENT_FAIL_REASON_SET = {
+    DTaskFailReason.TIMEOUT,
+    DTaskFailReason.MEMORY_LIMIT,
+    DTaskFailReason.WORKER_CRASH,
+    DTaskFailReason.ANALYZE_ERROR,
+}
+
+
+@dataclasses.dataclass(slots=True)
+class IncrementalResult:
+    """增量分析的结果统计"""
+
+    changed_count: int = dataclasses.field(kw_only=True, default=0)  # 新增或变更并重新分析的任务数
+    deleted_count: int = dataclasses.field(kw_only=True, default=0)  # 已删除并清理血缘关系的任务数
+    unchanged_count: int = dataclasses.field(kw_only=True, default=0)  # 未变更而跳过的任务数
+    retry_count: int = dataclasses.field(kw_only=True, default=0)  # 暂时性失败、下次增量分析时重试的任务数
+    report: BatchReport = dataclasses.field(kw_only=True, default_factory=BatchReport)  # 批量分析的统计报告
+
+
+class IncrementalAnalyzer:
+    """增量血缘分析器
+
+    对比 t_ds_task_definition 中各任务的 (code, version, update_time) 与 lu_ds_task 表中记录的检查点：
+    - 新增或版本、更新时间发生变化的任务：重新分析，批量替换旧版本的关联关系并更新检查点；因超时、超出内存限制等暂时性原因
+      推断失败的任务（见 TRANSIENT_FAIL_REASON_SET）保留旧的关联关系和检查点，下次增量分析时重试
+    - 已删除的任务：删除其检查点和关联关系
+    - 其他任务：跳过
+    """
+
+    def __init__(self, analyzer: HanLuAnalyzer, reader: DolphinMetaReader, store: LineageStore,
+                 workers: int = 1, task_code_batch_size: int = 500):
+        """
+
+        Parameters
+        ----------
+        analyzer : HanLuAnalyzer
+            寒露分析器
+        reader : DolphinMetaReader
+            海豚调度元数据读取器
+        store : LineageStore
+            寒露元数据库中的血缘关系存储
+        workers : int, default = 1
+            分析变更任务的工作进程数
+        task_code_batch_size : int, default = 500
+            每次按任务编码读取任务定义的任务数
+        """
+        self.analyzer = analyzer
+        self.reader = reader
+        self.store = store
+        self.workers = workers
+        self.task_code_batch_size = task_code_batch_size
+
+    def find_changes(self, project_codes: Optional[Sequence[int]] = None
+                     ) -> Tuple[Dict[int, TaskCheckpoint], List[int], int]:
+        """对比任务定义和检查点，返回需要重新分析的任务的新检查点、已删除的任务编码列表和未变更的任务数"""
+        checkpoints = self.store.load_checkpoints()
+        changed: Dict[int, TaskCheckpoint] = {}
+        unchanged_count = 0
+        exist_codes = set()
+        for record in self.reader.iter_task_definition(project_codes=project_codes,
+                                                       columns=["code", "version", "project_code", "update_time"]):
+            exist_codes.add(record["code"])
+            checkpoint = TaskCheckpoint(task_code=record["code"],
+                                        task_version=record["version"],
+                                        project_code=record["project_code"],
+                                        task_update_time=record["update_time"])
+            old_checkpoint = checkpoints.get(record["code"])
+            if (old_checkpoint is not None
+                    and old_checkpoint.task_version == checkpoint.task_version
+                    and old_checkpoint.task_update_time == checkpoint.task_update_time):
+                unchanged_count += 1
+            else:
+                changed[record["code"]] = checkpoint
+
+        project_code_set = set(project_codes) if project_codes is not None else None
+        deleted = [task_code for task_code, checkpoint in checkpoints.items()
+                   if task_code not in exist_codes
+                   and (project_code_set is None or checkpoint.project_code in project_code_set)]
+        return changed, deleted, unchanged_count
+
+    def run(self, project_codes: Optional[Sequence[int]] = None) -> IncrementalResult:
+        """执行增量分析
+
+        Parameters
+        ----------
+        project_codes : Optional[Sequence[int]], default = None
+            项目编码列表，为 None 时分析所有项目；指定时只清理这些项目中已删除的任务
+        """
+        changed, deleted, unchanged_count = self.find_changes(project_codes)
+        result = IncrementalResult(unchanged_count=unchanged_count)
+
+        records = self._iter_changed_records(changed)
+        with LineageWriter(self.store.pool) as writer:
+            writer.preload_nodes()
+            for task_code, data_task in analyze_dolphin_tasks(self.analyzer, records, workers=self.workers,
+                                                              report=result.report):
+                if data_task.is_unknown and data_task.fail_reason in TRANSIENT_FAIL_REASON_SET:
+                    result.retry_count += 1
+                    continue
+                writer.add(changed[task_code], data_task)
+                result.changed_count += 1
+
+        self.store.delete_tasks(deleted)
+        result.deleted_count = len(deleted)
+        return result
+
+    def _iter_changed_records(self, changed: Dict[int, TaskCheckpoint]) -> Iterator[Dict[str, Any]]:
+        """按任务编码分批读取变更任务的完整定义"""
+        task_codes = list(changed)
+        for i in range(0, len(task_codes), self.task_code_batch_size):
+            for record in self.reader.iter_task_definition(task_codes=task_codes[i:i + self.task_code_batch_size]):
+                # 读取检查点后任务可能再次变更，以实际分析的版本为准
+                changed[record["code"]] = TaskCheckpoint(task_code=record["code"],
+                                                         task_version=record["version"],
+                                                         project_code=record["project_code"],
+                                                         task_update_time=record["update_time"])
+                yield record
@@ -0,0 +1,75 @@
+"""
+寒露元数据库（hanlu_meta）中的血缘关系存储
+"""
+
+import dataclasses
+import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from hanlu.common.mysql_pool import MySQLConnectionPool
+from hanlu.data_node import DNode
+
+__all__ = [
+    "TaskCheckpoint",
+    "LineageStore",
+]
+
+# lu_ds_task_node 表的关联方向
+DIRECTION_DEPENDENT = 0  # 任务依赖节点（上游）
+DIRECTION_GENERATE = 1  # 任务生成节点（下游）
+
+
+@dataclasses.dataclass(slots=True, frozen=True, eq=True)
+class TaskCheckpoint:
+    """已分析任务的检查点（lu_ds_task 表中的记录）"""
+
+    task_code: int = dataclasses.field(kw_only=True)  # 海豚任务编码
+    task_version: int = dataclasses.field(kw_only=True)  # 已分析的海豚任务版本
+    project_code: int = dataclasses.field(kw_only=True, default=0)  # 海豚项目编码
+    task_update_time: Optional[datetime.datetime] = dataclasses.field(kw_only=True, default=None)  # 海豚任务更新时间
+
+
+def node_key(data_node: DNode) -> Tuple[str, str, str]:
+    """计算数据节点在 lu_ds_node 表中的唯一键 (instance_name, schema_name, table_name)"""
+    instance_name = data_node.instance.name if data_node.instance is not None else None
+    return instance_name or "", data_node.schema_name or "", data_node.table_name or ""
+
+
+class LineageStore:
+    """寒露元数据库中的血缘关系存储"""
+
+    def __init__(self, pool: MySQLConnectionPool):
+        """
+
+        Parameters
+        ----------
+        pool : MySQLConnectionPool
+            寒露元数据库（hanlu_meta）的连接池
+        """
+        self.pool = pool
+
+    def load_checkpoints(self) -> Dict[int, TaskCheckpoint]:
+        """读取所有已分析任务的检查点"""
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT `task_code`, `task_version`, `project_code`, `task_update_time` FROM `lu_ds_task`")
+                return {row[0]: TaskCheckpoint(task_code=row[0], task_version=row[1], project_code=row[2],
+                                               task_update_time=row[3])
+                        for row in cursor.fetchall()}
+
+    def delete_tasks(self, task_codes: Iterable[int]) -> None:
+        """删除已被删除任务的检查点和关联关系"""
+        task_codes = list(task_codes)
+        if not task_codes:
+            return
+        with self.pool.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    placeholders = ", ".join(["%s"] * len(task_codes))
+                    cursor.execute(f"DELETE FROM `lu_ds_task_node` WHERE `task_code` IN ({placeholders})", task_codes)
+                    cursor.execute(f"DELETE FROM `lu_ds_task` WHERE `task_code` IN ({placeholders})", task_codes)
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+
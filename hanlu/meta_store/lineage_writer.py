@@ -0,0 +1,241 @@
+"""
+寒露元数据库（hanlu_meta）血缘关系批量写入器
+"""
+
+import dataclasses
+import json
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+from hanlu.common.mysql_pool import MySQLConnectionPool
+from hanlu.data_node import DInstance
+from hanlu.data_node import DNode
+from hanlu.data_task import DTask
+from hanlu.meta_store.lineage_store import DIRECTION_DEPENDENT
+from hanlu.meta_store.lineage_store import DIRECTION_GENERATE
+from hanlu.meta_store.lineage_store import TaskCheckpoint
+from hanlu.meta_store.lineage_store import node_key
+
+__all__ = [
+    "LineageWriter",
+]
+
+# 不写入 lu_ds_instance 表 instance_info 字段的连接信息
+SECRET_FIELD_SET = {"password", "fs_obs_access_key", "fs_obs_secret_key"}
+
+
+def instance_info(data_instance: DInstance) -> str:
+    """将数据源实例的连接信息（不包含密码和密钥）序列化为 JSON 字符串"""
+    info = {}
+    for field in dataclasses.fields(data_instance):
+        if field.name in SECRET_FIELD_SET or field.name == "data_type" or not field.compare:
+            continue
+        value = getattr(data_instance, field.name)
+        info[field.name] = list(value) if isinstance(value, tuple) else value
+    return json.dumps(info, ensure_ascii=False, sort_keys=True)
+
+
+class LineageWriter:
+    """血缘关系批量写入器
+
+    调用 add 方法的数据任务先写入缓冲区，缓冲区中的任务数达到 batch_size 时（或调用 flush 时）在同一个事务中批量写入：
+    1. 使用多行 INSERT ... ON DUPLICATE KEY UPDATE 写入数据源实例（lu_ds_instance）和数据节点（lu_ds_node）
+    2. 查询新数据节点的 ID，数据节点 ID 缓存在本地，已缓存的数据节点不再查询
+    3. 删除这些任务旧版本的关联关系，使用多行 INSERT 写入新的关联关系（lu_ds_task_node）
+    4. 使用多行 INSERT ... ON DUPLICATE KEY UPDATE 更新任务检查点（lu_ds_task）
+    """
+
+    def __init__(self, pool: MySQLConnectionPool, batch_size: int = 1000, rows_per_statement: int = 1000):
+        """
+
+        Parameters
+        ----------
+        pool : MySQLConnectionPool
+            寒露元数据库（hanlu_meta）的连接池
+        batch_size : int, default = 1000
+            每次写入的任务数
+        rows_per_statement : int, default = 1000
+            每个多行 INSERT 语句包含的最大行数（避免超过 max_allowed_packet）
+        """
+        self.pool = pool
+        self.batch_size = batch_size
+        self.rows_per_statement = rows_per_statement
+        self._buffer: List[Tuple[TaskCheckpoint, DTask]] = []
+        self._node_id_hash: Dict[Tuple[str, str, str], int] = {}  # 数据节点唯一键到 lu_ds_node 表 ID 的缓存
+        self._instance_name_set = set()  # 已写入的数据源实例名称
+
+    def __enter__(self) -> "LineageWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            self.flush()
+
+    def preload_nodes(self) -> None:
+        """一次性读取 lu_ds_node 表中所有数据节点的 ID 到本地缓存"""
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT `id`, `instance_name`, `schema_name`, `table_name` FROM `lu_ds_node`")
+                for row in cursor.fetchall():
+                    self._node_id_hash[(row[1], row[2], row[3])] = row[0]
+
+    def add(self, checkpoint: TaskCheckpoint, data_task: DTask) -> None:
+        """添加需要写入的数据任务，缓冲区已满时自动写入"""
+        self._buffer.append((checkpoint, data_task))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_tasks(self, task_pairs: Iterable[Tuple[Hashable, DTask]],
+                    checkpoints: Optional[Dict[Hashable, TaskCheckpoint]] = None) -> None:
+        """写入血缘关系快照，可以直接使用 analyze_dolphin_tasks 的返回值
+
+        checkpoints 中没有的任务沿用 lu_ds_task 表中已有的检查点（任务版本、项目编码和更新时间），避免覆盖增量分析依赖的检查点；
+        lu_ds_task 表中也没有检查点的任务版本记为 0。
+
+        Parameters
+        ----------
+        task_pairs : Iterable[Tuple[Hashable, DTask]]
+            (task_code, DTask) 的迭代器
+        checkpoints : Optional[Dict[Hashable, TaskCheckpoint]], default = None
+            任务编码到检查点的映射
+        """
+        batch: List[Tuple[Hashable, DTask]] = []
+        for task_pair in task_pairs:
+            batch.append(task_pair)
+            if len(batch) >= self.batch_size:
+                self._add_task_pairs(batch, checkpoints)
+                batch = []
+        self._add_task_pairs(batch, checkpoints)
+        self.flush()
+
+    def _add_task_pairs(self, batch: List[Tuple[Hashable, DTask]],
+                        checkpoints: Optional[Dict[Hashable, TaskCheckpoint]]) -> None:
+        """为一批任务确定检查点后添加到缓冲区"""
+        if checkpoints is None:
+            checkpoints = {}
+        exist_checkpoints = self._load_checkpoints([task_code for task_code, _ in batch
+                                                    if task_code not in checkpoints])
+        for task_code, data_task in batch:
+            checkpoint = checkpoints.get(task_code) or exist_checkpoints.get(task_code)
+            if checkpoint is None:
+                checkpoint = TaskCheckpoint(task_code=task_code, task_version=0)
+            self.add(checkpoint, data_task)
+
+    def _load_checkpoints(self, task_codes: List[Hashable]) -> Dict[Hashable, TaskCheckpoint]:
+        """读取 lu_ds_task 表中已有的检查点"""
+        checkpoints = {}
+        if not task_codes:
+            return checkpoints
+        with self.pool.connection() as connection:
+            with connection.cursor() as cursor:
+                for i in range(0, len(task_codes), self.rows_per_statement):
+                    batch = task_codes[i:i + self.rows_per_statement]
+                    cursor.execute("SELECT `task_code`, `task_version`, `project_code`, `task_update_time` "
+                                   f"FROM `lu_ds_task` WHERE `task_code` IN ({', '.join(['%s'] * len(batch))})",
+                                   batch)
+                    for row in cursor.fetchall():
+                        checkpoints[row[0]] = TaskCheckpoint(task_code=row[0], task_version=row[1],
+                                                             project_code=row[2], task_update_time=row[3])
+        return checkpoints
+
+    def flush(self) -> None:
+        """在同一个事务中写入缓冲区中的所有数据任务"""
+        if not self._buffer:
+            return
+        buffer, self._buffer = self._buffer, []
+        with self.pool.connection() as connection:
+            try:
+                with connection.cursor() as cursor:
+                    self._write_instances(cursor, buffer)
+                    self._write_nodes(cursor, buffer)
+                    self._write_edges(cursor, buffer)
+                    self._write_checkpoints(cursor, buffer)
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                # 回滚后本批次写入的数据节点 ID 可能无效，清空本地缓存
+                self._node_id_hash.clear()
+                self._instance_name_set.clear()
+                raise
+
+    def _write_instances(self, cursor, buffer: List[Tuple[TaskCheckpoint, DTask]]) -> None:
+        """写入尚未写入的数据源实例"""
+        instance_hash: Dict[str, DInstance] = {}
+        for data_node in self._iter_nodes(buffer):
+            data_instance = data_node.instance
+            if data_instance is None or not data_instance.name or data_instance.name in self._instance_name_set:
+                continue
+            instance_hash.setdefault(data_instance.name, data_instance)
+        rows = [(name, int(data_instance.data_type), instance_info(data_instance))
+                for name, data_instance in instance_hash.items()]
+        self._insert_many(cursor, "lu_ds_instance", ["instance_name", "instance_type", "instance_info"], rows,
+                          update_columns=["instance_type", "instance_info"])
+        self._instance_name_set.update(instance_hash)
+
+    def _write_nodes(self, cursor, buffer: List[Tuple[TaskCheckpoint, DTask]]) -> None:
+        """写入未缓存的数据节点并查询其 ID"""
+        new_keys = list(dict.fromkeys(key for key in map(node_key, self._iter_nodes(buffer))
+                                      if key not in self._node_id_hash))
+        if not new_keys:
+            return
+        self._insert_many(cursor, "lu_ds_node", ["instance_name", "schema_name", "table_name"], new_keys,
+                          ignore=True)
+        for i in range(0, len(new_keys), self.rows_per_statement):
+            keys = new_keys[i:i + self.rows_per_statement]
+            cursor.execute("SELECT `id`, `instance_name`, `schema_name`, `table_name` FROM `lu_ds_node` "
+                           "WHERE (`instance_name`, `schema_name`, `table_name`) IN "
+                           f"({', '.join(['(%s, %s, %s)'] * len(keys))})",
+                           [value for key in keys for value in key])
+            # lu_ds_node 表的字符集排序规则不区分大小写，因此按忽略大小写的唯一键匹配查询结果
+            id_hash = {(row[1].lower(), row[2].lower(), row[3].lower()): row[0] for row in cursor.fetchall()}
+            for key in keys:
+                self._node_id_hash[key] = id_hash[(key[0].lower(), key[1].lower(), key[2].lower())]
+
+    def _write_edges(self, cursor, buffer: List[Tuple[TaskCheckpoint, DTask]]) -> None:
+        """删除任务旧版本的关联关系并写入新的关联关系"""
+        task_codes = [checkpoint.task_code for checkpoint, _ in buffer]
+        for i in range(0, len(task_codes), self.rows_per_statement):
+            batch = task_codes[i:i + self.rows_per_statement]
+            cursor.execute(f"DELETE FROM `lu_ds_task_node` WHERE `task_code` IN ({', '.join(['%s'] * len(batch))})",
+                           batch)
+
+        rows = []
+        for checkpoint, data_task in buffer:
+            for direction, node_set in [(DIRECTION_DEPENDENT, data_task.dependent_node_set),
+                                        (DIRECTION_GENERATE, data_task.generate_node_set)]:
+                for data_node in node_set:
+                    rows.append((checkpoint.task_code, checkpoint.task_version,
+                                 self._node_id_hash[node_key(data_node)], direction))
+        self._insert_many(cursor, "lu_ds_task_node", ["task_code", "task_version", "node_id", "direction"], rows,
+                          update_columns=["task_version"])
+
+    def _write_checkpoints(self, cursor, buffer: List[Tuple[TaskCheckpoint, DTask]]) -> None:
+        """更新任务检查点"""
+        rows = [(checkpoint.task_code, checkpoint.task_version, checkpoint.project_code,
+                 checkpoint.task_update_time, int(data_task.is_unknown))
+                for checkpoint, data_task in buffer]
+        self._insert_many(cursor, "lu_ds_task",
+                          ["task_code", "task_version", "project_code", "task_update_time", "is_unknown"], rows,
+                          update_columns=["task_version", "project_code", "task_update_time", "is_unknown"])
+
+    def _insert_many(self, cursor, table_name: str, columns: Sequence[str], rows: Sequence[Sequence[Any]],
+                     update_columns: Optional[Sequence[str]] = None, ignore: bool = False) -> None:
+        """使用多行 INSERT 语句写入，每个语句最多包含 rows_per_statement 行"""
+        if not rows:
+            return
+        sql_prefix = (f"INSERT {'IGNORE ' if ignore else ''}INTO `{table_name}` "
+                      f"({', '.join(f'`{column}`' for column in columns)}) VALUES ")
+        sql_suffix = ""
+        if update_columns:
+            sql_suffix = " ON DUPLICATE KEY UPDATE " + ", ".join(f"`{column}` = VALUES(`{column}`)"
+                                                                 for column in update_columns)
+        row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+        for i in range(0, len(rows), self.rows_per_statement):
+            batch = rows[i:i + self.rows_per_statement]
+            cursor.execute(sql_prefix + ", ".join([row_placeholder] * len(batch)) + sql_suffix,
+                           [value for row in batch for value in row])
+
+    @staticmethod
+    def _iter_nodes(buffer: List[Tuple[TaskCheckpoint, DTask]]) -> Iterable[DNode]:
+        for _, data_task in buffer:
+            yield from data_task.dependent_node_set
+            yield from data_task.generate_node_set
@@ -0,0 +1,9 @@
+"""
+spark-submit 作业的血缘分析：血缘模板和 PySpark 脚本静态扫描
+"""
+
+from hanlu.spark.pyspark_scanner import PySparkScanCache
+from hanlu.spark.pyspark_scanner import PySparkScanResult
+from hanlu.spark.pyspark_scanner import scan_pyspark_source
+from hanlu.spark.spark_lineage_template import SparkLineageTemplate
+from hanlu.spark.spark_lineage_template import parse_application_arguments
@@ -0,0 +1,171 @@
+"""
+PySpark 脚本的静态扫描：从 Python 源码中提取 spark.sql(...) 执行的 SQL，以及读取和写入的表名
+"""
+
+import ast
+import collections
+import dataclasses
+import hashlib
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+__all__ = [
+    "PySparkScanResult",
+    "PySparkScanCache",
+    "scan_pyspark_source",
+]
+
+# 方法名到调用类型的映射：sql 为执行 SQL，read 为读取表，write 为写入表
+_METHOD_TYPE_HASH = {
+    "sql": "sql",
+    "table": "read",
+    "saveAsTable": "write",
+    "insertInto": "write",
+}
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class PySparkScanResult:
+    """PySpark 脚本的静态扫描结果"""
+
+    sql_list: Tuple[str, ...] = dataclasses.field(kw_only=True, default=())  # spark.sql(...) 执行的 SQL
+    read_table_list: Tuple[str, ...] = dataclasses.field(kw_only=True, default=())  # spark.table(...) 读取的表
+    write_table_list: Tuple[str, ...] = dataclasses.field(kw_only=True, default=())  # saveAsTable / insertInto 写入的表
+    unresolved_count: int = dataclasses.field(kw_only=True, default=0)  # 参数无法静态确定的调用数量
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.sql_list and not self.read_table_list and not self.write_table_list
+
+
+class _StringResolver:
+    """静态确定表达式的字符串值：支持字符串常量、不包含表达式的 f-string、字符串拼接，以及只赋值过一次字符串的变量"""
+
+    __slots__ = ("_constant_hash",)
+
+    def __init__(self, tree: ast.AST):
+        assign_count = collections.Counter()
+        assign_value = {}
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    for name_node in ast.walk(target):
+                        if isinstance(name_node, ast.Name):
+                            assign_count[name_node.id] += 1
+                            assign_value[name_node.id] = node.value if isinstance(node, ast.Assign) else None
+        self._constant_hash: Dict[str, ast.AST] = {name: value for name, value in assign_value.items()
+                                                   if assign_count[name] == 1 and value is not None}
+
+    def resolve(self, node: ast.AST, depth: int = 0) -> Optional[str]:
+        if depth > 16:
+            return None
+        if isinstance(node, ast.Constant):
+            return node.value if isinstance(node.value, str) else None
+        if isinstance(node, ast.JoinedStr):
+            parts = [self.resolve(value, depth + 1) for value in node.values]
+            return "".join(parts) if all(part is not None for part in parts) else None
+        if isinstance(node, ast.FormattedValue):
+            if node.format_spec is not None or node.conversion not in (-1, 115):
+                return None
+            return self.resolve(node.value, depth + 1)
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left = self.resolve(node.left, depth + 1)
+            right = self.resolve(node.right, depth + 1)
+            return left + right if left is not None and right is not None else None
+        if isinstance(node, ast.Name) and node.id in self._constant_hash:
+            return self.resolve(self._constant_hash[node.id], depth + 1)
+        return None
+
+
+def scan_pyspark_source(source: str) -> PySparkScanResult:
+    """静态扫描 PySpark 脚本，提取 sql、table、saveAsTable 和 insertInto 方法调用的字符串参数
+
+    Parameters
+    ----------
+    source : str
+        Python 源码
+
+    Raises
+    ------
+    SyntaxError
+        源码不是合法的 Python 代码
+    RecursionError
+        源码中的表达式嵌套过深，无法构造语法树
+    """
+    tree = ast.parse(source)
+    resolver = _StringResolver(tree)
+    result_hash: Dict[str, List[str]] = {"sql": [], "read": [], "write": []}
+    unresolved_count = 0
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or not isinstance(node.func, ast.Attribute):
+            continue
+        call_type = _METHOD_TYPE_HASH.get(node.func.attr)
+        if call_type is None:
+            continue
+        argument = node.args[0] if node.args else None
+        if argument is None:
+            for keyword in node.keywords:
+                if keyword.arg in {"sqlQuery", "tableName", "name"}:
+                    argument = keyword.value
+        value = resolver.resolve(argument) if argument is not None else None
+        if value is None:
+            unresolved_count += 1
+        else:
+            result_hash[call_type].append(value)
+    return PySparkScanResult(
+        sql_list=tuple(result_hash["sql"]),
+        read_table_list=tuple(result_hash["read"]),
+        write_table_list=tuple(result_hash["write"]),
+        unresolved_count=unresolved_count
+    )
+
+
+class PySparkScanCache:
+    """以源码内容的哈希值为键的 PySpark 扫描结果缓存：相同内容的脚本只扫描一次，使用最近最少使用（LRU）策略淘汰"""
+
+    def __init__(self, max_size: int = 4096):
+        """
+
+        Parameters
+        ----------
+        max_size : int, default = 4096
+            最多保存的扫描结果数
+        """
+        self._max_size = max_size
+        self._result_hash: collections.OrderedDict[str, PySparkScanResult] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """序列化时（如发送到工作进程）不包含锁"""
+        return {"max_size": self._max_size, "result_hash": self._result_hash}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(max_size=state["max_size"])
+        self._result_hash = state["result_hash"]
+
+    def scan(self, source: str) -> PySparkScanResult:
+        """获取源码的扫描结果，缓存中不存在时扫描并写入缓存
+
+        Raises
+        ------
+        SyntaxError
+            源码不是合法的 Python 代码
+        RecursionError
+            源码中的表达式嵌套过深，无法构造语法树
+        """
+        key = hashlib.sha256(source.encode("utf-8")).hexdigest()
+        with self._lock:
+            result = self._result_hash.get(key)
+            if result is not None:
+                self._result_hash.move_to_end(key)
+                return result
+        result = scan_pyspark_source(source)
+        with self._lock:
+            self._result_hash[key] = result
+            while len(self._result_hash) > self._max_size:
+                self._result_hash.popitem(last=False)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._result_hash)
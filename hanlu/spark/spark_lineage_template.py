@@ -0,0 +1,77 @@
+"""
+spark-submit 作业的血缘模板
+"""
+
+import dataclasses
+import string
+from typing import Any, Dict, List, Optional, Tuple
+
+__all__ = [
+    "SparkLineageTemplate",
+    "parse_application_arguments",
+]
+
+_FORMATTER = string.Formatter()
+
+
+def parse_application_arguments(application_arguments: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    """将 application_arguments 解析为位置参数和命名参数
+
+    所有参数均作为位置参数；--name value、--name=value 和 name=value 形式的参数同时作为命名参数，参数名中的 - 替换为 _。
+
+    Parameters
+    ----------
+    application_arguments : List[str]
+        spark-submit 命令中 Application 的命令行参数
+    """
+    named_hash = {}
+    for i, argument in enumerate(application_arguments):
+        if argument.startswith("-"):
+            name, has_value, value = argument.lstrip("-").partition("=")
+            if not has_value:
+                if i + 1 >= len(application_arguments):
+                    continue
+                value = application_arguments[i + 1]
+        elif "=" in argument:
+            name, _, value = argument.partition("=")
+        else:
+            continue
+        if name:
+            named_hash[name.replace("-", "_")] = value
+    return list(application_arguments), named_hash
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class SparkLineageTemplate:
+    """spark-submit 作业的血缘模板
+
+    表名和 SQL 中可以使用 {0}、{1} 等引用 application_arguments 中的位置参数，使用 {name} 引用命名参数（见
+    parse_application_arguments），字面的花括号需要写为 {{ 和 }}。表名格式为 库名.表名 或 表名。
+    """
+
+    dependent_tables: Tuple[str, ...] = dataclasses.field(kw_only=True, default=())  # 依赖的表
+    generate_tables: Tuple[str, ...] = dataclasses.field(kw_only=True, default=())  # 生成的表
+    sql: Optional[str] = dataclasses.field(kw_only=True, default=None)  # 作业执行的 SQL（需要分析血缘关系时）
+    hive_name: Optional[str] = dataclasses.field(kw_only=True, default=None)  # 表所在 Hive 集群名称，为 None 时使用 Spark 默认集群
+
+    def render(self, application_arguments: Optional[List[str]]) -> "SparkLineageTemplate":
+        """使用 Application 的命令行参数渲染模板，返回不包含参数引用的模板
+
+        Raises
+        ------
+        KeyError, IndexError
+            模板引用的参数不存在
+        """
+        args, kwargs = parse_application_arguments(application_arguments or [])
+        return SparkLineageTemplate(
+            dependent_tables=tuple(self._format(table, args, kwargs) for table in self.dependent_tables),
+            generate_tables=tuple(self._format(table, args, kwargs) for table in self.generate_tables),
+            sql=self._format(self.sql, args, kwargs) if self.sql is not None else None,
+            hive_name=self.hive_name
+        )
+
+    @staticmethod
+    def _format(template: str, args: List[str], kwargs: Dict[str, Any]) -> str:
+        if "{" not in template and "}" not in template:
+            return template
+        return _FORMATTER.vformat(template, args, kwargs)
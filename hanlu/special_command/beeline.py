@@ -1,9 +1,9 @@
 """
-Shell 解析器扩展：解析 spark-submit 命令
+Shell 解析器扩展：解析 beeline 命令
 """
 
 import dataclasses
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from hanlu.special_command.base import Command
 
@@ -28,6 +28,19 @@ class CommandBeeline(Command):
     arg_verbose: str = dataclasses.field(kw_only=True, default=None)  # 详细输出日志信息（-e）
     arg_query: str = dataclasses.field(kw_only=True, default=None)  # 执行一个包含多个 HQL 的语句（-q）
     arg_color: str = dataclasses.field(kw_only=True, default=None)  # 启用或禁用彩色输出
+    arg_hivevar: Tuple[Tuple[str, str], ...] = dataclasses.field(kw_only=True, default=())  # Hive 变量（--hivevar）
+    arg_hiveconf: Tuple[Tuple[str, str], ...] = dataclasses.field(kw_only=True, default=())  # Hive 配置（--hiveconf）
+    arg_options: Tuple[Tuple[str, str], ...] = dataclasses.field(kw_only=True, default=())  # 不影响血缘关系的其他选项
+
+    @property
+    def hivevar_hash(self) -> Dict[str, str]:
+        """Hive 变量名到变量值的映射"""
+        return dict(self.arg_hivevar)
+
+    @property
+    def hiveconf_hash(self) -> Dict[str, str]:
+        """Hive 配置名到配置值的映射"""
+        return dict(self.arg_hiveconf)
 
 
 # 参数映射关系
@@ -36,6 +49,7 @@ ARG_NAME_HASH = {
     "--url": "arg_url",
     "-n": "arg_username",
     "--username": "arg_username",
+    "--user": "arg_username",
     "-p": "arg_password",
     "--password": "arg_password",
     "-d": "arg_database",
@@ -56,20 +70,101 @@ ARG_NAME_HASH = {
     "--color": "arg_color",
 }
 
+# 可以省略参数值的开关参数（省略时参数值为 true）
+SWITCH_ARG_NAME_SET = {"arg_incremental", "arg_silent", "arg_verbose", "arg_color"}
+
+# 键值对参数（--hivevar name=value）
+KEY_VALUE_ARG_NAME_HASH = {
+    "--hivevar": "arg_hivevar",
+    "--hiveconf": "arg_hiveconf",
+}
+
+# 不影响血缘关系的其他参数：参数值为 None 时表示该参数不需要参数值
+OTHER_ARG_NAME_HASH = {
+    "-w": "password-file",
+    "--password-file": "password-file",
+    "-a": "authType",
+    "--authType": "authType",
+    "--property-file": "property-file",
+    "-r": None,
+    "--showHeader": "showHeader",
+    "--headerInterval": "headerInterval",
+    "--outputformat": "outputformat",
+    "--fastConnect": "fastConnect",
+    "--autoCommit": "autoCommit",
+    "--force": "force",
+    "--truncateTable": "truncateTable",
+    "--delimiterForDSV": "delimiterForDSV",
+    "--isolation": "isolation",
+    "--nullemptystring": "nullemptystring",
+    "--maxWidth": "maxWidth",
+    "--maxColumnWidth": "maxColumnWidth",
+    "--showWarnings": "showWarnings",
+    "--showNestedErrs": "showNestedErrs",
+    "--numberFormat": "numberFormat",
+    "--showDbInPrompt": "showDbInPrompt",
+    "--incrementalBufferRows": "incrementalBufferRows",
+}
+
 
 def parse_beeline(tokens: List[str]) -> Optional[CommandBeeline]:
-    """解析 beeline 命令并返回 CommandBeeline 对象，如果不是标准的 beeline 命令则返回 None"""
-    # 匹配 Spark 参数
+    """解析 beeline 命令并返回 CommandBeeline 对象，如果不是标准的 beeline 命令则返回 None
+
+    长参数支持 --name value 和 --name=value 两种格式；开关参数（如 --silent）可以省略参数值。
+    """
     params = {}
+    key_value_params = {"arg_hivevar": [], "arg_hiveconf": [], "arg_options": []}
     i = 0
-    while i + 1 < len(tokens) and tokens[i] in ARG_NAME_HASH:
-        config_name = ARG_NAME_HASH[tokens[i]]
-        config_value = tokens[i + 1]
-        params[config_name] = config_value
-        i += 2
+    while i < len(tokens):
+        token = tokens[i]
+        inline_value = None
+        if token.startswith("--") and "=" in token:
+            token, inline_value = token.split("=", 1)
+
+        if token in ARG_NAME_HASH:
+            config_name = ARG_NAME_HASH[token]
+            if inline_value is not None:
+                params[config_name] = inline_value
+                i += 1
+            elif config_name in SWITCH_ARG_NAME_SET and (i + 1 >= len(tokens) or tokens[i + 1].startswith("-")):
+                params[config_name] = "true"
+                i += 1
+            elif i + 1 < len(tokens):
+                params[config_name] = tokens[i + 1]
+                i += 2
+            else:
+                return None
+        elif token in KEY_VALUE_ARG_NAME_HASH:
+            if inline_value is None:
+                if i + 1 >= len(tokens):
+                    return None
+                inline_value = tokens[i + 1]
+                i += 2
+            else:
+                i += 1
+            if "=" not in inline_value:
+                return None
+            key, value = inline_value.split("=", 1)
+            key_value_params[KEY_VALUE_ARG_NAME_HASH[token]].append((key, value))
+        elif token in OTHER_ARG_NAME_HASH:
+            option_name = OTHER_ARG_NAME_HASH[token]
+            if option_name is None:
+                i += 1
+                continue
+            if inline_value is None:
+                if i + 1 >= len(tokens):
+                    return None
+                inline_value = tokens[i + 1]
+                i += 2
+            else:
+                i += 1
+            key_value_params["arg_options"].append((option_name, inline_value))
+        else:
+            return None
 
     return CommandBeeline(
         command_name="beeline",
         tokens=tokens,
-        **params
+        **params,
+        **{name: tuple(value) for name, value in key_value_params.items()}
     )
@@ -44,6 +44,8 @@ class CommandSparkSubmit(Command):
     arg_archives: str = dataclasses.field(kw_only=True, default=None)
     arg_principal: str = dataclasses.field(kw_only=True, default=None)
     arg_keytab: str = dataclasses.field(kw_only=True, default=None)
+    arg_verbose: str = dataclasses.field(kw_only=True, default=None)  # 输出调试信息（开关参数）
+    arg_supervise: str = dataclasses.field(kw_only=True, default=None)  # 失败时自动重启 Driver（开关参数）
 
     # Jar 包或 Python 脚本
     application: str = dataclasses.field(kw_only=True)
@@ -57,23 +59,42 @@ SPARK_CONFIG_SET = {"--master", "--deploy-mode", "--class", "--name", "--jars",
                     "--repositories", "--py-files", "--files", "--conf", "--properties-file", "--driver-memory",
                     "--driver-java-options", "--driver-library-path", "--driver-class-path", "--executor-memory",
                     "--proxy-user", "--driver-cores", "--total-executor-cores", "--executor-cores",
-                    "--queue", "--num-executors", "--archives", "--principal", "--keylab"}
+                    "--queue", "--num-executors", "--archives", "--principal", "--keytab"}
+
+# Spark 的开关参数列表（不需要参数值）
+SPARK_SWITCH_SET = {"--verbose", "--supervise"}
 
 
 def parse_spark_submit(tokens: List[str]) -> Optional[CommandSparkSubmit]:
-    """解析 spark_submit 命令并返回 CommandSparkSubmit 对象，如果不是标准的 spark-submit 命令则返回 None"""
+    """解析 spark_submit 命令并返回 CommandSparkSubmit 对象，如果不是标准的 spark-submit 命令则返回 None
+
+    Spark 参数支持 --name value 和 --name=value 两种格式。
+    """
     # 匹配 Spark 参数
     params = {}
     i = 0
-    while i + 1 < len(tokens) and tokens[i] in SPARK_CONFIG_SET:
-        config_name = "arg_" + tokens[i].lstrip("-").replace("-", "_")
-        config_value = tokens[i + 1]
+    while i < len(tokens):
+        token, _, inline_value = tokens[i].partition("=")
+        if tokens[i] in SPARK_SWITCH_SET:
+            params["arg_" + tokens[i].lstrip("-")] = "true"
+            i += 1
+            continue
+        if token not in SPARK_CONFIG_SET:
+            break
+        config_name = "arg_" + token.lstrip("-").replace("-", "_")
+        if tokens[i] != token:
+            config_value = inline_value
+            i += 1
+        elif i + 1 < len(tokens):
+            config_value = tokens[i + 1]
+            i += 2
+        else:
+            return None
         if config_name == "arg_conf":
             params.setdefault(config_name, [])
             params[config_name].append(config_value)
         else:
             params[config_name] = config_value
-        i += 2
 
     if i == len(tokens):
         return None  # 没有 jar 包或 python 主程序
@@ -75,3 +75,33 @@ CREATE TABLE `lu_ds_role_variable`
     UNIQUE KEY `unique_role_variable`(`role_id`, `variable_id`)
 ) ENGINE = InnoDB
   DEFAULT CHARSET = utf8 COMMENT = '数据源管理-角色变量关联表';
+
+CREATE TABLE `lu_ds_task`
+(
+    `id`               bigint UNSIGNED NOT NULL AUTO_INCREMENT COMMENT '自增主键，不代表业务含义',
+    `task_code`        bigint          NOT NULL DEFAULT '0' COMMENT '海豚任务编码(t_ds_task_definition表code)',
+    `task_version`     int             NOT NULL DEFAULT '0' COMMENT '已分析的海豚任务版本(t_ds_task_definition表version)',
+    `project_code`     bigint          NOT NULL DEFAULT '0' COMMENT '海豚项目编码',
+    `task_update_time` datetime        NULL     DEFAULT NULL COMMENT '已分析的海豚任务更新时间(t_ds_task_definition表update_time)',
+    `is_unknown`       tinyint         NOT NULL DEFAULT '0' COMMENT '血缘推断是否失败:0=成功,1=失败',
+    `create_time`      datetime        NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '记录创建时间',
+    `update_time`      datetime        NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '记录更改时间',
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `unique_task_code`(`task_code`)
+) ENGINE = InnoDB
+  DEFAULT CHARSET = utf8 COMMENT = '血缘分析-任务分析检查点';
+
+CREATE TABLE `lu_ds_task_node`
+(
+    `id`           bigint UNSIGNED NOT NULL AUTO_INCREMENT COMMENT '自增主键，不代表业务含义',
+    `task_code`    bigint          NOT NULL DEFAULT '0' COMMENT '海豚任务编码(lu_ds_task表task_code)',
+    `task_version` int             NOT NULL DEFAULT '0' COMMENT '生成该关联关系的海豚任务版本',
+    `node_id`      bigint          NOT NULL DEFAULT '0' COMMENT '节点ID(lu_ds_node表主键)',
+    `direction`    tinyint         NOT NULL DEFAULT '0' COMMENT '关联方向:0=任务依赖节点(上游),1=任务生成节点(下游)',
+    `create_time`  datetime        NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '记录创建时间',
+    `update_time`  datetime        NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '记录更改时间',
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `unique_task_node`(`task_code`, `node_id`, `direction`),
+    KEY `idx_node`(`node_id`)
+) ENGINE = InnoDB
+  DEFAULT CHARSET = utf8 COMMENT = '血缘分析-任务节点关联表';
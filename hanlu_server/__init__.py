@@ -0,0 +1,8 @@
+"""
+寒露血缘查询服务
+"""
+
+from hanlu_server.http_protocol import HttpError
+from hanlu_server.http_protocol import HttpRequest
+from hanlu_server.lineage_service import LineageService
+from hanlu_server.lineage_service import load_lineage_graph
@@ -0,0 +1,35 @@
+"""
+启动寒露血缘查询服务：python -m hanlu_server --graph lineage.snapshot --port 8080
+"""
+
+import argparse
+import asyncio
+import importlib
+
+from hanlu_server.lineage_service import LineageService
+from hanlu_server.lineage_service import load_lineage_graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="寒露血缘查询服务")
+    parser.add_argument("--graph", required=True, help="血缘关系快照或使用 pickle 保存的血缘关系图的文件路径")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8080, help="监听端口")
+    parser.add_argument("--analyzer", default=None,
+                        help="构造分析器的函数（格式为 module:function），不指定时不提供分析接口")
+    parser.add_argument("--analyze-workers", type=int, default=2, help="执行分析请求的工作进程数")
+    parser.add_argument("--cache-size", type=int, default=1024, help="最多缓存的闭包查询结果数")
+    args = parser.parse_args()
+
+    analyzer = None
+    if args.analyzer is not None:
+        module_name, _, function_name = args.analyzer.partition(":")
+        analyzer = getattr(importlib.import_module(module_name), function_name)()
+
+    service = LineageService(load_lineage_graph(args.graph), analyzer=analyzer,
+                             analyze_workers=args.analyze_workers, cache_size=args.cache_size)
+    asyncio.run(service.serve_forever(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+基于 asyncio 流的最小 HTTP/1.1 协议实现：解析请求、写入响应，支持长连接（keep-alive）
+"""
+
+import asyncio
+import dataclasses
+import json
+import urllib.parse
+from typing import Any, Dict, Optional
+
+__all__ = [
+    "HttpError",
+    "HttpRequest",
+    "read_request",
+    "write_response",
+    "write_json",
+]
+
+MAX_HEADER_COUNT = 100  # 请求头的最大数量
+MAX_LINE_SIZE = 16384  # 请求行和请求头每行的最大字节数
+
+_STATUS_REASON_HASH = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HttpError(Exception):
+    """处理请求时需要返回给客户端的错误"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclasses.dataclass(slots=True)
+class HttpRequest:
+    """HTTP 请求"""
+
+    method: str = dataclasses.field(kw_only=True)  # 请求方法（大写）
+    path: str = dataclasses.field(kw_only=True)  # 请求路径（不包含查询参数）
+    query: Dict[str, str] = dataclasses.field(kw_only=True)  # 查询参数（同名参数取最后一个）
+    headers: Dict[str, str] = dataclasses.field(kw_only=True)  # 请求头（名称为小写）
+    body: bytes = dataclasses.field(kw_only=True, default=b"")  # 请求体
+    version: str = dataclasses.field(kw_only=True, default="HTTP/1.1")  # 协议版本
+
+    @property
+    def keep_alive(self) -> bool:
+        """响应后是否保持连接"""
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    def json(self) -> Any:
+        """将请求体解析为 JSON"""
+        try:
+            return json.loads(self.body or b"null")
+        except ValueError as e:
+            raise HttpError(400, f"请求体不是合法的 JSON: {e}") from e
+
+
+async def _read_line(reader: asyncio.StreamReader) -> bytes:
+    try:
+        line = await reader.readuntil(b"\n")
+    except asyncio.LimitOverrunError as e:
+        raise HttpError(400, "请求行或请求头过长") from e
+    if len(line) > MAX_LINE_SIZE:
+        raise HttpError(400, "请求行或请求头过长")
+    return line.rstrip(b"\r\n")
+
+
+async def read_request(reader: asyncio.StreamReader, max_body_size: int) -> Optional[HttpRequest]:
+    """从流中读取一个 HTTP 请求，连接已关闭时返回 None
+
+    Parameters
+    ----------
+    reader : asyncio.StreamReader
+        连接的读取流
+    max_body_size : int
+        请求体的最大字节数
+
+    Raises
+    ------
+    HttpError
+        请求格式错误或请求体过大
+    """
+    try:
+        request_line = await _read_line(reader)
+    except asyncio.IncompleteReadError:
+        return None
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split(" ")
+    if len(parts) != 3:
+        raise HttpError(400, "请求行格式错误")
+    method, target, version = parts
+
+    headers = {}
+    while True:
+        try:
+            line = await _read_line(reader)
+        except asyncio.IncompleteReadError:
+            return None
+        if not line:
+            break
+        if len(headers) >= MAX_HEADER_COUNT:
+            raise HttpError(400, "请求头过多")
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = b""
+    if "content-length" in headers:
+        try:
+            content_length = int(headers["content-length"])
+        except ValueError as e:
+            raise HttpError(400, "Content-Length 格式错误") from e
+        if content_length > max_body_size:
+            raise HttpError(413, f"请求体超过 {max_body_size} 字节")
+        try:
+            body = await reader.readexactly(content_length)
+        except asyncio.IncompleteReadError:
+            return None
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        raise HttpError(400, "不支持分块传输的请求体")
+
+    url = urllib.parse.urlsplit(target)
+    return HttpRequest(
+        method=method.upper(),
+        path=urllib.parse.unquote(url.path),
+        query=dict(urllib.parse.parse_qsl(url.query, keep_blank_values=True)),
+        headers=headers,
+        body=body,
+        version=version
+    )
+
+
+def write_response(writer: asyncio.StreamWriter, status: int, body: bytes,
+                   content_type: str = "application/json; charset=utf-8", keep_alive: bool = True) -> None:
+    """将 HTTP 响应写入流（不等待写入完成）
+
+    Parameters
+    ----------
+    writer : asyncio.StreamWriter
+        连接的写入流
+    status : int
+        状态码
+    body : bytes
+        响应体
+    content_type : str, default = "application/json; charset=utf-8"
+        响应体类型
+    keep_alive : bool, default = True
+        响应后是否保持连接
+    """
+    header = (f"HTTP/1.1 {status} {_STATUS_REASON_HASH.get(status, 'Unknown')}\r\n"
+              f"Content-Type: {content_type}\r\n"
+              f"Content-Length: {len(body)}\r\n"
+              f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+              f"\r\n")
+    writer.write(header.encode("latin-1") + body)
+
+
+def write_json(writer: asyncio.StreamWriter, status: int, value: Any, keep_alive: bool = True) -> None:
+    """将对象序列化为 JSON 后作为 HTTP 响应写入流"""
+    write_response(writer, status, json.dumps(value, ensure_ascii=False).encode("utf-8"), keep_alive=keep_alive)
@@ -0,0 +1,446 @@
+"""
+血缘查询 HTTP 服务
+
+启动时加载一次血缘关系图，在事件循环中并发处理上游、下游和影响范围查询；闭包的计算结果按查询条件缓存，翻页只需切片。
+分析 SQL / Shell 脚本 / 海豚任务的请求提交到固定数量的可终止工作进程中执行，等待中的请求超过上限时直接返回 503；
+分析超时的工作进程会被终止并重新创建，不会持续占用工作进程。
+
+接口：
+- GET /health：服务状态
+- GET /lineage/upstream、/lineage/downstream、/lineage/impact：起点由 task=任务 ID 或 instance=实例名称&schema=库名
+  &table=表名 指定；可选参数 depth（最大深度）、kind（all / node / task）、offset、limit
+- POST /analyze/sql：{"sql": ..., "jdbc_url": ..., "user_name": ..., "password": ..., "default_schema": ...}
+- POST /analyze/shell：{"script": ...}
+- POST /analyze/task：海豚元数据 task_definition 表中的记录
+"""
+
+import asyncio
+import collections
+import concurrent.futures
+import dataclasses
+import multiprocessing
+import pickle
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from hanlu.analyzer_batch import IsolatedWorker
+from hanlu.analyzer_batch import dumps_analyzer
+from hanlu.analyzer_main import HanLuAnalyzer
+from hanlu.data_graph import LineageClosure
+from hanlu.data_graph import LineageGraph
+from hanlu.data_graph import LineageSnapshot
+from hanlu.data_graph import is_lineage_snapshot
+from hanlu.data_node import DNode
+from hanlu.data_task import DTask
+from hanlu_server.http_protocol import HttpError
+from hanlu_server.http_protocol import HttpRequest
+from hanlu_server.http_protocol import read_request
+from hanlu_server.http_protocol import write_json
+
+__all__ = [
+    "LineageService",
+    "load_lineage_graph",
+]
+
+# 查询方向
+_DIRECTION_UPSTREAM = "upstream"
+_DIRECTION_DOWNSTREAM = "downstream"
+
+# 结果类型过滤
+_KIND_SET = {"all", "node", "task"}
+
+
+def load_lineage_graph(path: str) -> Union[LineageGraph, LineageSnapshot]:
+    """加载血缘关系：血缘关系快照通过 mmap 直接打开，否则视为使用 pickle 保存的血缘关系图并预先构造邻接数组
+
+    Parameters
+    ----------
+    path : str
+        文件路径
+    """
+    if is_lineage_snapshot(path):
+        return LineageSnapshot(path)
+    with open(path, "rb") as file:
+        graph = pickle.load(file)
+    if not isinstance(graph, LineageGraph):
+        raise TypeError(f"文件中不是血缘关系图: {type(graph).__name__}")
+    graph.build()
+    return graph
+
+
+def node_to_json(data_node: DNode) -> Dict[str, Any]:
+    """将数据节点转换为 JSON 对象"""
+    instance = data_node.instance
+    return {
+        "type": "node",
+        "data_type": instance.data_type.name if instance is not None else None,
+        "instance": instance.name if instance is not None else None,
+        "schema": data_node.schema_name,
+        "table": data_node.table_name,
+    }
+
+
+def task_to_json(data_task: DTask) -> Dict[str, Any]:
+    """将数据任务对象转换为 JSON 对象"""
+    return {
+        "is_unknown": data_task.is_unknown,
+        "fail_reason": data_task.fail_reason.name if data_task.fail_reason is not None else None,
+        "fail_detail": data_task.fail_detail,
+        "dependent": [node_to_json(data_node) for data_node in data_task.dependent_node_set],
+        "generate": [node_to_json(data_node) for data_node in data_task.generate_node_set],
+    }
+
+
+@dataclasses.dataclass(slots=True)
+class _ClosureResult:
+    """缓存的闭包查询结果：按广度优先顺序排列的 JSON 对象列表"""
+
+    item_hash: Dict[str, List[Dict[str, Any]]] = dataclasses.field(kw_only=True)  # 结果类型到结果列表的映射
+    depth_count: Dict[int, int] = dataclasses.field(kw_only=True)  # 深度到数据任务数的映射
+
+
+class LineageService:
+    """血缘查询 HTTP 服务"""
+
+    def __init__(self, graph: Union[LineageGraph, LineageSnapshot],
+                 analyzer: Optional[HanLuAnalyzer] = None,
+                 analyze_workers: int = 2,
+                 max_pending_analyze: int = 64,
+                 analyze_timeout: Optional[float] = 60.0,
+                 query_threads: int = 4,
+                 cache_size: int = 1024,
+                 default_page_size: int = 100,
+                 max_page_size: int = 1000,
+                 max_body_size: int = 8 * 1024 * 1024):
+        """
+
+        Parameters
+        ----------
+        graph : Union[LineageGraph, LineageSnapshot]
+            血缘关系图或血缘关系快照
+        analyzer : Optional[HanLuAnalyzer], default = None
+            分析器，为 None 时不提供分析接口
+        analyze_workers : int, default = 2
+            执行分析请求的工作进程数
+        max_pending_analyze : int, default = 64
+            最多同时等待的分析请求数，超过时返回 503
+        analyze_timeout : Optional[float], default = 60.0
+            分析请求的超时时间（秒），为 None 时不限制
+        query_threads : int, default = 4
+            计算闭包的线程数（缓存未命中时在线程中计算，避免阻塞事件循环）
+        cache_size : int, default = 1024
+            最多缓存的闭包查询结果数
+        default_page_size : int, default = 100
+            默认每页结果数
+        max_page_size : int, default = 1000
+            每页最多结果数
+        max_body_size : int, default = 8 * 1024 * 1024
+            请求体的最大字节数
+        """
+        self.analyzer = analyzer
+        self.analyze_workers = analyze_workers
+        self.analyze_timeout = analyze_timeout
+        self.cache_size = cache_size
+        self.default_page_size = default_page_size
+        self.max_page_size = max_page_size
+        self.max_body_size = max_body_size
+
+        self._query_executor = concurrent.futures.ThreadPoolExecutor(max_workers=query_threads,
+                                                                     thread_name_prefix="hanlu-query")
+        self._analyze_payload: Optional[bytes] = None  # 序列化的分析器，用于创建工作进程
+        self._analyze_worker_list: List[IsolatedWorker] = []  # 所有分析工作进程
+        self._idle_worker_queue: Optional[asyncio.Queue] = None  # 空闲的分析工作进程
+        # 等待工作进程返回结果的线程（每个工作进程最多有一个线程在等待）
+        self._analyze_wait_executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(analyze_workers, 1),
+                                                                            thread_name_prefix="hanlu-analyze")
+        self._analyze_slots = max_pending_analyze  # 剩余的分析请求名额（只在事件循环线程中修改）
+
+        self._cache: collections.OrderedDict[Tuple[Any, ...], _ClosureResult] = collections.OrderedDict()
+        self._inflight: Dict[Tuple[Any, ...], asyncio.Future] = {}  # 正在计算的闭包查询，相同查询只计算一次
+
+        self.graph = graph
+        self.reload(graph)
+
+    # ------------------------------ 生命周期 ------------------------------
+
+    def reload(self, graph: Union[LineageGraph, LineageSnapshot]) -> None:
+        """替换血缘关系图并清空查询缓存（在事件循环线程中调用）"""
+        graph.build()
+        self.graph = graph
+        self._cache.clear()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        """启动服务，返回 asyncio 的服务器对象"""
+        if self.analyzer is not None and self._idle_worker_queue is None:
+            self._analyze_payload = dumps_analyzer(self.analyzer)
+            self._idle_worker_queue = asyncio.Queue()
+            for _ in range(max(self.analyze_workers, 1)):
+                self._idle_worker_queue.put_nowait(self._create_worker())
+        return await asyncio.start_server(self.handle_connection, host, port, limit=self.max_body_size)
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """启动服务并持续运行"""
+        server = await self.start(host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """关闭线程池和分析工作进程"""
+        self._query_executor.shutdown(wait=False)
+        for worker in self._analyze_worker_list:
+            if worker.index is None:
+                worker.stop()
+            else:
+                worker.kill()
+        self._analyze_worker_list.clear()
+        self._idle_worker_queue = None
+        self._analyze_wait_executor.shutdown(wait=False)
+
+    # ------------------------------ 请求处理 ------------------------------
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """处理一个连接上的所有请求"""
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, self.max_body_size)
+                except HttpError as e:
+                    write_json(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                status, value = await self.dispatch(request)
+                write_json(writer, status, value, keep_alive=request.keep_alive)
+                await writer.drain()
+                if not request.keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, request: HttpRequest) -> Tuple[int, Any]:
+        """根据请求路径分发请求，返回状态码和 JSON 对象"""
+        try:
+            if request.path == "/health":
+                return 200, {"status": "ok", "vertex_count": self.graph.vertex_count,
+                             "edge_count": self.graph.edge_count}
+            if request.path in {"/lineage/upstream", "/lineage/downstream", "/lineage/impact"}:
+                self._check_method(request, "GET")
+                return 200, await self.query_lineage(request.path.rsplit("/", 1)[1], request.query)
+            if request.path in {"/analyze/sql", "/analyze/shell", "/analyze/task"}:
+                self._check_method(request, "POST")
+                return 200, await self.analyze(request.path.rsplit("/", 1)[1], request.json())
+            raise HttpError(404, f"接口不存在: {request.path}")
+        except HttpError as e:
+            return e.status, {"error": e.message}
+        except Exception as e:
+            return 500, {"error": repr(e)}
+
+    @staticmethod
+    def _check_method(request: HttpRequest, method: str) -> None:
+        if request.method != method:
+            raise HttpError(405, f"{request.path} 只支持 {method} 请求")
+
+    # ------------------------------ 血缘查询 ------------------------------
+
+    async def query_lineage(self, query_type: str, query: Dict[str, str]) -> Dict[str, Any]:
+        """查询上游、下游或影响范围（下游闭包及每层的任务数，默认只返回数据任务）
+
+        Parameters
+        ----------
+        query_type : str
+            upstream、downstream 或 impact
+        query : Dict[str, str]
+            查询参数
+        """
+        sources = self._resolve_sources(query)
+        max_depth = self._get_int(query, "depth", None)
+        kind = query.get("kind", "task" if query_type == "impact" else "all")
+        if kind not in _KIND_SET:
+            raise HttpError(400, f"kind 只能是 {sorted(_KIND_SET)} 之一")
+        offset = self._get_int(query, "offset", 0)
+        limit = min(self._get_int(query, "limit", self.default_page_size), self.max_page_size)
+
+        direction = _DIRECTION_UPSTREAM if query_type == "upstream" else _DIRECTION_DOWNSTREAM
+        result = await self._get_closure((direction, sources, max_depth))
+        item_list = result.item_hash[kind]
+        response = {
+            "total": len(item_list),
+            "offset": offset,
+            "limit": limit,
+            "items": item_list[offset:offset + limit],
+        }
+        if query_type == "impact":
+            response["node_count"] = len(result.item_hash["node"])
+            response["task_count"] = len(result.item_hash["task"])
+            response["task_count_by_depth"] = result.depth_count
+        return response
+
+    def _resolve_sources(self, query: Dict[str, str]) -> Tuple[Any, ...]:
+        """根据查询参数确定起点（同名的数据节点可能有多个）"""
+        if "task" in query:
+            task_id = self.graph.find_task(query["task"])
+            if task_id is None:
+                raise HttpError(404, f"任务不存在: {query['task']}")
+            return task_id,
+        if "table" in query:
+            key = (query.get("instance", ""), query.get("schema", ""), query["table"])
+            data_node_list = self.graph.find_nodes(*key)
+            if not data_node_list:
+                raise HttpError(404, f"数据节点不存在: {'.'.join(key)}")
+            return tuple(data_node_list)
+        raise HttpError(400, "需要指定 task 或 table 参数")
+
+    @staticmethod
+    def _get_int(query: Dict[str, str], name: str, default: Optional[int]) -> Optional[int]:
+        if name not in query or query[name] == "":
+            return default
+        try:
+            value = int(query[name])
+        except ValueError as e:
+            raise HttpError(400, f"参数 {name} 不是整数") from e
+        if value < 0:
+            raise HttpError(400, f"参数 {name} 不能小于 0")
+        return value
+
+    async def _get_closure(self, key: Tuple[Any, ...]) -> _ClosureResult:
+        """获取闭包查询结果：优先读取缓存，相同查询正在计算时等待其结果，否则在线程池中计算"""
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            return result
+        future = self._inflight.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        graph = self.graph
+        future = loop.run_in_executor(self._query_executor, self._compute_closure, graph, *key)
+        self._inflight[key] = future
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            del self._inflight[key]
+        if graph is self.graph:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _compute_closure(graph: Union[LineageGraph, LineageSnapshot], direction: str, sources: Tuple[Any, ...],
+                         max_depth: Optional[int]) -> _ClosureResult:
+        """计算闭包并转换为 JSON 对象列表；多个起点时合并各起点的闭包，取最小深度"""
+        query_func = graph.upstream if direction == _DIRECTION_UPSTREAM else graph.downstream
+        merged = LineageClosure()
+        for source in sources:
+            closure = query_func(source, max_depth)
+            for data_node, depth in closure.node_hash.items():
+                if data_node not in sources and depth < merged.node_hash.get(data_node, depth + 1):
+                    merged.node_hash[data_node] = depth
+            for task_id, depth in closure.task_hash.items():
+                if depth < merged.task_hash.get(task_id, depth + 1):
+                    merged.task_hash[task_id] = depth
+
+        node_items = []
+        for data_node, depth in merged.node_hash.items():
+            item = node_to_json(data_node)
+            item["depth"] = depth
+            node_items.append(item)
+        task_items = [{"type": "task", "task": task_id if isinstance(task_id, (int, str)) else str(task_id), "depth": depth}
+                      for task_id, depth in merged.task_hash.items()]
+        depth_count = collections.Counter(merged.task_hash.values())
+        return _ClosureResult(
+            item_hash={
+                "node": node_items,
+                "task": task_items,
+                "all": sorted(node_items + task_items, key=lambda item: item["depth"]),
+            },
+            depth_count=dict(sorted(depth_count.items()))
+        )
+
+    # ------------------------------ 分析请求 ------------------------------
+
+    async def analyze(self, analyze_type: str, body: Any) -> Dict[str, Any]:
+        """在分析工作进程中执行分析请求
+
+        Parameters
+        ----------
+        analyze_type : str
+            sql、shell 或 task
+        body : Any
+            请求体的 JSON 对象
+        """
+        if self.analyzer is None or self._idle_worker_queue is None:
+            raise HttpError(404, "服务没有配置分析器")
+        if not isinstance(body, dict):
+            raise HttpError(400, "请求体需要是 JSON 对象")
+
+        if analyze_type == "sql":
+            if not isinstance(body.get("sql"), str):
+                raise HttpError(400, "缺少 sql 参数")
+            data_instance = self.analyzer.hanlu_env.get_instance_by_jdbc_url(
+                body.get("jdbc_url"), user_name=body.get("user_name"), password=body.get("password"))
+            args = ("analyze_sql", data_instance, body["sql"], body.get("default_schema"))
+        elif analyze_type == "shell":
+            if not isinstance(body.get("script"), str):
+                raise HttpError(400, "缺少 script 参数")
+            args = ("analyze_shell_script", body["script"])
+        else:
+            if "task_type" not in body:
+                raise HttpError(400, "缺少 task_type 参数")
+            args = ("analyze_dolphin_task", body)
+
+        if self._analyze_slots <= 0:
+            raise HttpError(503, "等待中的分析请求过多，请稍后重试")
+        self._analyze_slots -= 1
+        try:
+            data_task = await self._call_worker(*args)
+        finally:
+            self._analyze_slots += 1
+        if isinstance(data_task, Exception):
+            raise data_task
+        return task_to_json(data_task)
+
+    async def _call_worker(self, method_name: str, *args: Any) -> Any:
+        """等待空闲的工作进程并调用分析器方法；超时、工作进程异常退出或请求被取消时终止该工作进程并创建新的工作进程"""
+        idle_worker_queue = self._idle_worker_queue
+        worker = await idle_worker_queue.get()
+        is_finished = False
+        try:
+            try:
+                worker.call(method_name, *args)
+            except OSError as e:  # 工作进程在空闲时异常退出
+                raise HttpError(503, "分析进程异常退出，已重启分析进程") from e
+            try:
+                is_ready = await asyncio.get_running_loop().run_in_executor(
+                    self._analyze_wait_executor, worker.connection.poll, self.analyze_timeout)
+            except OSError as e:  # 服务关闭时工作进程已被终止
+                raise HttpError(503, "服务正在关闭") from e
+            if not is_ready:
+                raise HttpError(503, f"分析超时（{self.analyze_timeout} 秒），已终止分析进程")
+            try:
+                _, result, _, _, _ = worker.connection.recv()
+            except (EOFError, OSError) as e:
+                raise HttpError(503, "分析进程异常退出，已重启分析进程") from e
+            worker.index = None
+            is_finished = True
+            return result
+        finally:
+            if self._idle_worker_queue is idle_worker_queue:  # 服务关闭后工作进程已在 close 中终止，不再放回
+                idle_worker_queue.put_nowait(worker if is_finished else self._replace_worker(worker))
+
+    def _create_worker(self) -> IsolatedWorker:
+        """创建新的分析工作进程"""
+        worker = IsolatedWorker(multiprocessing.get_context(), self._analyze_payload, None)
+        self._analyze_worker_list.append(worker)
+        return worker
+
+    def _replace_worker(self, worker: IsolatedWorker) -> IsolatedWorker:
+        """终止工作进程（如正在执行超时的分析）并创建新的工作进程"""
+        worker.kill()
+        self._analyze_worker_list.remove(worker)
+        return self._create_worker()
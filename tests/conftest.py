@@ -0,0 +1,125 @@
+"""
+测试使用的公共 fixture
+"""
+
+import contextlib
+import copy
+import re
+
+import pytest
+
+# 寒露元数据库中各表的唯一键字段（lu_ds_node 表的排序规则不区分大小写）
+_META_UNIQUE_KEY_HASH = {
+    "lu_ds_instance": ("instance_name",),
+    "lu_ds_node": ("instance_name", "schema_name", "table_name"),
+    "lu_ds_task": ("task_code",),
+    "lu_ds_task_node": ("task_code", "node_id", "direction"),
+}
+
+_INSERT_PATTERN = re.compile(r"INSERT (IGNORE )?INTO `(\w+)` \(([^)]*)\) VALUES .*?(?: ON DUPLICATE KEY UPDATE (.*))?$")
+_SELECT_PATTERN = re.compile(r"SELECT (.*?) FROM `(\w+)`(?: WHERE \(?([^)]*?)\)? IN .*)?$")
+_DELETE_PATTERN = re.compile(r"DELETE FROM `(\w+)` WHERE `(\w+)` IN .*$")
+
+
+def _unique_key(table_name, row):
+    return tuple(str(row[column]).lower() for column in _META_UNIQUE_KEY_HASH[table_name])
+
+
+class MemoryMetaDatabase:
+    """在内存中模拟寒露元数据库（hanlu_meta）：只支持 LineageStore 和 LineageWriter 使用的 SQL，记录执行的语句"""
+
+    def __init__(self):
+        self.table_hash = {table_name: [] for table_name in _META_UNIQUE_KEY_HASH}
+        self.statement_list = []
+        self.commit_count = 0
+        self.fail_on = None  # 执行包含该字符串的语句时抛出异常，用于测试回滚
+
+    @contextlib.contextmanager
+    def connection(self):
+        connection = _MemoryMetaConnection(self)
+        yield connection
+        connection.rollback()  # 没有提交的修改不生效
+
+    def rows(self, table_name, *columns):
+        return sorted(tuple(row[column] for column in columns) for row in self.table_hash[table_name])
+
+
+class _MemoryMetaConnection:
+    def __init__(self, database):
+        self.database = database
+        self.table_hash = copy.deepcopy(database.table_hash)
+
+    def cursor(self):
+        return _MemoryMetaCursor(self)
+
+    def commit(self):
+        self.database.table_hash = copy.deepcopy(self.table_hash)
+        self.database.commit_count += 1
+
+    def rollback(self):
+        self.table_hash = copy.deepcopy(self.database.table_hash)
+
+
+class _MemoryMetaCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.result = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def execute(self, sql, params=()):
+        params = list(params)
+        database = self.connection.database
+        database.statement_list.append(sql)
+        if database.fail_on is not None and database.fail_on in sql:
+            raise RuntimeError(f"模拟执行失败: {sql}")
+        table_hash = self.connection.table_hash
+        match = _INSERT_PATTERN.match(sql)
+        if match is not None:
+            is_ignore, table_name, column_str, update_str = match.groups()
+            columns = [column.strip("` ") for column in column_str.split(",")]
+            update_columns = re.findall(r"`(\w+)` = VALUES", update_str or "")
+            rows = table_hash[table_name]
+            for i in range(0, len(params), len(columns)):
+                row = dict(zip(columns, params[i:i + len(columns)]))
+                exist = next((old for old in rows if _unique_key(table_name, old) == _unique_key(table_name, row)),
+                             None)
+                if exist is None:
+                    row["id"] = max([old["id"] for old in rows], default=0) + 1
+                    rows.append(row)
+                elif not is_ignore:
+                    exist.update({column: row[column] for column in update_columns})
+            return
+        match = _DELETE_PATTERN.match(sql)
+        if match is not None:
+            table_name, column = match.groups()
+            table_hash[table_name] = [row for row in table_hash[table_name] if row[column] not in params]
+            return
+        match = _SELECT_PATTERN.match(sql)
+        if match is not None:
+            column_str, table_name, condition_str = match.groups()
+            columns = [column.strip("` ") for column in column_str.split(",")]
+            rows = table_hash[table_name]
+            if condition_str is not None:
+                condition_columns = [column.strip("` ") for column in condition_str.split(",")]
+                n = len(condition_columns)
+                key_set = {tuple(str(value).lower() for value in params[i:i + n]) for i in range(0, len(params), n)}
+                rows = [row for row in rows
+                        if tuple(str(row[column]).lower() for column in condition_columns) in key_set]
+            self.result = [tuple(row[column] for column in columns) for row in rows]
+            return
+        raise AssertionError(f"不支持的 SQL: {sql}")
+
+    def fetchall(self):
+        result, self.result = self.result, []
+        return result
+
+
+@pytest.fixture
+def meta_pool():
+    """模拟寒露元数据库的连接池（只提供 connection 上下文管理器）"""
+    return MemoryMetaDatabase()
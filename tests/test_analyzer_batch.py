@@ -0,0 +1,85 @@
+"""
+寒露批量分析器受限执行模式的测试
+"""
+
+import os
+import signal
+import time
+
+import pytest
+
+from hanlu import HanLuDefaultAnalyzer
+from hanlu import HanLuEnv
+from hanlu.analyzer_batch import BatchReport
+from hanlu.analyzer_batch import analyze_dolphin_tasks
+from hanlu.data_task import DTask
+from hanlu.data_task import DTaskFailReason
+
+
+class _BehaviorAnalyzer(HanLuDefaultAnalyzer):
+    """根据任务类型模拟超时、内存不足和工作进程异常退出的分析器"""
+
+    def analyze_dolphin_task(self, record):
+        if record["task_type"] == "SLEEP":
+            time.sleep(30)
+        elif record["task_type"] == "MEMORY_ERROR":
+            raise MemoryError
+        elif record["task_type"] == "ALLOCATE":
+            bytearray(1 << 33)
+        elif record["task_type"] in {"SIGKILL", "SIGTERM"}:
+            os.kill(os.getpid(), getattr(signal, record["task_type"]))
+            time.sleep(30)
+        return DTask.empty()
+
+
+def _run(task_type_list, task_timeout=None, memory_limit=None, workers=1):
+    records = [{"code": i, "task_type": task_type} for i, task_type in enumerate(task_type_list)]
+    report = BatchReport()
+    result = list(analyze_dolphin_tasks(_BehaviorAnalyzer(hanlu_env=HanLuEnv()), records, workers=workers,
+                                        report=report, task_timeout=task_timeout, memory_limit=memory_limit))
+    assert [task_code for task_code, _ in result] == list(range(len(task_type_list)))  # 按输入顺序返回
+    return [data_task.fail_reason for _, data_task in result], report
+
+
+def test_timeout_respawns_worker_for_next_task():
+    fail_reason_list, report = _run(["OK", "SLEEP", "OK", "OK"], task_timeout=0.5)
+    assert fail_reason_list == [None, DTaskFailReason.TIMEOUT, None, None]
+    assert len(report.worker_stat_hash) == 2  # 超时后由新的工作进程继续分析后续任务
+    assert report.failure_summary.reason_counter[DTaskFailReason.TIMEOUT] == 1
+
+
+def test_timeout_does_not_block_other_workers():
+    fail_reason_list, _ = _run(["SLEEP", "OK", "OK", "OK", "OK"], task_timeout=1, workers=2)
+    assert fail_reason_list == [DTaskFailReason.TIMEOUT, None, None, None, None]
+
+
+@pytest.mark.parametrize("task_type, memory_limit, expected", [
+    ("MEMORY_ERROR", None, DTaskFailReason.MEMORY_LIMIT),
+    ("SIGKILL", 1 << 40, DTaskFailReason.MEMORY_LIMIT),  # 设置内存限制时 SIGKILL 通常来自 OOM killer
+    ("SIGKILL", None, DTaskFailReason.WORKER_CRASH),
+    ("SIGTERM", 1 << 40, DTaskFailReason.WORKER_CRASH),  # 其他信号不视为超出内存限制
+])
+def test_crash_reason(task_type, memory_limit, expected):
+    fail_reason_list, _ = _run([task_type, "OK"], task_timeout=10, memory_limit=memory_limit)
+    assert fail_reason_list == [expected, None]
+
+
+def test_bounded_mode_runs_in_worker_process():
+    fail_reason_list, report = _run(["OK", "OK", "OK"], task_timeout=10)
+    assert fail_reason_list == [None, None, None]
+    assert os.getpid() not in report.worker_stat_hash  # workers 小于等于 1 时也在子进程中执行
+    assert report.task_count == 3
+
+
+def test_memory_limit_is_enforced():
+    fail_reason_list, _ = _run(["ALLOCATE", "OK"], memory_limit=1 << 32)
+    assert fail_reason_list == [DTaskFailReason.MEMORY_LIMIT, None]
+
+
+def test_mixed_failures_keep_order():
+    fail_reason_list, report = _run(["OK", "SLEEP", "MEMORY_ERROR", "OK", "SIGKILL", "OK"], task_timeout=1,
+                                    workers=3)
+    assert fail_reason_list == [None, DTaskFailReason.TIMEOUT, DTaskFailReason.MEMORY_LIMIT, None,
+                                DTaskFailReason.WORKER_CRASH, None]
+    assert report.task_count == 5  # 工作进程异常退出的任务不计入工作进程的统计
+    assert report.failure_summary.reason_counter[DTaskFailReason.WORKER_CRASH] == 1
@@ -0,0 +1,177 @@
+"""
+寒露分析器的测试
+"""
+
+import json
+import threading
+
+import pytest
+
+from hanlu import HanLuDefaultAnalyzer
+from hanlu import HanLuEnv
+from hanlu.analyzer_logger import HanLuLogger
+from hanlu.data_node import DHdfsInstance
+from hanlu.data_node import DHiveInstance
+from hanlu.data_node import DMySQLInstance
+from hanlu.data_node import DNode
+from hanlu.data_task import DTask
+from hanlu.data_task import DTaskFailReason
+from hanlu.hanlu_env import TableCatalog
+
+
+class _RecordLogger(HanLuLogger):
+    def __init__(self):
+        self.failure_list = []
+
+    def failure(self, reason, detail=None, **fields):
+        self.failure_list.append((reason, detail))
+
+
+def _create_table_catalog() -> TableCatalog:
+    table_catalog = TableCatalog()
+    table_catalog.add_tables([(None, "ods", "orders"), (None, "dw", "users"), (None, "default", "users")])
+    return table_catalog
+
+
+@pytest.mark.parametrize("table_catalog", [None, _create_table_catalog()])
+@pytest.mark.parametrize("schema_name, table_name, default_schema, expected", [
+    ("DW", "Orders", None, ("dw", "orders")),  # 表不在表目录中时同样转换为小写
+    ("ODS", "ORDERS", None, ("ods", "orders")),
+    (None, "Orders", "ODS", ("ods", "orders")),
+])
+def test_create_table_node_lowercases_hive_names(table_catalog, schema_name, table_name, default_schema, expected):
+    hive_instance = DHiveInstance.create(hosts=["h1:10000"], name="hive")
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=HanLuEnv(), table_catalog=table_catalog)
+    assert analyzer.create_table_node(hive_instance, schema_name, table_name, default_schema) == DNode.create(
+        instance=hive_instance, schema_name=expected[0], table_name=expected[1])
+
+
+@pytest.mark.parametrize("table_name, expected_schema", [
+    ("ORDERS", "ods"),  # 只有一个库包含该表
+    ("Users", "default"),  # 多个库包含该表时使用 default 库
+    ("Unknown", None),
+])
+def test_create_table_node_resolves_unqualified_names(table_name, expected_schema):
+    hive_instance = DHiveInstance.create(hosts=["h1:10000"], name="hive")
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=HanLuEnv(), table_catalog=_create_table_catalog())
+    assert analyzer.create_table_node(hive_instance, None, table_name) == DNode.create(
+        instance=hive_instance, schema_name=expected_schema, table_name=table_name.lower())
+
+
+def test_create_table_node_keeps_case_of_other_instances():
+    mysql_instance = DMySQLInstance.create(host="localhost", port=3306, name="mysql")
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=HanLuEnv(), table_catalog=_create_table_catalog())
+    assert analyzer.create_table_node(mysql_instance, "Shop", "Orders") == DNode.create(
+        instance=mysql_instance, schema_name="Shop", table_name="Orders")
+
+
+@pytest.mark.parametrize("path, table", [
+    ("hdfs://ns1/user/hive/warehouse/DW.db/Orders/dt=20240101/part-0000", "DW.Orders"),
+    ("/user/hive/warehouse/Users", "default.USERS"),  # default 库的表目录直接位于根路径下
+])
+def test_same_hive_table_through_jdbc_and_hdfs(path, table):
+    hanlu_env = HanLuEnv()
+    hdfs_instance = DHdfsInstance.create_hdfs_instance(name="hdfs", default_fs="hdfs://ns1")
+    hanlu_env.regist_hive_cluster(["h1:10000"], "hive", hdfs_instance=hdfs_instance,
+                                  hdfs_root_path="hdfs://ns1/user/hive/warehouse")
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=hanlu_env)
+
+    # beeline -u ... -n etl -p secret 执行的 SQL
+    jdbc_instance = hanlu_env.get_instance_by_jdbc_url("jdbc:hive2://h1:10000/ods", user_name="etl", password="secret")
+    sql_task = analyzer.analyze_sql(jdbc_instance, f"INSERT INTO {table} SELECT * FROM src")
+    # DataX hdfswriter 写入同一个表的目录
+    datax_task = analyzer.analyze_datax_config(json.dumps({"job": {"content": [{
+        "reader": {"name": "hdfsreader", "parameter": {"defaultFS": "hdfs://ns1", "path": "/tmp/src"}},
+        "writer": {"name": "hdfswriter", "parameter": {"defaultFS": "hdfs://ns1", "path": path}},
+    }]}}))
+    assert list(sql_task.generate_node_set) == list(datax_task.generate_node_set)
+    data_node = next(iter(datax_task.generate_node_set))
+    assert (data_node.schema_name, data_node.table_name) == tuple(table.lower().split("."))
+    assert data_node.instance.username is None and data_node.instance.password is None
+
+
+def test_sql_parse_error_is_logged_once():
+    logger = _RecordLogger()
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=HanLuEnv(), logger=logger)
+    hive_instance = DHiveInstance.create(hosts=["h1:10000"], name="hive")
+    data_task = analyzer.analyze_sql(hive_instance, "THIS IS )( NOT SQL")
+    assert data_task.fail_reason == DTaskFailReason.SQL_PARSE_ERROR
+    assert logger.failure_list == [(DTaskFailReason.SQL_PARSE_ERROR, data_task.fail_detail)]
+
+
+def test_sql_parse_error_keeps_fallback_reason():
+    class _Analyzer(HanLuDefaultAnalyzer):
+        def analyze_other_sql(self, data_instance, sql):
+            return self.fail(DTaskFailReason.UNSUPPORTED_DOLPHIN_TASK, "custom")
+
+    logger = _RecordLogger()
+    analyzer = _Analyzer(hanlu_env=HanLuEnv(), logger=logger)
+    data_task = analyzer.analyze_sql(DHiveInstance.create(hosts=["h1:10000"], name="hive"), "THIS IS )( NOT SQL")
+    assert data_task.fail_reason == DTaskFailReason.UNSUPPORTED_DOLPHIN_TASK
+    assert logger.failure_list == [(DTaskFailReason.UNSUPPORTED_DOLPHIN_TASK, "custom")]
+
+
+@pytest.mark.parametrize("sql_option", ["-e", "-q", "--query"])
+def test_beeline_sql_options(sql_option):
+    hanlu_env = HanLuEnv()
+    hanlu_env.regist_hive_cluster(["h1:10000"], "hive")
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=hanlu_env)
+    data_task = analyzer.analyze_shell_script(
+        f'beeline -u "jdbc:hive2://h1:10000/ods" --hivevar target=dw.orders {sql_option} '
+        f'"INSERT INTO ${{hivevar:target}} SELECT * FROM src"')
+    assert not data_task.is_unknown
+    assert [(node.schema_name, node.table_name) for node in data_task.dependent_node_set] == [("ods", "src")]
+    assert [(node.schema_name, node.table_name) for node in data_task.generate_node_set] == [("dw", "orders")]
+
+
+class _NestedScriptAnalyzer(HanLuDefaultAnalyzer):
+    """nested 命令将参数作为嵌套的 Shell 脚本分析"""
+
+    def analyze_other_shell_command(self, simu_process, command_input):
+        if command_input.command_name == "nested":
+            self.nested_task_list.append(self.analyze_shell_script(command_input.command_params[0]))
+            return DTask.empty()
+        return super().analyze_other_shell_command(simu_process, command_input)
+
+
+def _beeline_insert(target, source):
+    return f'beeline -u "jdbc:hive2://h1:10000/ods" -e "INSERT INTO {target} SELECT * FROM {source}"'
+
+
+def _table_names(node_set):
+    return sorted(f"{node.schema_name}.{node.table_name}" for node in node_set)
+
+
+@pytest.mark.parametrize("reuse_shell_system", [False, True])
+def test_shell_scripts_are_isolated(reuse_shell_system):
+    hanlu_env = HanLuEnv()
+    hanlu_env.regist_hive_cluster(["h1:10000"], "hive")
+    analyzer = _NestedScriptAnalyzer(hanlu_env=hanlu_env, reuse_shell_system=reuse_shell_system)
+    analyzer.nested_task_list = []
+    first_task = analyzer.analyze_shell_script(_beeline_insert("dw.a", "ods.b"))
+    second_task = analyzer.analyze_shell_script(
+        "\n".join([_beeline_insert("dw.c", "ods.d"), f"nested '{_beeline_insert('dw.e', 'ods.f')}'",
+                   _beeline_insert("dw.g", "ods.h")]))
+    assert _table_names(first_task.generate_node_set) == ["dw.a"]
+    # 嵌套脚本的血缘关系写入嵌套脚本的数据任务对象，嵌套脚本结束后的命令仍写入外层脚本的数据任务对象
+    assert _table_names(second_task.dependent_node_set) == ["ods.d", "ods.h"]
+    assert _table_names(second_task.generate_node_set) == ["dw.c", "dw.g"]
+    nested_task, = analyzer.nested_task_list
+    assert _table_names(nested_task.generate_node_set) == ["dw.e"]
+
+
+def test_shell_system_is_reused_per_thread():
+    hanlu_env = HanLuEnv()
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=hanlu_env, reuse_shell_system=True)
+    simu_system, context = analyzer._get_shell_system()
+    # 同一线程的脚本共享模拟系统（及其模拟文件系统）
+    assert analyzer._get_shell_system() == (simu_system, context)
+
+    thread_result = []
+    thread = threading.Thread(target=lambda: thread_result.append(analyzer._get_shell_system()))
+    thread.start()
+    thread.join()
+    assert thread_result[0][0] is not simu_system and thread_result[0][1] is not context
+
+    analyzer.hanlu_env = HanLuEnv()  # HanLuEnv 变化后重新初始化模拟系统
+    assert analyzer._get_shell_system()[0] is not simu_system
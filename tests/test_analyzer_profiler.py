@@ -0,0 +1,107 @@
+"""
+分阶段性能分析器的测试
+"""
+
+import json
+import pickle
+
+import pytest
+
+from hanlu import HanLuDefaultAnalyzer
+from hanlu import HanLuEnv
+from hanlu import analyzer_profiler
+from hanlu.analyzer_profiler import TimingProfiler
+
+
+class _FakeClock:
+    """每次调用 sleep 时前进指定秒数的时钟"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = _FakeClock()
+    monkeypatch.setattr(analyzer_profiler, "time", fake_clock)
+    return fake_clock
+
+
+def test_stage_metrics(clock):
+    profiler = TimingProfiler()
+    for seconds in [3e-6, 3e-6, 1e-3]:
+        with profiler.stage("sql_statement", "SQLInsertSelectStatement"):
+            clock.sleep(seconds)
+    with profiler.stage("shell_parse"):
+        clock.sleep(1e-6)
+    stages = profiler.report()["stages"]
+    metric = stages["sql_statement"]["SQLInsertSelectStatement"]
+    assert metric["count"] == 3 and metric["max_seconds"] == 1e-3
+    assert metric["total_seconds"] == pytest.approx(1.006e-3)
+    assert metric["histogram_us"] == {"<4": 2, "<1024": 1}  # 桶的上界为 2 的幂（微秒）
+    assert (metric["p50_seconds"], metric["p99_seconds"]) == (4e-6, 1.024e-3)
+    assert stages["shell_parse"][""]["count"] == 1  # 没有标签的阶段
+
+
+def test_slowest_tasks_breakdown(clock):
+    profiler = TimingProfiler(top_n=2)
+    for task_code, seconds in [(1, 0.3), (2, 0.1), (3, 0.2)]:
+        with profiler.task(task_code, "SHELL"):
+            with profiler.stage("shell_execute"):
+                clock.sleep(seconds)
+            with profiler.stage("shell_execute"):
+                clock.sleep(0.01)
+    with profiler.stage("sql_parse"):  # 任务之外的阶段不计入任务的分阶段耗时
+        clock.sleep(1)
+    report = profiler.report()
+    assert [task["task_code"] for task in report["slowest_tasks"]] == [1, 3]
+    assert report["slowest_tasks"][0]["breakdown_seconds"] == {"shell_execute": pytest.approx(0.31)}
+    assert report["stages"]["task"]["SHELL"]["count"] == 3
+    assert [task["task_code"] for task in profiler.report(top_n=1)["slowest_tasks"]] == [1]
+
+
+def test_merge_take_and_pickle(clock):
+    worker_profiler = TimingProfiler(top_n=2)
+    with worker_profiler.task(1, "SQL"):
+        with worker_profiler.stage("sql_parse"):
+            clock.sleep(0.5)
+    # 工作进程按批次取出统计信息，经序列化后在主进程中合并
+    batch = pickle.loads(pickle.dumps(worker_profiler.take()))
+    assert worker_profiler.report() == {"stages": {}, "slowest_tasks": []}
+
+    profiler = TimingProfiler(top_n=2)
+    with profiler.task(2, "SQL"):
+        clock.sleep(0.1)
+    profiler.merge(batch)
+    profiler.merge(batch)
+    report = profiler.report()
+    assert report["stages"]["sql_parse"][""]["count"] == 2
+    assert report["stages"]["task"]["SQL"]["count"] == 3
+    assert [task["task_code"] for task in report["slowest_tasks"]] == [1, 1]
+
+
+def test_export_json(clock, tmp_path):
+    profiler = TimingProfiler()
+    with profiler.task("a", "SQL"):
+        clock.sleep(0.1)
+    path = tmp_path / "profile.json"
+    profiler.export_json(str(path))
+    assert json.loads(path.read_text(encoding="utf-8"))["slowest_tasks"][0]["task_code"] == "a"
+
+
+def test_shell_command_labels_are_bounded():
+    hanlu_env = HanLuEnv()
+    hanlu_env.regist_hive_cluster(["h1:10000"], "hive")
+    profiler = TimingProfiler()
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=hanlu_env, profiler=profiler)
+    analyzer.analyze_shell_script('beeline -u "jdbc:hive2://h1:10000/ods" -e "INSERT INTO dw.a SELECT * FROM b"\n'
+                                  "/opt/run_20240101.sh\n/opt/run_20240102.sh\ncustom_tool --day 1")
+    # 脚本中的任意命令名称不作为标签，避免标签数量无限增长
+    assert profiler.report()["stages"]["shell_command"].keys() == {"beeline", "shell:other"}
+    assert profiler.report()["stages"]["shell_command"]["shell:other"]["count"] == 3
@@ -0,0 +1,72 @@
+"""
+合成海豚调度任务负载生成器和端到端性能基准测试脚本的测试（以子进程运行 benchmarks 目录下的脚本）
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARKS_PATH = os.path.join(ROOT_PATH, "benchmarks")
+
+
+def _run_script(script_name, *args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT_PATH, env.get("PYTHONPATH")]))
+    completed = subprocess.run([sys.executable, os.path.join(BENCHMARKS_PATH, script_name), *args], env=env,
+                               cwd=ROOT_PATH, capture_output=True, encoding="utf-8", timeout=300)
+    assert completed.returncode == 0, completed.stderr
+    return completed.stdout
+
+
+def _load_jsonl(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def test_generate_task_definitions(tmp_path):
+    for name, seed in [("a.jsonl", "1"), ("b.jsonl", "1"), ("c.jsonl", "2")]:
+        _run_script("synthetic_dolphin_workload.py", str(tmp_path / name), "--tasks", "200", "--seed", seed)
+    records = _load_jsonl(tmp_path / "a.jsonl")
+    assert records == _load_jsonl(tmp_path / "b.jsonl")  # 相同随机种子生成相同的任务
+    assert records != _load_jsonl(tmp_path / "c.jsonl")
+
+    assert len(records) == 200 and len({record["code"] for record in records}) == 200
+    assert {record["task_type"] for record in records} == {"SQL", "SHELL", "DEPENDENT"}
+    sql_params = [json.loads(record["task_params"]) for record in records if record["task_type"] == "SQL"]
+    shell_scripts = "\n".join(json.loads(record["task_params"])["rawScript"] for record in records
+                              if record["task_type"] == "SHELL")
+    assert any("${zdt" in task_params["sql"] for task_params in sql_params)
+    for command in ["beeline", "spark-submit", "datax.py"]:
+        assert command in shell_scripts
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_benchmark_result_and_baseline(tmp_path, workers):
+    records_path = tmp_path / "records.jsonl"
+    _run_script("synthetic_dolphin_workload.py", str(records_path), "--tasks", "40")
+    result_path = tmp_path / "result.json"
+    _run_script("bench_dolphin_workload.py", "--records", str(records_path), "--workers", workers, "--warmup", "5",
+                "--output", str(result_path))
+    with open(result_path, encoding="utf-8") as file:
+        result = json.load(file)
+    assert result["format_version"] == 1
+    assert result["config"]["tasks"] == 40 and result["config"]["workers"] == int(workers)
+    assert result["summary"]["tasks_per_second"] > 0
+    assert result["summary"]["peak_rss"]["self_bytes"] > 0
+    assert sum(metric["count"] for task_type, metric in result["task_latency"].items() if task_type != "all") == 40
+    for metric in result["task_latency"].values():
+        assert metric["p50_seconds"] <= metric["p90_seconds"] <= metric["p99_seconds"]
+    assert sum(metric["count"] for metric in result["stages"]["task"].values()) == 40
+
+    # 与之前的结果对比：相同配置时不提示配置不同
+    output = _run_script("bench_dolphin_workload.py", "--records", str(records_path), "--workers", workers,
+                         "--warmup", "5", "--baseline", str(result_path))
+    assert "吞吐量:" in output and "阶段 shell_parse" in output
+    assert "结果不能直接对比" not in output
+    output = _run_script("bench_dolphin_workload.py", "--tasks", "10", "--workers", workers, "--warmup", "0",
+                         "--baseline", str(result_path))
+    assert "结果不能直接对比" in output
@@ -0,0 +1,32 @@
+"""
+数据源对象及其驻留的测试
+"""
+
+import pickle
+
+from hanlu.data_node import DHdfsInstance
+from hanlu.data_node import DHiveInstance
+from hanlu.data_node import DNode
+
+
+def test_interned_and_plain_nodes_compare_by_fields():
+    named_instance = DHiveInstance.create(hosts=["h9:10000"], name="prod")
+    unnamed_instance = DHiveInstance.create(hosts=["h9:10000"], name=None)
+    assert named_instance == unnamed_instance
+    assert named_instance is unnamed_instance  # 驻留池的键与比较使用相同的字段
+
+    interned_node = DNode.create(instance=named_instance, schema_name="dw", table_name="orders")
+    plain_node = DNode(instance=DHiveInstance(data_type=named_instance.data_type, name="other",
+                                              hosts=("h9:10000",)), schema_name="dw", table_name="orders")
+    assert interned_node == plain_node and plain_node == interned_node
+    assert hash(interned_node) == hash(plain_node)
+    assert plain_node.intern() is interned_node
+    assert len({interned_node, plain_node}) == 1
+
+
+def test_interned_nodes_are_shared():
+    hdfs_instance = DHdfsInstance.create_hdfs_instance(name=None, default_fs="hdfs://ns9")
+    data_node = DNode.create(instance=hdfs_instance, table_name="/data/orders")
+    assert DNode.create(instance=hdfs_instance, table_name="/data/orders") is data_node
+    assert DNode.create(instance=hdfs_instance, table_name="/data/users") != data_node
+    assert pickle.loads(pickle.dumps(data_node)) is data_node
@@ -0,0 +1,64 @@
+"""
+数据任务对象的测试
+"""
+
+import pickle
+
+import pytest
+
+from hanlu.data_node import DHiveInstance
+from hanlu.data_node import DNode
+from hanlu.data_task import DTask
+from hanlu.data_task import DTaskFailReason
+
+HIVE_INSTANCE = DHiveInstance.create(hosts=["h1:10000"], name="hive")
+NODE_A = DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name="a")
+NODE_B = DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name="b")
+NODE_C = DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name="c")
+
+
+def test_list_api_is_compatible():
+    data_task = DTask(dependent_node_list=[NODE_A, NODE_A], generate_node_list=[NODE_B])
+    assert data_task.dependent_node_list == [NODE_A]
+    assert data_task.read_count(NODE_A) == 2
+    assert data_task.generate_node_list[0] is NODE_B
+    assert data_task.generate_node_list + [NODE_C] == [NODE_B, NODE_C]
+
+    with pytest.deprecated_call():
+        data_task.dependent_node_list.append(NODE_C)
+    with pytest.deprecated_call():
+        data_task.generate_node_list += [NODE_C, NODE_B]
+    assert list(data_task.dependent_node_set) == [NODE_A, NODE_C]
+    assert list(data_task.generate_node_set) == [NODE_B, NODE_C]
+    assert data_task.write_count(NODE_B) == 2
+
+    with pytest.deprecated_call():
+        data_task.dependent_node_list = [NODE_B]
+    assert list(data_task.dependent_node_set) == [NODE_B]
+
+
+@pytest.mark.parametrize("left_unknown, right_unknown", [(False, False), (True, False), (False, True), (True, True)])
+def test_add_matches_iadd(left_unknown, right_unknown):
+    def create(is_unknown, dependent, generate, fail_reason):
+        data_task = DTask(dependent_node_list=[dependent], generate_node_list=[generate])
+        if is_unknown:
+            data_task.is_unknown, data_task.fail_reason = True, fail_reason
+        return data_task
+
+    left = create(left_unknown, NODE_A, NODE_B, DTaskFailReason.SQL_PARSE_ERROR)
+    right = create(right_unknown, NODE_B, NODE_C, DTaskFailReason.UNSUPPORTED_SQL)
+    added = left + right
+    assert list(left.generate_node_set) == [NODE_B]  # + 不修改操作数
+    left += right
+    assert added == left
+    assert list(added.dependent_node_set) == [NODE_A, NODE_B]
+    assert added.is_unknown == (left_unknown or right_unknown)
+    with pytest.raises(TypeError):
+        left + 1  # noqa: B018
+
+
+def test_pickle_round_trip():
+    data_task = DTask(dependent_node_list=[NODE_A], generate_node_list=[NODE_B, NODE_B])
+    restored = pickle.loads(pickle.dumps(data_task))
+    assert restored == data_task
+    assert restored.write_count(NODE_B) == 2
@@ -0,0 +1,44 @@
+"""
+DataX 配置文件分析结果缓存的测试
+"""
+
+import json
+
+from hanlu import HanLuDefaultAnalyzer
+from hanlu import HanLuEnv
+from hanlu.data_node import DHdfsInstance
+from hanlu.data_node import DNode
+from hanlu.data_task import DTask
+from hanlu.datax import DEFAULT_DATAX_REGISTRY
+
+CONFIG = json.dumps({"job": {"content": [{
+    "reader": {"name": "streamreader", "parameter": {}},
+    "writer": {"name": "hdfswriter", "parameter": {"defaultFS": "hdfs://ns1", "path": "/warehouse/dw.db/orders"}},
+}]}})
+
+
+def _stream_reader(analyzer, parameter, is_reader):
+    return DTask.empty()
+
+
+def test_datax_cache_follows_env_and_registry():
+    hanlu_env = HanLuEnv()
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=hanlu_env)
+    analyzer.datax_registry = DEFAULT_DATAX_REGISTRY.copy()
+    assert analyzer.analyze_datax_config(CONFIG).is_unknown  # 没有注册 streamreader 的处理器
+
+    # 注册处理器后不命中旧的缓存结果
+    analyzer.datax_registry.regist_reader("streamreader", _stream_reader)
+    hdfs_instance = DHdfsInstance.create_hdfs_instance(name=None, default_fs="hdfs://ns1")
+    data_task = analyzer.analyze_datax_config(CONFIG)
+    assert not data_task.is_unknown
+    assert list(data_task.generate_node_set) == [DNode.create(instance=hdfs_instance,
+                                                              table_name="/warehouse/dw.db/orders")]
+
+    # 注册 Hive 集群后，HDFS 路径对应到 Hive 表
+    hanlu_env.regist_hive_cluster(["h1:10000"], "hive", hdfs_instance=hdfs_instance, hdfs_root_path="/warehouse")
+    data_task = analyzer.analyze_datax_config(CONFIG)
+    assert [(node.instance.name, node.schema_name, node.table_name) for node in data_task.generate_node_set] == [
+        ("hive", "dw", "orders")]
+    assert list(analyzer.analyze_datax_config(CONFIG).generate_node_set) == list(data_task.generate_node_set)
+    assert analyzer.datax_cache.misses == 3
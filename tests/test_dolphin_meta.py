@@ -0,0 +1,153 @@
+"""
+海豚调度元数据流式读取的测试（使用模拟的连接池，不需要 MySQL 服务）
+"""
+
+import json
+import pickle
+
+import pytest
+
+pytest.importorskip("pymysql")
+
+from hanlu import HanLuEnv  # noqa: E402
+from hanlu.common.mysql_pool import MySQLConnectionPool  # noqa: E402
+from hanlu.data_node import DHiveInstance  # noqa: E402
+from hanlu.data_node import DInstance  # noqa: E402
+from hanlu.data_node import DMySQLInstance  # noqa: E402
+from hanlu.dolphin_meta import DolphinMetaReader  # noqa: E402
+from hanlu.dolphin_meta import MySQLDolphinEnv  # noqa: E402
+
+
+class _FakeCursor:
+    def __init__(self, pool):
+        self.pool = pool
+        self.rows = []
+
+    def execute(self, sql, params):
+        self.pool.query_list.append((sql, list(params)))
+        table_name = sql.split("FROM `", 1)[1].split("`", 1)[0]
+        self.rows = list(self.pool.table_hash[table_name])
+        if table_name == "t_ds_datasource" and params:  # 按数据源 ID 过滤
+            self.rows = [row for row in self.rows if row["id"] in params]
+
+    def fetchmany(self, size):
+        self.pool.fetch_count += 1
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        pass
+
+
+class _FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self, cursor_class=None):
+        return _FakeCursor(self.pool)
+
+
+class _FakePool:
+    """记录查询、批次读取、归还和丢弃连接次数的连接池"""
+
+    def __init__(self, table_hash):
+        self.table_hash = table_hash
+        self.query_list = []
+        self.fetch_count = 0
+        self.released = 0
+        self.discarded = 0
+
+    def acquire(self):
+        return _FakeConnection(self)
+
+    def release(self, connection):
+        self.released += 1
+
+    def discard(self, connection):
+        self.discarded += 1
+
+
+TASK_LIST = [{"code": i, "task_type": "SQL"} for i in range(5)]
+
+
+def test_stream_in_batches():
+    pool = _FakePool({"t_ds_task_definition": TASK_LIST})
+    records = DolphinMetaReader(pool, batch_size=2).iter_task_definition()
+    assert next(records) == TASK_LIST[0]
+    assert pool.fetch_count == 1  # 只读取了第一个批次
+    assert list(records) == TASK_LIST[1:]
+    assert pool.fetch_count == 4  # 3 个批次和 1 次空批次
+    assert (pool.released, pool.discarded) == (1, 0)
+
+
+def test_stop_early_discards_connection():
+    pool = _FakePool({"t_ds_task_definition": TASK_LIST})
+    records = DolphinMetaReader(pool, batch_size=2).iter_task_definition()
+    next(records)
+    records.close()  # 服务端游标中还有未读取的记录
+    assert (pool.released, pool.discarded) == (0, 1)
+
+
+def test_task_definition_filters():
+    pool = _FakePool({"t_ds_task_definition": []})
+    reader = DolphinMetaReader(pool)
+    list(reader.iter_task_definition(project_codes=[1], process_codes=[10, 11], task_types=["SQL", "SHELL"],
+                                     columns=["code", "task_type"]))
+    assert pool.query_list[-1] == (
+        "SELECT `code`, `task_type` FROM `t_ds_task_definition` WHERE `project_code` IN (%s) AND `code` IN "
+        "(SELECT `post_task_code` FROM `t_ds_process_task_relation` WHERE `process_definition_code` IN (%s, %s)) "
+        "AND `task_type` IN (%s, %s)",
+        [1, 10, 11, "SQL", "SHELL"])
+
+    list(reader.iter_task_definition(task_codes=[]))
+    assert pool.query_list[-1] == ("SELECT * FROM `t_ds_task_definition` WHERE FALSE", [])
+
+
+def test_iter_batches():
+    reader = DolphinMetaReader(_FakePool({}), batch_size=2)
+    assert list(reader.iter_batches(iter(TASK_LIST))) == [TASK_LIST[0:2], TASK_LIST[2:4], TASK_LIST[4:]]
+
+
+def _datasource(datasource_id, datasource_type, connection_params):
+    return {"id": datasource_id, "type": datasource_type, "connection_params": json.dumps(connection_params)}
+
+
+DATASOURCE_LIST = [
+    _datasource(1, 2, {"jdbcUrl": "jdbc:hive2://h1:10000/dw", "user": "etl", "password": "secret"}),
+    _datasource(2, 0, {"address": "jdbc:mysql://db1:3306/", "database": "shop", "user": "u"}),
+    _datasource(3, 5, {"jdbcUrl": "jdbc:oracle:thin:@db2:1521:orcl"}),  # 不支持的数据源类型
+]
+
+
+def test_dolphin_env_caches_instances():
+    hanlu_env = HanLuEnv()
+    hanlu_env.regist_hive_cluster(["h1:10000"], "hive")
+    pool = _FakePool({"t_ds_datasource": DATASOURCE_LIST})
+    dolphin_env = MySQLDolphinEnv(DolphinMetaReader(pool), hanlu_env)
+
+    hive_instance = dolphin_env.get_data_instance(1)
+    assert isinstance(hive_instance, DHiveInstance) and hive_instance.name == "hive"
+    assert hive_instance.username == "etl" and hive_instance.schema_name == "dw"
+    assert dolphin_env.get_data_instance(1) is hive_instance
+    mysql_instance = dolphin_env.get_data_instance(2)
+    assert isinstance(mysql_instance, DMySQLInstance)
+    assert (mysql_instance.host, mysql_instance.port, mysql_instance.schema_name) == ("db1", 3306, "shop")
+    assert dolphin_env.get_data_instance(3) == DInstance.unknown()
+    assert dolphin_env.get_data_instance(99) is None
+    assert dolphin_env.get_data_instance(99) is None
+    assert len(pool.query_list) == 4  # 每个数据源 ID 只查询一次
+
+
+def test_dolphin_env_preload():
+    pool = _FakePool({"t_ds_datasource": DATASOURCE_LIST})
+    dolphin_env = MySQLDolphinEnv(DolphinMetaReader(pool), HanLuEnv())
+    dolphin_env.preload()
+    assert isinstance(dolphin_env.get_data_instance(2), DMySQLInstance)
+    assert dolphin_env.get_data_instance(3) == DInstance.unknown()
+    assert len(pool.query_list) == 1  # 预加载后不再逐个查询
+
+
+def test_pool_pickles_connect_arguments():
+    pool = MySQLConnectionPool(max_size=2, host="db1", user="u")
+    restored = pickle.loads(pickle.dumps(pool))
+    assert restored.__getstate__() == {"max_size": 2, "connect_kwargs": {"host": "db1", "user": "u"}}
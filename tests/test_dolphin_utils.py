@@ -0,0 +1,74 @@
+"""
+海豚调度工具函数的测试
+"""
+
+import datetime
+
+import pytest
+
+from hanlu.common import dolphin_utils
+
+
+@pytest.mark.parametrize("business_date, months, expected", [
+    (datetime.datetime(2024, 12, 15), 0, "20241215"),
+    (datetime.datetime(2024, 12, 15), 1, "20250115"),
+    (datetime.datetime(2024, 11, 15), 1, "20241215"),
+    (datetime.datetime(2024, 7, 31), 5, "20241231"),
+    (datetime.datetime(2024, 7, 31), 6, "20250131"),
+    (datetime.datetime(2024, 1, 15), -1, "20231215"),
+    (datetime.datetime(2024, 1, 15), -12, "20230115"),
+    (datetime.datetime(2024, 1, 15), -13, "20221215"),
+    (datetime.datetime(2024, 2, 15), -1, "20240115"),
+    (datetime.datetime(2024, 3, 31), -1, "20240229"),
+    (datetime.datetime(2024, 7, 31), -1, "20240630"),
+])
+def test_add_month_rollover(business_date, months, expected):
+    text = f"${{zdt.add(2,{months}).format(\"yyyyMMdd\")}}"
+    assert dolphin_utils.run_inner_function(text, business_date) == expected
+
+
+def test_normalize_last_month():
+    # 占位业务日期在 1 月，"上个月" 需要跨年
+    assert dolphin_utils.normalize_all_inner_function("dt=${zdt.add(2,-1).format(\"yyyyMMdd\")}") == "dt=19991201"
+
+
+@pytest.mark.parametrize("business_date, expected_list", [
+    (datetime.datetime(2024, 7, 31, 10, 30),
+     ["20240730", "2024-07-30", "202406", "20240724", "2024073109", "20240730", "20250630", "2023-07-31 10:30:00",
+      "20240717", "20240807"]),
+    (datetime.datetime(2024, 12, 31, 23, 0),
+     ["20241230", "2024-12-30", "202411", "20241224", "2024123122", "20241230", "20251130", "2023-12-31 23:00:00",
+      "20241217", "20250107"]),
+    (datetime.datetime(2025, 1, 1, 0, 0),
+     ["20241231", "2024-12-31", "202412", "20241225", "2024123123", "20241231", "20251201", "2024-01-01 00:00:00",
+      "20241218", "20250108"]),
+    (datetime.datetime(2024, 2, 29, 12, 0),
+     ["20240228", "2024-02-28", "202401", "20240222", "2024022911", "20240228", "20250129", "2023-02-28 12:00:00",
+      "20240215", "20240307"]),
+    (dolphin_utils.PLACEHOLDER_BUSINESS_DATE,
+     ["19991231", "1999-12-31", "199912", "19991225", "1999123123", "19991231", "20001201", "1999-01-01 00:00:00",
+      "19991218", "20000108"]),
+])
+def test_run_all_inner_function(business_date, expected_list):
+    script = ("${zdt.addDay(-1).format(\"yyyyMMdd\")}|${zdt.addDay(-1).format(\"yyyy-MM-dd\")}|"
+              "${zdt.add(2,-1).format(\"yyyyMM\")}|${zdt.add(5,-7).format(\"yyyyMMdd\")}|"
+              "${zdt.add(11,-1).format(\"yyyyMMddHH\")}|${start(\"yyyyMMdd\",-1)}|"
+              "${zdt.add(2,11).format(\"yyyyMMdd\")}|${zdt.add(1,-1).format(\"yyyy-MM-dd HH:mm:ss\")}|"
+              "${zdt.add(3,-2).format(\"yyyyMMdd\")}|${zdt.add(4,1).format(\"yyyyMMdd\")}")
+    assert dolphin_utils.run_all_inner_function(script, business_date).split("|") == expected_list
+    # 重复出现的内置函数与首次出现的结果一致
+    assert dolphin_utils.run_all_inner_function(f"{script}|{script}", business_date).split("|") == expected_list * 2
+
+
+@pytest.mark.parametrize("text", [
+    "${zdt}",
+    "${zdt.add(9,1).format(\"yyyyMMdd\")}",  # 不支持的时间单位
+    "${zdt.add(12,-30).format(\"yyyyMMddHHmm\")}",
+    "${zdt.unknown()}",
+    "${unknown_var}",
+    "${start(\"yyyyMMdd\")}",
+    "${zdt.getTime().format(\"yyyyMMdd\")}",
+    "${start(\"yyyyMMdd\",-1).format(\"yyyyMMdd\")}",
+])
+def test_unsupported_inner_function_is_kept(text):
+    assert dolphin_utils.run_all_inner_function(f"a {text} b", datetime.datetime(2024, 7, 31)) == f"a {text} b"
@@ -0,0 +1,77 @@
+"""
+寒露环境类的测试
+"""
+
+import pytest
+
+from hanlu import HanLuEnv
+from hanlu.common.string_utils import parse_jdbc_url
+from hanlu.data_node import DHdfsInstance
+from hanlu.data_node import DMySQLInstance
+from hanlu.hanlu_env import HiveLocation
+from hanlu.hanlu_env import hanlu_env as hanlu_env_module
+
+
+@pytest.mark.parametrize("root_path", [
+    "obs://b/user/hive/warehouse",
+    "obs://b/user/hive/warehouse/",
+    "/user/hive/warehouse",
+    "user/hive/warehouse",
+])
+@pytest.mark.parametrize("path", [
+    "obs://b/user/hive/warehouse/dw.db/t1/dt=20240101/part-0000",
+    "/user/hive/warehouse/dw.db/t1",
+])
+def test_hive_location_with_scheme_prefixed_root(root_path, path):
+    hdfs_instance = DHdfsInstance.create_obs_instance(name="obs", fs_obs_end_point="obs.example.com",
+                                                      fs_obs_bucket="b")
+    hanlu_env = HanLuEnv()
+    hanlu_env.regist_hive_cluster(["h1:10000"], "hive", hdfs_instance=hdfs_instance, hdfs_root_path=root_path)
+    assert (hanlu_env.get_hive_location_by_hdfs_path(hdfs_instance, path)
+            == HiveLocation(hive_name="hive", schema_name="dw", table_name="t1"))
+    assert hanlu_env.get_hive_location_by_hdfs_path(hdfs_instance, "obs://b/user/spark/dw.db/t1") is None
+
+
+def test_hive_table_location_with_scheme_prefixed_path():
+    hdfs_instance = DHdfsInstance.create_hdfs_instance(name="hdfs", default_fs="hdfs://ns1")
+    hanlu_env = HanLuEnv()
+    hanlu_env.regist_hive_table_location(hdfs_instance, "hdfs://ns1/data/external/orders", "hive", "ods", "orders")
+    assert (hanlu_env.get_hive_location_by_hdfs_path(hdfs_instance, "hdfs://ns1/data/external/orders/dt=20240101")
+            == HiveLocation(hive_name="hive", schema_name="ods", table_name="orders"))
+
+
+@pytest.mark.parametrize("jdbc_url, hosts, schema_name, params", [
+    ("jdbc:mysql://db1:3306/shop?useSSL=false&user=etl", ("db1:3306",), "shop", (("useSSL", "false"), ("user", "etl"))),
+    ("jdbc:mysql:loadbalance://db1:3306,db2:3306/shop?loadBalanceBlacklistTimeout=5000",
+     ("db1:3306", "db2:3306"), "shop", (("loadBalanceBlacklistTimeout", "5000"),)),
+    ("jdbc:mysql:replication://db1, db2:3307/shop", ("db1", "db2:3307"), "shop", ()),
+    ("jdbc:mysql:loadbalance://db1:3306,db2:3306", ("db1:3306", "db2:3306"), None, ()),  # 没有库名
+])
+def test_parse_mysql_jdbc_url(jdbc_url, hosts, schema_name, params):
+    jdbc_url_info = parse_jdbc_url(jdbc_url)
+    assert jdbc_url_info.protocol == "mysql"
+    assert (jdbc_url_info.hosts, jdbc_url_info.schema_name, jdbc_url_info.params) == (hosts, schema_name, params)
+
+
+@pytest.mark.parametrize("jdbc_url", [
+    "jdbc:mysql:loadbalance://db2:3306,db1:3306/shop",  # 使用第一个已注册的主机
+    "jdbc:mysql:replication://db9,db1/shop?user=etl",  # 省略端口号时使用默认端口号
+])
+def test_multi_host_mysql_url_uses_registered_server(jdbc_url):
+    hanlu_env = HanLuEnv()
+    hanlu_env.regist_mysql_server("db1", 3306, "mysql_shop")
+    data_instance = hanlu_env.get_instance_by_jdbc_url(jdbc_url)
+    assert isinstance(data_instance, DMySQLInstance)
+    assert (data_instance.name, data_instance.host, data_instance.port) == ("mysql_shop", "db1", 3306)
+    assert data_instance.schema_name == "shop"
+
+
+def test_jdbc_instance_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(hanlu_env_module, "JDBC_INSTANCE_CACHE_SIZE", 2)
+    hanlu_env = HanLuEnv()
+    url_list = [f"jdbc:hive2://h{i}:10000/dw" for i in range(3)]
+    hanlu_env.get_instance_by_jdbc_url(url_list[0])
+    hanlu_env.get_instance_by_jdbc_url(url_list[1])
+    hanlu_env.get_instance_by_jdbc_url(url_list[0])  # 命中后成为最近使用的结果
+    hanlu_env.get_instance_by_jdbc_url(url_list[2])
+    assert [key[0] for key in hanlu_env._jdbc_instance_cache] == [url_list[0], url_list[2]]
@@ -0,0 +1,142 @@
+"""
+增量血缘分析的测试（使用内存中模拟的寒露元数据库）
+"""
+
+import datetime
+import json
+
+import pytest
+
+pytest.importorskip("pymysql")
+
+from hanlu import HanLuDefaultAnalyzer  # noqa: E402
+from hanlu import HanLuEnv  # noqa: E402
+from hanlu.data_node import DHiveInstance  # noqa: E402
+from hanlu.data_node import DNode  # noqa: E402
+from hanlu.data_task import DTask  # noqa: E402
+from hanlu.data_task import DTaskFailReason  # noqa: E402
+from hanlu.meta_store import IncrementalAnalyzer  # noqa: E402
+from hanlu.meta_store import LineageStore  # noqa: E402
+from hanlu.meta_store import TaskCheckpoint  # noqa: E402
+
+HIVE_INSTANCE = DHiveInstance.create(hosts=["h1:10000"], name="hive")
+
+
+class _TableAnalyzer(HanLuDefaultAnalyzer):
+    """根据 task_params 中的表名构造数据任务对象，task_type 为 TIMEOUT 时模拟超时"""
+
+    def analyze_dolphin_task(self, record):
+        self.analyzed_code_list.append(record["code"])
+        if record["task_type"] == "TIMEOUT":
+            return self.fail(DTaskFailReason.TIMEOUT, task_code=record["code"])
+        task_params = json.loads(record["task_params"])
+        return DTask(dependent_node_list=[DNode.create(instance=HIVE_INSTANCE, schema_name="ods", table_name=table)
+                                          for table in task_params["in"]],
+                     generate_node_list=[DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name=table)
+                                         for table in task_params["out"]])
+
+
+class _ListReader:
+    """从列表中读取 t_ds_task_definition 记录的海豚调度元数据读取器"""
+
+    def __init__(self):
+        self.record_hash = {}
+
+    def set_task(self, code, version, in_tables, out_tables, task_type="SQL", project_code=1):
+        self.record_hash[code] = {
+            "code": code, "version": version, "project_code": project_code, "task_type": task_type,
+            "update_time": datetime.datetime(2024, 1, 1) + datetime.timedelta(days=version),
+            "task_params": json.dumps({"in": in_tables, "out": out_tables}),
+        }
+
+    def iter_task_definition(self, project_codes=None, task_codes=None, columns=None):
+        for record in self.record_hash.values():
+            if project_codes is not None and record["project_code"] not in project_codes:
+                continue
+            if task_codes is not None and record["code"] not in task_codes:
+                continue
+            yield {column: record[column] for column in columns} if columns is not None else dict(record)
+
+
+def _create_incremental(meta_pool):
+    analyzer = _TableAnalyzer(hanlu_env=HanLuEnv())
+    analyzer.analyzed_code_list = []
+    reader = _ListReader()
+    return IncrementalAnalyzer(analyzer, reader, LineageStore(meta_pool), task_code_batch_size=2), reader
+
+
+def _edges(meta_pool):
+    """(任务编码, 任务版本, 表名, 关联方向) 列表"""
+    table_name_hash = {row["id"]: row["table_name"] for row in meta_pool.table_hash["lu_ds_node"]}
+    return sorted((task_code, task_version, table_name_hash[node_id], direction)
+                  for task_code, task_version, node_id, direction
+                  in meta_pool.rows("lu_ds_task_node", "task_code", "task_version", "node_id", "direction"))
+
+
+def test_only_changed_tasks_are_analyzed(meta_pool):
+    incremental, reader = _create_incremental(meta_pool)
+    reader.set_task(1, 1, ["a"], ["b"])
+    reader.set_task(2, 1, ["b"], ["c"])
+    reader.set_task(3, 1, ["c"], ["d"])
+    result = incremental.run()
+    assert (result.changed_count, result.unchanged_count, result.deleted_count) == (3, 0, 0)
+    assert _edges(meta_pool) == [(1, 1, "a", 0), (1, 1, "b", 1), (2, 1, "b", 0), (2, 1, "c", 1),
+                                 (3, 1, "c", 0), (3, 1, "d", 1)]
+
+    # 第二次运行：任务 2 升级版本，任务 3 被删除，任务 4 为新增任务
+    incremental.analyzer.analyzed_code_list.clear()
+    reader.set_task(2, 2, ["b", "x"], ["e"])
+    del reader.record_hash[3]
+    reader.set_task(4, 1, ["d"], ["f"])
+    result = incremental.run()
+    assert (result.changed_count, result.unchanged_count, result.deleted_count) == (2, 1, 1)
+    assert sorted(incremental.analyzer.analyzed_code_list) == [2, 4]
+    assert _edges(meta_pool) == [(1, 1, "a", 0), (1, 1, "b", 1), (2, 2, "b", 0), (2, 2, "e", 1),
+                                 (2, 2, "x", 0), (4, 1, "d", 0), (4, 1, "f", 1)]  # 旧版本的关联关系被替换
+    assert sorted(LineageStore(meta_pool).load_checkpoints()) == [1, 2, 4]
+
+    # 第三次运行：没有变更
+    incremental.analyzer.analyzed_code_list.clear()
+    result = incremental.run()
+    assert (result.changed_count, result.unchanged_count, result.deleted_count) == (0, 3, 0)
+    assert incremental.analyzer.analyzed_code_list == []
+
+
+def test_update_time_change_triggers_reanalysis(meta_pool):
+    incremental, reader = _create_incremental(meta_pool)
+    reader.set_task(1, 1, ["a"], ["b"])
+    incremental.run()
+    reader.record_hash[1]["update_time"] += datetime.timedelta(hours=1)  # 版本不变但更新时间变化
+    changed, deleted, unchanged_count = incremental.find_changes()
+    assert list(changed) == [1] and deleted == [] and unchanged_count == 0
+
+
+def test_transient_failure_is_retried(meta_pool):
+    incremental, reader = _create_incremental(meta_pool)
+    reader.set_task(1, 1, ["a"], ["b"])
+    incremental.run()
+
+    reader.set_task(1, 2, ["a"], ["c"], task_type="TIMEOUT")
+    result = incremental.run()
+    assert (result.changed_count, result.retry_count) == (0, 1)
+    assert _edges(meta_pool) == [(1, 1, "a", 0), (1, 1, "b", 1)]  # 保留旧版本的关联关系和检查点
+    assert LineageStore(meta_pool).load_checkpoints()[1].task_version == 1
+
+    reader.set_task(1, 2, ["a"], ["c"])
+    result = incremental.run()
+    assert (result.changed_count, result.retry_count) == (1, 0)
+    assert _edges(meta_pool) == [(1, 2, "a", 0), (1, 2, "c", 1)]
+
+
+def test_project_filter_only_deletes_tasks_in_project(meta_pool):
+    incremental, reader = _create_incremental(meta_pool)
+    reader.set_task(1, 1, ["a"], ["b"], project_code=1)
+    reader.set_task(2, 1, ["a"], ["c"], project_code=2)
+    incremental.run()
+
+    del reader.record_hash[1]
+    del reader.record_hash[2]
+    result = incremental.run(project_codes=[2])
+    assert result.deleted_count == 1
+    assert LineageStore(meta_pool).load_checkpoints() == {1: TaskCheckpoint(
+        task_code=1, task_version=1, project_code=1, task_update_time=datetime.datetime(2024, 1, 2))}
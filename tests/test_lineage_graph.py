@@ -0,0 +1,101 @@
+"""
+血缘关系图的测试
+
+测试使用的血缘关系图（任务 5 与任务 2、3 构成环 b -> c -> d -> b）：
+- 任务 1：a -> b
+- 任务 2：b -> c
+- 任务 3：c -> d
+- 任务 4：a -> d
+- 任务 5：d -> b
+"""
+
+import pytest
+
+from hanlu.data_graph import LineageGraph
+from hanlu.data_node import DHiveInstance
+from hanlu.data_node import DNode
+from hanlu.data_task import DTask
+
+HIVE_INSTANCE = DHiveInstance.create(hosts=["h1:10000"], name="hive")
+NODE_HASH = {name: DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name=name) for name in "abcde"}
+EDGE_HASH = {1: ("a", "b"), 2: ("b", "c"), 3: ("c", "d"), 4: ("a", "d"), 5: ("d", "b")}
+
+
+def _create_graph() -> LineageGraph:
+    graph = LineageGraph()
+    for task_id, (dependent, generate) in EDGE_HASH.items():
+        graph.add_task(task_id, DTask(dependent_node_list=[NODE_HASH[dependent]],
+                                      generate_node_list=[NODE_HASH[generate]]))
+    return graph
+
+
+def _names(node_hash):
+    return {data_node.table_name: depth for data_node, depth in node_hash.items()}
+
+
+@pytest.mark.parametrize("max_depth, expected_nodes, expected_tasks", [
+    (None, {"b": 1, "d": 1, "c": 2}, {1: 1, 4: 1, 2: 2, 5: 2, 3: 3}),
+    (2, {"b": 1, "d": 1, "c": 2}, {1: 1, 4: 1, 2: 2, 5: 2}),
+    (1, {"b": 1, "d": 1}, {1: 1, 4: 1}),
+    (0, {}, {}),
+])
+def test_downstream_depth_limit(max_depth, expected_nodes, expected_tasks):
+    closure = _create_graph().downstream(NODE_HASH["a"], max_depth)
+    assert _names(closure.node_hash) == expected_nodes
+    assert closure.task_hash == expected_tasks
+
+
+@pytest.mark.parametrize("max_depth, expected_nodes, expected_tasks", [
+    (None, {"b": 1, "a": 2, "d": 2}, {2: 1, 1: 2, 5: 2, 3: 3, 4: 3}),  # 起点 c 不在闭包中
+    (2, {"b": 1, "a": 2, "d": 2}, {2: 1, 1: 2, 5: 2}),
+    (1, {"b": 1}, {2: 1}),
+])
+def test_upstream_depth_limit(max_depth, expected_nodes, expected_tasks):
+    closure = _create_graph().upstream(NODE_HASH["c"], max_depth)
+    assert _names(closure.node_hash) == expected_nodes
+    assert closure.task_hash == expected_tasks
+
+
+def test_closure_on_cycle_excludes_source():
+    graph = _create_graph()
+    closure = graph.downstream(NODE_HASH["b"])
+    assert _names(closure.node_hash) == {"c": 1, "d": 2}
+    assert closure.task_hash == {2: 1, 3: 2, 5: 3}
+    closure = graph.upstream(2)  # 任务作为起点
+    assert _names(closure.node_hash) == {"b": 0, "a": 1, "d": 1, "c": 2}
+    assert closure.task_hash == {1: 1, 5: 1, 3: 2, 4: 2}
+
+
+@pytest.mark.parametrize("source, target, expected", [
+    (NODE_HASH["a"], NODE_HASH["c"], [NODE_HASH["a"], 1, NODE_HASH["b"], 2, NODE_HASH["c"]]),
+    (NODE_HASH["a"], NODE_HASH["d"], [NODE_HASH["a"], 4, NODE_HASH["d"]]),
+    (3, 2, [3, NODE_HASH["d"], 5, NODE_HASH["b"], 2]),  # 经过环
+    (NODE_HASH["b"], NODE_HASH["b"], [NODE_HASH["b"]]),
+    (NODE_HASH["c"], NODE_HASH["a"], None),  # 逆数据流向不存在路径
+])
+def test_shortest_path(source, target, expected):
+    assert _create_graph().shortest_path(source, target) == expected
+
+
+def test_unknown_vertex_and_duplicate_task():
+    graph = _create_graph()
+    with pytest.raises(KeyError):
+        graph.downstream(NODE_HASH["e"])
+    with pytest.raises(KeyError):
+        graph.upstream(99)
+    with pytest.raises(KeyError):
+        graph.shortest_path(NODE_HASH["a"], NODE_HASH["e"])
+    with pytest.raises(ValueError):
+        graph.add_task(1, DTask.empty())
+
+
+def test_add_task_after_query_rebuilds():
+    graph = _create_graph()
+    assert graph.vertex_count == 9 and graph.edge_count == 10
+    assert not graph.has_node(NODE_HASH["e"])
+    graph.downstream(NODE_HASH["a"])
+    graph.add_task(6, DTask(dependent_node_list=[NODE_HASH["c"]], generate_node_list=[NODE_HASH["e"]]))
+    assert _names(graph.downstream(NODE_HASH["a"]).node_hash) == {"b": 1, "d": 1, "c": 2, "e": 3}
+    assert graph.find_nodes("hive", "dw", "e") == [NODE_HASH["e"]]
+    assert graph.find_nodes("hive", "dw", "missing") == []
+    assert graph.find_task("6") == 6
@@ -0,0 +1,76 @@
+"""
+血缘查询服务分析接口的测试
+"""
+
+import asyncio
+import os
+import signal
+import time
+
+import pytest
+
+from hanlu import HanLuDefaultAnalyzer
+from hanlu import HanLuEnv
+from hanlu.data_graph import LineageGraph
+from hanlu.data_task import DTask
+from hanlu_server.http_protocol import HttpError
+from hanlu_server.lineage_service import LineageService
+
+
+class _BehaviorAnalyzer(HanLuDefaultAnalyzer):
+    """根据任务类型模拟超时和工作进程异常退出的分析器"""
+
+    def analyze_dolphin_task(self, record):
+        if record["task_type"] == "SLEEP":
+            time.sleep(30)
+        elif record["task_type"] == "SIGKILL":
+            os.kill(os.getpid(), signal.SIGKILL)
+        return DTask.empty()
+
+
+def _run_service(coroutine_function, **kwargs):
+    async def main():
+        service = LineageService(LineageGraph(), analyzer=_BehaviorAnalyzer(hanlu_env=HanLuEnv()), **kwargs)
+        server = await service.start(port=0)
+        try:
+            return await coroutine_function(service)
+        finally:
+            server.close()
+            service.close()
+
+    return asyncio.run(main())
+
+
+def _worker_pids(service):
+    return {worker.process.pid for worker in service._analyze_worker_list}
+
+
+@pytest.mark.parametrize("task_type, message", [("SLEEP", "分析超时"), ("SIGKILL", "异常退出")])
+def test_analyze_replaces_failed_worker(task_type, message):
+    async def check(service):
+        pid_set = _worker_pids(service)
+        with pytest.raises(HttpError, match=message) as exc_info:
+            await service.analyze("task", {"task_type": task_type, "code": 1})
+        assert exc_info.value.status == 503
+        new_pid_set = _worker_pids(service)
+        assert len(new_pid_set) == 1 and new_pid_set != pid_set  # 终止失败的工作进程并创建新的工作进程
+        result = await service.analyze("task", {"task_type": "OK", "code": 2})
+        assert result["is_unknown"] is False and result["generate"] == []
+        assert _worker_pids(service) == new_pid_set  # 成功的请求复用工作进程
+
+    _run_service(check, analyze_workers=1, analyze_timeout=0.5)
+
+
+def test_concurrent_requests_do_not_wait_for_timed_out_worker():
+    async def check(service):
+        sleep_request = asyncio.ensure_future(service.analyze("task", {"task_type": "SLEEP", "code": 1}))
+        await asyncio.sleep(0.1)
+        start_time = time.monotonic()
+        for code in range(4):
+            await service.analyze("task", {"task_type": "OK", "code": code})
+        assert time.monotonic() - start_time < 1  # 另一个工作进程在超时期间继续处理请求
+        with pytest.raises(HttpError, match="分析超时"):
+            await sleep_request
+        assert len(_worker_pids(service)) == 2
+
+    _run_service(check, analyze_workers=2, analyze_timeout=2)
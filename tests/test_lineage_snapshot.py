@@ -0,0 +1,121 @@
+"""
+血缘关系快照的测试
+"""
+
+import struct
+
+import pytest
+
+from hanlu.data_graph import LineageSnapshot
+from hanlu.data_graph import LineageSnapshotError
+from hanlu.data_graph import LineageSnapshotWriter
+from hanlu.data_node import DHdfsInstance
+from hanlu.data_node import DHiveInstance
+from hanlu.data_node import DMySQLInstance
+from hanlu.data_node import DNode
+from hanlu.data_task import DTask
+
+
+def test_snapshot_excludes_credentials(tmp_path):
+    hive_instance = DHiveInstance.create(hosts=["h1:10000"], name="hive", username="hive_user",
+                                         password="hive_password")
+    obs_instance = DHdfsInstance.create_obs_instance(name="obs", fs_obs_end_point="obs.example.com",
+                                                     fs_obs_bucket="b", fs_obs_access_key="obs_access_key",
+                                                     fs_obs_secret_key="obs_secret_key")
+    source_node = DNode.create(instance=obs_instance, schema_name="/data", table_name="orders")
+    target_node = DNode.create(instance=hive_instance, schema_name="dw", table_name="orders")
+    data_task = DTask(dependent_node_list=[source_node], generate_node_list=[target_node])
+
+    writer = LineageSnapshotWriter()
+    writer.add_task(1, data_task)
+    path = str(tmp_path / "lineage.snapshot")
+    writer.write(path)
+
+    with open(path, "rb") as file:
+        content = file.read()
+    for secret in [b"hive_user", b"hive_password", b"obs_access_key", b"obs_secret_key"]:
+        assert secret not in content
+
+    with LineageSnapshot(path) as snapshot:
+        assert snapshot.has_node(source_node)
+        assert snapshot.has_node(target_node)
+        assert 1 in snapshot.downstream(source_node).task_hash
+        restored_node = snapshot.find_nodes("hive", "dw", "orders")[0]
+        assert restored_node.instance.hosts == ("h1:10000",)
+        assert restored_node.instance.password is None
+
+
+HIVE_INSTANCE = DHiveInstance.create(hosts=["h1:10000"], name="hive")
+NODE_A = DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name="a")
+NODE_B = DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name="b")
+NODE_C = DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name="c")
+
+
+def _write_snapshot(tmp_path) -> str:
+    writer = LineageSnapshotWriter()
+    writer.add_task(7, DTask(dependent_node_list=[NODE_A], generate_node_list=[NODE_B]))
+    writer.add_task("etl.load_c", DTask(dependent_node_list=[NODE_B], generate_node_list=[NODE_C]))
+    writer.add_task("12", DTask(dependent_node_list=[NODE_C], generate_node_list=[]))
+    path = str(tmp_path / "lineage.snapshot")
+    writer.write(path)
+    return path
+
+
+def _patch_file(path: str, offset: int, data: bytes) -> None:
+    with open(path, "r+b") as file:
+        file.seek(offset)
+        file.write(data)
+
+
+def test_snapshot_rejects_corrupted_body(tmp_path):
+    path = _write_snapshot(tmp_path)
+    with open(path, "rb") as file:
+        size = len(file.read())
+    _patch_file(path, size - 1, b"\xff")  # 修改元数据段的最后一个字节
+    with pytest.raises(LineageSnapshotError, match="校验失败"):
+        LineageSnapshot(path)
+    with LineageSnapshot(path, verify=False) as snapshot:  # 不校验时可以打开
+        assert snapshot.task_count == 3
+
+
+def test_snapshot_rejects_other_version(tmp_path):
+    path = _write_snapshot(tmp_path)
+    with open(path, "rb") as file:
+        version = struct.unpack_from("<I", file.read(12), 8)[0]  # 版本号位于 8 字节的魔数之后
+    _patch_file(path, 8, struct.pack("<I", version + 1))
+    with pytest.raises(LineageSnapshotError, match="版本"):
+        LineageSnapshot(path, verify=False)
+
+
+def test_snapshot_string_task_ids(tmp_path):
+    with LineageSnapshot(_write_snapshot(tmp_path)) as snapshot:
+        assert list(snapshot.tasks()) == [7, "12", "etl.load_c"]  # 整数任务 ID 排在字符串任务 ID 之前
+        assert snapshot.find_task("etl.load_c") == "etl.load_c"
+        assert snapshot.find_task("7") == 7
+        assert snapshot.find_task("12") == "12"  # 不存在整数任务 ID 12 时匹配字符串任务 ID
+        assert snapshot.find_task("missing") is None
+        assert snapshot.has_task("etl.load_c") and not snapshot.has_task(12)
+        assert snapshot.downstream(NODE_A).task_hash == {7: 1, "etl.load_c": 2, "12": 3}
+        assert list(snapshot.upstream("12").task_hash) == ["etl.load_c", 7]
+        assert dict(snapshot.iter_tasks())["etl.load_c"] == DTask(dependent_node_list=[NODE_B],
+                                                                  generate_node_list=[NODE_C])
+        with pytest.raises(KeyError):
+            snapshot.downstream("etl.missing")
+
+
+def test_snapshot_lookup_ignores_credentials(tmp_path):
+    mysql_instance = DMySQLInstance.create(host="db1", port=3306, name="mysql", username="u1", password="p1")
+    mysql_node = DNode.create(instance=mysql_instance, schema_name="shop", table_name="orders")
+    writer = LineageSnapshotWriter()
+    writer.add_task(1, DTask(dependent_node_list=[mysql_node], generate_node_list=[NODE_A]))
+    path = str(tmp_path / "lineage.snapshot")
+    writer.write(path)
+
+    other_user = DMySQLInstance.create(host="db1", port=3306, name="mysql", username="u2", password="p2")
+    other_host = DMySQLInstance.create(host="db2", port=3306, name="mysql", username="u1", password="p1")
+    with LineageSnapshot(path) as snapshot:
+        assert snapshot.has_node(mysql_node)
+        assert snapshot.has_node(DNode.create(instance=other_user, schema_name="shop", table_name="orders"))
+        assert not snapshot.has_node(DNode.create(instance=other_host, schema_name="shop", table_name="orders"))
+        assert snapshot.downstream(DNode.create(instance=other_user, schema_name="shop", table_name="orders")
+                                   ).task_hash == {1: 1}
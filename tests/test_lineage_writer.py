@@ -0,0 +1,140 @@
+"""
+血缘关系批量写入器的测试（使用内存中模拟的寒露元数据库）
+"""
+
+import datetime
+import json
+
+import pytest
+
+pytest.importorskip("pymysql")
+
+from hanlu.data_node import DHiveInstance  # noqa: E402
+from hanlu.data_node import DNode  # noqa: E402
+from hanlu.data_task import DTask  # noqa: E402
+from hanlu.meta_store import LineageWriter  # noqa: E402
+from hanlu.meta_store import TaskCheckpoint  # noqa: E402
+
+HIVE_INSTANCE = DHiveInstance.create(hosts=["h1:10000"], name="hive", username="etl", password="secret")
+
+
+def _task(in_tables, out_tables):
+    return DTask(dependent_node_list=[DNode.create(instance=HIVE_INSTANCE, schema_name="ods", table_name=table)
+                                      for table in in_tables],
+                 generate_node_list=[DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name=table)
+                                     for table in out_tables])
+
+
+def _checkpoint(task_code, task_version=1):
+    return TaskCheckpoint(task_code=task_code, task_version=task_version, project_code=1,
+                          task_update_time=datetime.datetime(2024, 1, 1))
+
+
+def _edges(meta_pool):
+    """(任务编码, 任务版本, 表名, 关联方向) 列表"""
+    table_name_hash = {row["id"]: row["table_name"] for row in meta_pool.table_hash["lu_ds_node"]}
+    return sorted((task_code, task_version, table_name_hash[node_id], direction)
+                  for task_code, task_version, node_id, direction
+                  in meta_pool.rows("lu_ds_task_node", "task_code", "task_version", "node_id", "direction"))
+
+
+def _insert_count(meta_pool, table_name):
+    return sum(1 for sql in meta_pool.statement_list if sql.startswith(f"INSERT INTO `{table_name}`"))
+
+
+def test_write_in_batches(meta_pool):
+    writer = LineageWriter(meta_pool, batch_size=2)
+    writer.add(_checkpoint(1), _task(["a"], ["b"]))
+    assert meta_pool.commit_count == 0  # 缓冲区未满时不写入
+    writer.add(_checkpoint(2), _task(["b"], ["c"]))
+    assert meta_pool.commit_count == 1
+    writer.add(_checkpoint(3), _task(["c"], ["d"]))
+    writer.flush()
+    writer.flush()  # 缓冲区为空时不再写入
+    assert meta_pool.commit_count == 2
+    assert _edges(meta_pool) == [(1, 1, "a", 0), (1, 1, "b", 1), (2, 1, "b", 0), (2, 1, "c", 1),
+                                 (3, 1, "c", 0), (3, 1, "d", 1)]
+    assert meta_pool.rows("lu_ds_task", "task_code", "task_version", "is_unknown") == [(1, 1, 0), (2, 1, 0),
+                                                                                      (3, 1, 0)]
+    assert _insert_count(meta_pool, "lu_ds_instance") == 1  # 数据源实例只写入一次
+
+
+def test_node_id_cache(meta_pool):
+    with LineageWriter(meta_pool) as writer:
+        writer.add(_checkpoint(1), _task(["a"], ["b"]))
+    node_query_count = sum(1 for sql in meta_pool.statement_list if sql.startswith("SELECT `id`"))
+    with writer:
+        writer.add(_checkpoint(2), _task(["a"], ["b"]))  # 数据节点 ID 已缓存
+    assert sum(1 for sql in meta_pool.statement_list if sql.startswith("SELECT `id`")) == node_query_count
+    assert len(meta_pool.table_hash["lu_ds_node"]) == 2
+
+    # 新的写入器预加载数据节点 ID 后也不再查询
+    writer = LineageWriter(meta_pool)
+    writer.preload_nodes()
+    meta_pool.statement_list.clear()
+    with writer:
+        writer.add(_checkpoint(3), _task(["a"], ["b"]))
+    assert not any(sql.startswith("INSERT IGNORE INTO `lu_ds_node`") for sql in meta_pool.statement_list)
+
+    # lu_ds_node 表的唯一键不区分大小写，大小写不同的表名使用已有的数据节点
+    with writer:
+        writer.add(_checkpoint(4), _task(["A"], ["b"]))
+    assert len(meta_pool.table_hash["lu_ds_node"]) == 2
+    assert _edges(meta_pool)[-2:] == [(4, 1, "a", 0), (4, 1, "b", 1)]
+
+
+def test_new_version_replaces_edges(meta_pool):
+    with LineageWriter(meta_pool) as writer:
+        writer.add(_checkpoint(1), _task(["a", "b"], ["c"]))
+        writer.add(_checkpoint(2), _task(["c"], ["d"]))
+    with LineageWriter(meta_pool) as writer:
+        writer.add(_checkpoint(1, task_version=2), _task(["a"], ["e"]))
+    assert _edges(meta_pool) == [(1, 2, "a", 0), (1, 2, "e", 1), (2, 1, "c", 0), (2, 1, "d", 1)]
+    assert meta_pool.rows("lu_ds_task", "task_code", "task_version") == [(1, 2), (2, 1)]
+
+
+def test_write_tasks_keeps_existing_checkpoints(meta_pool):
+    with LineageWriter(meta_pool) as writer:
+        writer.add(_checkpoint(1, task_version=5), _task(["a"], ["b"]))
+    LineageWriter(meta_pool, batch_size=1).write_tasks([(1, _task(["a"], ["c"])), (2, _task(["c"], ["d"])),
+                                                        (3, _task(["d"], ["e"]))],
+                                                       checkpoints={3: _checkpoint(3, task_version=7)})
+    assert meta_pool.rows("lu_ds_task", "task_code", "task_version", "project_code") == [(1, 5, 1), (2, 0, 0),
+                                                                                        (3, 7, 1)]
+    assert _edges(meta_pool)[:2] == [(1, 5, "a", 0), (1, 5, "c", 1)]
+
+
+def test_rollback_on_failure(meta_pool):
+    with LineageWriter(meta_pool) as writer:
+        writer.add(_checkpoint(1), _task(["a"], ["b"]))
+
+    meta_pool.fail_on = "INSERT INTO `lu_ds_task` "
+    writer.add(_checkpoint(1, task_version=2), _task(["x"], ["y"]))
+    with pytest.raises(RuntimeError):
+        writer.flush()
+    assert _edges(meta_pool) == [(1, 1, "a", 0), (1, 1, "b", 1)]  # 整个批次回滚
+    assert len(meta_pool.table_hash["lu_ds_node"]) == 2
+
+    # 回滚后数据节点 ID 缓存被清空，重新写入时重新写入数据节点
+    meta_pool.fail_on = None
+    writer.add(_checkpoint(1, task_version=2), _task(["x"], ["y"]))
+    writer.flush()
+    assert _edges(meta_pool) == [(1, 2, "x", 0), (1, 2, "y", 1)]
+
+
+def test_instance_info_excludes_secrets(meta_pool):
+    with LineageWriter(meta_pool) as writer:
+        writer.add(_checkpoint(1), _task(["a"], ["b"]))
+    (instance_name, instance_info), = meta_pool.rows("lu_ds_instance", "instance_name", "instance_info")
+    info = json.loads(instance_info)
+    assert instance_name == "hive"
+    assert info["hosts"] == ["h1:10000"] and info["username"] == "etl"
+    assert "password" not in info and "secret" not in instance_info
+
+
+def test_rows_per_statement(meta_pool):
+    with LineageWriter(meta_pool, rows_per_statement=2) as writer:
+        writer.add(_checkpoint(1), _task(["a", "b", "c"], ["d", "e"]))
+    assert _insert_count(meta_pool, "lu_ds_task_node") == 3  # 5 个关联关系分 3 个语句写入
+    assert sum(1 for sql in meta_pool.statement_list if sql.startswith("INSERT IGNORE INTO `lu_ds_node`")) == 3
+    assert len(_edges(meta_pool)) == 5
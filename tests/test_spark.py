@@ -0,0 +1,121 @@
+"""
+spark-submit 命令解析、血缘模板和 PySpark 脚本扫描的测试
+"""
+
+import pytest
+
+from hanlu import HanLuDefaultAnalyzer
+from hanlu import HanLuEnv
+from hanlu import special_command
+from hanlu.data_task import DTaskFailReason
+from hanlu.spark import PySparkScanCache
+from hanlu.spark import SparkLineageTemplate
+from hanlu.spark import parse_application_arguments
+from hanlu.spark import scan_pyspark_source
+
+
+class _FileProcess:
+    """只提供 read_file 的模拟进程"""
+
+    def __init__(self, file_hash):
+        self.file_hash = file_hash
+
+    def read_file(self, file_name):
+        return self.file_hash.get(file_name)
+
+
+@pytest.mark.parametrize("tokens, expected", [
+    (["--master", "yarn", "--deploy-mode=cluster", "--class", "com.a.Main", "app.jar", "20240101"],
+     {"arg_master": "yarn", "arg_deploy_mode": "cluster", "arg_class": "com.a.Main", "application": "app.jar",
+      "application_arguments": ["20240101"]}),
+    (["--conf", "spark.a=1", "--conf=spark.b=2=3", "job.py"],
+     {"arg_conf": ["spark.a=1", "spark.b=2=3"], "application": "job.py"}),  # 重复的 --conf 和 --conf=
+    (["--verbose", "--supervise", "--num-executors", "4", "job.py", "--verbose"],
+     {"arg_verbose": "true", "arg_supervise": "true", "arg_num_executors": "4", "application": "job.py",
+      "application_arguments": ["--verbose"]}),  # Application 之后的参数不作为 Spark 参数
+    (["--principal", "etl@EXAMPLE.COM", "--keytab", "/etc/etl.keytab", "app.jar"],
+     {"arg_principal": "etl@EXAMPLE.COM", "arg_keytab": "/etc/etl.keytab", "application": "app.jar"}),
+    (["app.jar", "--master", "local"], {"arg_master": None, "application_arguments": ["--master", "local"]}),
+])
+def test_parse_spark_submit(tokens, expected):
+    command = special_command.parse_spark_submit(tokens)
+    assert command is not None
+    for name, value in expected.items():
+        assert getattr(command, name) == value
+
+
+@pytest.mark.parametrize("tokens", [[], ["--master", "yarn"], ["--master"], ["--verbose"]])
+def test_parse_spark_submit_without_application(tokens):
+    assert special_command.parse_spark_submit(tokens) is None
+
+
+def test_parse_application_arguments():
+    args, kwargs = parse_application_arguments(["20240101", "--table", "dw.a", "--mode=full", "dt=1", "-x"])
+    assert args == ["20240101", "--table", "dw.a", "--mode=full", "dt=1", "-x"]
+    assert kwargs == {"table": "dw.a", "mode": "full", "dt": "1"}
+
+
+def test_template_render():
+    template = SparkLineageTemplate(dependent_tables=("ods.{table}",), generate_tables=("dw.{0}",),
+                                    sql="select '{{x}}' from {table}")
+    rendered = template.render(["t1", "--table", "src"])
+    assert rendered.dependent_tables == ("ods.src",) and rendered.generate_tables == ("dw.t1",)
+    assert rendered.sql == "select '{x}' from src"
+    with pytest.raises(KeyError):
+        template.render(["t1"])
+
+
+@pytest.mark.parametrize("source, sql_list, read_list, write_list, unresolved_count", [
+    ('spark.sql("insert into dw.a select * from ods.b")', ("insert into dw.a select * from ods.b",), (), (), 0),
+    ('t = "dw." + "a"\ndf.write.saveAsTable(t)\nspark.table(f"ods.{t}")', (), ("ods.dw.a",), ("dw.a",), 0),
+    ('spark.sql(sqlQuery="select 1")\ndf.write.insertInto(tableName="dw.c")', ("select 1",), (), ("dw.c",), 0),
+    ('t = "a"\nt = "b"\nspark.table(t)\nspark.sql(f"select {x:>3}")', (), (), (), 2),  # 无法静态确定的参数
+])
+def test_scan_pyspark_source(source, sql_list, read_list, write_list, unresolved_count):
+    result = scan_pyspark_source(source)
+    assert result.sql_list == sql_list
+    assert result.read_table_list == read_list
+    assert result.write_table_list == write_list
+    assert result.unresolved_count == unresolved_count
+
+
+def test_scan_cache_reuses_result():
+    cache = PySparkScanCache(max_size=1)
+    result = cache.scan('spark.table("a")')
+    assert cache.scan('spark.table("a")') is result
+    cache.scan('spark.table("b")')
+    assert len(cache) == 1 and cache.scan('spark.table("a")') is not result
+
+
+def _create_analyzer() -> HanLuDefaultAnalyzer:
+    hanlu_env = HanLuEnv()
+    hanlu_env.regist_hive_cluster(["h1:10000"], "hive")
+    hanlu_env.regist_spark_submit_template("etl.jar", "com.a.Load", SparkLineageTemplate(
+        dependent_tables=("ods.{source}",), generate_tables=("dw.{0}",)))
+    return HanLuDefaultAnalyzer(hanlu_env=hanlu_env, scan_pyspark=True)
+
+
+@pytest.mark.parametrize("tokens, expected_dependent, expected_generate", [
+    (["--class", "com.a.Load", "/opt/jobs/etl.jar", "orders", "--source", "orders_src"],
+     [("ods", "orders_src")], [("dw", "orders")]),  # 只注册文件名时匹配任意目录
+    (["--conf=spark.x=1", "/opt/jobs/job.py"], [("ods", "b")], [("dw", "a")]),
+])
+def test_analyze_spark_submit(tokens, expected_dependent, expected_generate):
+    file_process = _FileProcess({"/opt/jobs/job.py": 'spark.sql("insert into dw.a select * from ods.b")'})
+    data_task = _create_analyzer().analyze_spark_submit_command(file_process,
+                                                                special_command.parse_spark_submit(tokens))
+    assert not data_task.is_unknown
+    assert [(node.schema_name, node.table_name) for node in data_task.dependent_node_set] == expected_dependent
+    assert [(node.schema_name, node.table_name) for node in data_task.generate_node_set] == expected_generate
+
+
+@pytest.mark.parametrize("source", [
+    "spark.sql(",
+    "x = 'a\0'",  # 空字符
+    "x = " + "1 + " * 100000 + "1",  # 嵌套过深，构造语法树时 RecursionError
+])
+def test_analyze_invalid_pyspark_source(source):
+    data_task = _create_analyzer().analyze_spark_submit_command(
+        _FileProcess({"job.py": source}), special_command.parse_spark_submit(["job.py"]))
+    assert data_task.fail_reason == DTaskFailReason.UNSUPPORTED_SPARK_SUBMIT
+    assert data_task.fail_detail == "pyspark syntax error"
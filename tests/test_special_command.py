@@ -0,0 +1,41 @@
+"""
+特殊命令解析器的测试
+"""
+
+import pytest
+
+from hanlu import special_command
+
+
+@pytest.mark.parametrize("tokens, expected", [
+    (["-u", "jdbc:hive2://h1:10000/ods", "-n", "etl", "-p", "secret", "-e", "select 1"],
+     {"arg_url": "jdbc:hive2://h1:10000/ods", "arg_username": "etl", "arg_password": "secret",
+      "arg_execute": "select 1"}),
+    (["--url=jdbc:hive2://h1:10000", "--database=dw", "-f", "/tmp/a.sql"],
+     {"arg_url": "jdbc:hive2://h1:10000", "arg_database": "dw", "arg_filename": "/tmp/a.sql"}),
+    (["-q", "select 1; select 2"], {"arg_query": "select 1; select 2"}),
+    (["--query=select 1"], {"arg_query": "select 1"}),
+    (["-e", "select 'a=b'", "--silent"], {"arg_execute": "select 'a=b'", "arg_silent": "true"}),  # 省略值的开关参数
+    (["--silent=false", "--verbose", "-e", "select 1"],
+     {"arg_silent": "false", "arg_verbose": "true", "arg_execute": "select 1"}),
+    (["--hivevar", "dt=20240101", "--hivevar=k=v=w", "--hiveconf", "mapreduce.job.queuename=etl"],
+     {"hivevar_hash": {"dt": "20240101", "k": "v=w"}, "hiveconf_hash": {"mapreduce.job.queuename": "etl"}}),
+    (["--outputformat=csv2", "-r", "--showHeader", "false", "-e", "select 1"],
+     {"arg_options": (("outputformat", "csv2"), ("showHeader", "false")), "arg_execute": "select 1"}),
+])
+def test_parse_beeline(tokens, expected):
+    command = special_command.parse_beeline(tokens)
+    assert command is not None
+    for name, value in expected.items():
+        assert getattr(command, name) == value
+
+
+@pytest.mark.parametrize("tokens", [
+    ["-e"],  # 缺少参数值
+    ["--hivevar", "dt"],  # 键值对参数缺少 =
+    ["--hivevar"],
+    ["--unknown", "x"],
+    ["select 1"],
+])
+def test_parse_beeline_invalid(tokens):
+    assert special_command.parse_beeline(tokens) is None
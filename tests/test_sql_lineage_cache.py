@@ -0,0 +1,133 @@
+"""
+SQL 血缘分析结果缓存的测试
+"""
+
+import pickle
+
+from hanlu import HanLuDefaultAnalyzer
+from hanlu import HanLuEnv
+from hanlu.cache import SQLLineageCache
+from hanlu.cache import sql_lineage_cache
+from hanlu.column_lineage import SchemaStore
+from hanlu.column_lineage import TableSchema
+from hanlu.data_node import DHiveInstance
+from hanlu.data_node import DNode
+from hanlu.data_task import DTask
+from hanlu.hanlu_env import TableCatalog
+
+SQL = "INSERT INTO dw.t SELECT * FROM ods.s"
+HIVE_INSTANCE = DHiveInstance.create(hosts=["h1:10000"], name="hive")
+NODE_S = DNode.create(instance=HIVE_INSTANCE, schema_name="ods", table_name="s")
+NODE_T = DNode.create(instance=HIVE_INSTANCE, schema_name="dw", table_name="t")
+
+
+def _create_task() -> DTask:
+    return DTask(dependent_node_list=[NODE_S], generate_node_list=[NODE_T])
+
+
+def test_cache_key_follows_column_lineage_and_schema():
+    hive_instance = DHiveInstance.create(hosts=["h1:10000"], name="hive")
+    schema_store = SchemaStore()
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=HanLuEnv(), sql_cache=SQLLineageCache(), schema_provider=schema_store)
+    assert analyzer.analyze_sql(hive_instance, SQL).column_edge_list == []
+
+    # 开启字段级血缘关系后不命中关闭时的缓存结果；缺少表结构时无法展开 SELECT *
+    analyzer.column_lineage = True
+    assert analyzer.analyze_sql(hive_instance, SQL).column_edge_list == []
+    assert analyzer.sql_cache.misses == 2
+
+    # 更新表结构后不命中旧的缓存结果
+    schema_store.add_table("ods", "s", TableSchema(columns=("a", "b")))
+    schema_store.add_table("dw", "t", TableSchema(columns=("x", "y")))
+    column_edge_list = analyzer.analyze_sql(hive_instance, SQL).column_edge_list
+    assert [(edge.source_column, edge.target_column) for edge in column_edge_list] == [("a", "x"), ("b", "y")]
+    assert analyzer.analyze_sql(hive_instance, SQL).column_edge_list == column_edge_list
+    assert analyzer.sql_cache.misses == 3
+
+
+def test_fingerprint_changes_with_content():
+    schema_store = SchemaStore()
+    empty_fingerprint = schema_store.fingerprint()
+    schema_store.load_rows([("ODS", "S", "A", 0, False)], instance_name="hive")
+    assert schema_store.fingerprint() != empty_fingerprint
+    assert pickle.loads(pickle.dumps(schema_store)).fingerprint() == schema_store.fingerprint()
+
+    table_catalog = TableCatalog()
+    empty_fingerprint = table_catalog.fingerprint()
+    table_catalog.add_tables([(None, "ods", "s"), ("hive", "dw", "t")])
+    assert table_catalog.fingerprint() != empty_fingerprint
+    assert pickle.loads(pickle.dumps(table_catalog)).fingerprint() == table_catalog.fingerprint()
+
+
+def test_memory_hit_miss_and_key():
+    cache = SQLLineageCache()
+    assert cache.get(HIVE_INSTANCE, SQL) is None
+    cache.put(HIVE_INSTANCE, SQL, _create_task())
+    assert cache.get(HIVE_INSTANCE, f"  {SQL} ;  \n") == _create_task()  # 标准化后的 SQL 相同
+    assert cache.get(HIVE_INSTANCE, SQL, default_schema=None, context=None) == _create_task()
+    assert cache.get(HIVE_INSTANCE, SQL.lower()) is None
+    assert cache.get(HIVE_INSTANCE, SQL, default_schema="dw") is None
+    assert cache.get(HIVE_INSTANCE, SQL, context="column_lineage=True") is None
+    assert cache.get(DHiveInstance.create(hosts=["h2:10000"], name="hive2"), SQL) is None
+    assert (cache.memory_hits, cache.disk_hits, cache.misses) == (2, 0, 5)
+    assert SQLLineageCache(namespace="v2").make_key(HIVE_INSTANCE, SQL) != cache.make_key(HIVE_INSTANCE, SQL)
+
+
+def test_cached_task_is_a_copy():
+    cache = SQLLineageCache()
+    data_task = _create_task()
+    cache.put(HIVE_INSTANCE, SQL, data_task)
+    data_task.add_generate_node(NODE_S)  # 写入后修改参数不影响缓存
+    cached_task = cache.get(HIVE_INSTANCE, SQL)
+    cached_task.add_dependent_node(NODE_T)  # 修改返回值不影响缓存
+    assert cache.get(HIVE_INSTANCE, SQL) == _create_task()
+
+
+def test_memory_lru_eviction():
+    cache = SQLLineageCache(max_size=2)
+    for sql in ["select 1", "select 2"]:
+        cache.put(HIVE_INSTANCE, sql, DTask.empty())
+    assert cache.get(HIVE_INSTANCE, "select 1") is not None  # select 1 成为最近使用的结果
+    cache.put(HIVE_INSTANCE, "select 3", DTask.empty())
+    assert cache.get(HIVE_INSTANCE, "select 2") is None
+    assert cache.get(HIVE_INSTANCE, "select 1") is not None and cache.get(HIVE_INSTANCE, "select 3") is not None
+
+
+def test_disk_tier_flush_and_reload(tmp_path):
+    path = str(tmp_path / "sql_lineage.sqlite")
+    cache = SQLLineageCache(path=path, commit_interval=100)
+    cache.put(HIVE_INSTANCE, SQL, _create_task())
+    assert SQLLineageCache(path=path).get(HIVE_INSTANCE, SQL) is None  # 尚未提交的写入对其他连接不可见
+    cache.flush()
+
+    reloaded = SQLLineageCache(path=path)
+    assert reloaded.get(HIVE_INSTANCE, SQL) == _create_task()
+    assert reloaded.get(HIVE_INSTANCE, SQL) == _create_task()
+    assert (reloaded.memory_hits, reloaded.disk_hits) == (1, 1)  # 磁盘层命中后写入内存层
+    reloaded.close()
+
+    cache.put(HIVE_INSTANCE, "select 1", DTask.empty())
+    pickle.loads(pickle.dumps(cache))  # 序列化时提交尚未提交的写入
+    assert SQLLineageCache(path=path).get(HIVE_INSTANCE, "select 1") == DTask.empty()
+    cache.close()
+
+
+def test_format_version_invalidates_disk_tier(tmp_path, monkeypatch):
+    path = str(tmp_path / "sql_lineage.sqlite")
+    cache = SQLLineageCache(path=path, commit_interval=1)
+    cache.put(HIVE_INSTANCE, SQL, _create_task())
+    cache.close()
+    monkeypatch.setattr(sql_lineage_cache, "CACHE_FORMAT_VERSION", sql_lineage_cache.CACHE_FORMAT_VERSION + 1)
+    assert SQLLineageCache(path=path).get(HIVE_INSTANCE, SQL) is None
+
+
+def test_analyzer_reuses_cached_result():
+    analyzer = HanLuDefaultAnalyzer(hanlu_env=HanLuEnv(), sql_cache=SQLLineageCache())
+    data_task = analyzer.analyze_sql(HIVE_INSTANCE, SQL)
+    assert analyzer.analyze_sql(HIVE_INSTANCE, SQL + ";") == data_task
+    assert (analyzer.sql_cache.memory_hits, analyzer.sql_cache.misses) == (1, 1)
+
+    # 修改 Hive 表目录后不命中旧的缓存结果
+    analyzer.table_catalog = TableCatalog()
+    analyzer.analyze_sql(HIVE_INSTANCE, SQL)
+    assert analyzer.sql_cache.misses == 2
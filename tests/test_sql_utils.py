@@ -0,0 +1,59 @@
+"""
+SQL 工具函数的测试
+"""
+
+import pytest
+
+from hanlu.common import sql_utils
+
+
+def test_apply_hive_variables_statement_with_trailing_comment():
+    sql = "insert into a select * from ${hivevar:src} -- load a\n;\ninsert into b select * from c"
+    result = sql_utils.apply_hive_variables(sql, {"src": "s"})
+    assert sql_utils.split_sql_statements(result) == [
+        "insert into a select * from s -- load a",
+        "insert into b select * from c",
+    ]
+
+
+def test_apply_hive_variables_set_statement_with_trailing_comment():
+    sql = "set hivevar:dt=20240101; -- 业务日期\nselect * from t where dt = '${hivevar:dt}' -- 过滤\n;select 1"
+    result = sql_utils.split_sql_statements(sql_utils.apply_hive_variables(sql, {}))
+    assert result[1] == "-- 业务日期\nselect * from t where dt = '20240101' -- 过滤"
+    assert result[2] == "select 1"
+
+
+def test_apply_hive_variables_without_variables():
+    sql = "select 1 -- c\n;select 2"
+    assert sql_utils.apply_hive_variables(sql, {"x": "y"}) is sql
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("select 1; select 2;", ["select 1", "select 2"]),
+    ("select ';' from t; select 2", ["select ';' from t", "select 2"]),  # 字符串中的分号
+    ("select \"a;b\", 'it\\'s;' from t", ["select \"a;b\", 'it\\'s;' from t"]),  # 转义的引号
+    ("select `a;b` from t;select 2", ["select `a;b` from t", "select 2"]),  # 反引号标识符中的分号
+    ("select 1 -- x; y\n;select 2", ["select 1 -- x; y", "select 2"]),  # 单行注释中的分号
+    ("select /* a;\nb */ 1;select 2", ["select /* a;\nb */ 1", "select 2"]),  # 多行注释中的分号
+    (";; \n ; -- only comment\n; /* c */", []),  # 只包含空白和注释的语句
+    ("", []),
+])
+def test_split_sql_statements(sql, expected):
+    assert sql_utils.split_sql_statements(sql) == expected
+
+
+@pytest.mark.parametrize("sql, hivevar_hash, hiveconf_hash, expected", [
+    ("select ${hivevar:a}, ${hiveconf:a}, ${a}", {"a": "v"}, {"a": "c"}, ["select v, c, v"]),
+    ("select ${a}", {}, {"a": "c"}, ["select c"]),  # ${name} 在 Hive 变量中不存在时查找 Hive 配置
+    ("select ${hivevar:missing}", {}, {}, ["select ${hivevar:missing}"]),  # 未定义的变量保持不变
+    ("select ${a}", {"a": "${b}", "b": "x"}, {}, ["select x"]),  # 变量值中的变量引用
+    ("select '${a};'; select ${a}", {"a": "1"}, {}, ["select '1;'", "select 1"]),
+    ("set hivevar:a=2; select ${a}", {"a": "1"}, {}, ["set hivevar:a=2", "select 2"]),  # SET 覆盖 --hivevar
+    ("select ${a}; set a=3; select ${hiveconf:a}", {"a": "1"}, {}, ["select 1", "set a=3", "select 3"]),
+    ("set hivevar:t=x;y; select ${t}", {}, {}, ["set hivevar:t=x", "y", "select x"]),
+])
+def test_apply_hive_variables(sql, hivevar_hash, hiveconf_hash, expected):
+    original_hivevar_hash = dict(hivevar_hash)
+    result = sql_utils.apply_hive_variables(sql, hivevar_hash, hiveconf_hash)
+    assert sql_utils.split_sql_statements(result) == expected
+    assert hivevar_hash == original_hivevar_hash  # 不修改传入的映射